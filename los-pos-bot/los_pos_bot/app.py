@@ -4,23 +4,48 @@ Endpoints:
   GET  /health       — App Runner health check
   POST /webhook      — HubSpot company.creation webhook (HMAC validated)
   POST /run-batch    — Triggered by EventBridge Scheduler for nightly backfill
+  POST /run-list     — Scan every company in a HubSpot list
   POST /scan         — Ad-hoc single-domain scan (no HubSpot write)
+  GET  /scan/{id}    — Status and result of an async scan
+  GET  /scan/{id}/events — NDJSON stream of an async scan's progress
+  GET  /jobs         — Job queue depth, throughput and worker status
+
+Webhook, batch and list work goes through the durable job queue in
+``los_pos_bot.jobs`` and is processed by a worker pool started with the app.
 """
 
+import asyncio
+import copy
 import hashlib
 import hmac
+import inspect
 import json
 import logging
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from typing import Optional
+from urllib.parse import urlsplit
 
-from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from los_pos_bot import pipeline, writer
 from los_pos_bot.hubspot_companies import HubSpotCompanyClient
+from los_pos_bot.jobs import (
+    PRIORITY_BACKFILL,
+    PRIORITY_LIST,
+    PRIORITY_WEBHOOK,
+    Job,
+    JobQueue,
+    WorkerPool,
+)
+from los_pos_bot.scan_store import ScanStore
 from los_pos_bot.settings import get_settings
 
 settings = get_settings()
@@ -31,7 +56,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Truv LOS/POS Bot", version="1.0.0")
+job_queue = JobQueue(
+    settings.job_db_path,
+    max_attempts=settings.job_max_attempts,
+    backoff_seconds=settings.job_retry_backoff_seconds,
+)
+scan_store = ScanStore(
+    settings.job_db_path,
+    ttl_hours=settings.scan_cache_ttl_hours,
+    miss_ttl_hours=settings.scan_cache_miss_ttl_hours,
+)
+
+# Ad-hoc scans run here, never on the request threadpool
+_scan_executor = ThreadPoolExecutor(max_workers=settings.scan_workers, thread_name_prefix="scan")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_queue.recover()
+    worker_pool.start()
+    webhook_resolver.start()
+    yield
+    webhook_resolver.stop()
+    worker_pool.stop()
+    _scan_executor.shutdown(wait=False)
+
+
+app = FastAPI(title="Truv LOS/POS Bot", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -86,7 +137,6 @@ def _verify_hubspot_hmac(
 @app.post("/webhook")
 async def receive_webhook(
     request: Request,
-    background_tasks: BackgroundTasks,
     x_hubspot_request_timestamp: Optional[str] = Header(None),
     x_hubspot_signature_v3: Optional[str] = Header(None),
 ):
@@ -97,7 +147,9 @@ async def receive_webhook(
     2. Timestamp replay window (5-minute max)
     3. HMAC-SHA256 signature (V3)
 
-    Processing is async — returns 200 immediately, runs pipeline in background.
+    Processing is async — returns 200 immediately after queueing the company
+    ids. A resolver reads queued ids in batches of up to 100 once a short
+    window passes, so an import burst costs one HubSpot read per 100 companies.
     """
     # 1. Read raw bytes BEFORE any JSON parsing (critical for HMAC correctness)
     raw_body = await request.body()
@@ -137,12 +189,14 @@ async def receive_webhook(
 
     # HubSpot sends an array of subscription events
     events = payload if isinstance(payload, list) else [payload]
-    for event in events:
-        company_id = str(event.get("objectId") or event.get("companyId") or "")
-        if company_id:
-            background_tasks.add_task(_process_single_company_by_id, company_id)
+    company_ids = [str(event.get("objectId") or event.get("companyId") or "") for event in events]
+    queued = job_queue.enqueue(
+        [(company_id, None) for company_id in company_ids if company_id],
+        PRIORITY_WEBHOOK,
+        source="webhook",
+    )
 
-    return {"status": "accepted", "events": len(events)}
+    return {"status": "accepted", "events": len(events), "queued": queued}
 
 
 # ---------------------------------------------------------------------------
@@ -157,7 +211,6 @@ class BatchRequest(BaseModel):
 @app.post("/run-batch")
 async def run_batch(
     req: BatchRequest,
-    background_tasks: BackgroundTasks,
     x_scout_token: Optional[str] = Header(None),
 ):
     """Trigger nightly backfill of unenriched company records.
@@ -170,8 +223,12 @@ async def run_batch(
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     limit = min(req.limit, settings.batch_limit_per_run)
-    background_tasks.add_task(_run_batch_background, limit)
-    return {"status": "started", "limit": limit}
+    try:
+        queued = await run_in_threadpool(_enqueue_backfill, limit)
+    except Exception as e:
+        logger.error(f"Batch enqueue failed: {e}", exc_info=True)
+        raise HTTPException(status_code=502, detail="Failed to fetch companies from HubSpot")
+    return {"status": "queued", "limit": limit, "queued": queued}
 
 
 # ---------------------------------------------------------------------------
@@ -187,7 +244,6 @@ class ListBatchRequest(BaseModel):
 @app.post("/run-list")
 async def run_list_batch(
     req: ListBatchRequest,
-    background_tasks: BackgroundTasks,
     x_scout_token: Optional[str] = Header(None),
 ):
     """Trigger a batch scan for all companies in a HubSpot list.
@@ -199,8 +255,12 @@ async def run_list_batch(
     if settings.webhook_secret and not hmac.compare_digest(token, settings.webhook_secret):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    background_tasks.add_task(_run_list_background, req.list_id, req.force)
-    return {"status": "started", "list_id": req.list_id, "force": req.force}
+    try:
+        queued = await run_in_threadpool(_enqueue_list, req.list_id, req.force)
+    except Exception as e:
+        logger.error(f"List {req.list_id} enqueue failed: {e}", exc_info=True)
+        raise HTTPException(status_code=502, detail="Failed to fetch list from HubSpot")
+    return {"status": "queued", "list_id": req.list_id, "force": req.force, "queued": queued}
 
 
 # ---------------------------------------------------------------------------
@@ -210,27 +270,215 @@ async def run_list_batch(
 class ScanRequest(BaseModel):
     domain: str
     use_browser: bool = False
+    refresh: bool = False  # Ignore a fresh stored result
+    wait: bool = True  # False: return a job id at once and stream /scan/{job_id}/events
+
+
+def _check_token(x_scout_token: Optional[str]) -> None:
+    token = x_scout_token or ""
+    if settings.webhook_secret and not hmac.compare_digest(token, settings.webhook_secret):
+        raise HTTPException(status_code=401, detail="Unauthorized")
 
 
 @app.post("/scan")
-def scan_domain(
+async def scan_domain(
     req: ScanRequest,
     x_scout_token: Optional[str] = Header(None),
 ):
-    """Scan a single domain for LOS/POS — no HubSpot write, returns result directly."""
-    token = x_scout_token or ""
-    if settings.webhook_secret and not hmac.compare_digest(token, settings.webhook_secret):
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    domain = req.domain.strip()
+    """Scan a single domain for LOS/POS — no HubSpot write.
+
+    A fresh stored result is returned without scanning. Otherwise the scan
+    joins any in-flight scan of the domain, or starts one on the bounded
+    scan executor (503 when its queue is full). With wait=false the
+    response is a job id whose progress streams from /scan/{job_id}/events.
+    """
+    _check_token(x_scout_token)
+    domain = _normalize_domain(req.domain)
     if not domain:
         raise HTTPException(status_code=400, detail="domain is required")
 
+    stored = None if req.refresh else scan_store.get(domain, req.use_browser)
+    if stored:
+        response = {**stored.payload, "cached": True, "scanned_at": stored.scanned_at}
+        if req.wait:
+            return response
+        task = _register_scan_job(ScanTask.finished(domain, response))
+        return {"job_id": task.id, "status": task.status, "result": response}
+
+    task = _submit_adhoc_scan(domain, req.use_browser)
+    if task is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Scan queue is full — try again shortly",
+            headers={"Retry-After": "30"},
+        )
+    if not req.wait:
+        _register_scan_job(task)
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": task.id, "status": task.status, "events": f"/scan/{task.id}/events"},
+        )
+
     try:
-        result = pipeline.run(company_id="adhoc", raw_domain=domain, use_browser=req.use_browser)
+        await asyncio.wrap_future(task.future)
     except Exception as e:
         logger.error(f"Scan error for {domain}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Scan failed")
+    return {**task.payload, "cached": False}
+
+
+@app.get("/scan/{job_id}")
+def scan_job(job_id: str, x_scout_token: Optional[str] = Header(None)):
+    """Status of an async scan, with its result once done."""
+    _check_token(x_scout_token)
+    task = _scan_jobs.get(job_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired scan job")
+    return {"job_id": task.id, "domain": task.domain, "status": task.status, "result": task.payload}
+
+
+@app.get("/scan/{job_id}/events")
+async def scan_job_events(job_id: str, x_scout_token: Optional[str] = Header(None)):
+    """Stream an async scan's events as NDJSON until its result or error."""
+    _check_token(x_scout_token)
+    task = _scan_jobs.get(job_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired scan job")
+    return StreamingResponse(_stream_events(task), media_type="application/x-ndjson")
+
+
+async def _stream_events(task: "ScanTask"):
+    queue = task.subscribe()
+    try:
+        while True:
+            try:
+                record = await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                yield json.dumps({"event": "heartbeat", "job_id": task.id}) + "\n"
+                continue
+            yield json.dumps(record, default=str) + "\n"
+            if record["event"] in ("result", "error"):
+                return
+    finally:
+        task.unsubscribe(queue)
 
+
+# ---------------------------------------------------------------------------
+# Job queue status
+# ---------------------------------------------------------------------------
+
+@app.get("/jobs")
+def job_status(
+    window_minutes: int = 15,
+    x_scout_token: Optional[str] = Header(None),
+):
+    """Queue depth by status and priority, throughput over the window, and worker load."""
+    _check_token(x_scout_token)
+    return {
+        **job_queue.stats(window_seconds=max(window_minutes, 1) * 60),
+        "workers": worker_pool.stats(),
+        "resolver": webhook_resolver.stats(),
+        "scans": {
+            "workers": settings.scan_workers,
+            "pending": _adhoc_pending,
+            "queue_limit": settings.scan_queue_limit,
+            "in_flight": len(_inflight_scans),
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Background workers
+# ---------------------------------------------------------------------------
+
+def _get_client() -> HubSpotCompanyClient:
+    return HubSpotCompanyClient(api_token=settings.hubspot_api_token)
+
+
+# HubSpot batch endpoints take at most 100 inputs
+HUBSPOT_BATCH_SIZE = 100
+
+# Enough to resolve a webhook company's domain and honour manual corrections
+WEBHOOK_PROPERTIES = ["name", "domain", "website", "los_pos_manually_corrected"]
+
+# Async /scan jobs stay visible this long after they finish
+SCAN_JOB_RETENTION_SECONDS = 900
+
+# Layer events need a pipeline that reports layers as they finish
+_PIPELINE_REPORTS_LAYERS = "on_layer" in inspect.signature(pipeline.run).parameters
+
+
+class ScanTask:
+    """One pipeline run for a domain, shared by every caller waiting on it.
+
+    Records progress events (queued, started, layer, result or error) so
+    async /scan clients can stream them. Event-loop subscribers are fed
+    with call_soon_threadsafe from the scanning thread.
+    """
+
+    def __init__(self, domain: str, use_browser: bool = False):
+        self.id = uuid.uuid4().hex
+        self.domain = domain
+        self.use_browser = use_browser
+        self.future: Future = Future()
+        self.payload: Optional[dict] = None
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+        self._subscribers: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+
+    @classmethod
+    def finished(cls, domain: str, payload: dict) -> "ScanTask":
+        """A task already holding a stored result."""
+        task = cls(domain)
+        task.payload = payload
+        task.emit("result", result=payload)
+        task.future.set_result(None)
+        return task
+
+    @property
+    def status(self) -> str:
+        if self.future.done():
+            return "failed" if self.future.exception() else "done"
+        return "running" if any(e["event"] == "started" for e in self.events) else "queued"
+
+    def emit(self, event: str, **data) -> None:
+        record = {"event": event, "job_id": self.id, "domain": self.domain, "time": round(time.time(), 3), **data}
+        with self._lock:
+            self.events.append(record)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, record)
+            except RuntimeError:
+                pass  # Loop closed; the client is gone
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue of every event so far and each later one; call from the event loop."""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            for record in self.events:
+                queue.put_nowait(record)
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+
+
+# (normalized domain, use_browser) → the scan in progress, shared by workers
+# and /scan so nothing scans the same site twice at once (single flight)
+_inflight_scans: dict[tuple[str, bool], ScanTask] = {}
+_inflight_lock = threading.Lock()
+_adhoc_pending = 0
+
+# Async /scan job id → task
+_scan_jobs: dict[str, ScanTask] = {}
+_scan_jobs_lock = threading.Lock()
+
+
+def _scan_payload(result) -> dict:
+    """The /scan response body for a pipeline result."""
     return {
         "domain": result.domain,
         "los": result.los_platform,
@@ -244,97 +492,280 @@ def scan_domain(
     }
 
 
-# ---------------------------------------------------------------------------
-# Background workers
-# ---------------------------------------------------------------------------
+def _normalize_domain(raw: str) -> str:
+    """Lowercase a domain or URL and strip scheme, path, port and www."""
+    value = raw.strip().lower()
+    host = urlsplit(value if "://" in value else f"//{value}").hostname or ""
+    host = host.rstrip(".")
+    return host[4:] if host.startswith("www.") else host
 
-def _get_client() -> HubSpotCompanyClient:
-    return HubSpotCompanyClient(api_token=settings.hubspot_api_token)
 
+def _inflight(domain: str, use_browser: bool) -> Optional[ScanTask]:
+    """The running scan that covers this request; call with _inflight_lock held."""
+    return _inflight_scans.get((domain, True)) or (None if use_browser else _inflight_scans.get((domain, False)))
 
-def _process_single_company_by_id(company_id: str) -> None:
-    """Fetch a single company by ID and run the detection pipeline."""
-    client = _get_client()
+
+def _run_scan(task: ScanTask, company_id: str):
+    """Run the pipeline for a claimed task, publish its events and store the result.
+
+    The task stays in flight until its result is stored and its future
+    resolved, so a caller arriving in between joins it instead of finding
+    neither a running scan nor a stored result.
+    """
+    task.emit("started")
+    kwargs = {}
+    if _PIPELINE_REPORTS_LAYERS:
+        kwargs["on_layer"] = lambda layer, detail=None: task.emit("layer", layer=layer, **(detail or {}))
     try:
-        company = client.get_company(
-            company_id,
-            properties=["name", "domain", "website", "los_pos_manually_corrected"],
+        result = pipeline.run(
+            company_id=company_id,
+            raw_domain=task.domain,
+            use_browser=task.use_browser,
+            **kwargs,
         )
+        task.payload = _scan_payload(result)
+    except BaseException as e:
+        _end_inflight(task)
+        task.emit("error", error="Scan failed")
+        task.future.set_exception(e)
+        raise
+
+    try:
+        scan_store.put(task.domain, task.payload, found=bool(result.found), use_browser=task.use_browser)
     except Exception as e:
-        logger.error(f"[{company_id}] Failed to fetch company: {e}")
-        return
+        logger.warning(f"[{task.domain}] Failed to store scan result: {e}")
+    task.emit("result", result={**task.payload, "cached": False})
+    task.future.set_result(result)
+    _end_inflight(task)
+    return result
+
+
+def _end_inflight(task: ScanTask) -> None:
+    with _inflight_lock:
+        if _inflight_scans.get((task.domain, task.use_browser)) is task:
+            del _inflight_scans[(task.domain, task.use_browser)]
 
-    _process_company(client, company)
 
+def _scan_domain(domain: str, company_id: str = "adhoc", use_browser: bool = False):
+    """Run the pipeline for a normalized domain, joining any scan already in flight."""
+    with _inflight_lock:
+        task = _inflight(domain, use_browser)
+        owner = task is None
+        if owner:
+            task = _inflight_scans[(domain, use_browser)] = ScanTask(domain, use_browser)
+    if not owner:
+        logger.info(f"[{company_id}] Joining in-flight scan of {domain}")
+        return task.future.result()
+    return _run_scan(task, company_id)
 
-def _process_company(client: HubSpotCompanyClient, company: dict) -> None:
-    """Run pipeline + write for one company dict."""
-    company_id = company.get("id", "")
-    if not company_id:
-        return
 
-    # Skip if a rep has manually corrected this record
-    if client.is_manually_corrected(company):
-        logger.info(f"[{company_id}] Skipping — manually corrected")
-        return
+def _submit_adhoc_scan(domain: str, use_browser: bool) -> Optional[ScanTask]:
+    """Join the in-flight scan of a domain or start one on the scan executor.
+
+    Returns None when the executor already has scan_queue_limit scans waiting.
+    """
+    global _adhoc_pending
+    with _inflight_lock:
+        task = _inflight(domain, use_browser)
+        if task is not None:
+            return task
+        if _adhoc_pending >= settings.scan_workers + settings.scan_queue_limit:
+            return None
+        task = _inflight_scans[(domain, use_browser)] = ScanTask(domain, use_browser)
+        _adhoc_pending += 1
+    task.emit("queued")
+    task.future.add_done_callback(_release_adhoc_slot)
+    _scan_executor.submit(_run_scan, task, "adhoc")
+    return task
+
+
+def _release_adhoc_slot(_future: Future) -> None:
+    global _adhoc_pending
+    with _inflight_lock:
+        _adhoc_pending -= 1
+
+
+def _register_scan_job(task: ScanTask) -> ScanTask:
+    """Make a task reachable by job id, dropping jobs that finished long ago."""
+    cutoff = time.time() - SCAN_JOB_RETENTION_SECONDS
+    with _scan_jobs_lock:
+        for job_id, old in list(_scan_jobs.items()):
+            if old.future.done() and old.events[-1]["time"] < cutoff:
+                del _scan_jobs[job_id]
+        _scan_jobs[task.id] = task
+    return task
+
+
+def _for_company(result, company_id: str):
+    """Copy of a domain's result addressed to one company."""
+    addressed = copy.copy(result)
+    addressed.company_id = company_id
+    return addressed
+
+
+def _scannable(client: HubSpotCompanyClient, companies: list[dict]) -> tuple[list[tuple[str, str]], int]:
+    """(company id, normalized domain) for scannable companies, plus the skip count."""
+    items: list[tuple[str, str]] = []
+    skipped = 0
+    for company in companies:
+        company_id = company.get("id", "")
+        if not company_id or client.is_manually_corrected(company):
+            skipped += 1
+            continue
+        domain = _normalize_domain(client.get_domain_from_company(company) or "")
+        if not domain:
+            skipped += 1
+            continue
+        items.append((company_id, domain))
+    return items, skipped
 
-    raw_domain = client.get_domain_from_company(company)
-    if not raw_domain:
-        logger.warning(f"[{company_id}] No domain — skipping")
-        return
 
-    result = pipeline.run(company_id=company_id, raw_domain=raw_domain)
+# Worker scans reuse a domain's result for this long, so an import whose
+# companies resolve over several passes still scans each domain once
+RECENT_SCAN_SECONDS = 600
+_recent_scans: dict[str, tuple[float, object]] = {}
+_recent_lock = threading.Lock()
 
-    writer.write_result(
-        client=client,
-        result=result,
-        review_list_id=settings.hubspot_review_list_id,
+
+def _recent_scan(domain: str):
+    with _recent_lock:
+        entry = _recent_scans.get(domain)
+    if entry and time.monotonic() - entry[0] < RECENT_SCAN_SECONDS:
+        return entry[1]
+    return None
+
+
+def _remember_scan(domain: str, result) -> None:
+    now = time.monotonic()
+    with _recent_lock:
+        if len(_recent_scans) >= 10_000:
+            for key, (at, _) in list(_recent_scans.items()):
+                if now - at >= RECENT_SCAN_SECONDS:
+                    del _recent_scans[key]
+        _recent_scans[domain] = (now, result)
+
+
+def _scan_and_fan_out(domain: str, company_ids: list[str]) -> list:
+    """Scan a domain once and address the result to every company that shares it."""
+    result = _recent_scan(domain)
+    if result is None:
+        result = _scan_domain(domain, company_ids[0])
+        _remember_scan(domain, result)
+    return [_for_company(result, cid) for cid in company_ids]
+
+
+def _write_results(client: HubSpotCompanyClient, results: list) -> dict[str, str]:
+    """Write each result to HubSpot; returns {company id: error} for failed writes.
+
+    Writes go one company at a time through writer.write_result, which owns
+    the property mapping and the review-list rule. Scans are deduplicated
+    per domain, but the writes are not batched.
+    """
+    errors: dict[str, str] = {}
+    for result in results:
+        try:
+            writer.write_result(
+                client=client,
+                result=result,
+                review_list_id=settings.hubspot_review_list_id,
+            )
+        except Exception as e:
+            logger.error(f"[{result.company_id}] Write failed: {e}")
+            errors[result.company_id] = f"write failed: {e}"
+    return errors
+
+
+def _resolve_jobs(jobs: list[Job]) -> tuple[dict[str, str], dict[str, str]]:
+    """Resolver handler: read a burst of webhook companies at once and queue their domains."""
+    client = _get_client()
+    company_ids = [job.company_id for job in jobs]
+    companies, _ = _batch_read_companies(client, company_ids, WEBHOOK_PROPERTIES)
+    items, _ = _scannable(client, companies)
+    domains = dict(items)
+    job_queue.resolve(domains)
+
+    read = {company.get("id") for company in companies}
+    outcomes = {cid: "skipped" for cid in company_ids if cid in read and cid not in domains}
+    errors = {cid: "company read failed" for cid in company_ids if cid not in read}
+    logger.info(
+        f"Resolved {len(jobs)} webhook companies: {len(set(domains.values()))} unique domains | "
+        f"{len(outcomes)} skipped | {len(errors)} unread"
     )
+    return outcomes, errors
 
 
-def _run_batch_background(limit: int) -> None:
-    """Fetch unenriched companies and process them with bounded concurrency."""
+def _process_jobs(jobs: list[Job]) -> tuple[dict[str, str], dict[str, str]]:
+    """Worker handler: scan each unique domain once and write each result.
+
+    Returns ({company id: outcome}, {company id: error}) for the job queue.
+    """
     client = _get_client()
-    companies = list(client.get_unenriched_companies(limit=limit))
-    logger.info(f"Batch run: {len(companies)} companies to process")
-
-    max_workers = settings.max_concurrent_domains
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(_process_company, client, co): co.get("id", "?")
-            for co in companies
-        }
-        completed = 0
-        for future in as_completed(futures):
-            cid = futures[future]
-            try:
-                future.result()
-            except Exception as e:
-                logger.error(f"[{cid}] Unhandled error in batch: {e}")
-            completed += 1
-            if completed % 25 == 0:
-                logger.info(f"Batch progress: {completed}/{len(companies)}")
+    outcomes: dict[str, str] = {}
+    errors: dict[str, str] = {}
+    groups: dict[str, list[str]] = {}
+    for job in jobs:
+        groups.setdefault(job.domain, []).append(job.company_id)
+
+    results = []
+    for domain, company_ids in groups.items():
+        try:
+            results.extend(_scan_and_fan_out(domain, company_ids))
+        except Exception as e:
+            logger.error(f"[{domain}] Scan failed: {e}")
+            errors.update(dict.fromkeys(company_ids, f"scan failed: {e}"))
 
-    logger.info(f"Batch run complete: {len(companies)} companies processed")
+    write_errors = _write_results(client, results)
+    errors.update(write_errors)
+    for result in results:
+        if result.company_id not in write_errors:
+            outcomes[result.company_id] = "found" if result.found else "unknown"
 
+    logger.info(
+        f"Worker batch: {len(jobs)} jobs, {len(groups)} domains | "
+        f"{sum(o == 'found' for o in outcomes.values())} found | {len(errors)} errors"
+    )
+    return outcomes, errors
+
+
+worker_pool = WorkerPool(
+    job_queue,
+    _process_jobs,
+    workers=settings.job_workers,
+    claim_size=settings.job_claim_size,
+)
 
-def _run_list_background(list_id: str, force: bool = False) -> None:
-    """Fetch all companies in a HubSpot list and run the detection pipeline."""
+# One resolver is enough: each pass is a single 100-company batch read
+webhook_resolver = WorkerPool(
+    job_queue,
+    _resolve_jobs,
+    workers=1,
+    claim_size=HUBSPOT_BATCH_SIZE,
+    poll_interval=settings.webhook_batch_window_seconds / 2,
+    claim=lambda limit: job_queue.claim_unresolved(limit, settings.webhook_batch_window_seconds),
+    wake_on_enqueue=False,
+    retry_unreported=False,
+)
+
+
+def _enqueue_backfill(limit: int) -> int:
+    """Queue unenriched companies for the nightly backfill."""
     client = _get_client()
-    from los_pos_bot.hubspot_companies import COMPANY_PROPERTIES
+    companies = list(client.get_unenriched_companies(limit=limit))
+    items, skipped = _scannable(client, companies)
+    queued = job_queue.enqueue(items, PRIORITY_BACKFILL, source="backfill")
+    logger.info(f"Batch run: {len(companies)} companies, {queued} queued ({skipped} skipped)")
+    return queued
+
 
-    # Fetch list memberships
+def _list_company_ids(client: HubSpotCompanyClient, list_id: str) -> list[str]:
+    """Company ids in a HubSpot list, following pagination."""
     company_ids: list[str] = []
     after = None
     while True:
         params: dict = {"limit": 100}
         if after:
             params["after"] = after
-        try:
-            resp = client.get(f"/crm/v3/lists/{list_id}/memberships", params=params)
-        except Exception as e:
-            logger.error(f"Failed to fetch list {list_id} memberships: {e}")
-            return
+        resp = client.get(f"/crm/v3/lists/{list_id}/memberships", params=params)
         results = resp.get("results", [])
         for r in results:
             rid = str(r) if isinstance(r, (str, int)) else str(r.get("recordId", r.get("vid", "")))
@@ -343,48 +774,50 @@ def _run_list_background(list_id: str, force: bool = False) -> None:
         after = resp.get("paging", {}).get("next", {}).get("after")
         if not after or not results:
             break
-
-    logger.info(f"List {list_id}: {len(company_ids)} companies to process (force={force})")
-
-    found = unknown = skipped = 0
-    for i, cid in enumerate(company_ids, 1):
+    return company_ids
+
+
+def _batch_read_companies(
+    client: HubSpotCompanyClient,
+    company_ids: list[str],
+    properties: list[str],
+) -> tuple[list[dict], int]:
+    """Read companies 100 per request; returns (companies, ids that failed to read)."""
+    companies: list[dict] = []
+    failed = 0
+    for i in range(0, len(company_ids), HUBSPOT_BATCH_SIZE):
+        chunk = company_ids[i:i + HUBSPOT_BATCH_SIZE]
         try:
-            company = client.get_company(cid, properties=COMPANY_PROPERTIES)
+            resp = client.post(
+                "/crm/v3/objects/companies/batch/read",
+                json_data={"inputs": [{"id": cid} for cid in chunk], "properties": properties},
+            )
         except Exception as e:
-            logger.error(f"[{cid}] Failed to fetch company: {e}")
-            skipped += 1
-            continue
-
-        if client.is_manually_corrected(company):
-            skipped += 1
-            continue
-
-        props = company.get("properties", {})
-        if not force and props.get("los_platform") and props["los_platform"] != "Unknown":
-            skipped += 1
+            logger.error(f"Batch read of {len(chunk)} companies failed: {e}")
+            failed += len(chunk)
             continue
+        results = resp.get("results", [])
+        companies.extend(results)
+        failed += len(chunk) - len(results)
+    return companies, failed
 
-        raw_domain = client.get_domain_from_company(company)
-        if not raw_domain:
-            skipped += 1
-            continue
 
-        result = pipeline.run(company_id=cid, raw_domain=raw_domain)
-        if result.found:
-            found += 1
-        else:
-            unknown += 1
+def _is_enriched(company: dict) -> bool:
+    """True if the record already has an LOS detection."""
+    los = company.get("properties", {}).get("los_platform")
+    return bool(los) and los != "Unknown"
 
-        writer.write_result(
-            client=client,
-            result=result,
-            review_list_id=settings.hubspot_review_list_id,
-        )
 
-        if i % 25 == 0:
-            logger.info(f"List {list_id} progress: {i}/{len(company_ids)}")
+def _enqueue_list(list_id: str, force: bool = False) -> int:
+    """Queue every company in a HubSpot list, skipping enriched ones unless forced."""
+    client = _get_client()
+    from los_pos_bot.hubspot_companies import COMPANY_PROPERTIES
 
-    logger.info(
-        f"List {list_id} complete: {found} found | {unknown} unknown | "
-        f"{skipped} skipped | {len(company_ids)} total"
-    )
+    company_ids = _list_company_ids(client, list_id)
+    companies, unread = _batch_read_companies(client, company_ids, COMPANY_PROPERTIES)
+    todo = [co for co in companies if force or not _is_enriched(co)]
+    items, not_scannable = _scannable(client, todo)
+    queued = job_queue.enqueue(items, PRIORITY_LIST, source="list")
+    skipped = unread + (len(companies) - len(todo)) + not_scannable
+    logger.info(f"List {list_id}: {len(company_ids)} companies, {queued} queued ({skipped} skipped, force={force})")
+    return queued
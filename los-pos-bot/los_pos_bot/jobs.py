@@ -0,0 +1,475 @@
+"""Durable company-scan job queue and worker pool for LOS/POS Bot.
+
+Webhook, list and nightly backfill work used to run as FastAPI
+``BackgroundTasks``. That meant three problems:
+
+- work was lost on every restart or deploy
+- it ran on the request threadpool
+- nothing stopped a nightly batch and a webhook burst from scanning the
+  same company at the same time
+
+``JobQueue`` keeps one row per company in a local SQLite file, so
+enqueueing a company that is already queued only raises its priority. A
+company that is already running is left alone. Priorities are
+webhook > list > nightly backfill. Failed jobs are retried with
+exponential backoff until ``max_attempts``.
+
+Webhook jobs arrive as bare company ids. One resolver claims them with
+``claim_unresolved()`` once 100 are waiting or the oldest has waited a
+short window, so a burst costs one HubSpot batch read per 100
+companies. It then ``resolve()``s each job's domain. Scan workers
+``claim()`` only jobs with a domain, and each claim takes every due job
+that shares one of its domains, so a domain is scanned once per pass.
+
+Rows left ``running`` by a crash are requeued by ``recover()`` on startup.
+
+Usage:
+    queue = JobQueue("los_pos_jobs.sqlite3")
+    queue.recover()
+    queue.enqueue([("123", None)], PRIORITY_WEBHOOK, source="webhook")
+    pool = WorkerPool(queue, handler, workers=3)
+    resolver = WorkerPool(queue, resolve_handler, workers=1, claim_size=100,
+                          claim=lambda n: queue.claim_unresolved(n, window_seconds=2.0))
+    pool.start(); resolver.start()
+    queue.stats()                                  # depth, throughput, workers
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first
+PRIORITY_WEBHOOK = 0
+PRIORITY_LIST = 1
+PRIORITY_BACKFILL = 2
+PRIORITY_NAMES = {PRIORITY_WEBHOOK: "webhook", PRIORITY_LIST: "list", PRIORITY_BACKFILL: "backfill"}
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Finished rows older than this are pruned on startup
+KEEP_FINISHED_SECONDS = 7 * 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    company_id TEXT PRIMARY KEY,
+    domain TEXT,
+    priority INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_run_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    outcome TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, priority, next_run_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+CREATE INDEX IF NOT EXISTS jobs_domain ON jobs (domain);
+"""
+
+_JOB_COLUMNS = "company_id, domain, priority, source, attempts, enqueued_at"
+
+
+@dataclass
+class Job:
+    """One claimed company scan.
+
+    ``domain`` is set when the enqueuer already read the company, and left
+    None until the resolver reads it (webhooks).
+    """
+
+    company_id: str
+    domain: Optional[str]
+    priority: int
+    source: str
+    attempts: int
+    enqueued_at: float
+
+
+class JobQueue:
+    """SQLite-backed job queue, deduplicated by company id.
+
+    Safe to share between threads; every statement runs under one lock,
+    so a claim can never hand the same job to two workers.
+
+    Args:
+        path: SQLite file. Put it on a persistent volume for jobs to
+            survive a redeploy.
+        max_attempts: Tries before a job is marked failed.
+        backoff_seconds: Delay before the first retry; doubles each time.
+        max_backoff_seconds: Cap on the retry delay.
+        clock: Time source (seconds since the epoch).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_attempts: int = 4,
+        backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 900.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.clock = clock
+        # Set on enqueue so idle workers wake without waiting a poll interval
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def recover(self) -> int:
+        """Requeue jobs a previous process left running, and prune old rows."""
+        now = self.clock()
+        with self._lock:
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = ?, next_run_at = ?, started_at = NULL WHERE status = ?",
+                (QUEUED, now, RUNNING),
+            ).rowcount
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, now - KEEP_FINISHED_SECONDS),
+            )
+            self._conn.commit()
+        if requeued:
+            logger.info(f"Requeued {requeued} jobs interrupted by the last shutdown")
+            self.ready.set()
+        return requeued
+
+    def enqueue(
+        self,
+        items: Iterable[tuple[str, Optional[str]]],
+        priority: int,
+        source: str,
+    ) -> int:
+        """Queue (company id, domain or None) pairs; returns how many rows changed.
+
+        A company already queued keeps its place but takes the higher
+        priority and any newly known domain. A
+        company already running is not queued again. Finished companies
+        are queued afresh.
+        """
+        now = self.clock()
+        rows = [
+            (company_id, domain, priority, source, QUEUED, now, now)
+            for company_id, domain in dict(items).items()
+            if company_id
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT INTO jobs "
+                "(company_id, domain, priority, source, status, next_run_at, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (company_id) DO UPDATE SET "
+                "  domain = COALESCE(excluded.domain, jobs.domain), "
+                "  priority = MIN(jobs.priority, excluded.priority), "
+                "  source = CASE WHEN excluded.priority < jobs.priority THEN excluded.source ELSE jobs.source END "
+                "WHERE jobs.status = 'queued'",
+                rows,
+            )
+            # Finished rows are reset rather than merged
+            self._conn.executemany(
+                "UPDATE jobs SET domain = ?, priority = ?, source = ?, status = ?, "
+                "attempts = 0, next_run_at = ?, enqueued_at = ?, started_at = NULL, "
+                "finished_at = NULL, outcome = NULL, error = NULL "
+                "WHERE company_id = ? AND status IN ('done', 'failed')",
+                [(*row[1:], row[0]) for row in rows],
+            )
+            self._conn.commit()
+            changed = self._conn.total_changes - before
+        self.ready.set()
+        return changed
+
+    def claim(self, limit: int) -> list[Job]:
+        """Claim up to ``limit`` of the most urgent due jobs with a domain.
+
+        Every other due job for the same domains comes along, whatever its
+        priority, so the worker scans each domain once for all of them.
+        """
+        now = self.clock()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs "
+                "WHERE status = ? AND next_run_at <= ? AND domain IS NOT NULL "
+                "ORDER BY priority, next_run_at LIMIT ?",
+                (QUEUED, now, limit),
+            ).fetchall()
+            if rows:
+                domains = list({row[1] for row in rows})
+                claimed = [row[0] for row in rows]
+                rows += self._conn.execute(
+                    f"SELECT {_JOB_COLUMNS} FROM jobs "
+                    f"WHERE status = ? AND next_run_at <= ? AND domain IN ({','.join('?' * len(domains))}) "
+                    f"AND company_id NOT IN ({','.join('?' * len(claimed))})",
+                    (QUEUED, now, *domains, *claimed),
+                ).fetchall()
+            return self._mark_running(rows, now)
+
+    def claim_unresolved(self, limit: int, window_seconds: float = 0.0) -> list[Job]:
+        """Claim up to ``limit`` due jobs that still need a HubSpot read.
+
+        Returns nothing until ``limit`` jobs are waiting or the oldest has
+        waited ``window_seconds``, so bursts are read in full batches.
+        """
+        now = self.clock()
+        with self._lock:
+            waiting, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(next_run_at) FROM jobs "
+                "WHERE status = ? AND next_run_at <= ? AND domain IS NULL",
+                (QUEUED, now),
+            ).fetchone()
+            if not waiting or (waiting < limit and now - oldest < window_seconds):
+                return []
+            rows = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs "
+                "WHERE status = ? AND next_run_at <= ? AND domain IS NULL "
+                "ORDER BY priority, next_run_at LIMIT ?",
+                (QUEUED, now, limit),
+            ).fetchall()
+            return self._mark_running(rows, now)
+
+    def resolve(self, domains: dict[str, str]) -> None:
+        """Give claimed jobs their domain and return them to the queue for scanning."""
+        now = self.clock()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET domain = ?, status = ?, attempts = 0, next_run_at = ?, "
+                "started_at = NULL, error = NULL WHERE company_id = ? AND status = ?",
+                [(domain, QUEUED, now, cid, RUNNING) for cid, domain in domains.items()],
+            )
+            self._conn.commit()
+        if domains:
+            self.ready.set()
+
+    def _mark_running(self, rows: list[tuple], now: float) -> list[Job]:
+        """Mark selected rows running; call with the lock held."""
+        if not rows:
+            return []
+        self._conn.executemany(
+            "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ? WHERE company_id = ?",
+            [(RUNNING, now, row[0]) for row in rows],
+        )
+        self._conn.commit()
+        return [
+            Job(
+                company_id=cid,
+                domain=domain,
+                priority=priority,
+                source=source,
+                attempts=attempts + 1,
+                enqueued_at=enqueued_at,
+            )
+            for cid, domain, priority, source, attempts, enqueued_at in rows
+        ]
+
+    def complete(self, outcomes: dict[str, str]) -> None:
+        """Mark jobs done, recording each one's outcome ("found", "skipped", ...)."""
+        now = self.clock()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, finished_at = ?, outcome = ?, error = NULL "
+                "WHERE company_id = ? AND status = ?",
+                [(DONE, now, outcome, cid, RUNNING) for cid, outcome in outcomes.items()],
+            )
+            self._conn.commit()
+
+    def fail(self, errors: dict[str, str]) -> None:
+        """Schedule a retry with backoff, or mark failed once attempts run out."""
+        now = self.clock()
+        with self._lock:
+            attempts = dict(self._conn.execute(
+                f"SELECT company_id, attempts FROM jobs WHERE status = ? "
+                f"AND company_id IN ({','.join('?' * len(errors))})",
+                (RUNNING, *errors),
+            ).fetchall()) if errors else {}
+            for cid, error in errors.items():
+                tries = attempts.get(cid)
+                if tries is None:
+                    continue
+                if tries >= self.max_attempts:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, finished_at = ?, outcome = 'error', error = ? "
+                        "WHERE company_id = ?",
+                        (FAILED, now, error, cid),
+                    )
+                    logger.error(f"[{cid}] Job failed after {tries} attempts: {error}")
+                else:
+                    delay = min(self.backoff_seconds * 2 ** (tries - 1), self.max_backoff_seconds)
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, next_run_at = ?, started_at = NULL, error = ? "
+                        "WHERE company_id = ?",
+                        (QUEUED, now + delay, error, cid),
+                    )
+            self._conn.commit()
+
+    def stats(self, window_seconds: float = 900.0) -> dict:
+        """Queue depth by status and priority, plus recent throughput and latency."""
+        now = self.clock()
+        since = now - window_seconds
+        with self._lock:
+            by_status = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall())
+            queued = self._conn.execute(
+                "SELECT priority, COUNT(*), SUM(next_run_at > ?), SUM(domain IS NULL), MIN(enqueued_at) "
+                "FROM jobs WHERE status = ? GROUP BY priority",
+                (now, QUEUED),
+            ).fetchall()
+            finished = self._conn.execute(
+                "SELECT outcome, COUNT(*), AVG(finished_at - enqueued_at) FROM jobs "
+                "WHERE status IN (?, ?) AND finished_at >= ? GROUP BY outcome",
+                (DONE, FAILED, since),
+            ).fetchall()
+
+        done = sum(count for _, count, _ in finished)
+        waited = sum(count * (avg or 0) for _, count, avg in finished)
+        return {
+            "depth": {status: by_status.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)},
+            "queued_by_priority": {
+                PRIORITY_NAMES.get(priority, str(priority)): {
+                    "queued": count,
+                    "backing_off": int(backing_off or 0),
+                    "awaiting_read": int(unresolved or 0),
+                    "oldest_age_seconds": round(now - oldest, 1),
+                }
+                for priority, count, backing_off, unresolved, oldest in queued
+            },
+            "throughput": {
+                "window_seconds": window_seconds,
+                "finished": done,
+                "per_minute": round(done * 60 / window_seconds, 2),
+                "outcomes": {outcome or "unknown": count for outcome, count, _ in finished},
+                "avg_latency_seconds": round(waited / done, 1) if done else None,
+            },
+        }
+
+
+# ── Workers ──────────────────────────────────────────────────────────
+
+
+Handler = Callable[[list[Job]], tuple[dict[str, str], dict[str, str]]]
+
+
+class WorkerPool:
+    """Threads that claim jobs and pass them to a handler.
+
+    The handler takes a claimed batch and returns ``(outcomes, errors)``,
+    both keyed by company id. Outcomes are completed; errors are retried.
+    Any job the handler leaves out of both is retried as well, unless
+    ``retry_unreported`` is off.
+
+    Args:
+        queue: Queue to drain.
+        handler: Processes a batch of claimed jobs.
+        workers: Number of worker threads.
+        claim_size: Jobs claimed per batch. Small batches keep a webhook
+            from waiting long behind backfill work.
+        poll_interval: Longest idle wait between claims. Retries that are
+            backing off become due at most this late.
+        claim: Claims a batch of at most the given size; defaults to
+            ``queue.claim``.
+        wake_on_enqueue: Wake idle threads as soon as jobs are enqueued.
+            Turn off for claims that wait out a window anyway.
+        retry_unreported: Retry jobs missing from the handler's result.
+            Turn off for handlers that hand jobs back with ``resolve()``;
+            another worker may already be running them.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Handler,
+        workers: int = 3,
+        claim_size: int = 10,
+        poll_interval: float = 5.0,
+        claim: Optional[Callable[[int], list[Job]]] = None,
+        wake_on_enqueue: bool = True,
+        retry_unreported: bool = True,
+    ):
+        self.queue = queue
+        self.claim = claim or queue.claim
+        self.wake_on_enqueue = wake_on_enqueue
+        self.retry_unreported = retry_unreported
+        self.handler = handler
+        self.workers = workers
+        self.claim_size = claim_size
+        self.poll_interval = poll_interval
+        self.busy = 0
+        self._busy_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"los-pos-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop claiming and wait for in-flight batches.
+
+        Jobs still running after the timeout stay marked running and are
+        requeued by the next process's ``recover()``.
+        """
+        self._stop.set()
+        self.queue.ready.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            jobs = self.claim(self.claim_size)
+            if not jobs:
+                if self.wake_on_enqueue:
+                    self.queue.ready.wait(self.poll_interval)
+                    self.queue.ready.clear()
+                else:
+                    self._stop.wait(self.poll_interval)
+                continue
+            with self._busy_lock:
+                self.busy += 1
+            try:
+                self._run(jobs)
+            finally:
+                with self._busy_lock:
+                    self.busy -= 1
+
+    def _run(self, jobs: list[Job]) -> None:
+        try:
+            outcomes, errors = self.handler(jobs)
+        except Exception as e:
+            logger.error(f"Worker batch of {len(jobs)} jobs failed: {e}", exc_info=True)
+            outcomes, errors = {}, {job.company_id: str(e) for job in jobs}
+        if self.retry_unreported:
+            errors = {
+                **{job.company_id: "not processed" for job in jobs if job.company_id not in outcomes},
+                **errors,
+            }
+        self.queue.complete(outcomes)
+        self.queue.fail(errors)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "busy": self.busy, "claim_size": self.claim_size}
@@ -0,0 +1,106 @@
+"""Latest LOS/POS scan result per domain, for serving repeat /scan requests.
+
+Reps often scan the same lender from the dashboard minutes apart, and every
+scan used to rerun the full pipeline. ``ScanStore`` keeps the newest
+response for each normalized domain in SQLite, next to the job queue.
+Worker scans write to it too, so a domain the nightly backfill just scanned
+is free to look up.
+
+A result stays fresh for ``ttl_hours`` when a platform was found, and for
+the shorter ``miss_ttl_hours`` when nothing was, since misses are the
+results most likely to change on a rescan. Browser scans are stored
+separately. They satisfy plain requests as well, but plain results never
+satisfy a browser request.
+
+Usage:
+    store = ScanStore("data/los_pos_jobs.sqlite3")
+    store.put("lender.com", payload, found=True)
+    hit = store.get("lender.com")                  # StoredScan or None
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    domain TEXT NOT NULL,
+    use_browser INTEGER NOT NULL,
+    scanned_at REAL NOT NULL,
+    found INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (domain, use_browser)
+)
+"""
+
+
+@dataclass
+class StoredScan:
+    """One fresh stored /scan response."""
+
+    payload: dict
+    scanned_at: float
+    use_browser: bool
+
+
+class ScanStore:
+    """Newest scan response per (domain, browser mode), in SQLite.
+
+    Safe to share between threads; statements are serialized with a lock.
+
+    Args:
+        path: SQLite file (may be shared with the job queue).
+        ttl_hours: Freshness of results that found a platform.
+        miss_ttl_hours: Freshness of results that found nothing.
+        clock: Time source (seconds since the epoch).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_hours: float = 168.0,
+        miss_ttl_hours: float = 24.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_hours * 3600
+        self.miss_ttl_seconds = miss_ttl_hours * 3600
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, domain: str, use_browser: bool = False) -> Optional[StoredScan]:
+        """Newest fresh result that covers the requested mode, or None."""
+        now = self.clock()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT use_browser, scanned_at, found, payload FROM scans "
+                "WHERE domain = ? AND use_browser >= ? ORDER BY scanned_at DESC",
+                (domain, int(use_browser)),
+            ).fetchall()
+        for browser, scanned_at, found, payload in rows:
+            ttl = self.ttl_seconds if found else self.miss_ttl_seconds
+            if now - scanned_at < ttl:
+                return StoredScan(payload=json.loads(payload), scanned_at=scanned_at, use_browser=bool(browser))
+        return None
+
+    def put(self, domain: str, payload: dict, found: bool, use_browser: bool = False) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scans (domain, use_browser, scanned_at, found, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (domain, int(use_browser), self.clock(), int(found), json.dumps(payload, default=str)),
+            )
+            self._conn.commit()
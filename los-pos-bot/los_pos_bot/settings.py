@@ -37,6 +37,20 @@ class Settings(BaseSettings):
     batch_limit_per_run: int = Field(default=500, alias="BATCH_LIMIT_PER_RUN")
     detection_timeout_seconds: int = Field(default=30, alias="DETECTION_TIMEOUT_SECONDS")
 
+    # Job queue (SQLite — mount JOB_DB_PATH on a volume to survive redeploys)
+    job_db_path: str = Field(default="data/los_pos_jobs.sqlite3", alias="JOB_DB_PATH")
+    job_workers: int = Field(default=3, alias="JOB_WORKERS")
+    job_claim_size: int = Field(default=10, alias="JOB_CLAIM_SIZE")
+    job_max_attempts: int = Field(default=4, alias="JOB_MAX_ATTEMPTS")
+    job_retry_backoff_seconds: float = Field(default=30.0, alias="JOB_RETRY_BACKOFF_SECONDS")
+    webhook_batch_window_seconds: float = Field(default=2.0, alias="WEBHOOK_BATCH_WINDOW_SECONDS")
+
+    # Ad-hoc /scan (results are cached in the job DB)
+    scan_workers: int = Field(default=4, alias="SCAN_WORKERS")
+    scan_queue_limit: int = Field(default=20, alias="SCAN_QUEUE_LIMIT")
+    scan_cache_ttl_hours: float = Field(default=168.0, alias="SCAN_CACHE_TTL_HOURS")
+    scan_cache_miss_ttl_hours: float = Field(default=24.0, alias="SCAN_CACHE_MISS_TTL_HOURS")
+
     model_config = {
         "env_file": ".env",
         "extra": "ignore",
@@ -0,0 +1,125 @@
+"""Ensure los_pos_bot is importable from los-pos-bot/tests/.
+
+The app's detection pipeline, HubSpot writer and company client talk to the
+network, so they are replaced in ``sys.modules`` before ``los_pos_bot.app``
+is imported. Tests steer the stub pipeline through ``pipeline.scan`` and
+read what it and the writer were asked to do from their ``calls`` lists.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import types
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+# Add los-pos-bot/ so `los_pos_bot` is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep the app's module-level job DB out of the working tree
+os.environ.setdefault("JOB_DB_PATH", str(Path(tempfile.mkdtemp()) / "jobs.sqlite3"))
+
+
+@dataclass
+class FakeResult:
+    """Stands in for the pipeline's detection result."""
+
+    company_id: str
+    domain: str
+    los_platform: Optional[str] = "Encompass"
+    pos_platform: Optional[str] = None
+    los_confidence: str = "high"
+    pos_confidence: str = ""
+    detection_method: str = "html"
+    evidence_lines: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    browser_log: list = field(default_factory=list)
+
+    @property
+    def found(self) -> bool:
+        return bool(self.los_platform or self.pos_platform)
+
+
+def _scan(company_id, raw_domain, use_browser, on_layer):
+    if on_layer is not None:
+        on_layer("dns", {"matches": 0})
+    return FakeResult(company_id=company_id, domain=raw_domain)
+
+
+def _run(company_id, raw_domain, use_browser=False, on_layer=None):
+    with pipeline.lock:
+        pipeline.calls.append((company_id, raw_domain, use_browser))
+    return pipeline.scan(company_id, raw_domain, use_browser, on_layer)
+
+
+def _write_result(client, result, review_list_id=""):
+    writer.calls.append(result)
+
+
+pipeline = types.ModuleType("los_pos_bot.pipeline")
+pipeline.run = _run
+pipeline.scan = _scan
+pipeline.calls = []
+pipeline.lock = threading.Lock()
+
+writer = types.ModuleType("los_pos_bot.writer")
+writer.write_result = _write_result
+writer.calls = []
+
+sys.modules["los_pos_bot.pipeline"] = pipeline
+sys.modules["los_pos_bot.writer"] = writer
+
+try:
+    import los_pos_bot.hubspot_companies  # noqa: F401
+except ImportError:
+    hubspot_companies = types.ModuleType("los_pos_bot.hubspot_companies")
+    hubspot_companies.HubSpotCompanyClient = object
+    hubspot_companies.COMPANY_PROPERTIES = ["name", "domain", "website", "los_platform"]
+    sys.modules["los_pos_bot.hubspot_companies"] = hubspot_companies
+
+
+class FakeCompanyClient:
+    """HubSpot company client whose batch reads come from a dict of domains."""
+
+    def __init__(self, domains: dict[str, str]):
+        self.domains = domains
+        self.reads: list[list[str]] = []
+
+    def post(self, path, json_data=None):
+        assert path == "/crm/v3/objects/companies/batch/read"
+        ids = [i["id"] for i in json_data["inputs"]]
+        self.reads.append(ids)
+        return {"results": [
+            {"id": cid, "properties": {"domain": self.domains[cid]}} for cid in ids if cid in self.domains
+        ]}
+
+    def is_manually_corrected(self, company):
+        return False
+
+    def get_domain_from_company(self, company):
+        return company["properties"].get("domain")
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """los_pos_bot.app with a fresh job queue, scan store and stub call logs."""
+    from los_pos_bot import app
+    from los_pos_bot.jobs import JobQueue
+    from los_pos_bot.scan_store import ScanStore
+
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    store = ScanStore(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(app, "job_queue", queue)
+    monkeypatch.setattr(app, "scan_store", store)
+    monkeypatch.setattr(app, "_adhoc_pending", 0)
+    monkeypatch.setattr(app.settings, "webhook_secret", "")
+    monkeypatch.setattr(pipeline, "scan", _scan)
+    for state in (app._inflight_scans, app._scan_jobs, app._recent_scans, pipeline.calls, writer.calls):
+        state.clear()
+    yield app
+    queue.close()
+    store.close()
@@ -0,0 +1,62 @@
+"""Tests for the ad-hoc /scan endpoints and their single-flight scans."""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from conftest import pipeline
+
+
+def test_async_scan_streams_layer_events(app_module):
+    """A pipeline that reports layers has them streamed to /scan/{id}/events."""
+    assert app_module._PIPELINE_REPORTS_LAYERS
+    client = TestClient(app_module.app)
+
+    resp = client.post("/scan", json={"domain": "https://www.Lender.com/apply", "wait": False})
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+
+    events = [json.loads(line) for line in client.get(f"/scan/{job_id}/events").text.splitlines()]
+
+    assert [e["event"] for e in events] == ["queued", "started", "layer", "result"]
+    assert events[2]["layer"] == "dns" and events[2]["matches"] == 0
+    assert events[3]["result"]["domain"] == "lender.com"
+    assert client.get(f"/scan/{job_id}").json()["status"] == "done"
+
+
+def test_scan_stays_in_flight_until_its_result_is_stored(app_module, monkeypatch):
+    """A caller arriving while the result is being stored joins the finished scan."""
+    store_put = app_module.scan_store.put
+    joined = []
+
+    def put(domain, payload, found, use_browser=False):
+        joined.append(app_module._submit_adhoc_scan(domain, use_browser))
+        store_put(domain, payload, found, use_browser)
+
+    monkeypatch.setattr(app_module.scan_store, "put", put)
+
+    task = app_module._submit_adhoc_scan("lender.com", False)
+    task.future.result(timeout=5)
+
+    assert joined == [task]
+    assert len(pipeline.calls) == 1
+    assert app_module._inflight_scans == {}
+    assert app_module.scan_store.get("lender.com").payload["los"] == "Encompass"
+
+
+def test_failed_scan_leaves_flight_so_the_next_call_retries(app_module, monkeypatch):
+    scan = pipeline.scan
+    outcomes = [RuntimeError("site down")]
+
+    def flaky(*args):
+        if outcomes:
+            raise outcomes.pop()
+        return scan(*args)
+
+    monkeypatch.setattr(pipeline, "scan", flaky)
+    client = TestClient(app_module.app)
+
+    assert client.post("/scan", json={"domain": "lender.com"}).status_code == 500
+    assert app_module._inflight_scans == {}
+    assert client.post("/scan", json={"domain": "lender.com"}).json()["los"] == "Encompass"
+    assert len(pipeline.calls) == 2
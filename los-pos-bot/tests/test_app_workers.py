@@ -0,0 +1,104 @@
+"""Tests for the webhook resolver, worker handler and ad-hoc scan admission."""
+
+import math
+import threading
+
+from fastapi.testclient import TestClient
+
+from conftest import FakeCompanyClient, pipeline, writer
+from los_pos_bot.jobs import PRIORITY_LIST
+
+
+def test_webhook_burst_is_read_one_batch_per_hundred_companies(app_module, monkeypatch):
+    n = 250
+    hubspot = FakeCompanyClient({str(i): f"lender{i % 7}.com" for i in range(1, n + 1) if i != 3})
+    monkeypatch.setattr(app_module, "_get_client", lambda: hubspot)
+    client = TestClient(app_module.app)
+
+    resp = client.post("/webhook", json=[{"objectId": i} for i in range(1, n + 1)])
+    assert resp.json()["queued"] == n
+
+    queue = app_module.job_queue
+    while jobs := queue.claim_unresolved(app_module.HUBSPOT_BATCH_SIZE, window_seconds=0):
+        outcomes, errors = app_module._resolve_jobs(jobs)
+        queue.complete(outcomes)
+        queue.fail(errors)
+
+    assert len(hubspot.reads) == math.ceil(n / 100)
+    assert sorted(len(ids) for ids in hubspot.reads) == [50, 100, 100]
+    claimed = queue.claim(n)
+    assert len(claimed) == n - 1
+    assert {job.domain for job in claimed} == {f"lender{i}.com" for i in range(7)}
+    # The company that failed to read is retried later, not dropped
+    assert queue.stats()["depth"] == {"queued": 1, "running": n - 1, "done": 0, "failed": 0}
+
+
+def test_companies_sharing_a_domain_trigger_one_scan(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "_get_client", lambda: FakeCompanyClient({}))
+    app_module.job_queue.enqueue(
+        [("1", "lender.com"), ("2", "lender.com"), ("3", "lender.com"), ("4", "other.com")],
+        PRIORITY_LIST,
+        source="list",
+    )
+    jobs = app_module.job_queue.claim(1) + app_module.job_queue.claim(1)
+
+    outcomes, errors = app_module._process_jobs(jobs)
+
+    assert sorted(domain for _, domain, _ in pipeline.calls) == ["lender.com", "other.com"]
+    assert sorted(r.company_id for r in writer.calls) == ["1", "2", "3", "4"]
+    assert {r.domain for r in writer.calls if r.company_id != "4"} == {"lender.com"}
+    assert outcomes == dict.fromkeys(["1", "2", "3", "4"], "found") and errors == {}
+
+    # A later pass over the same domain reuses the recent result
+    app_module._process_jobs(jobs[:1])
+    assert len(pipeline.calls) == 2
+
+
+def test_adhoc_scans_join_a_worker_scan_of_the_same_domain(app_module, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    scan = pipeline.scan
+
+    def blocking(*args):
+        started.set()
+        assert release.wait(5)
+        return scan(*args)
+
+    monkeypatch.setattr(pipeline, "scan", blocking)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(app_module._scan_domain("lender.com", "1")))
+    worker.start()
+    assert started.wait(5)
+
+    adhoc = app_module._submit_adhoc_scan("lender.com", False)
+    browser = app_module._submit_adhoc_scan("lender.com", True)
+    release.set()
+    worker.join(5)
+
+    assert adhoc.future.result(timeout=5) is results[0]
+    browser.future.result(timeout=5)
+    # A plain scan cannot answer a browser request, so that one runs separately
+    assert sorted(call[2] for call in pipeline.calls) == [False, True]
+
+
+def test_repeat_scan_within_ttl_is_served_from_the_store(app_module):
+    client = TestClient(app_module.app)
+
+    first = client.post("/scan", json={"domain": "lender.com"}).json()
+    again = client.post("/scan", json={"domain": "https://www.lender.com/"}).json()
+    refreshed = client.post("/scan", json={"domain": "lender.com", "refresh": True}).json()
+
+    assert first["cached"] is False
+    assert again["cached"] is True and again["los"] == first["los"]
+    assert refreshed["cached"] is False
+    assert len(pipeline.calls) == 2
+
+
+def test_scan_is_refused_when_the_scan_queue_is_full(app_module, monkeypatch):
+    settings = app_module.settings
+    monkeypatch.setattr(app_module, "_adhoc_pending", settings.scan_workers + settings.scan_queue_limit)
+
+    resp = TestClient(app_module.app).post("/scan", json={"domain": "lender.com"})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "30"
+    assert pipeline.calls == []
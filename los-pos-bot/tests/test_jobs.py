@@ -0,0 +1,205 @@
+"""Tests for the SQLite job queue (los_pos_bot.jobs)."""
+
+import threading
+
+import pytest
+
+from los_pos_bot.jobs import (
+    KEEP_FINISHED_SECONDS,
+    PRIORITY_BACKFILL,
+    PRIORITY_LIST,
+    PRIORITY_WEBHOOK,
+    JobQueue,
+    WorkerPool,
+)
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    q = JobQueue(tmp_path / "jobs.sqlite3", max_attempts=3, backoff_seconds=10, max_backoff_seconds=15, clock=clock)
+    yield q
+    q.close()
+
+
+def _row(queue, company_id):
+    return queue._conn.execute(
+        "SELECT domain, priority, source, status, attempts, next_run_at, outcome FROM jobs WHERE company_id = ?",
+        (company_id,),
+    ).fetchone()
+
+
+# ── enqueue ──────────────────────────────────────────────────────────
+
+
+def test_reenqueue_keeps_the_higher_priority_and_known_domain(queue):
+    queue.enqueue([("1", "lender.com")], PRIORITY_BACKFILL, source="backfill")
+    queue.enqueue([("1", None)], PRIORITY_WEBHOOK, source="webhook")
+    queue.enqueue([("1", None)], PRIORITY_LIST, source="list")
+
+    domain, priority, source, status, *_ = _row(queue, "1")
+    assert (domain, priority, source, status) == ("lender.com", PRIORITY_WEBHOOK, "webhook", "queued")
+
+
+def test_running_jobs_are_not_requeued(queue):
+    queue.enqueue([("1", "lender.com")], PRIORITY_LIST, source="list")
+    queue.claim(10)
+
+    assert queue.enqueue([("1", "lender.com")], PRIORITY_WEBHOOK, source="webhook") == 0
+    assert _row(queue, "1")[3] == "running"
+
+
+def test_finished_jobs_are_reset_when_enqueued_again(queue):
+    queue.max_attempts = 1
+    queue.enqueue([("1", "old.com"), ("2", "b.com")], PRIORITY_LIST, source="list")
+    queue.claim(10)
+    queue.complete({"1": "found"})
+    queue.fail({"2": "boom"})
+    assert [_row(queue, cid)[3] for cid in ("1", "2")] == ["done", "failed"]
+
+    queue.enqueue([("1", "new.com"), ("2", None)], PRIORITY_BACKFILL, source="backfill")
+
+    domain, priority, source, status, attempts, _, outcome = _row(queue, "1")
+    assert (domain, priority, source, status, attempts, outcome) == (
+        "new.com", PRIORITY_BACKFILL, "backfill", "queued", 0, None)
+    assert _row(queue, "2")[3:5] == ("queued", 0)
+
+
+# ── claim ────────────────────────────────────────────────────────────
+
+
+def test_claim_takes_most_urgent_first_and_every_job_sharing_its_domain(queue):
+    queue.enqueue([("b1", "shared.com"), ("b2", "other.com")], PRIORITY_BACKFILL, source="backfill")
+    queue.enqueue([("w1", "shared.com")], PRIORITY_WEBHOOK, source="webhook")
+    queue.enqueue([("w2", None)], PRIORITY_WEBHOOK, source="webhook")
+
+    jobs = queue.claim(1)
+
+    assert sorted(j.company_id for j in jobs) == ["b1", "w1"]
+    assert all(j.attempts == 1 for j in jobs)
+    # Unresolved webhooks wait for the resolver; other domains for the next claim
+    assert [j.company_id for j in queue.claim(10)] == ["b2"]
+    assert queue.claim(10) == []
+
+
+# ── retries ──────────────────────────────────────────────────────────
+
+
+def test_failures_back_off_exponentially_then_fail(queue, clock):
+    queue.enqueue([("1", "lender.com")], PRIORITY_LIST, source="list")
+    delays = []
+    for _ in range(2):
+        [job] = queue.claim(10)
+        queue.fail({job.company_id: "timeout"})
+        next_run_at = _row(queue, "1")[5]
+        delays.append(next_run_at - clock.now)
+        assert queue.claim(10) == []  # Not due yet
+        clock.now = next_run_at
+
+    [job] = queue.claim(10)
+    queue.fail({job.company_id: "timeout"})
+
+    assert delays == [10, 15]  # 10, then 20 capped at 15
+    _, _, _, status, attempts, _, outcome = _row(queue, "1")
+    assert (status, attempts, outcome) == ("failed", 3, "error")
+
+
+def test_fail_ignores_jobs_that_are_not_running(queue):
+    queue.enqueue([("1", "lender.com")], PRIORITY_LIST, source="list")
+
+    queue.fail({"1": "stale report"})
+
+    assert _row(queue, "1")[3:5] == ("queued", 0)
+
+
+# ── recovery ─────────────────────────────────────────────────────────
+
+
+def test_recover_requeues_running_jobs_and_prunes_old_finished_ones(queue, clock):
+    queue.enqueue([("old", "a.com"), ("crashed", "b.com")], PRIORITY_LIST, source="list")
+    queue.claim(10)
+    queue.complete({"old": "found"})
+    clock.now += KEEP_FINISHED_SECONDS + 1
+
+    assert queue.recover() == 1
+    assert _row(queue, "old") is None
+    assert _row(queue, "crashed")[3] == "queued"
+    assert queue.ready.is_set()
+
+
+# ── webhook resolution ───────────────────────────────────────────────
+
+
+def test_unresolved_jobs_wait_for_a_full_batch_or_the_window(queue, clock):
+    queue.enqueue([("1", None), ("2", None)], PRIORITY_WEBHOOK, source="webhook")
+
+    assert queue.claim_unresolved(3, window_seconds=2) == []
+    queue.enqueue([("3", None)], PRIORITY_WEBHOOK, source="webhook")
+    assert len(queue.claim_unresolved(3, window_seconds=2)) == 3
+
+    queue.enqueue([("4", None)], PRIORITY_WEBHOOK, source="webhook")
+    assert queue.claim_unresolved(3, window_seconds=2) == []
+    clock.now += 2
+    assert [j.company_id for j in queue.claim_unresolved(3, window_seconds=2)] == ["4"]
+
+
+def test_resolve_returns_jobs_to_the_queue_with_their_domain(queue):
+    queue.enqueue([("1", None), ("2", None)], PRIORITY_WEBHOOK, source="webhook")
+    queue.claim_unresolved(10)
+    queue.ready.clear()
+
+    queue.resolve({"1": "lender.com"})
+
+    assert _row(queue, "1")[:5] == ("lender.com", PRIORITY_WEBHOOK, "webhook", "queued", 0)
+    assert _row(queue, "2")[3] == "running"
+    assert queue.ready.is_set()
+    assert [j.company_id for j in queue.claim(10)] == ["1"]
+
+
+# ── stats ────────────────────────────────────────────────────────────
+
+
+def test_stats_report_depth_and_throughput(queue, clock):
+    queue.enqueue([("1", "a.com"), ("2", None)], PRIORITY_WEBHOOK, source="webhook")
+    queue.claim(10)
+    clock.now += 30
+    queue.complete({"1": "found"})
+
+    stats = queue.stats()
+
+    assert stats["depth"] == {"queued": 1, "running": 0, "done": 1, "failed": 0}
+    assert stats["queued_by_priority"]["webhook"]["awaiting_read"] == 1
+    assert stats["throughput"]["outcomes"] == {"found": 1}
+    assert stats["throughput"]["avg_latency_seconds"] == 30
+
+
+# ── worker pool ──────────────────────────────────────────────────────
+
+
+def test_worker_pool_completes_reported_jobs_and_retries_the_rest(queue):
+    queue.enqueue([("ok", "a.com"), ("err", "b.com"), ("lost", "c.com")], PRIORITY_LIST, source="list")
+    handled = threading.Event()
+
+    def handler(jobs):
+        handled.set()
+        return {"ok": "found"}, {"err": "scan failed"}
+
+    pool = WorkerPool(queue, handler, workers=1, claim_size=10, poll_interval=0.05)
+    pool.start()
+    assert handled.wait(5)
+    pool.stop()
+
+    assert _row(queue, "ok")[3] == "done"
+    assert _row(queue, "err")[3] == "queued" and _row(queue, "lost")[3] == "queued"
@@ -0,0 +1,88 @@
+"""Tests for the stored /scan responses (los_pos_bot.scan_store)."""
+
+import pytest
+
+from los_pos_bot.scan_store import ScanStore
+
+HOUR = 3600
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    s = ScanStore(tmp_path / "jobs.sqlite3", ttl_hours=48, miss_ttl_hours=6, clock=clock)
+    yield s
+    s.close()
+
+
+def test_found_results_stay_fresh_for_the_full_ttl(store, clock):
+    store.put("lender.com", {"los": "Encompass"}, found=True)
+
+    clock.now += 47 * HOUR
+    hit = store.get("lender.com")
+    assert hit.payload == {"los": "Encompass"}
+    assert hit.scanned_at == clock.now - 47 * HOUR
+
+    clock.now += HOUR
+    assert store.get("lender.com") is None
+
+
+def test_misses_expire_after_the_shorter_ttl(store, clock):
+    store.put("lender.com", {"los": None}, found=False)
+
+    clock.now += 5 * HOUR
+    assert store.get("lender.com") is not None
+    clock.now += HOUR
+    assert store.get("lender.com") is None
+
+
+def test_put_replaces_the_previous_result(store, clock):
+    store.put("lender.com", {"los": None}, found=False)
+    clock.now += 5 * HOUR
+    store.put("lender.com", {"los": "Encompass"}, found=True)
+
+    clock.now += 24 * HOUR
+    assert store.get("lender.com").payload == {"los": "Encompass"}
+
+
+def test_browser_results_serve_plain_requests_but_not_the_reverse(store, clock):
+    store.put("plain.com", {"mode": "plain"}, found=True)
+    store.put("browser.com", {"mode": "browser"}, found=True, use_browser=True)
+
+    assert store.get("plain.com", use_browser=True) is None
+    assert store.get("browser.com").use_browser is True
+    assert store.get("browser.com", use_browser=True).payload == {"mode": "browser"}
+
+
+def test_newest_fresh_result_wins_across_modes(store, clock):
+    store.put("lender.com", {"mode": "browser"}, found=True, use_browser=True)
+    clock.now += HOUR
+    store.put("lender.com", {"mode": "plain"}, found=False)
+
+    assert store.get("lender.com").payload == {"mode": "plain"}
+    # Once the plain miss goes stale, the older browser hit still covers it
+    clock.now += 6 * HOUR
+    assert store.get("lender.com").payload == {"mode": "browser"}
+
+
+def test_results_survive_reopening_the_file(tmp_path, clock):
+    path = tmp_path / "jobs.sqlite3"
+    first = ScanStore(path, clock=clock)
+    first.put("lender.com", {"los": "Encompass"}, found=True)
+    first.close()
+
+    second = ScanStore(path, clock=clock)
+    assert second.get("lender.com").payload == {"los": "Encompass"}
+    second.close()
@@ -7,10 +7,14 @@ from typing import Optional
 from outreach_intel.service import OutreachService
 from outreach_intel.scorer import ScoredContact
 from outreach_intel.tam_manager import extract_tam, calculate_waves
+from outreach_intel.tam_snapshot import open_latest_snapshot, refresh_snapshot
+from outreach_intel.wave_simulator import SimConfig, cohorts_from_snapshot, simulate, sweep
 from outreach_intel.wave_scheduler import (
     build_wave,
     get_wave_status,
+    resume_wave,
     AVAILABLE_ANGLES,
+    MAX_SNAPSHOT_AGE_DAYS,
 )
 
 
@@ -213,11 +217,20 @@ def cmd_tam(args: argparse.Namespace) -> None:
     verticals = args.verticals.split(",") if args.verticals else None
     personas = args.personas.split(",") if args.personas else None
 
-    report = extract_tam(
-        verticals=verticals,
-        personas=personas,
-        count_only=args.count_only,
-    )
+    if args.from_snapshot:
+        snapshot = open_latest_snapshot()
+        if snapshot is None:
+            print("No TAM snapshot found. Run `tam` (without --from-snapshot) first.")
+            sys.exit(1)
+        with snapshot:
+            print(f"Reading TAM snapshot v{snapshot.version} (as of {snapshot.as_of:%Y-%m-%d %H:%M} UTC)")
+            report = snapshot.report(verticals=verticals, personas=personas)
+    else:
+        report = extract_tam(
+            verticals=verticals,
+            personas=personas,
+            count_only=args.count_only,
+        )
 
     if args.json:
         output = {
@@ -257,7 +270,13 @@ def cmd_tam_waves(args: argparse.Namespace) -> None:
     verticals = args.verticals.split(",") if args.verticals else None
     personas = args.personas.split(",") if args.personas else None
 
-    report = extract_tam(verticals=verticals, personas=personas)
+    snapshot = None if args.live else open_latest_snapshot()
+    if snapshot is not None:
+        with snapshot:
+            print(f"Reading TAM snapshot v{snapshot.version} (as of {snapshot.as_of:%Y-%m-%d %H:%M} UTC)")
+            report = snapshot.report(verticals=verticals, personas=personas)
+    else:
+        report = extract_tam(verticals=verticals, personas=personas)
     schedule = calculate_waves(
         tam_size=report.wave_eligible,
         wave_size=args.wave_size,
@@ -283,6 +302,93 @@ def cmd_tam_waves(args: argparse.Namespace) -> None:
     print(f"  Domains needed:      {schedule['domains_needed']}")
 
 
+def cmd_tam_refresh(args: argparse.Namespace) -> None:
+    """Apply HubSpot changes since the last TAM snapshot."""
+    try:
+        result = refresh_snapshot()
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"\nTAM snapshot v{result['version']}: {result['rows']:,} contacts "
+              f"(+{result['upserted']:,} upserted, -{result['removed']:,} removed)")
+
+
+def cmd_tam_simulate(args: argparse.Namespace) -> None:
+    """Simulate the wave schedule day by day over the TAM snapshot."""
+    snapshot = open_latest_snapshot()
+    if snapshot is None:
+        print("No TAM snapshot found. Run `tam` first.")
+        sys.exit(1)
+
+    config = SimConfig(
+        wave_size=args.wave_size,
+        wave_interval_days=args.interval,
+        cycle_days=args.cycle_days,
+        horizon_days=args.horizon,
+        sequence_offsets=tuple(int(x) for x in args.sequence.split(",")),
+        inboxes=args.inboxes,
+        emails_per_inbox_per_day=args.per_inbox,
+        domains=args.domains,
+        inboxes_per_domain=args.inboxes_per_domain,
+        emails_per_domain_per_day=args.per_domain,
+    )
+    with snapshot:
+        print(f"Simulating over TAM snapshot v{snapshot.version} ({len(snapshot):,} contacts)")
+        cohorts = cohorts_from_snapshot(snapshot, cycle_days=config.cycle_days, angles=config.angles)
+
+    variations = {}
+    if args.sweep_wave_size:
+        variations["wave_size"] = [int(x) for x in args.sweep_wave_size.split(",")]
+    if args.sweep_inboxes:
+        variations["inboxes"] = [int(x) for x in args.sweep_inboxes.split(",")]
+
+    if variations:
+        results = sweep(cohorts, config, **variations)
+        if args.json:
+            print(json.dumps([
+                {"wave_size": r.config.wave_size, "inboxes": r.config.inboxes, **r.bottlenecks}
+                for r in results
+            ], indent=2))
+            return
+        print(f"\n{'Wave':>6} {'Inboxes':>8} {'Sent':>8} {'Short':>6} {'Bound':>6} {'Delay':>6} {'Util':>6}  Limit")
+        for r in results:
+            b = r.bottlenecks
+            # No delay estimate when the config has no sending capacity
+            delay = "-" if b["max_send_delay_days"] is None else f"{b['max_send_delay_days']}d"
+            print(f"{r.config.wave_size:>6} {r.config.inboxes:>8} {b['contacts_sent']:>8,} "
+                  f"{b['short_waves']:>6} {b['capacity_bound_days']:>6} {delay:>6} "
+                  f"{b['capacity_utilization']:>6.0%}  {b['binding_limit'] or '-'}")
+        return
+
+    result = simulate(cohorts, config)
+    if args.json:
+        print(json.dumps({
+            "bottlenecks": result.bottlenecks,
+            "waves": [vars(w) for w in result.waves],
+            "days": [vars(d) for d in result.days] if args.days else [],
+        }, indent=2))
+        return
+
+    if args.days:
+        print(f"\n{'Date':<11} {'Eligible':>9} {'Wave':>6} {'Due':>7} {'Sent':>7} {'Backlog':>8}  Angle")
+        for d in result.days:
+            print(f"{d.date:<11} {d.eligible:>9,} {d.wave_contacts:>6,} {d.emails_due:>7,} "
+                  f"{d.emails_sent:>7,} {d.backlog:>8,}  {d.wave_angle or ''}")
+
+    print(f"\nWaves:")
+    for w in result.waves:
+        note = f"  (short: {w.shortfall_reason})" if w.shortfall_reason else ""
+        print(f"  {w.date}  {w.angle:<24} {w.contacts:>6,}{note}")
+
+    print(f"\nBottlenecks:")
+    for key, value in result.bottlenecks.items():
+        print(f"  {key:<24} {value}")
+
+
 def cmd_signal_review(args: argparse.Namespace) -> None:
     """Review top contacts with Claude signal analysis."""
     from outreach_intel.signal_agent import review_scored_contacts
@@ -642,6 +748,10 @@ def cmd_score_inbound(args: argparse.Namespace) -> None:
 
 def cmd_wave_build(args: argparse.Namespace) -> None:
     """Build a wave of contacts for Smartlead."""
+    if args.resume:
+        resume_wave(args.resume)
+        return
+
     verticals = args.verticals.split(",") if args.verticals else None
     personas = args.personas.split(",") if args.personas else None
 
@@ -652,6 +762,8 @@ def cmd_wave_build(args: argparse.Namespace) -> None:
         personas=personas,
         list_name=args.name,
         dry_run=args.dry_run,
+        use_index=not args.live,
+        max_snapshot_age_days=args.max_snapshot_age,
     )
 
 
@@ -870,8 +982,21 @@ def main(argv: Optional[list[str]] = None) -> None:
         "--count-only", action="store_true",
         help="Fast mode: only return counts, don't fetch full contact records"
     )
+    tam_parser.add_argument(
+        "--from-snapshot", action="store_true",
+        help="Read breakdowns from the latest local TAM snapshot instead of HubSpot"
+    )
     tam_parser.set_defaults(func=cmd_tam)
 
+    # TAM refresh command
+    tam_refresh_parser = subparsers.add_parser(
+        "tam-refresh", help="Update the TAM snapshot with contacts modified since the last one"
+    )
+    tam_refresh_parser.add_argument(
+        "--json", action="store_true", help="Output as JSON"
+    )
+    tam_refresh_parser.set_defaults(func=cmd_tam_refresh)
+
     # TAM waves command
     tam_waves_parser = subparsers.add_parser(
         "tam-waves", help="Calculate wave schedule for TAM coverage"
@@ -888,8 +1013,61 @@ def main(argv: Optional[list[str]] = None) -> None:
     tam_waves_parser.add_argument(
         "-p", "--personas", help="Comma-separated personas"
     )
+    tam_waves_parser.add_argument(
+        "--live", action="store_true",
+        help="Pull the TAM from HubSpot even if a local snapshot exists"
+    )
     tam_waves_parser.set_defaults(func=cmd_tam_waves)
 
+    # TAM simulate command
+    tam_sim_parser = subparsers.add_parser(
+        "tam-simulate", help="Simulate the wave schedule day by day over the TAM snapshot"
+    )
+    tam_sim_parser.add_argument(
+        "--wave-size", type=int, default=2500, help="Contacts per wave (default: 2500)"
+    )
+    tam_sim_parser.add_argument(
+        "--interval", type=int, default=7, help="Days between wave launches (default: 7)"
+    )
+    tam_sim_parser.add_argument(
+        "--cycle-days", type=int, default=45, help="Days before a contact can recycle (default: 45)"
+    )
+    tam_sim_parser.add_argument(
+        "--horizon", type=int, default=120, help="Days to simulate (default: 120)"
+    )
+    tam_sim_parser.add_argument(
+        "--sequence", default="0,3", help="Day offsets of each sequence email (default: 0,3)"
+    )
+    tam_sim_parser.add_argument(
+        "--inboxes", type=int, default=125, help="Sending inboxes (default: 125)"
+    )
+    tam_sim_parser.add_argument(
+        "--per-inbox", type=int, default=5, help="Emails per inbox per day (default: 5)"
+    )
+    tam_sim_parser.add_argument(
+        "--domains", type=int, default=3, help="Sending domains (default: 3)"
+    )
+    tam_sim_parser.add_argument(
+        "--inboxes-per-domain", type=int, default=50,
+        help="Inboxes each domain can host, 0 = no cap (default: 50)"
+    )
+    tam_sim_parser.add_argument(
+        "--per-domain", type=int, default=0, help="Emails per domain per day, 0 = no cap"
+    )
+    tam_sim_parser.add_argument(
+        "--sweep-wave-size", help="Comma-separated wave sizes to compare"
+    )
+    tam_sim_parser.add_argument(
+        "--sweep-inboxes", help="Comma-separated inbox counts to compare"
+    )
+    tam_sim_parser.add_argument(
+        "--days", action="store_true", help="Print the day-by-day send plan"
+    )
+    tam_sim_parser.add_argument(
+        "--json", action="store_true", help="Output as JSON"
+    )
+    tam_sim_parser.set_defaults(func=cmd_tam_simulate)
+
     # Wave build command
     wave_build_parser = subparsers.add_parser(
         "wave-build", help="Build a wave of contacts for the next Smartlead campaign"
@@ -913,6 +1091,18 @@ def main(argv: Optional[list[str]] = None) -> None:
     wave_build_parser.add_argument(
         "--dry-run", action="store_true", help="Preview without creating list"
     )
+    wave_build_parser.add_argument(
+        "--live", action="store_true",
+        help="Select contacts via HubSpot search instead of the local eligibility index"
+    )
+    wave_build_parser.add_argument(
+        "--max-snapshot-age", type=float, default=MAX_SNAPSHOT_AGE_DAYS, metavar="DAYS",
+        help=f"Use HubSpot search when the TAM snapshot is older than this (default: {MAX_SNAPSHOT_AGE_DAYS})"
+    )
+    wave_build_parser.add_argument(
+        "--resume", metavar="CHECKPOINT",
+        help="Finish an interrupted wave from its checkpoint file"
+    )
     wave_build_parser.set_defaults(func=cmd_wave_build)
 
     # Wave status command
@@ -1,5 +1,7 @@
 """HubSpot API client for Outreach Intelligence."""
 import os
+import threading
+import time
 from typing import Any, Optional
 import requests
 from dotenv import load_dotenv
@@ -7,6 +9,45 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+class RateLimiter:
+    """Thread-safe limiter that spaces calls to at most `rate` per second.
+
+    One instance is shared by every HubSpotClient in the process so that
+    concurrent workers (TAM segments, wave stamping) stay under HubSpot's
+    account-wide limits instead of each assuming it has the full budget.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        """Block until the caller may issue its request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+
+
+# HubSpot allows ~5 search requests/sec and ~19 other requests/sec per account
+SEARCH_RATE_LIMITER = RateLimiter(rate=4.5)
+API_RATE_LIMITER = RateLimiter(rate=18)
+
+
+def _retry_delay(response: requests.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a 429: Retry-After if sent, else backoff."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, TypeError, ValueError):
+        return float(2 ** attempt)
+
+
 class HubSpotClient:
     """Client for HubSpot CRM API."""
 
@@ -35,14 +76,19 @@ class HubSpotClient:
         endpoint: str,
         params: Optional[dict] = None,
         json_data: Optional[dict] = None,
+        max_retries: int = 3,
     ) -> dict[str, Any]:
         """Make authenticated request to HubSpot API.
 
+        Requests are paced by the shared rate limiters and retried with
+        exponential backoff on 429 responses.
+
         Args:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint path (e.g., /crm/v3/objects/contacts)
             params: Query parameters
             json_data: JSON body for POST/PUT requests
+            max_retries: Attempts before giving up on 429 responses
 
         Returns:
             Response JSON as dictionary
@@ -55,14 +101,21 @@ class HubSpotClient:
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json",
         }
+        limiter = SEARCH_RATE_LIMITER if endpoint.endswith("/search") else API_RATE_LIMITER
+
+        for attempt in range(max_retries):
+            limiter.acquire()
+            response = requests.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json_data,
+            )
+            if response.status_code != 429 or attempt == max_retries - 1:
+                break
+            time.sleep(_retry_delay(response, attempt))
 
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            json=json_data,
-        )
         response.raise_for_status()
 
         # DELETE requests may return empty response
@@ -0,0 +1,616 @@
+"""Offline throughput benchmark for the POS/LOS detector.
+
+There was no way to measure detector throughput without hitting real
+lender sites. This harness stands up a local network instead, in a child
+process so that its CPU time isn't counted against the detector:
+
+  - a DNS stub (UDP) authoritative for the synthetic lenders and vendor
+    hosts, answering NXDOMAIN/NODATA with an SOA for everything else
+  - HTTP and HTTPS servers, with certificates from a throwaway local CA
+    (selected by SNI)
+  - configurable DNS and HTTP latency with jitter, homepage redirect hops,
+    live portal subdomains per lender, page size, gzip and a share of
+    wildcard-DNS zones
+
+Each synthetic lender plants one vendor signal drawn from
+``VENDOR_FINGERPRINTS``: a portal CNAME, a portal redirect into the
+vendor's host, a vendor script tag on the homepage, a vendor certificate
+on a portal, or nothing. Only signals that the current matchers recognize
+are planted, so recall against the planted vendors should be 1.0 and
+false positives 0. Anything else is a regression.
+
+The detector runs the way ``detect_batch`` runs it (the async engine,
+through ``detect_batch_async``), with these changes:
+
+  - the resolver points at the stub, with a cold cache for every size
+  - ports 80/443 are remapped onto the local servers
+  - the SSL context trusts the local CA; hostnames aren't checked, so one
+    certificate can serve every lender
+  - Firecrawl is off
+
+For each size the benchmark reports domains/sec, detector CPU time
+(total and per domain), stand-in CPU time (if it nears wall time, the
+servers were the bottleneck), recall and the per-layer telemetry table
+(see ``pos_los_telemetry``).
+
+Requires the openssl CLI to mint the local CA and certificates.
+
+Usage:
+    python -m outreach_intel.pos_los_bench                     # 100, 1K and 10K domains
+    python -m outreach_intel.pos_los_bench --sizes 500 --http-latency-ms 120 -o bench.json
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import random
+import re
+import ssl
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Optional
+
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+from aiohttp import web
+
+from .pos_los_detector import (
+    DEFAULT_POLICY,
+    EXHAUSTIVE_POLICY,
+    PORTAL_SUBDOMAINS,
+    VENDOR_FINGERPRINTS,
+    DetectionPolicy,
+    _match_cert_names,
+    _match_cname,
+    _match_html_page,
+    _match_redirect_chain,
+)
+from .pos_los_dns import CachingResolver
+from .pos_los_engine import MAX_DOMAINS, MAX_IN_FLIGHT, AsyncDetector, detect_batch_async
+from .pos_los_telemetry import BatchTelemetry, format_report
+
+logger = logging.getLogger(__name__)
+
+BENCH_ZONE = "bench.test"
+LOCALHOST = "127.0.0.1"
+SIZES = (100, 1_000, 10_000)
+
+SIGNALS = ("cname", "redirect", "script", "ssl", "none")
+# Signals that still work when the zone has wildcard DNS (redirect and
+# ssl portals answer like the wildcard, so the detector rightly skips them)
+WILDCARD_SAFE = ("cname", "script", "none")
+
+_HOST_PATTERN = re.compile(r"[a-z0-9-]+(?:\\\.[a-z0-9-]+)+")
+
+# Filler vocabulary, shuffled so pages compress like prose rather than a
+# repeated line
+_WORDS = (
+    "rates purchase refinance local officer options today home buyers family "
+    "credit union checking savings branch hours community neighbors fixed "
+    "adjustable jumbo veterans first time closing costs estimate calculator "
+    "contact team reviews awards since years trusted service support"
+).split()
+
+
+@dataclass
+class BenchConfig:
+    """Shape of the synthetic network."""
+
+    seed: int = 0
+    dns_latency_ms: float = 2.0
+    http_latency_ms: float = 40.0
+    # Each delay is drawn uniformly from latency * (1 ± jitter)
+    jitter: float = 0.5
+    # Homepage redirects before the real page (/ → /r/1 → … → /home)
+    redirect_hops: int = 1
+    live_portals: int = 2
+    page_kb: int = 30
+    gzip: bool = True
+    wildcard_share: float = 0.05
+    signal_weights: dict[str, float] = field(default_factory=lambda: {
+        "cname": 0.3, "redirect": 0.15, "script": 0.3, "ssl": 0.05, "none": 0.2,
+    })
+
+
+@dataclass(frozen=True)
+class Signal:
+    """One plantable vendor signal and every vendor the matchers report for it."""
+
+    kind: str
+    vendor: str
+    host: str
+    expected: tuple[str, ...]
+
+
+@dataclass
+class SyntheticLender:
+    domain: str
+    signal: Optional[Signal]
+    portals: list[str]
+    wildcard: bool = False
+
+    @property
+    def signal_portal(self) -> str:
+        return f"{self.portals[0]}.{self.domain}"
+
+    @property
+    def label(self) -> str:
+        return self.domain.split(".")[0]
+
+
+# ── Synthetic sites ─────────────────────────────────────────────────
+
+def _literal_hosts(patterns: list[str]) -> list[str]:
+    """Hostnames from patterns that are plain escaped hosts (r"blend\\.com")."""
+    return [p.replace("\\.", ".") for p in patterns if _HOST_PATTERN.fullmatch(p)]
+
+
+def script_tag(host: str) -> str:
+    return f'<script src="https://cdn.{host}/loader.js"></script>'
+
+
+def signal_catalog() -> dict[str, list[Signal]]:
+    """Plantable signals per kind, one per vendor, verified against the matchers."""
+    probe = f"apply.probe.{BENCH_ZONE}"
+    checks = {
+        "cname": (lambda fp: fp.cname_patterns, lambda host: _match_cname(probe, f"probe.{host}")),
+        "redirect": (
+            lambda fp: fp.redirect_patterns,
+            lambda host: _match_redirect_chain(f"https://{probe}", [f"https://{probe}", f"https://app.{host}/probe"]),
+        ),
+        "script": (
+            lambda fp: fp.cname_patterns + fp.redirect_patterns,
+            lambda host: _match_html_page(script_tag(host), f"https://probe.{BENCH_ZONE}", set()),
+        ),
+        "ssl": (lambda fp: fp.ssl_patterns, lambda host: _match_cert_names(probe, [f"*.{host}"])),
+    }
+    catalog: dict[str, list[Signal]] = {kind: [] for kind in checks}
+    for kind, (patterns_of, match) in checks.items():
+        for fp in VENDOR_FINGERPRINTS:
+            for host in _literal_hosts(patterns_of(fp)):
+                vendors = {d.vendor for d in match(host)}
+                if fp.name in vendors:
+                    catalog[kind].append(Signal(kind, fp.name, host, tuple(sorted(vendors))))
+                    break
+    return catalog
+
+
+def build_sites(config: BenchConfig, count: int) -> dict[str, SyntheticLender]:
+    """``count`` lenders, deterministic for a given config."""
+    rng = random.Random(config.seed)
+    catalog = signal_catalog()
+    kinds = [k for k in SIGNALS if k == "none" or catalog.get(k)]
+    weights = [config.signal_weights.get(k, 0.0) for k in kinds]
+    sites: dict[str, SyntheticLender] = {}
+    for i in range(count):
+        domain = f"lender{i:05d}.{BENCH_ZONE}"
+        kind = rng.choices(kinds, weights)[0]
+        signal = rng.choice(catalog[kind]) if kind != "none" else None
+        portals = rng.sample(PORTAL_SUBDOMAINS, max(1, config.live_portals))
+        wildcard = kind in WILDCARD_SAFE and rng.random() < config.wildcard_share
+        sites[domain] = SyntheticLender(domain, signal, portals, wildcard)
+    return sites
+
+
+# ── Stand-in network (runs in the child process) ────────────────────
+
+class StandInNetwork:
+    """DNS answers and HTTP responses for a set of synthetic lenders."""
+
+    def __init__(self, sites: dict[str, SyntheticLender], config: BenchConfig):
+        self.sites = sites
+        self.config = config
+        self._rng = random.Random(config.seed + 1)
+        self._vendor_hosts = {s.host for kinds in signal_catalog().values() for s in kinds}
+        self._soa = dns.rrset.from_text(
+            f"{BENCH_ZONE}.", 3600, "IN", "SOA",
+            f"ns.{BENCH_ZONE}. hostmaster.{BENCH_ZONE}. 1 3600 600 86400 3600",
+        )
+        words = random.Random(config.seed + 2).choices(_WORDS, k=config.page_kb * 1024 // 7)
+        self._filler = "".join(f"<p>{' '.join(words[i:i + 12])}.</p>\n" for i in range(0, len(words), 12))
+
+    def delay(self, latency_ms: float) -> float:
+        spread = self.config.jitter
+        return max(0.0, latency_ms * self._rng.uniform(1 - spread, 1 + spread)) / 1000
+
+    def _vendor_host(self, name: str) -> bool:
+        parts = name.split(".")
+        return any(".".join(parts[i:]) in self._vendor_hosts for i in range(len(parts) - 1))
+
+    def _owner(self, name: str) -> Optional[SyntheticLender]:
+        """Lender whose zone ``name`` is a direct subdomain of."""
+        _, _, parent = name.partition(".")
+        return self.sites.get(parent)
+
+    def lookup(self, name: str) -> Optional[tuple[str, str]]:
+        """("CNAME", target) or ("A", address) for a name, or None (NXDOMAIN)."""
+        if name in self.sites or self._vendor_host(name):
+            return "A", LOCALHOST
+        lender = self._owner(name)
+        if lender is None:
+            return None
+        signal = lender.signal
+        if signal is not None and signal.kind == "cname" and name == lender.signal_portal:
+            return "CNAME", f"{lender.label}.{signal.host}"
+        if name.split(".")[0] in lender.portals or lender.wildcard:
+            return "A", LOCALHOST
+        return None
+
+    def answer(self, query: dns.message.Message) -> dns.message.Message:
+        response = dns.message.make_response(query)
+        response.flags |= dns.flags.AA
+        question = query.question[0]
+        name = question.name.to_text().rstrip(".").lower()
+        record = self.lookup(name)
+        if record is None:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+            response.authority.append(self._soa)
+            return response
+        kind, value = record
+        if kind == "CNAME":
+            response.answer.append(dns.rrset.from_text(f"{name}.", 300, "IN", "CNAME", f"{value}."))
+            if question.rdtype == dns.rdatatype.A:
+                response.answer.append(dns.rrset.from_text(f"{value}.", 300, "IN", "A", LOCALHOST))
+        elif question.rdtype == dns.rdatatype.A:
+            response.answer.append(dns.rrset.from_text(f"{name}.", 300, "IN", "A", value))
+        else:
+            response.authority.append(self._soa)  # NODATA
+        return response
+
+    def _page(self, title: str, head: str = "", body: str = "") -> web.Response:
+        html = f"<html><head><title>{title}</title>{head}</head><body>{body}</body></html>"
+        response = web.Response(text=html, content_type="text/html")
+        if self.config.gzip:
+            response.enable_compression()
+        return response
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        await asyncio.sleep(self.delay(self.config.http_latency_ms))
+        host = (request.host or "").split(":")[0].lower()
+        path = request.path
+
+        lender = self.sites.get(host)
+        if lender is not None:
+            hops = self.config.redirect_hops
+            if path == "/" and hops:
+                raise web.HTTPFound("/r/1")
+            if path.startswith("/r/"):
+                step = int(path[3:] or 0)
+                raise web.HTTPFound(f"/r/{step + 1}" if step < hops else "/home")
+            if path in ("/", "/home"):
+                signal = lender.signal
+                head = script_tag(signal.host) if signal is not None and signal.kind == "script" else ""
+                return self._page(lender.domain, head, self._filler)
+            raise web.HTTPNotFound()
+
+        owner = self._owner(host)
+        if owner is not None:
+            signal = owner.signal
+            if signal is not None and signal.kind == "redirect" and host == owner.signal_portal:
+                raise web.HTTPFound(f"https://app.{signal.host}/{owner.label}")
+            return self._page("Sign in", body="<form><input name=email></form>")
+        return self._page("Portal", body="<p>Welcome back.</p>")
+
+    def sni_callback(self, vendor_contexts: dict[str, ssl.SSLContext]):
+        def pick(sslobj: ssl.SSLObject, server_name: Optional[str], _context: ssl.SSLContext) -> None:
+            owner = self._owner((server_name or "").lower())
+            signal = owner.signal if owner is not None else None
+            if signal is not None and signal.kind == "ssl" and server_name == owner.signal_portal:
+                sslobj.context = vendor_contexts[signal.host]
+        return pick
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    def __init__(self, network: StandInNetwork):
+        self.network = network
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        try:
+            query = dns.message.from_wire(data)
+        except Exception:
+            return
+        wire = self.network.answer(query).to_wire()
+        delay = self.network.delay(self.network.config.dns_latency_ms)
+        asyncio.get_running_loop().call_later(delay, self.transport.sendto, wire, addr)
+
+
+def _server_context(cert_dir: Path, name: str) -> ssl.SSLContext:
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_dir / f"{name}.pem", cert_dir / f"{name}.key")
+    return context
+
+
+async def _serve_async(config: BenchConfig, count: int, cert_dir: Path, conn) -> None:
+    network = StandInNetwork(build_sites(config, count), config)
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: _DnsProtocol(network), local_addr=(LOCALHOST, 0))
+
+    tls = _server_context(cert_dir, "default")
+    vendor_contexts = {host: _server_context(cert_dir, host) for host in _ssl_hosts()}
+    tls.sni_callback = network.sni_callback(vendor_contexts)
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", network.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, LOCALHOST, 0, backlog=1024).start()
+    await web.TCPSite(runner, LOCALHOST, 0, ssl_context=tls, backlog=1024).start()
+    (_, http_port), (_, https_port) = runner.addresses
+    conn.send((transport.get_extra_info("sockname")[1], http_port, https_port))
+    try:
+        while True:
+            message = await loop.run_in_executor(None, conn.recv)
+            if message == "cpu":
+                conn.send(time.process_time())
+            else:
+                break
+    finally:
+        await runner.cleanup()
+        transport.close()
+
+
+def _serve(config: BenchConfig, count: int, cert_dir: str, conn) -> None:
+    """Child-process entry point."""
+    asyncio.run(_serve_async(config, count, Path(cert_dir), conn))
+
+
+# ── Certificates ────────────────────────────────────────────────────
+
+def _ssl_hosts() -> list[str]:
+    return sorted({s.host for s in signal_catalog()["ssl"]})
+
+
+def _openssl(*args: str, cwd: Path) -> None:
+    subprocess.run(["openssl", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def make_certs(cert_dir: Path) -> Path:
+    """Mint a throwaway CA, a default leaf and one leaf per SSL-signal vendor host.
+
+    Returns the CA certificate path.
+    """
+    ec = ("-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1", "-nodes")
+    _openssl(
+        "req", "-x509", *ec, "-keyout", "ca.key", "-out", "ca.pem", "-days", "2",
+        "-subj", "/CN=pos-los-bench CA",
+        "-addext", "basicConstraints=critical,CA:TRUE",
+        "-addext", "keyUsage=critical,keyCertSign,cRLSign",
+        cwd=cert_dir,
+    )
+    leaves = {"default": [BENCH_ZONE, f"*.{BENCH_ZONE}"], **{h: [f"*.{h}", h] for h in _ssl_hosts()}}
+    for name, sans in leaves.items():
+        (cert_dir / f"{name}.ext").write_text(
+            "basicConstraints=CA:FALSE\n"
+            "authorityKeyIdentifier=keyid,issuer\n"
+            f"subjectAltName={','.join(f'DNS:{s}' for s in sans)}\n"
+        )
+        _openssl("req", *ec, "-keyout", f"{name}.key", "-out", f"{name}.csr", "-subj", f"/CN={sans[0]}", cwd=cert_dir)
+        _openssl(
+            "x509", "-req", "-in", f"{name}.csr", "-CA", "ca.pem", "-CAkey", "ca.key", "-CAcreateserial",
+            "-out", f"{name}.pem", "-days", "2", "-extfile", f"{name}.ext",
+            cwd=cert_dir,
+        )
+    return cert_dir / "ca.pem"
+
+
+# ── Benchmark ───────────────────────────────────────────────────────
+
+class StandIn:
+    """The stand-in network in a child process; use as a context manager."""
+
+    def __init__(self, config: BenchConfig, count: int):
+        self.config = config
+        self.count = count
+        self._tmp = tempfile.TemporaryDirectory(prefix="pos-los-bench-")
+        self.cert_dir = Path(self._tmp.name)
+        self.dns_port = self.http_port = self.https_port = 0
+
+    def __enter__(self) -> "StandIn":
+        self.ca_path = make_certs(self.cert_dir)
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve, args=(self.config, self.count, str(self.cert_dir), child_conn), daemon=True,
+        )
+        self._process.start()
+        if not self._conn.poll(60):
+            self.__exit__()
+            raise RuntimeError("Stand-in network did not start")
+        self.dns_port, self.http_port, self.https_port = self._conn.recv()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._process.is_alive():
+            try:
+                self._conn.send("stop")
+            except OSError:
+                pass
+            self._process.join(10)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._tmp.cleanup()
+
+    def cpu_seconds(self) -> float:
+        self._conn.send("cpu")
+        return self._conn.recv()
+
+    def client_ssl_context(self) -> ssl.SSLContext:
+        """Trusts the local CA; hostnames aren't checked (one cert serves every lender)."""
+        context = ssl.create_default_context(cafile=str(self.ca_path))
+        context.check_hostname = False
+        return context
+
+    def detector(self, max_in_flight: int = MAX_IN_FLIGHT) -> AsyncDetector:
+        """An AsyncDetector wired to this network, with a cold DNS cache."""
+        return AsyncDetector(
+            max_in_flight=max_in_flight,
+            use_firecrawl=False,
+            ssl_context=self.client_ssl_context(),
+            resolver=CachingResolver(cache_path=None, nameservers=[LOCALHOST], port=self.dns_port),
+            port_map={80: self.http_port, 443: self.https_port},
+        )
+
+
+@dataclass
+class BenchRun:
+    """One benchmark size."""
+
+    domains: int
+    seconds: float
+    domains_per_sec: float
+    cpu_seconds: float
+    cpu_ms_per_domain: float
+    standin_cpu_seconds: float
+    recall: float
+    false_positives: int
+    errors: int
+    telemetry: dict[str, Any]
+
+
+def score(results: list, sites: dict[str, SyntheticLender]) -> tuple[float, int]:
+    """(recall of planted vendors, vendors reported beyond what was planted)."""
+    planted = found = false_positives = 0
+    for result in results:
+        lender = sites[result.domain]
+        detected = {d.vendor for d in result.detections}
+        expected = set(lender.signal.expected) if lender.signal else set()
+        if lender.signal is not None:
+            planted += 1
+            found += lender.signal.vendor in detected
+        false_positives += len(detected - expected)
+    return (found / planted if planted else 1.0), false_positives
+
+
+async def _run_size(
+    standin: StandIn,
+    sites: dict[str, SyntheticLender],
+    size: int,
+    max_domains: int,
+    max_in_flight: int,
+    policy: DetectionPolicy,
+) -> BenchRun:
+    domains = list(sites)[:size]
+    telemetry = BatchTelemetry()
+    standin_cpu = standin.cpu_seconds()
+    cpu = time.process_time()
+    started = time.perf_counter()
+    results = await detect_batch_async(
+        domains,
+        max_domains=max_domains,
+        progress_callback=lambda i, n, domain, result: telemetry.add(result),
+        detector=standin.detector(max_in_flight),
+        policy=policy,
+    )
+    seconds = time.perf_counter() - started
+    cpu = time.process_time() - cpu
+    recall, false_positives = score(results, sites)
+    return BenchRun(
+        domains=size,
+        seconds=round(seconds, 3),
+        domains_per_sec=round(size / seconds, 2),
+        cpu_seconds=round(cpu, 3),
+        cpu_ms_per_domain=round(cpu / size * 1000, 3),
+        standin_cpu_seconds=round(standin.cpu_seconds() - standin_cpu, 3),
+        recall=round(recall, 4),
+        false_positives=false_positives,
+        errors=sum(1 for r in results if r.errors),
+        telemetry=telemetry.report(),
+    )
+
+
+def run_benchmark(
+    sizes: tuple[int, ...] = SIZES,
+    config: Optional[BenchConfig] = None,
+    max_domains: int = MAX_DOMAINS,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    policy: DetectionPolicy = DEFAULT_POLICY,
+) -> list[BenchRun]:
+    """Benchmark the async engine against the stand-in network at each size."""
+    config = config or BenchConfig()
+    policy = replace(policy, layers=policy.free_layers())  # Never Firecrawl
+    sites = build_sites(config, max(sizes))
+    runs = []
+    with StandIn(config, max(sizes)) as standin:
+        for size in sizes:
+            logger.info(f"Benchmarking {size} domains")
+            runs.append(asyncio.run(_run_size(standin, sites, size, max_domains, max_in_flight, policy)))
+    return runs
+
+
+def format_runs(runs: list[BenchRun]) -> str:
+    lines = [
+        f"{'Domains':>8} {'Wall s':>8} {'Dom/s':>8} {'CPU s':>8} {'CPU ms/d':>9} "
+        f"{'Stand-in':>9} {'Recall':>7} {'FP':>4} {'Errors':>7}",
+        "-" * 80,
+    ]
+    for run in runs:
+        lines.append(
+            f"{run.domains:>8} {run.seconds:>8.2f} {run.domains_per_sec:>8.1f} {run.cpu_seconds:>8.2f} "
+            f"{run.cpu_ms_per_domain:>9.2f} {run.standin_cpu_seconds:>9.2f} {run.recall:>7.3f} "
+            f"{run.false_positives:>4} {run.errors:>7}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    """CLI: python -m outreach_intel.pos_los_bench"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark for the POS/LOS detector")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Batch sizes to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dns-latency-ms", type=float, default=BenchConfig.dns_latency_ms)
+    parser.add_argument("--http-latency-ms", type=float, default=BenchConfig.http_latency_ms)
+    parser.add_argument("--jitter", type=float, default=BenchConfig.jitter)
+    parser.add_argument("--redirect-hops", type=int, default=BenchConfig.redirect_hops)
+    parser.add_argument("--live-portals", type=int, default=BenchConfig.live_portals)
+    parser.add_argument("--page-kb", type=int, default=BenchConfig.page_kb)
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--wildcard-share", type=float, default=BenchConfig.wildcard_share)
+    parser.add_argument("--max-domains", type=int, default=MAX_DOMAINS, help="Domains open at once")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT, help="Concurrent probes")
+    parser.add_argument("--exhaustive", action="store_true", help="Run every free layer on every domain")
+    parser.add_argument("--output", "-o", help="Also write the runs as JSON")
+    args = parser.parse_args()
+
+    config = BenchConfig(
+        seed=args.seed,
+        dns_latency_ms=args.dns_latency_ms,
+        http_latency_ms=args.http_latency_ms,
+        jitter=args.jitter,
+        redirect_hops=args.redirect_hops,
+        live_portals=args.live_portals,
+        page_kb=args.page_kb,
+        gzip=not args.no_gzip,
+        wildcard_share=args.wildcard_share,
+    )
+    runs = run_benchmark(
+        tuple(args.sizes),
+        config,
+        max_domains=args.max_domains,
+        max_in_flight=args.max_in_flight,
+        policy=EXHAUSTIVE_POLICY if args.exhaustive else DEFAULT_POLICY,
+    )
+    print(format_runs(runs))
+    for run in runs:
+        print(f"\nPer-layer telemetry, {run.domains} domains:")
+        print(format_report(run.telemetry))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": asdict(config), "runs": [asdict(r) for r in runs]}, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
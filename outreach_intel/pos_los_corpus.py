@@ -0,0 +1,312 @@
+"""Content-addressed corpus of detector observations for offline re-matching.
+
+A new entry in ``VENDOR_FINGERPRINTS``, ``SCRIPT_SRC_FINGERPRINTS`` or
+``CONFIG_PATTERNS`` used to take effect only after re-crawling every
+lender, Firecrawl credits included. The detector can now archive what it
+observed for each domain:
+
+  - CNAME answers for the portal subdomains
+  - redirect chains
+  - raw HTML, both the HTML layer's pages and Firecrawl's rawHtml
+  - Firecrawl link lists
+  - certificate CN/SAN names
+
+``rematch`` re-runs every matcher over that archive, in parallel across
+cores and without a single network call.
+
+Layout (under exports/detector/corpus/):
+    objects/ab/cdef...   zlib-compressed blobs, named by the sha256 of
+                         their uncompressed bytes (identical pages across
+                         domains and runs are stored once)
+    index.jsonl          {"domain", "manifest", "archived_at"} per archive;
+                         the last line for a domain wins
+
+A domain's manifest is itself a blob: JSON that references page and
+link-list blobs by hash. Archiving scans turn off early exit and layer
+plans, so every free layer runs and pages are read up to the HTML caps.
+Firecrawl still runs only when the policy calls for it, so the manifest's
+``layers`` records which layers a capture covers. Web-search results are
+not archived.
+
+Usage:
+    python -m outreach_intel.pos_los_detector -f lenders.txt --archive
+    python -m outreach_intel.pos_los_corpus rematch --store
+    python -m outreach_intel.pos_los_corpus rematch lender.com -o json
+    python -m outreach_intel.pos_los_corpus stats
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from .pos_los_detector import (
+    DomainResult,
+    Detection,
+    _build_result,
+    _match_cert_names,
+    _match_cname,
+    _match_html_page,
+    _match_links,
+    _match_raw_html,
+    _match_redirect_chain,
+    normalize_domain,
+    results_to_csv,
+)
+
+CORPUS_DIR = Path(__file__).parent.parent / "exports" / "detector" / "corpus"
+
+
+@dataclass
+class Capture:
+    """Everything the layers observed for one domain, in layer order.
+
+    ``pages`` are HTML-layer pages in ``_html_urls`` order (first page
+    wins per vendor); ``firecrawl_pages`` and ``links`` come from
+    Firecrawl scrapes.
+    """
+
+    domain: str
+    cnames: dict[str, list[str]] = field(default_factory=dict)
+    redirects: dict[str, list[str]] = field(default_factory=dict)
+    pages: list[tuple[str, str]] = field(default_factory=list)
+    certs: dict[str, list[str]] = field(default_factory=dict)
+    firecrawl_pages: list[tuple[str, str]] = field(default_factory=list)
+    links: list[tuple[str, list[str]]] = field(default_factory=list)
+    layers: dict[str, str] = field(default_factory=dict)
+
+    def add_firecrawl_page(self, url: str, raw_html: str, links: list[str]) -> None:
+        if raw_html:
+            self.firecrawl_pages.append((url, raw_html))
+        if links:
+            self.links.append((url, list(links)))
+
+
+def rematch_capture(capture: Capture) -> DomainResult:
+    """Re-run every matcher over a capture, exactly as the layers would."""
+    detections: list[Detection] = []
+    for fqdn, targets in capture.cnames.items():
+        for target in targets:
+            detections.extend(_match_cname(fqdn, target))
+    for url, chain in capture.redirects.items():
+        detections.extend(_match_redirect_chain(url, chain))
+    seen_vendors: set[str] = set()
+    for url, html in capture.pages:
+        detections.extend(_match_html_page(html, url, seen_vendors))
+    for hostname, names in capture.certs.items():
+        detections.extend(_match_cert_names(hostname, names))
+    for url, html in capture.firecrawl_pages:
+        detections.extend(_match_raw_html(html, url))
+    for _, links in capture.links:
+        detections.extend(_match_links(links, capture.domain))
+    return _build_result(capture.domain, detections, [], capture.layers)
+
+
+class Corpus:
+    """Compressed, content-addressed archive of Captures."""
+
+    def __init__(self, root: Path = CORPUS_DIR):
+        self.root = Path(root)
+        self._index_lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "index.jsonl"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest[2:]
+
+    # ── Blobs ───────────────────────────────────────────────────────
+
+    def put_blob(self, data: bytes) -> str:
+        """Store data once under its sha256; returns the hex digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(zlib.compress(data, 6))
+            os.replace(tmp, path)
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        return zlib.decompress(self._object_path(digest).read_bytes())
+
+    def _put_json(self, value: Any) -> str:
+        return self.put_blob(json.dumps(value, sort_keys=True).encode("utf-8"))
+
+    def _get_json(self, digest: str) -> Any:
+        return json.loads(self.get_blob(digest))
+
+    # ── Captures ────────────────────────────────────────────────────
+
+    def archive(self, capture: Capture, archived_at: Optional[datetime] = None) -> str:
+        """Store a capture and point the index at it; returns the manifest digest."""
+        manifest = {
+            "domain": capture.domain,
+            "cnames": capture.cnames,
+            "redirects": capture.redirects,
+            "pages": [[url, self.put_blob(html.encode("utf-8"))] for url, html in capture.pages],
+            "certs": capture.certs,
+            "firecrawl_pages": [
+                [url, self.put_blob(html.encode("utf-8"))] for url, html in capture.firecrawl_pages
+            ],
+            "links": [[url, self._put_json(links)] for url, links in capture.links],
+            "layers": capture.layers,
+        }
+        digest = self._put_json(manifest)
+        archived_at = archived_at or datetime.now(timezone.utc)
+        line = json.dumps({
+            "domain": normalize_domain(capture.domain),
+            "manifest": digest,
+            "archived_at": archived_at.isoformat(),
+        })
+        with self._index_lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        return digest
+
+    def index(self) -> dict[str, dict[str, str]]:
+        """{domain: latest index entry}."""
+        if not self.index_path.exists():
+            return {}
+        latest: dict[str, dict[str, str]] = {}
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    latest[entry["domain"]] = entry
+        return latest
+
+    def load(self, manifest_digest: str) -> Capture:
+        manifest = self._get_json(manifest_digest)
+        return Capture(
+            domain=manifest["domain"],
+            cnames=manifest["cnames"],
+            redirects=manifest["redirects"],
+            pages=[(url, self.get_blob(d).decode("utf-8")) for url, d in manifest["pages"]],
+            certs=manifest["certs"],
+            firecrawl_pages=[
+                (url, self.get_blob(d).decode("utf-8")) for url, d in manifest["firecrawl_pages"]
+            ],
+            links=[(url, self._get_json(d)) for url, d in manifest["links"]],
+            layers=manifest["layers"],
+        )
+
+    def stats(self) -> dict[str, int]:
+        objects = [p for p in (self.root / "objects").glob("*/*") if p.is_file()]
+        return {
+            "domains": len(self.index()),
+            "objects": len(objects),
+            "bytes": sum(p.stat().st_size for p in objects),
+        }
+
+
+# ── Rematch ─────────────────────────────────────────────────────────
+
+def _rematch_one(job: tuple[str, str]) -> dict[str, Any]:
+    """Process-pool worker: load one manifest and rematch it (no network)."""
+    root, digest = job
+    return rematch_capture(Corpus(Path(root)).load(digest)).to_dict()
+
+
+def rematch(
+    corpus: Corpus,
+    domains: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+    progress_callback: Optional[Callable] = None,
+) -> list[tuple[DomainResult, datetime]]:
+    """Re-run the current fingerprints over archived captures.
+
+    Args:
+        corpus: Archive to read.
+        domains: Restrict to these domains (default: every archived domain).
+        workers: Worker processes (default: one per core).
+        progress_callback: Optional fn(completed, total, domain, result).
+
+    Returns:
+        (result, archived_at) per domain, in index order.
+    """
+    index = corpus.index()
+    if domains is not None:
+        wanted = {normalize_domain(d) for d in domains}
+        index = {d: e for d, e in index.items() if d in wanted}
+    entries = list(index.values())
+    jobs = [(str(corpus.root), e["manifest"]) for e in entries]
+
+    results: list[tuple[DomainResult, datetime]] = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        for i, (entry, data) in enumerate(zip(entries, pool.map(_rematch_one, jobs, chunksize=chunksize))):
+            result = DomainResult.from_dict(data)
+            results.append((result, datetime.fromisoformat(entry["archived_at"])))
+            if progress_callback:
+                progress_callback(i + 1, len(jobs), entry["domain"], result)
+    return results
+
+
+def main():
+    """CLI: python -m outreach_intel.pos_los_corpus {rematch,stats}"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline POS/LOS re-matching from the page corpus")
+    parser.add_argument("--corpus", default=str(CORPUS_DIR), help="Corpus directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rematch_parser = subparsers.add_parser("rematch", help="Re-run fingerprints over archived pages")
+    rematch_parser.add_argument("domains", nargs="*", help="Only these domains (default: all)")
+    rematch_parser.add_argument("--workers", "-w", type=int, default=None,
+                                help="Worker processes (default: one per core)")
+    rematch_parser.add_argument("--output", "-o", choices=["json", "csv", "table"], default="table")
+    rematch_parser.add_argument("--store", action="store_true",
+                                help="Write results to the result store (dated when archived)")
+    rematch_parser.add_argument("--store-path", help="Result store file (implies --store)")
+
+    subparsers.add_parser("stats", help="Corpus size")
+    args = parser.parse_args()
+
+    corpus = Corpus(Path(args.corpus))
+    if args.command == "stats":
+        stats = corpus.stats()
+        print(f"{stats['domains']} domains, {stats['objects']} objects, {stats['bytes'] / 1e6:.1f} MB")
+        return
+
+    pairs = rematch(corpus, args.domains or None, workers=args.workers)
+    results = [result for result, _ in pairs]
+
+    changed = 0
+    if args.store or args.store_path:
+        from outreach_intel.pos_los_store import STORE_PATH, ResultStore
+
+        with ResultStore(Path(args.store_path) if args.store_path else STORE_PATH) as store:
+            before = store.get_many(r.domain for r in results)
+            for result, archived_at in pairs:
+                old = before.get(result.domain)
+                if old is None or {d.vendor for d in old.result.detections} != {d.vendor for d in result.detections}:
+                    changed += 1
+                store.put(result, scanned_at=archived_at)
+
+    if args.output == "json":
+        print(json.dumps([r.to_dict() for r in results], indent=2))
+    elif args.output == "csv":
+        print(results_to_csv(results))
+    else:
+        print(f"\n{'Domain':<30} {'POS':<30} {'LOS':<30}")
+        print("-" * 90)
+        for r in results:
+            print(f"{r.domain:<30} {', '.join(r.pos_detected) or '-':<30} {', '.join(r.los_detected) or '-':<30}")
+        summary = f"\nRematched {len(results)} domains offline."
+        if args.store or args.store_path:
+            summary += f" {changed} changed vendor sets."
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,16 @@ Detection layers:
   3. HTML content scanning on main site and portal pages
   4. SSL certificate inspection
   5. Firecrawl: map → rawHtml scrape + regex → web search fallback
+
+The layer functions below are the synchronous reference implementation.
+``detect_batch`` runs the same matching through the asyncio engine in
+``pos_los_engine`` by default.
 """
 
+import codecs
 import csv
 import dns.resolver
+import hashlib
 import io
 import json
 import logging
@@ -22,14 +28,28 @@ import re
 import socket
 import ssl
 import sys
+import time
+import zlib
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, field, asdict
-from typing import Optional
+from dataclasses import dataclass, field, asdict, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
 from urllib.parse import urlparse
 
 import requests
+import urllib3
 from dotenv import load_dotenv
 
+from outreach_intel.pos_los_matcher import FingerprintMatcher, HostIndex, PageScan, StreamScan
+from outreach_intel.pos_los_telemetry import finalize_runs, layer_run
+
+if TYPE_CHECKING:
+    from outreach_intel.firecrawl_client import SearchResult
+    from outreach_intel.pos_los_corpus import Capture, Corpus
+    from outreach_intel.pos_los_firecrawl import FirecrawlLayer
+    from outreach_intel.pos_los_store import RescanPolicy, ResultStore
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -296,6 +316,11 @@ PORTAL_SUBDOMAINS = [
     "homeloans", "pos", "myaccount", "online", "loans", "homeloan",
 ]
 
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
 # ---------------------------------------------------------------------------
 # Script src / CDN / copyright fingerprints for rawHtml detection
 # ---------------------------------------------------------------------------
@@ -411,6 +436,42 @@ def _is_false_positive(vendor_name: str, match_context: str) -> bool:
             return True
     return False
 
+
+def _usage_patterns(vendor: str) -> list[str]:
+    """Search-snippet patterns for "[lender] uses [vendor]"-style statements."""
+    return [
+        rf"(?:uses?|using|powered by|built on|deployed|implemented|selected|chose|partners? with)\s+{re.escape(vendor)}",
+        rf"{re.escape(vendor)}\s+(?:customer|client|partner|user|deployment|implementation)",
+    ]
+
+
+# Every text fingerprint table, compiled once for single-pass scanning
+FINGERPRINT_MATCHER = FingerprintMatcher({
+    "html": {fp.name: fp.html_patterns for fp in VENDOR_FINGERPRINTS},
+    "script_src": SCRIPT_SRC_FINGERPRINTS,
+    "copyright": COPYRIGHT_PATTERNS,
+    "config": CONFIG_PATTERNS,
+    "usage": {fp.name: _usage_patterns(fp.name) for fp in VENDOR_FINGERPRINTS},
+})
+
+# Host fingerprints for CNAME targets, redirect chains, links and cert names
+HOST_INDEX = HostIndex({
+    "cname": {fp.name: fp.cname_patterns for fp in VENDOR_FINGERPRINTS},
+    "redirect": {fp.name: fp.redirect_patterns for fp in VENDOR_FINGERPRINTS},
+    "ssl": {fp.name: fp.ssl_patterns for fp in VENDOR_FINGERPRINTS},
+})
+
+# Build a vendor→category lookup from fingerprints
+_VENDOR_CATEGORY: dict[str, str] = {fp.name: fp.category for fp in VENDOR_FINGERPRINTS}
+
+# Changes whenever any fingerprint table does; stored with every result
+FINGERPRINT_VERSION = hashlib.sha256(json.dumps({
+    "vendors": [asdict(fp) for fp in VENDOR_FINGERPRINTS],
+    "script_src": SCRIPT_SRC_FINGERPRINTS,
+    "copyright": COPYRIGHT_PATTERNS,
+    "config": CONFIG_PATTERNS,
+}, sort_keys=True).encode()).hexdigest()[:12]
+
 # ---------------------------------------------------------------------------
 # Detection result
 # ---------------------------------------------------------------------------
@@ -432,6 +493,11 @@ class DomainResult:
     detections: list[Detection] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
     browser_log: list[str] = field(default_factory=list)
+    # {layer: ISO timestamp} for every layer that ran to completion (or failed)
+    layers: dict[str, str] = field(default_factory=dict)
+    fingerprint_version: str = ""
+    # {layer: LayerRun as dict} (see pos_los_telemetry)
+    telemetry: dict[str, dict] = field(default_factory=dict)
 
     def to_dict(self) -> dict:
         return {
@@ -441,13 +507,109 @@ class DomainResult:
             "detections": [asdict(d) for d in self.detections],
             "errors": self.errors,
             "browser_log": self.browser_log,
+            "layers": self.layers,
+            "fingerprint_version": self.fingerprint_version,
+            "telemetry": self.telemetry,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "DomainResult":
+        """Inverse of ``to_dict``."""
+        return cls(
+            domain=data["domain"],
+            pos_detected=list(data.get("pos", [])),
+            los_detected=list(data.get("los", [])),
+            detections=[Detection(**d) for d in data.get("detections", [])],
+            errors=list(data.get("errors", [])),
+            browser_log=list(data.get("browser_log", [])),
+            layers=dict(data.get("layers", {})),
+            fingerprint_version=data.get("fingerprint_version", ""),
+            telemetry=dict(data.get("telemetry", {})),
+        )
+
+
+def layer_timestamp() -> str:
+    """UTC timestamp recorded when a detection layer finishes."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# ---------------------------------------------------------------------------
+# Early-exit policy
+# ---------------------------------------------------------------------------
+
+CONFIDENCE_RANK = {"high": 3, "medium": 2, "low": 1}
+
+# Layers that cost nothing but time, in reference order
+FREE_LAYERS = ("dns", "redirect", "html", "ssl")
+
+
+@dataclass(frozen=True)
+class DetectionPolicy:
+    """When a domain scan may stop early, and when the paid layer runs.
+
+    With the defaults, a scan stops as soon as both a POS and an LOS have
+    a high-confidence detection, and Firecrawl runs only when every free
+    layer came up empty.
+
+    ``layers`` restricts and orders the layers that run (e.g. a plan from
+    ``pos_los_telemetry.plan_layers``); None means every layer in
+    reference order. Firecrawl runs only if listed.
+    """
+
+    required_categories: tuple[str, ...] = ("pos", "los")
+    min_confidence: str = "high"
+    early_exit: bool = True
+    firecrawl_only_when_empty: bool = True
+    layers: Optional[tuple[str, ...]] = None
+
+    def free_layers(self) -> tuple[str, ...]:
+        if self.layers is None:
+            return FREE_LAYERS
+        return tuple(layer for layer in self.layers if layer in FREE_LAYERS)
+
+    def satisfied(self, detections: list[Detection]) -> bool:
+        """True once every required category has a confident enough detection."""
+        if not self.early_exit:
+            return False
+        floor = CONFIDENCE_RANK.get(self.min_confidence, 0)
+        covered: set[str] = set()
+        for det in detections:
+            if CONFIDENCE_RANK.get(det.confidence, 0) >= floor:
+                covered.update(("pos", "los") if det.category == "both" else (det.category,))
+        return all(c in covered for c in self.required_categories)
+
+    def run_firecrawl(self, detections: list[Detection]) -> bool:
+        if self.layers is not None and "firecrawl" not in self.layers:
+            return False
+        if self.satisfied(detections):
+            return False
+        return not (self.firecrawl_only_when_empty and detections)
+
+
+DEFAULT_POLICY = DetectionPolicy()
+
+# Every layer, every time (the original behavior)
+EXHAUSTIVE_POLICY = DetectionPolicy(early_exit=False, firecrawl_only_when_empty=False)
+
 
 # ---------------------------------------------------------------------------
 # Layer 1: DNS CNAME analysis
 # ---------------------------------------------------------------------------
 
+def _match_cname(fqdn: str, cname_target: str) -> list[Detection]:
+    """Match one CNAME target against vendor fingerprints."""
+    return [
+        Detection(
+            vendor=vendor,
+            category=_VENDOR_CATEGORY[vendor],
+            confidence="high",
+            method="dns",
+            evidence=f"{fqdn} CNAME -> {cname_target}",
+        )
+        for vendor, _ in HOST_INDEX.match(cname_target, "cname")
+    ]
+
+
 def check_dns_cnames(domain: str) -> list[Detection]:
     """Check CNAME records on portal subdomains for vendor fingerprints."""
     detections = []
@@ -461,16 +623,7 @@ def check_dns_cnames(domain: str) -> list[Detection]:
             answers = resolver.resolve(fqdn, "CNAME")
             for rdata in answers:
                 cname_target = str(rdata.target).rstrip(".")
-                for fp in VENDOR_FINGERPRINTS:
-                    for pattern in fp.cname_patterns:
-                        if re.search(pattern, cname_target, re.IGNORECASE):
-                            detections.append(Detection(
-                                vendor=fp.name,
-                                category=fp.category,
-                                confidence="high",
-                                method="dns",
-                                evidence=f"{fqdn} CNAME -> {cname_target}",
-                            ))
+                detections.extend(_match_cname(fqdn, cname_target))
         except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer,
                 dns.resolver.NoNameservers, dns.resolver.LifetimeTimeout,
                 dns.exception.DNSException):
@@ -482,35 +635,36 @@ def check_dns_cnames(domain: str) -> list[Detection]:
 # Layer 2: HTTP redirect chain analysis
 # ---------------------------------------------------------------------------
 
+def _match_redirect_chain(url: str, chain_urls: list[str]) -> list[Detection]:
+    """Match every URL in a redirect chain (final URL last) against vendors."""
+    detections = []
+    final_url = chain_urls[-1]
+    for chain_url in chain_urls:
+        for vendor, _ in HOST_INDEX.match(chain_url, "redirect"):
+            detections.append(Detection(
+                vendor=vendor,
+                category=_VENDOR_CATEGORY[vendor],
+                confidence="high",
+                method="redirect",
+                evidence=f"{url} -> {final_url}",
+            ))
+    return detections
+
+
 def check_redirect_chains(domain: str) -> list[Detection]:
     """Follow redirect chains on portal subdomains to detect vendor hosting."""
     detections = []
     session = requests.Session()
-    session.headers["User-Agent"] = (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
+    session.headers["User-Agent"] = USER_AGENT
 
     for sub in PORTAL_SUBDOMAINS:
         for scheme in ["https", "http"]:
             url = f"{scheme}://{sub}.{domain}"
             try:
                 resp = session.get(url, timeout=10, allow_redirects=True)
-                final_url = resp.url
                 # Check all URLs in the redirect chain
-                chain_urls = [r.url for r in resp.history] + [final_url]
-
-                for chain_url in chain_urls:
-                    for fp in VENDOR_FINGERPRINTS:
-                        for pattern in fp.redirect_patterns:
-                            if re.search(pattern, chain_url, re.IGNORECASE):
-                                detections.append(Detection(
-                                    vendor=fp.name,
-                                    category=fp.category,
-                                    confidence="high",
-                                    method="redirect",
-                                    evidence=f"{url} -> {final_url}",
-                                ))
+                chain_urls = [r.url for r in resp.history] + [resp.url]
+                detections.extend(_match_redirect_chain(url, chain_urls))
                 break  # https worked, skip http
             except (requests.RequestException, ConnectionError):
                 continue
@@ -521,54 +675,186 @@ def check_redirect_chains(domain: str) -> list[Detection]:
 # Layer 3: HTML content scanning
 # ---------------------------------------------------------------------------
 
+# Common apply paths checked on the main domain
+APPLY_PATHS = [
+    "/apply", "/borrower", "/start-application", "/get-started",
+    "/apply-now", "/mortgage-application", "/home-loans",
+    "/start-your-loan", "/prequalify", "/get-prequalified",
+]
+
+# Only the first 200K characters of a page are scanned
+HTML_CHAR_CAP = 200_000
+# Decompressed bytes read per page, whatever they decode to
+HTML_BYTE_CAP = 1_000_000
+HTML_CHUNK_SIZE = 16 * 1024
+
+# Bodies are decompressed by HtmlStream, so only advertise what it handles
+ACCEPT_ENCODING = "gzip, deflate"
+# Bodies of other types (images, PDFs, JSON) are never downloaded
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+def _html_urls(domain: str) -> list[str]:
+    """Pages scanned by the HTML layer, in priority order."""
+    urls = [f"https://{domain}"]
+    urls.extend(f"https://{sub}.{domain}" for sub in PORTAL_SUBDOMAINS)
+    urls.extend(f"https://{domain}{path}" for path in APPLY_PATHS)
+    return urls
+
+
+def parse_content_type(header: str) -> tuple[str, Optional[str]]:
+    """(mime type, charset) from a Content-Type header; both lowercased."""
+    mime, _, params = (header or "").partition(";")
+    charset = None
+    for param in params.split(";"):
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset" and value.strip():
+            charset = value.strip().strip("\"'").lower()
+    return mime.strip().lower(), charset
+
+
+def is_html_content_type(header: str) -> bool:
+    """True for HTML-ish or missing Content-Type (many portals omit it)."""
+    mime, _ = parse_content_type(header)
+    return not mime or mime in HTML_CONTENT_TYPES
+
+
+class HtmlStream:
+    """Incremental page reader: decompress, decode and anchor-scan chunk by chunk.
+
+    ``feed`` returns True once reading should stop: the character or byte
+    cap was reached, or ``stop(scan)`` says the text so far is enough. The
+    check runs only when a chunk brings in a new fingerprint anchor, so it
+    costs nothing on pages with no vendor mentions.
+
+    Args:
+        content_encoding: Content-Encoding header ("", identity, gzip, deflate).
+        charset: Declared charset; utf-8 when missing or unknown.
+        stop: Optional early-termination predicate over the scan so far.
+    """
+
+    def __init__(
+        self,
+        content_encoding: str = "",
+        charset: Optional[str] = None,
+        stop: Optional[Callable[[PageScan], bool]] = None,
+    ):
+        encoding = (content_encoding or "identity").strip().lower()
+        if encoding in ("gzip", "x-gzip", "deflate"):
+            # 32 + MAX_WBITS auto-detects zlib and gzip headers
+            self._inflate = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        elif encoding == "identity":
+            self._inflate = None
+        else:
+            raise ValueError(f"unsupported Content-Encoding: {encoding}")
+        self._raw_deflate = encoding == "deflate"
+        try:
+            self._decoder = codecs.getincrementaldecoder(charset or "utf-8")(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.scan: StreamScan = FINGERPRINT_MATCHER.stream()
+        self.stop = stop
+        self.bytes_in = 0   # as received (compressed)
+        self.bytes_out = 0  # after decompression
+        self.done = False
+        self.stopped_early = False
+
+    @property
+    def text(self) -> str:
+        return self.scan.text
+
+    def _inflate_chunk(self, chunk: bytes, budget: int) -> bytes:
+        if self._inflate is None:
+            return chunk[:budget]
+        try:
+            return self._inflate.decompress(chunk, budget)
+        except zlib.error:
+            if not (self._raw_deflate and self.bytes_out == 0):
+                raise
+            # Some servers send raw deflate without the zlib header
+            self._inflate = zlib.decompressobj(-zlib.MAX_WBITS)
+            self._raw_deflate = False
+            return self._inflate.decompress(chunk, budget)
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume one received chunk; True when no more should be read."""
+        if self.done:
+            return True
+        self.bytes_in += len(chunk)
+        data = self._inflate_chunk(chunk, HTML_BYTE_CAP - self.bytes_out)
+        self.bytes_out += len(data)
+        text = self._decoder.decode(data, final=self.bytes_out >= HTML_BYTE_CAP)
+        text = text[:HTML_CHAR_CAP - len(self.scan.text)]
+        new_anchors = self.scan.feed(text)
+        if self.bytes_out >= HTML_BYTE_CAP or len(self.scan.text) >= HTML_CHAR_CAP:
+            self.done = True
+        elif new_anchors and self.stop is not None and self.stop(self.scan):
+            self.done = self.stopped_early = True
+        return self.done
+
+    def close(self) -> PageScan:
+        """Flush the decoder at end of body and return the final scan."""
+        if not self.done:
+            tail = self._decoder.decode(b"", final=True)
+            self.scan.feed(tail[:HTML_CHAR_CAP - len(self.scan.text)])
+            self.done = True
+        return self.scan
+
+
+def _match_html_page(
+    html: str,
+    url: str,
+    seen_vendors: set[str],
+    scan: Optional[PageScan] = None,
+) -> list[Detection]:
+    """Match one page against HTML fingerprints, skipping vendors already seen.
+
+    Adds each matched vendor to seen_vendors, so pages must be passed in
+    the same order as ``_html_urls`` for results to be deterministic.
+    Pass ``scan`` when the page was already scanned while streaming.
+    """
+    detections = []
+    scan = scan or FINGERPRINT_MATCHER.scan(html)
+    for vendor, hit in scan.first_hits("html", skip_vendors=seen_vendors).items():
+        # HTML matches are lower confidence — vendor name
+        # in marketing copy doesn't mean they use it
+        confidence = "medium"
+        # But specific script/iframe patterns are higher
+        if any(kw in hit.pattern for kw in ["src=", "iframe", r"\.", "sdk"]):
+            confidence = "high"
+        detections.append(Detection(
+            vendor=vendor,
+            category=_VENDOR_CATEGORY[vendor],
+            confidence=confidence,
+            method="html",
+            evidence=f"Pattern '{hit.pattern}' matched in {url}",
+        ))
+        seen_vendors.add(vendor)
+    return detections
+
+
 def check_html_content(domain: str) -> list[Detection]:
     """Scan main site and portal pages for vendor-specific patterns."""
     detections = []
     session = requests.Session()
-    session.headers["User-Agent"] = (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
-
-    urls_to_check = [f"https://{domain}"]
-    for sub in PORTAL_SUBDOMAINS:
-        urls_to_check.append(f"https://{sub}.{domain}")
-    # Also check common apply paths on the main domain
-    for path in ["/apply", "/borrower", "/start-application", "/get-started",
-                  "/apply-now", "/mortgage-application", "/home-loans",
-                  "/start-your-loan", "/prequalify", "/get-prequalified"]:
-        urls_to_check.append(f"https://{domain}{path}")
+    session.headers["User-Agent"] = USER_AGENT
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
 
     seen_vendors = set()
-    for url in urls_to_check:
+    for url in _html_urls(domain):
         try:
-            resp = session.get(url, timeout=10, allow_redirects=True)
-            if resp.status_code != 200:
-                continue
-            html = resp.text[:200_000]  # Cap to avoid huge pages
-
-            for fp in VENDOR_FINGERPRINTS:
-                if fp.name in seen_vendors:
+            with session.get(url, timeout=10, allow_redirects=True, stream=True) as resp:
+                content_type = resp.headers.get("Content-Type", "")
+                if resp.status_code != 200 or not is_html_content_type(content_type):
                     continue
-                for pattern in fp.html_patterns:
-                    match = re.search(pattern, html, re.IGNORECASE)
-                    if match:
-                        # HTML matches are lower confidence — vendor name
-                        # in marketing copy doesn't mean they use it
-                        confidence = "medium"
-                        # But specific script/iframe patterns are higher
-                        if any(kw in pattern for kw in ["src=", "iframe", r"\.", "sdk"]):
-                            confidence = "high"
-                        detections.append(Detection(
-                            vendor=fp.name,
-                            category=fp.category,
-                            confidence=confidence,
-                            method="html",
-                            evidence=f"Pattern '{pattern}' matched in {url}",
-                        ))
-                        seen_vendors.add(fp.name)
+                # Stream raw bytes so the caps bound the transfer, not just the scan
+                stream = HtmlStream(resp.headers.get("Content-Encoding", ""), parse_content_type(content_type)[1])
+                for chunk in resp.raw.stream(HTML_CHUNK_SIZE, decode_content=False):
+                    if stream.feed(chunk):
                         break
-        except (requests.RequestException, ConnectionError):
+                scan = stream.close()
+            detections.extend(_match_html_page(scan.text, url, seen_vendors, scan=scan))
+        except (requests.RequestException, urllib3.exceptions.HTTPError, ConnectionError, ValueError, zlib.error):
             continue
     return detections
 
@@ -577,6 +863,31 @@ def check_html_content(domain: str) -> list[Detection]:
 # Layer 4: SSL certificate inspection
 # ---------------------------------------------------------------------------
 
+def _cert_names(cert: dict) -> list[str]:
+    """Certificate CN followed by its DNS SAN entries."""
+    subject = dict(x[0] for x in cert.get("subject", ()))
+    names = [subject.get("commonName", "")]
+    for entry_type, entry_value in cert.get("subjectAltName", ()):
+        if entry_type == "DNS":
+            names.append(entry_value)
+    return names
+
+
+def _match_cert_names(hostname: str, names: list[str]) -> list[Detection]:
+    """Match certificate CN/SAN names against vendor SSL fingerprints."""
+    detections = []
+    for name in names:
+        for vendor, _ in HOST_INDEX.match(name, "ssl"):
+            detections.append(Detection(
+                vendor=vendor,
+                category=_VENDOR_CATEGORY[vendor],
+                confidence="high",
+                method="ssl",
+                evidence=f"{hostname} cert CN/SAN includes '{name}'",
+            ))
+    return detections
+
+
 def check_ssl_certs(domain: str) -> list[Detection]:
     """Check SSL certificate CN on portal subdomains for vendor domains."""
     detections = []
@@ -588,26 +899,7 @@ def check_ssl_certs(domain: str) -> list[Detection]:
                 s.settimeout(5)
                 s.connect((hostname, 443))
                 cert = s.getpeercert()
-                subject = dict(x[0] for x in cert.get("subject", ()))
-                cn = subject.get("commonName", "")
-                # Also check SAN
-                san_list = []
-                for entry_type, entry_value in cert.get("subjectAltName", ()):
-                    if entry_type == "DNS":
-                        san_list.append(entry_value)
-
-                all_names = [cn] + san_list
-                for name in all_names:
-                    for fp in VENDOR_FINGERPRINTS:
-                        for pattern in fp.ssl_patterns:
-                            if re.search(pattern, name, re.IGNORECASE):
-                                detections.append(Detection(
-                                    vendor=fp.name,
-                                    category=fp.category,
-                                    confidence="high",
-                                    method="ssl",
-                                    evidence=f"{hostname} cert CN/SAN includes '{name}'",
-                                ))
+                detections.extend(_match_cert_names(hostname, _cert_names(cert)))
         except (socket.timeout, socket.gaierror, ssl.SSLError,
                 ConnectionRefusedError, OSError):
             continue
@@ -618,27 +910,25 @@ def check_ssl_certs(domain: str) -> list[Detection]:
 # Layer 5: Firecrawl rawHtml scrape + regex detection (no LLM)
 # ---------------------------------------------------------------------------
 
-# Build a vendor→category lookup from fingerprints
-_VENDOR_CATEGORY: dict[str, str] = {fp.name: fp.category for fp in VENDOR_FINGERPRINTS}
-
-
 def _match_raw_html(html: str, url: str) -> list[Detection]:
     """Match vendor fingerprints against raw HTML content.
 
     Scans script src, link href, iframe src, copyright comments, config
     blobs, and inline scripts for vendor-specific patterns. Filters out
-    known false positives (CSS blend-mode, URL path coincidences, etc.).
+    known false positives (CSS blend-mode, URL path coincidences, etc.),
+    checking each occurrence rather than only the first.
     """
     detections: list[Detection] = []
     seen_vendors: set[str] = set()
+    scan = FINGERPRINT_MATCHER.scan(html)
 
     # --- Pass 1: script src / link href / iframe src attributes ---
+    candidates = scan.candidates("script_src")
     attr_matches = re.findall(
         r'(?:src|href)\s*=\s*["\']([^"\']+)["\']', html, re.IGNORECASE
-    )
-    for vendor, patterns in SCRIPT_SRC_FINGERPRINTS.items():
-        if vendor in seen_vendors:
-            continue
+    ) if candidates else []
+    for vendor in candidates:
+        patterns = SCRIPT_SRC_FINGERPRINTS[vendor]
         for attr_val in attr_matches:
             for pattern in patterns:
                 if re.search(pattern, attr_val, re.IGNORECASE):
@@ -656,43 +946,22 @@ def _match_raw_html(html: str, url: str) -> list[Detection]:
             if vendor in seen_vendors:
                 break
 
-    # --- Pass 2: copyright / legal text in HTML comments and body ---
-    for vendor, patterns in COPYRIGHT_PATTERNS.items():
-        if vendor in seen_vendors:
-            continue
-        for pattern in patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                context = html[max(0, match.start() - 30):match.end() + 30]
-                if not _is_false_positive(vendor, context):
-                    detections.append(Detection(
-                        vendor=vendor,
-                        category=_VENDOR_CATEGORY.get(vendor, "pos"),
-                        confidence="high",
-                        method="firecrawl_html",
-                        evidence=f"[rawHtml] Copyright/legal: '{match.group()}' on {url}",
-                    ))
-                    seen_vendors.add(vendor)
-                    break
-
-    # --- Pass 3: config / inline-script patterns ---
-    for vendor, patterns in CONFIG_PATTERNS.items():
-        if vendor in seen_vendors:
-            continue
-        for pattern in patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                context = html[max(0, match.start() - 30):match.end() + 30]
-                if not _is_false_positive(vendor, context):
-                    detections.append(Detection(
-                        vendor=vendor,
-                        category=_VENDOR_CATEGORY.get(vendor, "pos"),
-                        confidence="high",
-                        method="firecrawl_html",
-                        evidence=f"[rawHtml] Config pattern: '{match.group()}' on {url}",
-                    ))
-                    seen_vendors.add(vendor)
-                    break
+    # --- Pass 2: copyright / legal text, then Pass 3: config / inline-script ---
+    for source, label in [("copyright", "Copyright/legal"), ("config", "Config pattern")]:
+        hits = scan.first_hits(
+            source,
+            skip_vendors=seen_vendors,
+            accept=lambda hit: not _is_false_positive(hit.vendor, scan.context(hit)),
+        )
+        for vendor, hit in hits.items():
+            detections.append(Detection(
+                vendor=vendor,
+                category=_VENDOR_CATEGORY.get(vendor, "pos"),
+                confidence="high",
+                method="firecrawl_html",
+                evidence=f"[rawHtml] {label}: '{hit.text}' on {url}",
+            ))
+            seen_vendors.add(vendor)
 
     return detections
 
@@ -702,173 +971,95 @@ def _match_links(links: list[str], domain: str) -> list[Detection]:
     detections: list[Detection] = []
     seen_vendors: set[str] = set()
     for link in links:
-        for fp in VENDOR_FINGERPRINTS:
-            if fp.name in seen_vendors:
+        # Skip links that are on the lender's own domain
+        if domain in link:
+            continue
+        for vendor, _ in HOST_INDEX.match(link, "redirect"):
+            if vendor in seen_vendors or _is_false_positive(vendor, link):
                 continue
-            for pattern in fp.redirect_patterns:
-                if re.search(pattern, link, re.IGNORECASE):
-                    # Skip links that are on the lender's own domain
-                    if domain in link:
-                        continue
-                    if not _is_false_positive(fp.name, link):
-                        detections.append(Detection(
-                            vendor=fp.name,
-                            category=fp.category,
-                            confidence="medium",
-                            method="firecrawl_link",
-                            evidence=f"[Links] Vendor URL '{link}' found on {domain}",
-                        ))
-                        seen_vendors.add(fp.name)
-                        break
+            detections.append(Detection(
+                vendor=vendor,
+                category=_VENDOR_CATEGORY[vendor],
+                confidence="medium",
+                method="firecrawl_link",
+                evidence=f"[Links] Vendor URL '{link}' found on {domain}",
+            ))
+            seen_vendors.add(vendor)
     return detections
 
 
-def _search_fallback(domain: str, company_name: str | None = None) -> list[Detection]:
-    """Web search fallback for white-labeled portals invisible to HTML scanning."""
-    from outreach_intel.firecrawl_client import FirecrawlClient
-
-    client = FirecrawlClient()
-    if not client.available:
-        return []
-
+def _search_query(domain: str, company_name: str | None = None) -> str:
     name = company_name or domain.split(".")[0].replace("-", " ").title()
-    query = f'"{name}" mortgage "loan origination system" OR "POS" OR "point of sale" vendor technology'
-    results = client.search(query, limit=5)
+    return f'"{name}" mortgage "loan origination system" OR "POS" OR "point of sale" vendor technology'
+
 
+def _match_search_results(results: list["SearchResult"]) -> list[Detection]:
+    """Match vendor usage statements in web-search results."""
     detections: list[Detection] = []
     seen_vendors: set[str] = set()
     for result in results:
         text = f"{result.title} {result.description} {result.markdown[:3000]}"
-        for fp in VENDOR_FINGERPRINTS:
-            if fp.name in seen_vendors:
-                continue
-            # Look for strong signals: "[lender] uses [vendor]", "[lender] partners with [vendor]"
-            usage_patterns = [
-                rf"(?:uses?|using|powered by|built on|deployed|implemented|selected|chose|partners? with)\s+{re.escape(fp.name)}",
-                rf"{re.escape(fp.name)}\s+(?:customer|client|partner|user|deployment|implementation)",
-            ]
-            for pattern in usage_patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    detections.append(Detection(
-                        vendor=fp.name,
-                        category=fp.category,
-                        confidence="medium",
-                        method="firecrawl_search",
-                        evidence=f"[Search] '{result.title}' ({result.url})",
-                    ))
-                    seen_vendors.add(fp.name)
-                    break
+        # Look for strong signals: "[lender] uses [vendor]", "[lender] partners with [vendor]"
+        hits = FINGERPRINT_MATCHER.scan(text).first_hits("usage", skip_vendors=seen_vendors)
+        for vendor in hits:
+            detections.append(Detection(
+                vendor=vendor,
+                category=_VENDOR_CATEGORY[vendor],
+                confidence="medium",
+                method="firecrawl_search",
+                evidence=f"[Search] '{result.title}' ({result.url})",
+            ))
+            seen_vendors.add(vendor)
     return detections
 
 
-def detect_firecrawl(domain: str) -> list[Detection]:
-    """Detect POS/LOS vendors via Firecrawl: map → rawHtml scrape → search fallback.
-
-    Three-step pipeline that replaces the old LLM-based approach:
-      1. Map the domain to discover portal/apply URLs
-      2. Scrape apply URLs with rawHtml and regex-match vendor fingerprints
-      3. Fall back to web search for white-labeled portals
-    """
+def _search_fallback(domain: str, company_name: str | None = None) -> list[Detection]:
+    """Web search fallback for white-labeled portals invisible to HTML scanning."""
     from outreach_intel.firecrawl_client import FirecrawlClient
 
     client = FirecrawlClient()
     if not client.available:
-        logger.warning("No FIRECRAWL_API_KEY set — skipping Firecrawl layer")
         return []
+    return _match_search_results(client.search(_search_query(domain, company_name), limit=5))
 
-    all_detections: list[Detection] = []
-
-    # --- Step 1: Discover portal URLs via map ---
-    portal_urls: list[str] = []
-    try:
-        map_result = client.map(
-            f"https://{domain}",
-            search="apply portal borrower login mortgage application",
-            limit=20,
-        )
-        for url in map_result.urls:
-            lower = url.lower()
-            if any(kw in lower for kw in ["apply", "portal", "borrower", "login", "app", "mortgage"]):
-                portal_urls.append(url)
-    except Exception as e:
-        logger.warning(f"Firecrawl map failed for {domain}: {e}")
-
-    # Also try well-known subdomains (may not appear in sitemap)
-    for sub in PORTAL_SUBDOMAINS[:5]:
-        candidate = f"https://{sub}.{domain}"
-        if candidate not in portal_urls:
-            portal_urls.append(candidate)
-
-    # Always include homepage
-    homepage = f"https://{domain}"
-    if homepage not in portal_urls:
-        portal_urls.insert(0, homepage)
-
-    # --- Step 2: rawHtml scrape + regex matching ---
-    pages_scraped = 0
-    max_pages = 4  # homepage + up to 3 portal pages
-
-    for url in portal_urls:
-        if pages_scraped >= max_pages:
-            break
-
-        result = client.scrape(
-            url,
-            formats=["rawHtml", "links"],
-            only_main_content=False,
-            timeout=20,
-            wait_for=5000,
-        )
-
-        if result.error:
-            logger.debug(f"Firecrawl scrape failed for {url}: {result.error}")
-            continue
-
-        pages_scraped += 1
 
-        # Match vendor fingerprints in rawHtml
-        if result.raw_html:
-            html_detections = _match_raw_html(result.raw_html, url)
-            all_detections.extend(html_detections)
-
-        # Match vendor domains in links
-        if result.links:
-            link_detections = _match_links(result.links, domain)
-            all_detections.extend(link_detections)
+def detect_firecrawl(
+    domain: str,
+    capture: Optional["Capture"] = None,
+    layer: Optional["FirecrawlLayer"] = None,
+) -> list[Detection]:
+    """Detect POS/LOS vendors via Firecrawl: map → rawHtml scrape → search fallback.
 
-        # Early exit if we already found vendors
-        if all_detections:
-            logger.info(f"Firecrawl found {len(all_detections)} vendor(s) for {domain} after {pages_scraped} page(s)")
-            return all_detections
+    Three-step pipeline that replaces the old LLM-based approach:
+      1. Map the domain to discover portal/apply URLs
+      2. Scrape apply URLs with rawHtml and regex-match vendor fingerprints
+         (concurrently, stopping at the first page with a vendor)
+      3. Fall back to web search for white-labeled portals
 
-    # --- Step 3: Web search fallback ---
-    if not all_detections:
-        logger.info(f"No vendors found in HTML for {domain}, trying web search fallback")
-        search_detections = _search_fallback(domain)
-        all_detections.extend(search_detections)
+    Pass a shared ``layer`` (see ``pos_los_firecrawl``) to put a batch under
+    one credit budget, rate limit and map/search cache; without one, the
+    call gets its own unlimited layer. Scraped rawHtml and links are added
+    to ``capture`` when given, so they can be re-matched offline (see
+    ``pos_los_corpus``).
+    """
+    if layer is not None:
+        return layer.detect(domain, capture)
 
-    if all_detections:
-        logger.info(f"Firecrawl detected {len(all_detections)} vendor(s) for {domain}")
-    else:
-        logger.info(f"Firecrawl found no vendors for {domain}")
+    from outreach_intel.pos_los_firecrawl import FirecrawlLayer
 
-    return all_detections
+    layer = FirecrawlLayer()
+    try:
+        return layer.detect(domain, capture)
+    finally:
+        layer.close()
 
 
 # ---------------------------------------------------------------------------
 # Orchestrator
 # ---------------------------------------------------------------------------
 
-def detect_tech_stack(domain: str, use_browser: bool = False) -> DomainResult:
-    """Run all detection layers against a single domain.
-
-    Args:
-        domain: The lender's root domain (e.g., "flagstar.com")
-        use_browser: Ignored (kept for backward compatibility).
-
-    Returns:
-        DomainResult with all detections, deduplicated by vendor.
-    """
+def normalize_domain(domain: str) -> str:
+    """Lowercase a domain or URL and strip protocol, path and www."""
     domain = domain.strip().lower()
     # Strip protocol if provided
     if "://" in domain:
@@ -876,33 +1067,28 @@ def detect_tech_stack(domain: str, use_browser: bool = False) -> DomainResult:
     # Strip www
     if domain.startswith("www."):
         domain = domain[4:]
-
-    result = DomainResult(domain=domain)
-    all_detections: list[Detection] = []
-
-    # Run layers in order: fast/free first, then Firecrawl rawHtml + search
-    layers = [
-        ("dns", check_dns_cnames),
-        ("redirect", check_redirect_chains),
-        ("html", check_html_content),
-        ("ssl", check_ssl_certs),
-        ("firecrawl", detect_firecrawl),
-    ]
-
-    for layer_name, layer_fn in layers:
-        try:
-            detections = layer_fn(domain)
-            all_detections.extend(detections)
-        except Exception as e:
-            result.errors.append(f"{layer_name}: {e}")
-            logger.warning(f"Layer {layer_name} failed for {domain}: {e}")
+    return domain
+
+
+def _build_result(
+    domain: str,
+    all_detections: list[Detection],
+    errors: list[str],
+    layers: Optional[dict[str, str]] = None,
+) -> DomainResult:
+    """Deduplicate detections (highest confidence per vendor) into a DomainResult."""
+    result = DomainResult(
+        domain=domain,
+        errors=list(errors),
+        layers=dict(layers or {}),
+        fingerprint_version=FINGERPRINT_VERSION,
+    )
 
     # Deduplicate: keep highest confidence per vendor
     best_by_vendor: dict[str, Detection] = {}
-    confidence_rank = {"high": 3, "medium": 2, "low": 1}
     for det in all_detections:
         existing = best_by_vendor.get(det.vendor)
-        if not existing or confidence_rank.get(det.confidence, 0) > confidence_rank.get(existing.confidence, 0):
+        if not existing or CONFIDENCE_RANK.get(det.confidence, 0) > CONFIDENCE_RANK.get(existing.confidence, 0):
             best_by_vendor[det.vendor] = det
 
     result.detections = list(best_by_vendor.values())
@@ -920,25 +1106,230 @@ def detect_tech_stack(domain: str, use_browser: bool = False) -> DomainResult:
     return result
 
 
+def detect_tech_stack(
+    domain: str,
+    use_browser: bool = False,
+    policy: Optional[DetectionPolicy] = None,
+) -> DomainResult:
+    """Run the detection layers against a single domain.
+
+    The free layers run concurrently on the async engine and are cancelled
+    as soon as ``policy`` is satisfied; Firecrawl runs afterwards only if
+    the policy asks for it. Inside a running event loop (where the engine
+    can't be started synchronously) the layers run sequentially instead,
+    under the same policy.
+
+    Args:
+        domain: The lender's root domain (e.g., "flagstar.com")
+        use_browser: Ignored (kept for backward compatibility).
+        policy: Early-exit policy (defaults to DEFAULT_POLICY).
+
+    Returns:
+        DomainResult with all detections, deduplicated by vendor.
+    """
+    import asyncio
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        from outreach_intel.pos_los_engine import detect_one
+
+        return asyncio.run(detect_one(domain, policy=policy))
+    return detect_tech_stack_sequential(domain, policy=policy)
+
+
+def detect_tech_stack_sequential(
+    domain: str,
+    policy: Optional[DetectionPolicy] = None,
+    firecrawl: Optional["FirecrawlLayer"] = None,
+) -> DomainResult:
+    """Blocking reference implementation: one layer after another."""
+    policy = policy or DEFAULT_POLICY
+    domain = normalize_domain(domain)
+    all_detections: list[Detection] = []
+    errors: list[str] = []
+    layer_times: dict[str, str] = {}
+    runs = []
+
+    # Run layers in order: fast/free first, then Firecrawl rawHtml + search
+    layer_fns = {
+        "dns": check_dns_cnames,
+        "redirect": check_redirect_chains,
+        "html": check_html_content,
+        "ssl": check_ssl_certs,
+        "firecrawl": lambda d: detect_firecrawl(d, layer=firecrawl),
+    }
+
+    def run_layer(layer_name: str) -> None:
+        started = time.perf_counter()
+        detections, status = [], "ok"
+        try:
+            detections = layer_fns[layer_name](domain)
+            all_detections.extend(detections)
+        except Exception as e:
+            status = "error"
+            errors.append(f"{layer_name}: {e}")
+            logger.warning(f"Layer {layer_name} failed for {domain}: {e}")
+        layer_times[layer_name] = layer_timestamp()
+        runs.append(layer_run(layer_name, detections, time.perf_counter() - started, status=status))
+
+    for layer_name in policy.free_layers():
+        run_layer(layer_name)
+        if policy.satisfied(all_detections):
+            break
+
+    if policy.run_firecrawl(all_detections):
+        run_layer("firecrawl")
+
+    result = _build_result(domain, all_detections, errors, layer_times)
+    result.telemetry = finalize_runs(runs)
+    return result
+
+
 def detect_batch(
     domains: list[str],
-    max_workers: int = 5,
+    max_workers: Optional[int] = None,
     progress_callback: Optional[callable] = None,
+    engine: str = "async",
+    max_in_flight: Optional[int] = None,
+    policy: Optional[DetectionPolicy] = None,
+    store: Optional["ResultStore"] = None,
+    rescan: Optional["RescanPolicy"] = None,
+    corpus: Optional["Corpus"] = None,
+    jsonl_path: Optional[Path] = None,
+    firecrawl: Optional["FirecrawlLayer"] = None,
 ) -> list[DomainResult]:
     """Run detection across multiple domains in parallel.
 
+    The default "async" engine (see ``pos_los_engine``) drives DNS, HTTP
+    and TLS probes for many domains from one event loop, so the number of
+    probes in flight is bounded by a global budget rather than by thread
+    count. The "thread" engine runs ``detect_tech_stack_sequential`` in a
+    thread pool.
+    Both produce the same DomainResult shape. Call ``detect_batch_async``
+    instead when already inside an event loop.
+
     Args:
         domains: List of root domains to scan.
-        max_workers: Concurrency limit.
+        max_workers: Domains scanned at once (default 5 threads, or 50
+            domains for the async engine).
         progress_callback: Optional fn(completed, total, domain, result) called per domain.
+        engine: "async" or "thread".
+        max_in_flight: Async engine only — global cap on concurrent probes.
+        policy: Early-exit policy (defaults to DEFAULT_POLICY).
+        store: Optional ResultStore (see ``pos_los_store``). Domains still
+            fresh under ``rescan`` are served from it instead of scanned,
+            and every new result is written to it as it completes.
+        rescan: Freshness policy for ``store`` (defaults to its TTLs).
+        corpus: Async engine only — archive what each scan observed (see
+            ``pos_los_corpus``) so it can be re-matched offline.
+        jsonl_path: Checkpoint file. Each result is appended as one JSON
+            line as soon as its domain completes, and domains already in
+            the file are skipped, so a crashed run resumes where it stopped.
+        firecrawl: Firecrawl layer shared by every domain (see
+            ``pos_los_firecrawl``), carrying the batch's credit budget, rate
+            limit and map/search cache. Defaults to one with no budget.
 
     Returns:
-        List of DomainResult objects.
+        List of DomainResult objects (stored or checkpointed ones first).
     """
+    if jsonl_path is not None:
+        sink, done = _open_checkpoint(jsonl_path)
+        completed = {normalize_domain(r.domain) for r in done}
+        todo = list(dict.fromkeys(d for d in map(normalize_domain, domains) if d not in completed))
+        logger.info(f"Checkpoint {jsonl_path}: {len(completed)} done, {len(todo)} to scan")
+
+        def on_done(completed_count, total, domain, result):
+            sink.write(json.dumps(result.to_dict()) + "\n")
+            sink.flush()
+            if progress_callback:
+                progress_callback(completed_count, total, domain, result)
+
+        try:
+            scanned = detect_batch(
+                todo,
+                max_workers=max_workers,
+                progress_callback=on_done,
+                engine=engine,
+                max_in_flight=max_in_flight,
+                policy=policy,
+                store=store,
+                rescan=rescan,
+                corpus=corpus,
+                firecrawl=firecrawl,
+            )
+        finally:
+            sink.close()
+        return done + scanned
+
+    if store is not None:
+        fresh, stale = store.partition(domains, rescan)
+        logger.info(f"Result store: {len(fresh)} fresh, {len(stale)} to scan")
+
+        # Stored results are reported like scanned ones, so a JSONL
+        # checkpoint or telemetry callback sees every domain in the batch
+        total = len(fresh) + len(stale)
+        if progress_callback:
+            for i, (domain, rec) in enumerate(fresh.items(), 1):
+                progress_callback(i, total, domain, rec.result)
+
+        def on_result(completed, _total, domain, result):
+            store.put(result)
+            if progress_callback:
+                progress_callback(len(fresh) + completed, total, domain, result)
+
+        scanned = detect_batch(
+            stale,
+            max_workers=max_workers,
+            progress_callback=on_result,
+            engine=engine,
+            max_in_flight=max_in_flight,
+            policy=policy,
+            corpus=corpus,
+            firecrawl=firecrawl,
+        )
+        return [rec.result for rec in fresh.values()] + scanned
+
+    if engine not in ("async", "thread"):
+        raise ValueError(f"Unknown engine '{engine}' (expected 'async' or 'thread')")
+    if engine == "thread" and corpus is not None:
+        raise ValueError("Archiving to a corpus requires the async engine")
+    if firecrawl is None:
+        from outreach_intel.pos_los_firecrawl import FirecrawlLayer
+
+        firecrawl = FirecrawlLayer()
+        try:
+            return detect_batch(
+                domains,
+                max_workers=max_workers,
+                progress_callback=progress_callback,
+                engine=engine,
+                max_in_flight=max_in_flight,
+                policy=policy,
+                corpus=corpus,
+                firecrawl=firecrawl,
+            )
+        finally:
+            firecrawl.close()
+
+    if engine == "async":
+        import asyncio
+        from outreach_intel.pos_los_engine import detect_batch_async
+
+        return asyncio.run(detect_batch_async(
+            domains,
+            max_domains=max_workers,
+            progress_callback=progress_callback,
+            max_in_flight=max_in_flight,
+            policy=policy,
+            corpus=corpus,
+            firecrawl=firecrawl,
+        ))
+
     results = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    with ThreadPoolExecutor(max_workers=max_workers or 5) as executor:
         future_to_domain = {
-            executor.submit(detect_tech_stack, d): d for d in domains
+            executor.submit(detect_tech_stack_sequential, d, policy, firecrawl): d for d in domains
         }
         for i, future in enumerate(as_completed(future_to_domain)):
             domain = future_to_domain[future]
@@ -967,6 +1358,73 @@ def results_to_csv(results: list[DomainResult]) -> str:
     return output.getvalue()
 
 
+# ---------------------------------------------------------------------------
+# Streaming JSONL output, checkpoints and shards
+# ---------------------------------------------------------------------------
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse "i/n" (1-based, e.g. "2/4") into (i, n)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}' (expected i/n, e.g. 2/4)")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}' (need 1 <= i <= n)")
+    return index, count
+
+
+def shard_of(domain: str, count: int) -> int:
+    """1-based shard of a domain; stable across runs, machines and list order."""
+    digest = hashlib.sha1(normalize_domain(domain).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def select_shard(domains: list[str], index: int, count: int) -> list[str]:
+    """The domains that belong to shard index of count."""
+    return [d for d in domains if shard_of(d, count) == index]
+
+
+def read_results_jsonl(path: Path) -> list[DomainResult]:
+    """Results from a JSONL file; a torn last line (crash mid-write) is ignored."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    results = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                results.append(DomainResult.from_dict(json.loads(line)))
+            except (ValueError, KeyError):
+                logger.warning(f"Skipping unreadable line in {path}")
+    return results
+
+
+def _open_checkpoint(path: Path) -> tuple[io.TextIOWrapper, list[DomainResult]]:
+    """Open a JSONL file for appending, returning the results already in it.
+
+    A torn last line is cut off so new lines start on a clean boundary.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+    return open(path, "a", encoding="utf-8"), read_results_jsonl(path)
+
+
+def merge_results(paths: list[Path]) -> list[DomainResult]:
+    """Combine JSONL outputs (e.g. one per shard); the last result per domain wins."""
+    merged: dict[str, DomainResult] = {}
+    for path in paths:
+        for result in read_results_jsonl(path):
+            merged[normalize_domain(result.domain)] = result
+    return list(merged.values())
+
+
 # ---------------------------------------------------------------------------
 # CLI entry point (also wired into outreach_intel/cli.py)
 # ---------------------------------------------------------------------------
@@ -979,9 +1437,42 @@ def main():
     parser.add_argument("domains", nargs="*", help="Domains to scan")
     parser.add_argument("--file", "-f", help="File with one domain per line")
     parser.add_argument("--output", "-o", choices=["json", "csv", "table"], default="table")
-    parser.add_argument("--workers", "-w", type=int, default=5, help="Parallel workers")
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="Domains scanned at once (default: 5 threads, 50 async)")
+    parser.add_argument("--engine", choices=["async", "thread"], default="async",
+                        help="Detection engine (default: async)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Async engine: max concurrent DNS/HTTP/TLS probes")
+    parser.add_argument("--min-confidence", choices=["high", "medium", "low"], default="high",
+                        help="Stop scanning a domain once POS and LOS reach this confidence")
+    parser.add_argument("--exhaustive", action="store_true",
+                        help="Run every layer (including Firecrawl) on every domain")
+    parser.add_argument("--store", action="store_true",
+                        help="Skip domains with fresh stored results and save new ones")
+    parser.add_argument("--store-path", help="Result store file (implies --store)")
+    parser.add_argument("--rescan-all", action="store_true",
+                        help="With --store: rescan every domain, ignoring freshness")
+    parser.add_argument("--archive", action="store_true",
+                        help="Archive observed pages for offline rematch (async engine)")
+    parser.add_argument("--jsonl", help="Append each result to this JSONL file as it completes; "
+                                        "rerunning with the same file skips finished domains")
+    parser.add_argument("--shard", help="Only scan shard i of n (e.g. 2/4), split by domain hash")
+    parser.add_argument("--merge", nargs="+", metavar="JSONL",
+                        help="Merge JSONL outputs (e.g. from shards) and print them; no scanning")
+    parser.add_argument("--telemetry", metavar="REPORT",
+                        help="Write per-layer timing/hit-rate telemetry for this batch as JSON")
+    parser.add_argument("--adaptive", metavar="REPORT",
+                        help="Reorder/skip layers using a previous telemetry report")
+    parser.add_argument("--firecrawl-credits", type=int, default=None,
+                        help="Firecrawl credit budget for the whole batch (default: unlimited)")
+    parser.add_argument("--firecrawl-rpm", type=int, default=None,
+                        help="Firecrawl requests per minute across the batch")
     args = parser.parse_args()
 
+    if args.merge:
+        _print_results(merge_results([Path(p) for p in args.merge]), args.output)
+        return
+
     domains = list(args.domains) if args.domains else []
     if args.file:
         with open(args.file) as f:
@@ -990,16 +1481,93 @@ def main():
     if not domains:
         parser.error("Provide domains as arguments or via --file")
 
+    if args.shard:
+        try:
+            index, count = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        domains = select_shard(domains, index, count)
+        print(f"Shard {index}/{count}: {len(domains)} domains")
+
+    from outreach_intel.pos_los_telemetry import BatchTelemetry, adaptive_layers, format_report
+
+    telemetry = BatchTelemetry()
+
     def on_progress(completed, total, domain, result):
+        telemetry.add(result)
         pos = ", ".join(result.pos_detected) or "none"
         los = ", ".join(result.los_detected) or "none"
         print(f"[{completed}/{total}] {domain}: POS={pos} LOS={los}")
 
-    results = detect_batch(domains, max_workers=args.workers, progress_callback=on_progress)
+    policy = EXHAUSTIVE_POLICY if args.exhaustive else DetectionPolicy(min_confidence=args.min_confidence)
+    if args.adaptive:
+        plan = adaptive_layers(Path(args.adaptive), FREE_LAYERS)
+        if plan is None:
+            print(f"No telemetry report at {args.adaptive} yet; running every layer")
+        else:
+            policy = replace(policy, layers=plan)
+            print(f"Adaptive layer plan: {' → '.join(plan)}")
+    store = rescan = None
+    if args.store or args.store_path:
+        from outreach_intel.pos_los_store import RESCAN_ALL, STORE_PATH, ResultStore
+
+        store = ResultStore(Path(args.store_path) if args.store_path else STORE_PATH)
+        rescan = RESCAN_ALL if args.rescan_all else None
+    corpus = None
+    if args.archive:
+        from outreach_intel.pos_los_corpus import Corpus
+
+        corpus = Corpus()
+        print("Archiving: every free layer runs and pages are read in full (early exit off)")
+    from outreach_intel.pos_los_firecrawl import RATE_PER_MINUTE, FirecrawlLayer, FirecrawlScheduler
+
+    firecrawl = FirecrawlLayer(scheduler=FirecrawlScheduler(
+        credit_budget=args.firecrawl_credits,
+        per_minute=args.firecrawl_rpm or RATE_PER_MINUTE,
+    ))
+    try:
+        results = detect_batch(
+            domains,
+            max_workers=args.workers,
+            progress_callback=on_progress,
+            engine=args.engine,
+            max_in_flight=args.max_in_flight,
+            policy=policy,
+            store=store,
+            rescan=rescan,
+            corpus=corpus,
+            jsonl_path=Path(args.jsonl) if args.jsonl else None,
+            firecrawl=firecrawl,
+        )
+    finally:
+        firecrawl.close()
+        if store is not None:
+            store.close()
+
+    spend = firecrawl.scheduler.stats()
+    if spend["requests"] or spend["denied"]:
+        budget = f"/{spend['credit_budget']}" if spend["credit_budget"] is not None else ""
+        print(f"\nFirecrawl: {spend['requests']} requests, {spend['credits_used']}{budget} credits"
+              + (f", {spend['denied']} denied by budget" if spend["denied"] else ""))
+
+    if args.telemetry:
+        report = telemetry.write(Path(args.telemetry))
+        print(f"\nLayer telemetry ({report['domains']} domains scanned) → {args.telemetry}")
+        print(format_report(report))
+
+    if args.jsonl:
+        # Everything is already on disk; --merge turns it into CSV/JSON
+        print(f"\n{len(results)} results in {args.jsonl}. "
+              f"{sum(1 for r in results if r.pos_detected or r.los_detected)} with detections.")
+        return
+    _print_results(results, args.output)
+
 
-    if args.output == "json":
+def _print_results(results: list[DomainResult], output: str) -> None:
+    """Print results as json, csv or a table."""
+    if output == "json":
         print(json.dumps([r.to_dict() for r in results], indent=2))
-    elif args.output == "csv":
+    elif output == "csv":
         print(results_to_csv(results))
     else:
         # Table output
@@ -0,0 +1,280 @@
+"""Caching DNS resolver for the POS/LOS detector.
+
+Every scan probes ~19 portal subdomains per lender, and most of them
+return NXDOMAIN. The old layer built a fresh resolver per domain, asked
+the network every time, and then still sent HTTP and TLS probes to names
+that did not exist. This resolver sits between the detector and the
+network:
+
+  - positive answers are cached for their record TTL
+  - NXDOMAIN/NODATA answers are cached for the zone's negative TTL (SOA
+    minimum, RFC 2308), falling back to NEGATIVE_TTL
+  - timeouts and SERVFAILs are cached briefly in memory only
+  - both caches are persisted to disk between runs
+  - concurrent identical queries share one lookup (single flight)
+
+``wildcard(apex)`` asks for a random label under the apex. If that
+resolves, the zone has wildcard DNS, and any portal subdomain whose answer
+matches the wildcard's answer is skipped rather than probed over HTTP/TLS.
+
+``AiohttpResolver`` plugs the same cache into aiohttp, so HTTP connections
+reuse the lookups the DNS layer already made.
+
+Usage:
+    resolver = CachingResolver()
+    resolver.load()
+    answer = await resolver.query("apply.lender.com", "CNAME")
+    resolver.save()
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import socket
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import aiohttp
+import aiohttp.abc
+import dns.asyncresolver
+import dns.exception
+import dns.rdatatype
+import dns.resolver
+
+logger = logging.getLogger(__name__)
+
+DNS_CACHE_PATH = Path(__file__).parent.parent / "exports" / "detector" / "dns_cache.json"
+
+DNS_TIMEOUT = 5
+# Clamp record TTLs so one odd zone can't pin or thrash the cache
+MIN_TTL = 60
+MAX_TTL = 7 * 86400
+# Negative TTL when the response carries no SOA
+NEGATIVE_TTL = 3600
+# Timeouts/SERVFAIL: retry soon, never persisted
+ERROR_TTL = 300
+
+_PERSISTED = ("ok", "nodata", "nxdomain")
+
+
+@dataclass
+class DnsAnswer:
+    """Cached outcome of one (name, type) query.
+
+    ``status`` is "ok" (records present), "nodata" (name exists, no
+    records of this type), "nxdomain" or "error".
+    """
+
+    status: str
+    records: list[str] = field(default_factory=list)
+    expires: float = 0.0
+
+    @property
+    def exists(self) -> bool:
+        """False only when the name definitely doesn't exist."""
+        return self.status != "nxdomain"
+
+
+def _negative_ttl(response) -> int:
+    """Negative-caching TTL from a response's SOA (min of SOA TTL and MINIMUM)."""
+    for rrset in getattr(response, "authority", None) or []:
+        if rrset.rdtype == dns.rdatatype.SOA:
+            return max(MIN_TTL, min(rrset.ttl, rrset[0].minimum, MAX_TTL))
+    return NEGATIVE_TTL
+
+
+def _records(answer: dns.resolver.Answer) -> list[str]:
+    if answer.rrset is None:
+        return []
+    if answer.rdtype == dns.rdatatype.CNAME:
+        return [str(rdata.target).rstrip(".") for rdata in answer.rrset]
+    return [rdata.to_text() for rdata in answer.rrset]
+
+
+class CachingResolver:
+    """Async resolver with TTL-respecting positive and negative caches."""
+
+    def __init__(
+        self,
+        cache_path: Optional[Path] = DNS_CACHE_PATH,
+        nameservers: Optional[list[str]] = None,
+        port: int = 53,
+        timeout: float = DNS_TIMEOUT,
+    ):
+        self.cache_path = cache_path
+        self._resolver = dns.asyncresolver.Resolver()
+        self._resolver.timeout = timeout
+        self._resolver.lifetime = timeout
+        if nameservers:
+            self._resolver.nameservers = nameservers
+            self._resolver.port = port
+        self._cache: dict[str, DnsAnswer] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ── Persistence ─────────────────────────────────────────────────
+
+    def load(self) -> int:
+        """Load unexpired entries from disk; returns how many were loaded."""
+        if not self.cache_path or not self.cache_path.exists():
+            return 0
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable DNS cache {self.cache_path}: {e}")
+            return 0
+        now = time.time()
+        loaded = 0
+        for key, (status, records, expires) in entries.items():
+            if expires > now and key not in self._cache:
+                self._cache[key] = DnsAnswer(status, records, expires)
+                loaded += 1
+        return loaded
+
+    def save(self) -> None:
+        """Write unexpired, persistable entries to disk (atomic replace)."""
+        if not self.cache_path:
+            return
+        now = time.time()
+        entries = {
+            key: [a.status, a.records, a.expires]
+            for key, a in self._cache.items()
+            if a.status in _PERSISTED and a.expires > now
+        }
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": entries}, f)
+        os.replace(tmp, self.cache_path)
+
+    # ── Queries ─────────────────────────────────────────────────────
+
+    async def query(self, name: str, rdtype: str = "CNAME") -> DnsAnswer:
+        """Answer for (name, rdtype), from cache when fresh."""
+        key = f"{name.lower().rstrip('.')}|{rdtype}"
+        cached = self._cache.get(key)
+        if cached is not None and cached.expires > time.time():
+            self.hits += 1
+            return cached
+        if key not in self._inflight:
+            self.misses += 1
+            self._inflight[key] = asyncio.ensure_future(self._lookup(key, name, rdtype))
+        return await asyncio.shield(self._inflight[key])
+
+    async def query_many(self, names: list[str], rdtype: str = "CNAME") -> list[DnsAnswer]:
+        """Resolve many names concurrently, in input order."""
+        return list(await asyncio.gather(*(self.query(n, rdtype) for n in names)))
+
+    async def _lookup(self, key: Optional[str], name: str, rdtype: str) -> DnsAnswer:
+        now = time.time()
+        try:
+            answer = await self._resolver.resolve(name, rdtype, raise_on_no_answer=False)
+        except dns.resolver.NXDOMAIN as e:
+            response = next(iter(e.responses().values()), None)
+            result = DnsAnswer("nxdomain", [], now + _negative_ttl(response))
+        except dns.exception.DNSException:
+            result = DnsAnswer("error", [], now + ERROR_TTL)
+        else:
+            if answer.rrset is None:
+                result = DnsAnswer("nodata", [], now + _negative_ttl(answer.response))
+            else:
+                ttl = max(MIN_TTL, min(answer.rrset.ttl, MAX_TTL))
+                result = DnsAnswer("ok", _records(answer), now + ttl)
+        if key is not None:
+            self._cache[key] = result
+            self._inflight.pop(key, None)
+        return result
+
+    async def cnames(self, fqdn: str) -> list[str]:
+        return (await self.query(fqdn, "CNAME")).records
+
+    async def addresses(self, host: str) -> list[str]:
+        """IPv4 addresses, or IPv6 when there are none."""
+        answer = await self.query(host, "A")
+        if answer.status == "ok":
+            return answer.records
+        if answer.status == "nxdomain":
+            return []
+        return (await self.query(host, "AAAA")).records
+
+    # ── Wildcards ───────────────────────────────────────────────────
+
+    async def wildcard(self, apex: str) -> Optional[tuple[str, list[str]]]:
+        """("CNAME"|"A", sorted records) if apex has wildcard DNS, else None."""
+        key = f"{apex.lower().rstrip('.')}|WILDCARD"
+        cached = self._cache.get(key)
+        if cached is None or cached.expires <= time.time():
+            if key not in self._inflight:
+                self._inflight[key] = asyncio.ensure_future(self._probe_wildcard(key, apex))
+            cached = await asyncio.shield(self._inflight[key])
+        if cached.status != "ok":
+            return None
+        kind, *records = cached.records
+        return kind, records
+
+    async def _probe_wildcard(self, key: str, apex: str) -> DnsAnswer:
+        # A random label can only resolve through a wildcard record
+        probe = f"wc-{secrets.token_hex(6)}.{apex}"
+        cname = await self._lookup(None, probe, "CNAME")
+        if cname.status == "ok":
+            result = DnsAnswer("ok", ["CNAME", *sorted(cname.records)], cname.expires)
+        elif cname.status == "nodata":
+            a = await self._lookup(None, probe, "A")
+            result = DnsAnswer("ok", ["A", *sorted(a.records)], a.expires) if a.status == "ok" else a
+        else:
+            result = cname
+        self._cache[key] = result
+        self._inflight.pop(key, None)
+        return result
+
+    async def served_by_wildcard(self, fqdn: str, cname: DnsAnswer, wildcard: tuple[str, list[str]]) -> bool:
+        """True if fqdn's answer is indistinguishable from the zone wildcard."""
+        kind, records = wildcard
+        if kind == "CNAME":
+            return cname.status == "ok" and sorted(cname.records) == records
+        if cname.status != "nodata":
+            return False
+        a = await self.query(fqdn, "A")
+        return a.status == "ok" and sorted(a.records) == records
+
+
+class AiohttpResolver(aiohttp.abc.AbstractResolver):
+    """aiohttp resolver backed by a CachingResolver.
+
+    Single-label names (``localhost``) go to the system resolver.
+    ``port_map`` redirects well-known ports (e.g. {443: 8443}) so a
+    benchmark can point the engine at local servers.
+    """
+
+    def __init__(self, resolver: CachingResolver, port_map: Optional[dict[int, int]] = None):
+        self._resolver = resolver
+        self._system = aiohttp.ThreadedResolver()
+        self._port_map = port_map or {}
+
+    async def resolve(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET):
+        port = self._port_map.get(port, port)
+        if "." not in host.strip("."):
+            return await self._system.resolve(host, port, family)
+        addresses = await self._resolver.addresses(host)
+        if not addresses:
+            raise OSError(f"DNS lookup failed for {host}")
+        return [
+            {
+                "hostname": host,
+                "host": address,
+                "port": port,
+                "family": socket.AF_INET6 if ":" in address else socket.AF_INET,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+            for address in addresses
+        ]
+
+    async def close(self) -> None:
+        await self._system.close()
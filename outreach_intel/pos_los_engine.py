@@ -0,0 +1,603 @@
+"""Asyncio detection engine for the POS/LOS detector.
+
+``detect_batch`` used to run ``detect_tech_stack`` in a five-thread pool,
+and each thread walked ~19 portal subdomains per layer with blocking DNS,
+HTTP and TLS calls, so at most five sockets were ever open at once. This
+engine runs every probe as a coroutine on one event loop instead:
+
+  - ``max_in_flight`` is a global budget on DNS/HTTP/TLS probes across
+    all domains in the batch
+  - ``per_domain`` caps concurrent probes against any single lender
+  - ``max_domains`` bounds how many domains are open at once
+
+Within a domain the four free layers (DNS, redirect, HTML, SSL) run
+concurrently. A ``DetectionPolicy`` is checked as each layer finishes and
+cancels the rest once the required categories (POS and LOS by default)
+have confident detections. The paid Firecrawl layer runs afterwards only
+if the policy asks for it, by default only when the free layers found
+nothing. It keeps its synchronous client and runs in a worker thread,
+drawing on the batch's shared ``FirecrawlLayer`` (credit budget, rate
+limit, map/search cache; see ``pos_los_firecrawl``).
+
+DNS goes through ``pos_los_dns.CachingResolver`` (TTL-respecting
+positive/negative caches persisted between runs). The HTTP connector uses
+the same cache. Portal subdomains that are NXDOMAIN, or that only resolve
+through a wildcard record, are never probed over HTTP or TLS.
+
+The layers of one domain share a ``DomainScan``. Its page cache fetches
+each URL once and records the redirect chain, the capped body and the
+peer certificate of the first hop together. The redirect, HTML and SSL
+layers all read from it, so a portal subdomain costs one connection
+instead of three (redirect GET, HTML GET, TLS handshake).
+
+Bodies are streamed through ``HtmlStream``: non-HTML content types are
+never downloaded, gzip/deflate is inflated chunk by chunk, and the
+fingerprint scan runs as chunks arrive. The download stops at the byte
+and character caps, or as soon as the page alone satisfies the policy.
+
+Matching reuses the pure helpers in ``pos_los_detector`` and results go
+through the same dedupe, so DomainResult/Detection output has the same
+shape as before.
+
+Usage:
+    results = asyncio.run(detect_batch_async(domains))
+
+    async with AsyncDetector() as detector:
+        result = await detector.detect("flagstar.com")
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import ssl
+import time
+import zlib
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .pos_los_detector import (
+    DEFAULT_POLICY,
+    FREE_LAYERS,
+    PORTAL_SUBDOMAINS,
+    USER_AGENT,
+    Detection,
+    ACCEPT_ENCODING,
+    HTML_CHUNK_SIZE,
+    DetectionPolicy,
+    DomainResult,
+    HtmlStream,
+    _build_result,
+    _cert_names,
+    _html_urls,
+    _match_cert_names,
+    _match_cname,
+    _match_html_page,
+    _match_redirect_chain,
+    detect_firecrawl,
+    is_html_content_type,
+    layer_timestamp,
+    normalize_domain,
+    parse_content_type,
+)
+from .pos_los_corpus import Capture, Corpus
+from .pos_los_dns import DNS_CACHE_PATH, AiohttpResolver, CachingResolver, DnsAnswer
+from .pos_los_matcher import PageScan
+from .pos_los_telemetry import LayerRun, finalize_runs, layer_run
+
+if TYPE_CHECKING:
+    from .pos_los_firecrawl import FirecrawlLayer
+
+logger = logging.getLogger(__name__)
+
+MAX_IN_FLIGHT = 200
+PER_DOMAIN = 8
+MAX_DOMAINS = 50
+
+HTTP_TIMEOUT = 10
+TLS_TIMEOUT = 5
+
+# Layer whose task is running (for attributing page bytes in telemetry)
+_CURRENT_LAYER: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("pos_los_layer", default=None)
+
+_FETCH_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError, UnicodeError, zlib.error)
+
+
+@dataclass
+class Page:
+    """One fetched URL: redirect chain (final URL last), capped body and cert.
+
+    ``cert`` is the verified peer certificate of the URL's own host, when
+    the connection was opened for this scan. ``error`` is set (and
+    ``status`` is 0) when the request failed. ``scan`` is the fingerprint
+    scan built while the body streamed in (None when no body was read).
+    """
+
+    url: str
+    status: int
+    chain: list[str] = field(default_factory=list)
+    text: str = ""
+    cert: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    scan: Optional[PageScan] = None
+    bytes_read: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _CertRecordingConnector(aiohttp.TCPConnector):
+    """TCP connector that keeps the peer certificate of new TLS connections.
+
+    Only hosts a fetch is currently watching are recorded, so the map stays
+    as small as the set of in-flight fetches.
+
+    This overrides a private aiohttp method, so requirements.txt caps
+    aiohttp at the versions it has been checked against. The response's
+    own connection is no help here: aiohttp releases it as soon as a short
+    body hits EOF, before the fetch can read the certificate.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.certs: dict[str, dict[str, Any]] = {}
+        self._watching: dict[str, int] = {}
+
+    def watch(self, host: str) -> None:
+        self._watching[host] = self._watching.get(host, 0) + 1
+
+    def unwatch(self, host: str) -> None:
+        self._watching[host] -= 1
+        if not self._watching[host]:
+            del self._watching[host]
+            self.certs.pop(host, None)
+
+    async def _wrap_create_connection(self, *args: Any, req: Any, **kwargs: Any) -> Any:
+        transport, protocol = await super()._wrap_create_connection(*args, req=req, **kwargs)
+        host = req.url.host
+        if host in self._watching:
+            cert = transport.get_extra_info("peercert")
+            if cert:
+                self.certs[host] = cert
+        return transport, protocol
+
+
+class AsyncDetector:
+    """Runs the free detection layers with bounded concurrent probes.
+
+    The I/O primitives (``lookup``, ``wildcard``, ``fetch``, ``peer_cert``)
+    are the only methods that touch the network.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        per_domain: int = PER_DOMAIN,
+        policy: DetectionPolicy = DEFAULT_POLICY,
+        use_firecrawl: bool = True,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        resolver: Optional[CachingResolver] = None,
+        dns_cache_path: Optional[Path] = DNS_CACHE_PATH,
+        corpus: Optional[Corpus] = None,
+        firecrawl: Optional["FirecrawlLayer"] = None,
+        port_map: Optional[dict[int, int]] = None,
+    ):
+        self.max_in_flight = max_in_flight
+        self.per_domain = per_domain
+        self.policy = policy
+        self.use_firecrawl = use_firecrawl
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._budget = asyncio.Semaphore(max_in_flight)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[_CertRecordingConnector] = None
+        self.resolver = resolver or CachingResolver(cache_path=dns_cache_path)
+        self.corpus = corpus
+        self.firecrawl = firecrawl
+        # Remaps 80/443 onto local servers (see pos_los_bench)
+        self.port_map = port_map or {}
+
+    async def __aenter__(self) -> "AsyncDetector":
+        if self._session is None:
+            self.resolver.load()
+            self._connector = _CertRecordingConnector(
+                limit=self.max_in_flight,
+                ssl=self.ssl_context,
+                resolver=AiohttpResolver(self.resolver, self.port_map),
+            )
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                headers={"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING},
+                timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+                auto_decompress=False,  # HtmlStream inflates incrementally
+            )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self.resolver.save()
+
+    # ── I/O primitives ──────────────────────────────────────────────
+
+    async def lookup(self, fqdn: str) -> DnsAnswer:
+        """Cached CNAME answer for fqdn (also tells whether the name exists)."""
+        return await self.resolver.query(fqdn, "CNAME")
+
+    async def wildcard(self, apex: str) -> Optional[tuple[str, list[str]]]:
+        return await self.resolver.wildcard(apex)
+
+    async def fetch(self, url: str, stop: Optional[Callable[[PageScan], bool]] = None) -> Page:
+        """GET url following redirects, streaming an HTML body through the matcher.
+
+        The body is read only for a 200 with an HTML content type, and
+        reading stops at the caps or as soon as ``stop(scan)`` is True.
+        """
+        host = urlsplit(url).hostname or ""
+        self._connector.watch(host)
+        page = Page(url=url, status=0)
+        try:
+            async with self._session.get(url, allow_redirects=True) as resp:
+                page.chain = [str(r.url) for r in resp.history] + [str(resp.url)]
+                page.status = resp.status
+                page.cert = self._connector.certs.get(host)
+                content_type = resp.headers.get("Content-Type", "")
+                if resp.status == 200 and is_html_content_type(content_type):
+                    stream = HtmlStream(
+                        resp.headers.get("Content-Encoding", ""),
+                        parse_content_type(content_type)[1],
+                        stop,
+                    )
+                    async for chunk in resp.content.iter_chunked(HTML_CHUNK_SIZE):
+                        if stream.feed(chunk):
+                            break
+                    page.scan = stream.close()
+                    page.text = page.scan.text
+                    page.bytes_read = stream.bytes_in
+        except _FETCH_ERRORS as e:
+            page.status = 0
+            page.error = str(e) or type(e).__name__
+            page.cert = page.cert or self._connector.certs.get(host)
+        finally:
+            self._connector.unwatch(host)
+        return page
+
+    async def peer_cert(self, hostname: str) -> Optional[dict[str, Any]]:
+        """Verified peer certificate for hostname:443, or None."""
+        addresses = await self.resolver.addresses(hostname)
+        if not addresses:
+            return None
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    addresses[0], self.port_map.get(443, 443), ssl=self.ssl_context, server_hostname=hostname,
+                ),
+                TLS_TIMEOUT,
+            )
+        except (asyncio.TimeoutError, ssl.SSLError, OSError):
+            return None
+        try:
+            return writer.get_extra_info("peercert")
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _bounded(self, limit: asyncio.Semaphore, probe: Callable, *args: Any) -> Any:
+        """Run one probe inside both the per-domain and global budgets."""
+        async with limit, self._budget:
+            return await probe(*args)
+
+    # ── Layers ──────────────────────────────────────────────────────
+
+    async def dns_layer(self, scan: "DomainScan") -> list[Detection]:
+        detections = []
+        for fqdn, answer in (await scan.dns_answers()).items():
+            for target in answer.records:
+                detections.extend(_match_cname(fqdn, target))
+        return detections
+
+    async def redirect_layer(self, scan: "DomainScan") -> list[Detection]:
+        async def probe(hostname: str) -> list[Detection]:
+            for scheme in ("https", "http"):
+                url = f"{scheme}://{hostname}"
+                page = await scan.page(url)
+                if page.ok:
+                    return _match_redirect_chain(url, page.chain)  # https worked, skip http
+            return []
+
+        chains = await asyncio.gather(*(probe(h) for h in await scan.portal_hosts()))
+        return [det for chain in chains for det in chain]
+
+    async def html_layer(self, scan: "DomainScan") -> list[Detection]:
+        live = {scan.domain, *await scan.portal_hosts()}
+        urls = [url for url in _html_urls(scan.domain) if urlsplit(url).hostname in live]
+        pages = await asyncio.gather(*(scan.page(url) for url in urls))
+        # Match in URL order so "first page wins" per vendor matches the sync layer
+        detections: list[Detection] = []
+        seen_vendors: set[str] = set()
+        for url, page in zip(urls, pages):
+            if page.status != 200:
+                continue
+            detections.extend(_match_html_page(page.text, url, seen_vendors, scan=page.scan))
+        return detections
+
+    async def ssl_layer(self, scan: "DomainScan") -> list[Detection]:
+        async def cert_for(hostname: str) -> Optional[dict[str, Any]]:
+            page = await scan.page(f"https://{hostname}")
+            if page.cert or not page.ok:
+                return page.cert
+            # Served over a pooled connection opened before this scan
+            return await scan.probe(self.peer_cert, hostname)
+
+        hostnames = await scan.portal_hosts()
+        certs = await asyncio.gather(*(cert_for(h) for h in hostnames))
+        detections = []
+        for hostname, cert in zip(hostnames, certs):
+            if cert:
+                scan.cert_names[hostname] = _cert_names(cert)
+                detections.extend(_match_cert_names(hostname, scan.cert_names[hostname]))
+        return detections
+
+    async def firecrawl_layer(self, scan: "DomainScan") -> list[Detection]:
+        if not self.use_firecrawl:
+            return []
+        return await asyncio.to_thread(detect_firecrawl, scan.domain, scan.capture, self.firecrawl)
+
+    # ── Orchestration ───────────────────────────────────────────────
+
+    async def detect(self, domain: str, policy: Optional[DetectionPolicy] = None) -> DomainResult:
+        """Async equivalent of ``detect_tech_stack``.
+
+        With a corpus attached, early exit and any layer plan are switched
+        off: the archive must hold whole pages and every free layer, or
+        rematch could never find a vendor whose signal the current
+        fingerprints happened not to need.
+        """
+        policy = policy or self.policy
+        if self.corpus is not None:
+            policy = replace(policy, early_exit=False, layers=None)
+        domain = normalize_domain(domain)
+        scan = DomainScan(self, domain, policy)
+        by_layer: dict[str, list[Detection]] = {}
+        errors: dict[str, str] = {}
+        layer_times: dict[str, str] = {}
+        runs: list[LayerRun] = []
+        free_layers = policy.free_layers()
+
+        started = time.perf_counter()
+        tasks = {asyncio.create_task(self._run_layer(name, scan)): name for name in free_layers}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    if task.exception() is not None:
+                        errors[name] = f"{name}: {task.exception()}"
+                        logger.warning(f"Layer {name} failed for {domain}: {task.exception()}")
+                    else:
+                        by_layer[name] = task.result()
+                    layer_times[name] = layer_timestamp()
+                    runs.append(layer_run(
+                        name,
+                        by_layer.get(name, []),
+                        time.perf_counter() - started,
+                        scan.bytes_for(name),
+                        "error" if name in errors else "ok",
+                    ))
+                found = [det for dets in by_layer.values() for det in dets]
+                if pending and policy.satisfied(found):
+                    logger.debug(f"{domain}: policy satisfied, cancelling {len(pending)} layer(s)")
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            scan.close()
+        elapsed = time.perf_counter() - started
+        for task in pending:
+            runs.append(layer_run(tasks[task], [], elapsed, scan.bytes_for(tasks[task]), "cancelled"))
+
+        # Policy layer order keeps dedupe tie-breaks deterministic
+        all_detections = [det for name in free_layers for det in by_layer.get(name, [])]
+        if policy.run_firecrawl(all_detections):
+            started = time.perf_counter()
+            found, status = [], "ok"
+            try:
+                found = await self.firecrawl_layer(scan)
+                all_detections.extend(found)
+            except Exception as e:
+                status = "error"
+                errors["firecrawl"] = f"firecrawl: {e}"
+                logger.warning(f"Layer firecrawl failed for {domain}: {e}")
+            layer_times["firecrawl"] = layer_timestamp()
+            runs.append(layer_run("firecrawl", found, time.perf_counter() - started, status=status))
+
+        if self.corpus is not None:
+            scan.capture.layers = layer_times
+            await asyncio.to_thread(self.corpus.archive, scan.observed())
+
+        ordered_errors = [errors[n] for n in (*FREE_LAYERS, "firecrawl") if n in errors]
+        result = _build_result(domain, all_detections, ordered_errors, layer_times)
+        result.telemetry = finalize_runs(runs)
+        return result
+
+    async def _run_layer(self, name: str, scan: "DomainScan") -> list[Detection]:
+        # Pages this layer requests first are billed to it in telemetry
+        _CURRENT_LAYER.set(name)
+        return await getattr(self, f"{name}_layer")(scan)
+
+
+class DomainScan:
+    """Per-domain state shared by the layers: probe limit and page cache."""
+
+    def __init__(self, detector: AsyncDetector, domain: str, policy: Optional[DetectionPolicy] = None):
+        self.detector = detector
+        self.domain = domain
+        self.policy = policy or detector.policy
+        self.limit = asyncio.Semaphore(detector.per_domain)
+        self._pages: dict[str, asyncio.Future] = {}
+        self._page_layer: dict[str, Optional[str]] = {}
+        self._dns: Optional[asyncio.Future] = None
+        self._hosts: Optional[asyncio.Future] = None
+        self.cert_names: dict[str, list[str]] = {}
+        # Filled by Firecrawl as it scrapes, and by observed() at the end
+        self.capture: Optional[Capture] = Capture(domain) if detector.corpus is not None else None
+
+    async def probe(self, probe: Callable, *args: Any) -> Any:
+        return await self.detector._bounded(self.limit, probe, *args)
+
+    async def dns_answers(self) -> dict[str, DnsAnswer]:
+        """CNAME answer for every portal subdomain, looked up once per scan."""
+        if self._dns is None:
+            self._dns = asyncio.ensure_future(self._lookup_portals())
+        return await asyncio.shield(self._dns)
+
+    async def _lookup_portals(self) -> dict[str, DnsAnswer]:
+        fqdns = [f"{sub}.{self.domain}" for sub in PORTAL_SUBDOMAINS]
+        answers = await asyncio.gather(*(self.probe(self.detector.lookup, f) for f in fqdns))
+        return dict(zip(fqdns, answers))
+
+    async def portal_hosts(self) -> list[str]:
+        """Portal subdomains worth probing: they exist and aren't just the wildcard."""
+        if self._hosts is None:
+            self._hosts = asyncio.ensure_future(self._live_portals())
+        return await asyncio.shield(self._hosts)
+
+    async def _live_portals(self) -> list[str]:
+        answers = await self.dns_answers()
+        wildcard = await self.probe(self.detector.wildcard, self.domain)
+        live = []
+        for fqdn, answer in answers.items():
+            if not answer.exists:
+                continue
+            if wildcard and await self.detector.resolver.served_by_wildcard(fqdn, answer, wildcard):
+                continue
+            live.append(fqdn)
+        if wildcard:
+            logger.debug(f"{self.domain}: wildcard DNS, probing {len(live)} of {len(answers)} portals")
+        return live
+
+    async def page(self, url: str) -> Page:
+        """Fetch url once per scan; concurrent callers share the request."""
+        if url not in self._pages:
+            stop = self.page_is_enough if self.policy.early_exit else None
+            self._page_layer[url] = _CURRENT_LAYER.get()
+            self._pages[url] = asyncio.ensure_future(self.probe(self.detector.fetch, url, stop))
+        # Shielded so one cancelled layer doesn't cancel the fetch for the others
+        return await asyncio.shield(self._pages[url])
+
+    def bytes_for(self, layer: str) -> int:
+        """Body bytes of the finished fetches that layer requested first."""
+        total = 0
+        for url, future in self._pages.items():
+            if self._page_layer.get(url) != layer or not future.done() or future.cancelled():
+                continue
+            if future.exception() is None:
+                total += future.result().bytes_read
+        return total
+
+    def page_is_enough(self, page_scan: PageScan) -> bool:
+        """Stop downloading once this page alone satisfies the policy."""
+        return self.policy.satisfied(_match_html_page(page_scan.text, "", set(), scan=page_scan))
+
+    def observed(self) -> Capture:
+        """Everything the finished layers saw, for the corpus."""
+        capture = self.capture or Capture(self.domain)
+
+        def done(future: Optional[asyncio.Future]) -> Any:
+            if future is None or not future.done() or future.cancelled() or future.exception():
+                return None
+            return future.result()
+
+        for fqdn, answer in (done(self._dns) or {}).items():
+            if answer.records:
+                capture.cnames[fqdn] = answer.records
+        pages = {url: done(future) for url, future in self._pages.items()}
+        for hostname in done(self._hosts) or []:
+            # Same choice as the redirect layer: https, else http
+            for scheme in ("https", "http"):
+                page = pages.get(f"{scheme}://{hostname}")
+                if page is not None and page.ok:
+                    capture.redirects[page.url] = page.chain
+                    break
+        capture.pages = [
+            (url, pages[url].text)
+            for url in _html_urls(self.domain)
+            if pages.get(url) is not None and pages[url].status == 200
+        ]
+        capture.certs = dict(self.cert_names)
+        return capture
+
+    @property
+    def fetches(self) -> int:
+        return len(self._pages)
+
+    def close(self) -> None:
+        """Cancel lookups and fetches nobody is waiting for any more (early exit)."""
+        for future in [*self._pages.values(), self._dns, self._hosts]:
+            if future is not None and not future.done():
+                future.cancel()
+
+
+async def detect_one(domain: str, policy: Optional[DetectionPolicy] = None) -> DomainResult:
+    """Scan a single domain with a short-lived detector."""
+    async with AsyncDetector() as detector:
+        return await detector.detect(domain, policy=policy)
+
+
+async def detect_batch_async(
+    domains: list[str],
+    max_domains: Optional[int] = None,
+    progress_callback: Optional[Callable] = None,
+    max_in_flight: Optional[int] = None,
+    detector: Optional[AsyncDetector] = None,
+    policy: Optional[DetectionPolicy] = None,
+    corpus: Optional[Corpus] = None,
+    firecrawl: Optional["FirecrawlLayer"] = None,
+) -> list[DomainResult]:
+    """Scan many domains concurrently on the running event loop.
+
+    Args:
+        domains: Root domains to scan.
+        max_domains: Domains open at once (default 50).
+        progress_callback: Optional fn(completed, total, domain, result) per domain.
+        max_in_flight: Global cap on concurrent probes (default 200).
+        detector: Preconfigured detector (defaults to a new AsyncDetector).
+        policy: Early-exit policy (defaults to the detector's).
+        corpus: Archive every domain's observations here (see ``pos_los_corpus``).
+        firecrawl: Firecrawl layer shared by the batch (budget, rate limit, cache).
+
+    Returns:
+        DomainResult per domain, in completion order.
+    """
+    detector = detector or AsyncDetector(
+        max_in_flight=max_in_flight or MAX_IN_FLIGHT, corpus=corpus, firecrawl=firecrawl,
+    )
+    gate = asyncio.Semaphore(max_domains or MAX_DOMAINS)
+
+    async def scan(domain: str) -> tuple[str, DomainResult]:
+        async with gate:
+            try:
+                return domain, await detector.detect(domain, policy=policy)
+            except Exception as e:
+                return domain, DomainResult(domain=domain, errors=[str(e)])
+
+    results: list[DomainResult] = []
+    async with detector:
+        tasks = [asyncio.create_task(scan(d)) for d in domains]
+        for i, next_done in enumerate(asyncio.as_completed(tasks)):
+            domain, result = await next_done
+            results.append(result)
+            if progress_callback:
+                progress_callback(i + 1, len(domains), domain, result)
+    return results
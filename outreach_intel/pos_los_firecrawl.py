@@ -0,0 +1,368 @@
+"""Budgeted, concurrent Firecrawl layer for the POS/LOS detector.
+
+The Firecrawl layer used to map the domain and then scrape up to four
+candidate URLs one after another, each with a 5s render wait, before maybe
+falling back to web search. That took 20+ seconds per domain, and nothing
+bounded how many credits a batch could spend. Now:
+
+  - the candidate URLs are scraped concurrently; once a page yields a
+    vendor, queued scrapes are cancelled and in-flight ones are ignored
+  - a ``FirecrawlScheduler`` shared by the whole batch enforces a credit
+    budget, a per-minute request limit and a cap on concurrent requests
+  - map and search results are cached per domain (``FirecrawlCache``),
+    persisted between runs, so a rescan only pays for scrapes
+
+Credits are reserved before each request and never refunded, so the budget
+is a hard ceiling even when requests fail. A domain that was denied credits
+and found nothing raises ``BudgetExhausted``. The engine records that as a
+layer error, so the store rescans the domain after a day instead of caching
+an empty result for a week.
+
+Usage:
+    layer = FirecrawlLayer(scheduler=FirecrawlScheduler(credit_budget=500))
+    results = detect_batch(domains, firecrawl=layer)
+    layer.close()  # persists the map/search cache
+
+    python -m outreach_intel.pos_los_detector -f lenders.txt --firecrawl-credits 500
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .firecrawl_client import FirecrawlClient, ScrapeResult, SearchResult
+from .pos_los_detector import (
+    PORTAL_SUBDOMAINS,
+    Detection,
+    _match_links,
+    _match_raw_html,
+    _match_search_results,
+    _search_query,
+)
+from .pos_los_corpus import Capture
+
+logger = logging.getLogger(__name__)
+
+FIRECRAWL_CACHE_PATH = Path(__file__).parent.parent / "exports" / "detector" / "firecrawl_cache.json"
+CACHE_TTL_DAYS = 30
+
+# Credits charged per request
+MAP_CREDITS = 1
+SCRAPE_CREDITS = 1
+SEARCH_LIMIT = 5
+SEARCH_CREDITS = SEARCH_LIMIT  # One per returned result
+
+RATE_PER_MINUTE = 100
+MAX_CONCURRENT = 10
+
+MAX_PAGES = 4  # Homepage + up to 3 portal pages
+SCRAPE_WAIT_MS = 5000
+SCRAPE_TIMEOUT = 20
+
+MAP_SEARCH = "apply portal borrower login mortgage application"
+PORTAL_KEYWORDS = ("apply", "portal", "borrower", "login", "app", "mortgage")
+
+
+class BudgetExhausted(RuntimeError):
+    """The batch credit budget ran out before the layer found anything."""
+
+
+class FirecrawlScheduler:
+    """Credit budget, request rate and concurrency shared by a whole batch.
+
+    Thread-safe: every domain's Firecrawl layer runs in its own worker
+    thread and draws from the same scheduler.
+
+    Args:
+        credit_budget: Credits the batch may spend (None: unlimited).
+        per_minute: Requests started in any 60-second window.
+        max_concurrent: Requests in flight at once.
+    """
+
+    def __init__(
+        self,
+        credit_budget: Optional[int] = None,
+        per_minute: int = RATE_PER_MINUTE,
+        max_concurrent: int = MAX_CONCURRENT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.credit_budget = credit_budget
+        self.per_minute = per_minute
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started: deque[float] = deque()
+        self.credits_used = 0
+        self.requests = 0
+        self.denied = 0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.credit_budget is None:
+            return None
+        return max(0, self.credit_budget - self.credits_used)
+
+    def acquire(self, credits: int, cancel: Optional[threading.Event] = None) -> bool:
+        """Reserve credits and a rate-limit slot, waiting for the slot if needed.
+
+        Returns False, without waiting, when the budget can't cover
+        ``credits``, or as soon as ``cancel`` is set.
+        """
+        while True:
+            with self._lock:
+                if self.credit_budget is not None and self.credits_used + credits > self.credit_budget:
+                    self.denied += 1
+                    return False
+                now = self._clock()
+                while self._started and now - self._started[0] >= 60:
+                    self._started.popleft()
+                if len(self._started) < self.per_minute:
+                    self._started.append(now)
+                    self.credits_used += credits
+                    self.requests += 1
+                    return True
+                delay = self._started[0] + 60 - now
+            if cancel is None:
+                time.sleep(delay)
+            elif cancel.wait(delay):
+                return False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "credits_used": self.credits_used,
+            "credit_budget": self.credit_budget,
+            "denied": self.denied,
+        }
+
+
+class FirecrawlCache:
+    """Map and search results per domain, persisted between runs."""
+
+    def __init__(self, path: Optional[Path] = FIRECRAWL_CACHE_PATH, ttl_days: float = CACHE_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> int:
+        """Load unexpired entries from disk; returns how many were loaded."""
+        if not self.path or not self.path.exists():
+            return 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable Firecrawl cache {self.path}: {e}")
+            return 0
+        now = time.time()
+        with self._lock:
+            for key, (stored_at, value) in entries.items():
+                if now - stored_at < self.ttl:
+                    self._entries.setdefault(key, (stored_at, value))
+            return len(self._entries)
+
+    def save(self) -> None:
+        """Write unexpired entries to disk if anything changed (atomic replace)."""
+        if not self.path or not self._dirty:
+            return
+        now = time.time()
+        with self._lock:
+            entries = {k: [t, v] for k, (t, v) in self._entries.items() if now - t < self.ttl}
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": entries}, f)
+        os.replace(tmp, self.path)
+
+    def get(self, kind: str, domain: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(f"{kind}|{domain}")
+            if entry is None or time.time() - entry[0] >= self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, kind: str, domain: str, value: Any) -> None:
+        with self._lock:
+            self._entries[f"{kind}|{domain}"] = (time.time(), value)
+            self._dirty = True
+
+
+class FirecrawlLayer:
+    """Firecrawl detection (map → concurrent rawHtml scrapes → search).
+
+    One instance is shared by every domain of a batch, so they all draw
+    from the same scheduler and cache.
+
+    Args:
+        client: Firecrawl API client (default: from FIRECRAWL_API_KEY).
+        scheduler: Shared budget/rate limiter (default: unlimited credits).
+        cache: Map/search cache (default: loaded from FIRECRAWL_CACHE_PATH).
+        max_pages: Successful scrapes per domain.
+        wait_for: Milliseconds Firecrawl waits for JS before scraping.
+    """
+
+    def __init__(
+        self,
+        client: Optional[FirecrawlClient] = None,
+        scheduler: Optional[FirecrawlScheduler] = None,
+        cache: Optional[FirecrawlCache] = None,
+        max_pages: int = MAX_PAGES,
+        wait_for: int = SCRAPE_WAIT_MS,
+    ):
+        self.client = client or FirecrawlClient()
+        self.scheduler = scheduler or FirecrawlScheduler()
+        if cache is None:
+            cache = FirecrawlCache()
+            cache.load()
+        self.cache = cache
+        self.max_pages = max_pages
+        self.wait_for = wait_for
+
+    def close(self) -> None:
+        self.cache.save()
+
+    def detect(self, domain: str, capture: Optional[Capture] = None) -> list[Detection]:
+        """Detect POS/LOS vendors for one domain.
+
+        Raises:
+            BudgetExhausted: Credits were denied and nothing was found.
+        """
+        if not self.client.available:
+            logger.warning("No FIRECRAWL_API_KEY set — skipping Firecrawl layer")
+            return []
+
+        denied = self.scheduler.denied
+        detections = self._scrape_candidates(domain, self._portal_urls(domain), capture)
+        if detections:
+            logger.info(f"Firecrawl found {len(detections)} vendor(s) for {domain} in page scrapes")
+            return detections
+
+        logger.info(f"No vendors found in HTML for {domain}, trying web search fallback")
+        detections = _match_search_results(self._search(domain))
+        if detections:
+            logger.info(f"Firecrawl detected {len(detections)} vendor(s) for {domain}")
+        elif self.scheduler.denied > denied:
+            raise BudgetExhausted(f"credit budget exhausted ({self.scheduler.credits_used} used)")
+        else:
+            logger.info(f"Firecrawl found no vendors for {domain}")
+        return detections
+
+    # ── Map / search (cached) ───────────────────────────────────────
+
+    def _map(self, domain: str) -> list[str]:
+        urls = self.cache.get("map", domain)
+        if urls is not None:
+            return urls
+        if not self.scheduler.acquire(MAP_CREDITS):
+            return []
+        try:
+            with self.scheduler.slots:
+                result = self.client.map(f"https://{domain}", search=MAP_SEARCH, limit=20)
+        except Exception as e:
+            logger.warning(f"Firecrawl map failed for {domain}: {e}")
+            return []
+        if result.error:
+            logger.warning(f"Firecrawl map failed for {domain}: {result.error}")
+            return []
+        self.cache.put("map", domain, result.urls)
+        return result.urls
+
+    def _portal_urls(self, domain: str) -> list[str]:
+        """Candidate URLs in scrape-priority order: homepage, mapped portals, subdomains."""
+        portal_urls = [url for url in self._map(domain) if any(kw in url.lower() for kw in PORTAL_KEYWORDS)]
+        # Also try well-known subdomains (may not appear in sitemap)
+        for sub in PORTAL_SUBDOMAINS[:5]:
+            candidate = f"https://{sub}.{domain}"
+            if candidate not in portal_urls:
+                portal_urls.append(candidate)
+        homepage = f"https://{domain}"
+        if homepage not in portal_urls:
+            portal_urls.insert(0, homepage)
+        return portal_urls
+
+    def _search(self, domain: str) -> list[SearchResult]:
+        cached = self.cache.get("search", domain)
+        if cached is not None:
+            return [SearchResult(**item) for item in cached]
+        if not self.scheduler.acquire(SEARCH_CREDITS):
+            return []
+        with self.scheduler.slots:
+            results = self.client.search(_search_query(domain), limit=SEARCH_LIMIT)
+        if results:  # The client returns [] on failure too; don't cache that
+            self.cache.put("search", domain, [asdict(r) for r in results])
+        return results
+
+    # ── Scrapes ─────────────────────────────────────────────────────
+
+    def _scrape(self, url: str, cancel: threading.Event) -> Optional[ScrapeResult]:
+        """One rawHtml scrape, or None if cancelled or denied credits."""
+        if cancel.is_set() or not self.scheduler.acquire(SCRAPE_CREDITS, cancel):
+            return None
+        # The slot covers only the request, not the rate-limit wait, so
+        # throttled scrapes don't starve other domains of concurrency
+        with self.scheduler.slots:
+            return self.client.scrape(
+                url,
+                formats=["rawHtml", "links"],
+                only_main_content=False,
+                timeout=SCRAPE_TIMEOUT,
+                wait_for=self.wait_for,
+            )
+
+    def _scrape_candidates(self, domain: str, urls: list[str], capture: Optional[Capture]) -> list[Detection]:
+        """Scrape up to ``max_pages`` candidates at once, stopping at the first vendor.
+
+        A failed scrape is replaced by the next candidate, so up to
+        ``max_pages`` pages are read, as before. Detections come from every
+        page that finished before the stop.
+        """
+        cancel = threading.Event()
+        queue = iter(urls)
+        detections: list[Detection] = []
+        pool = ThreadPoolExecutor(max_workers=self.max_pages, thread_name_prefix="firecrawl")
+        pending: dict[Future, str] = {}
+
+        def submit_next() -> None:
+            url = next(queue, None)
+            if url is not None:
+                pending[pool.submit(self._scrape, url, cancel)] = url
+
+        try:
+            for _ in range(self.max_pages):
+                submit_next()
+            while pending and not detections:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    result = future.result()
+                    if result is None:
+                        continue
+                    if result.error:
+                        logger.debug(f"Firecrawl scrape failed for {url}: {result.error}")
+                        submit_next()
+                        continue
+                    if capture is not None:
+                        capture.add_firecrawl_page(url, result.raw_html, result.links)
+                    if result.raw_html:
+                        detections.extend(_match_raw_html(result.raw_html, url))
+                    if result.links:
+                        detections.extend(_match_links(result.links, domain))
+        finally:
+            # Queued scrapes never start; running ones finish unobserved
+            cancel.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+        return detections
@@ -0,0 +1,367 @@
+"""Compiled single-pass fingerprint matcher for page text.
+
+The HTML layers used to call ``re.search`` once per vendor pattern over up
+to 200KB of HTML — about 170ms per page for the ~100 patterns in the
+fingerprint DB, nearly all of it spent proving that a vendor is absent.
+
+This matcher compiles the DB once. Every pattern contributes its longest
+required literal (its "anchor", lowercased), and all anchors are merged
+into one trie-shaped regex inside a lookahead, so a single scan of the
+lowercased page reports every anchor present, including overlapping ones
+(``emortgage`` inside ``icemortgagetechnology``). Python's ``re`` has no
+literal-set automaton, but a trie-shaped alternation fails fast on the
+first character and gets within a few ms of one.
+
+Only patterns whose anchor is present are then confirmed with their own
+compiled regex, which yields hits with offsets so callers can run the
+false-positive context check on each occurrence. Pattern declaration
+order is preserved, so "first pattern that matches wins" semantics are
+unchanged.
+
+``StreamScan`` runs the same anchor scan over text that arrives in
+chunks (a page being downloaded). Each chunk is scanned together with the
+last ``longest anchor - 1`` characters of the previous text, so anchors
+that straddle a chunk boundary are still found. Callers can then stop the
+download as soon as the hits they need have appeared.
+
+``HostIndex`` does the same job for strings that are URLs or hostnames
+(CNAME targets, redirect chains, page links, certificate SANs). Host
+patterns are indexed in a reverse-label trie (``com`` -> ``blend`` ->
+``app``), so a lookup walks the string's own labels and costs O(labels)
+however many vendors there are. Only path-specific or non-literal
+patterns are confirmed with a regex.
+
+Usage:
+    matcher = FingerprintMatcher({"html": {"Blend": [r"blend\\.com", ...]}})
+    scan = matcher.scan(html)
+    scan.first_hits("html")          # {vendor: Hit} for the first matching pattern
+    scan.hits()                      # every occurrence, with offsets
+
+    stream = matcher.stream()
+    for chunk in chunks:
+        if stream.feed(chunk) and stream.first_hits("html"):
+            break
+
+    index = HostIndex({"cname": {"Blend": [r"blend\\.com"]}})
+    index.match("lender.blend.com", "cname")   # [("Blend", "blend\\.com")]
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlsplit
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+# Literals too common in HTML to make a useful anchor when a pattern has a better one
+WEAK_LITERALS = {'src="', "iframe", "all rights reserved"}
+
+
+@dataclass(frozen=True)
+class Hit:
+    """One occurrence of a vendor pattern in the scanned text."""
+
+    vendor: str
+    source: str
+    pattern: str
+    start: int
+    end: int
+    text: str
+
+
+@dataclass(frozen=True)
+class _Fingerprint:
+    vendor: str
+    source: str
+    pattern: str
+    regex: re.Pattern
+    anchor: str  # "" when the pattern has no required literal
+
+
+def required_literal(pattern: str) -> str:
+    """Longest literal run every match of pattern must contain, lowercased.
+
+    Only top-level literal runs count (anything inside groups, branches or
+    optional repeats may be skipped). Runs in WEAK_LITERALS are used only
+    if nothing better exists. Returns "" if the pattern has no such run.
+    """
+    runs, run = [], ""
+    for op, av in sre_parse.parse(pattern, re.IGNORECASE):
+        if op is sre_parse.LITERAL:
+            run += chr(av)
+        else:
+            runs.append(run)
+            run = ""
+    runs.append(run)
+    runs = [r.lower() for r in runs if r]
+    strong = [r for r in runs if r not in WEAK_LITERALS]
+    return max(strong or runs, key=len, default="")
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Regex source matching any of words, shaped as a prefix trie."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # Greedy optional tail: the longest anchor at a position wins
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class FingerprintMatcher:
+    """Fingerprint tables compiled for single-pass scanning.
+
+    Args:
+        tables: {source: {vendor: [pattern, ...]}}; sources are free-form
+            names ("html", "copyright", ...) and order is preserved.
+    """
+
+    def __init__(self, tables: dict[str, dict[str, list[str]]]):
+        self._by_source: dict[str, dict[str, list[_Fingerprint]]] = {}
+        anchors: set[str] = set()
+        for source, vendors in tables.items():
+            compiled = self._by_source.setdefault(source, {})
+            for vendor, patterns in vendors.items():
+                for pattern in patterns:
+                    anchor = required_literal(pattern)
+                    compiled.setdefault(vendor, []).append(_Fingerprint(
+                        vendor=vendor,
+                        source=source,
+                        pattern=pattern,
+                        regex=re.compile(pattern, re.IGNORECASE),
+                        anchor=anchor,
+                    ))
+                    if anchor:
+                        anchors.add(anchor)
+
+        self._anchor_regex = re.compile(f"(?=({_trie_regex(anchors)}))") if anchors else None
+        # The scan reports the longest anchor at each position; shorter
+        # anchors starting there are its prefixes and are present too.
+        self._implied = {a: {b for b in anchors if a.startswith(b)} for a in anchors}
+        self.max_anchor_len = max(map(len, anchors), default=0)
+
+    @property
+    def sources(self) -> list[str]:
+        return list(self._by_source)
+
+    def anchors_present(self, text: str) -> set[str]:
+        """Every anchor that occurs in text (one pass over the lowercased text)."""
+        if self._anchor_regex is None:
+            return set()
+        present: set[str] = set()
+        for longest in {m.group(1) for m in self._anchor_regex.finditer(text.lower())}:
+            present |= self._implied[longest]
+        return present
+
+    def scan(self, text: str) -> "PageScan":
+        return PageScan(self, text)
+
+    def stream(self) -> "StreamScan":
+        return StreamScan(self)
+
+
+class PageScan:
+    """Anchor scan of one text, with lazy confirmation per source."""
+
+    def __init__(self, matcher: FingerprintMatcher, text: str):
+        self.text = text
+        self._matcher = matcher
+        self._present = matcher.anchors_present(text)
+
+    def _candidates(self, source: str) -> Iterable[tuple[str, list[_Fingerprint]]]:
+        for vendor, fingerprints in self._matcher._by_source.get(source, {}).items():
+            live = [f for f in fingerprints if not f.anchor or f.anchor in self._present]
+            if live:
+                yield vendor, live
+
+    def candidates(self, source: str) -> list[str]:
+        """Vendors in source that could match (anchor present), in table order."""
+        return [vendor for vendor, _ in self._candidates(source)]
+
+    def _hits(self, fingerprint: _Fingerprint) -> Iterable[Hit]:
+        for m in fingerprint.regex.finditer(self.text):
+            yield Hit(
+                vendor=fingerprint.vendor,
+                source=fingerprint.source,
+                pattern=fingerprint.pattern,
+                start=m.start(),
+                end=m.end(),
+                text=m.group(),
+            )
+
+    def first_hits(
+        self,
+        source: str,
+        skip_vendors: Iterable[str] = (),
+        accept: Optional[Callable[[Hit], bool]] = None,
+    ) -> dict[str, Hit]:
+        """First accepted hit per vendor, trying patterns in table order.
+
+        Args:
+            source: Which table to match.
+            skip_vendors: Vendors to ignore (e.g. already detected).
+            accept: Optional filter (e.g. a false-positive check); a
+                rejected occurrence moves on to the pattern's next one.
+
+        Returns:
+            {vendor: Hit} in table order.
+        """
+        skip = set(skip_vendors)
+        found: dict[str, Hit] = {}
+        for vendor, fingerprints in self._candidates(source):
+            if vendor in skip:
+                continue
+            for fingerprint in fingerprints:
+                hit = next((h for h in self._hits(fingerprint) if accept is None or accept(h)), None)
+                if hit is not None:
+                    found[vendor] = hit
+                    break
+        return found
+
+    def hits(self, source: Optional[str] = None) -> list[Hit]:
+        """Every occurrence of every pattern (optionally one source), by offset."""
+        sources = [source] if source else self._matcher.sources
+        all_hits = [
+            hit
+            for s in sources
+            for _, fingerprints in self._candidates(s)
+            for fingerprint in fingerprints
+            for hit in self._hits(fingerprint)
+        ]
+        return sorted(all_hits, key=lambda h: (h.start, h.end))
+
+    def context(self, hit: Hit, width: int = 30) -> str:
+        """Text around a hit, for false-positive checks."""
+        return self.text[max(0, hit.start - width):hit.end + width]
+
+
+class StreamScan(PageScan):
+    """PageScan over text fed in chunks; every PageScan query sees the text so far."""
+
+    def __init__(self, matcher: FingerprintMatcher):
+        super().__init__(matcher, "")
+        self._overlap = max(matcher.max_anchor_len - 1, 0)
+
+    def feed(self, text: str) -> bool:
+        """Append text; True if it brought in an anchor not seen before."""
+        if not text:
+            return False
+        start = max(len(self.text) - self._overlap, 0)
+        self.text += text
+        found = self._matcher.anchors_present(self.text[start:])
+        new = found - self._present
+        self._present |= new
+        return bool(new)
+
+
+# ── Host-suffix index ──────────────────────────────────────────────
+
+_HOST_CHARS = re.compile(r"^[a-z0-9.-]+$")
+
+
+@dataclass(frozen=True)
+class _HostEntry:
+    vendor: str
+    pattern: str
+    order: int
+    confirm: Optional[re.Pattern]  # None when the suffix match is the whole test
+
+
+def _literal_runs(pattern: str) -> tuple[str, bool]:
+    """Trailing literal run of pattern, and whether the pattern is all literal."""
+    run, all_literal = "", True
+    for op, av in sre_parse.parse(pattern, re.IGNORECASE):
+        if op is sre_parse.LITERAL:
+            run += chr(av)
+        else:
+            run, all_literal = "", False
+    return run.lower(), all_literal
+
+
+def host_suffix(pattern: str) -> tuple[str, bool]:
+    """Host suffix a pattern requires, and whether a regex must confirm it.
+
+    ``blend\\.com`` -> ("blend.com", False); ``elliemae\\.com/static`` and
+    ``(?:cdn|static)\\.floify\\.com`` -> (suffix, True). Patterns that don't
+    end in a dotted host name (``encompass``) return ("", True).
+    """
+    run, all_literal = _literal_runs(pattern)
+    host, slash, _ = run.partition("/")
+    if slash and not all_literal:
+        return "", True
+    suffix = host.strip(".")
+    if "." not in suffix or not _HOST_CHARS.match(suffix):
+        return "", True
+    # A leading "." or a path still needs the regex; a bare host does not
+    return suffix, not (all_literal and not slash and not host.startswith("."))
+
+
+def hostname_of(value: str) -> str:
+    """Lowercase hostname of a URL, host[:port], or certificate name."""
+    value = value.strip().lower()
+    if "://" in value:
+        try:
+            value = urlsplit(value).hostname or ""
+        except ValueError:
+            return ""
+    else:
+        value = value.split("/", 1)[0].rsplit("@", 1)[-1].split(":", 1)[0]
+    return value.removeprefix("*.").rstrip(".")
+
+
+class HostIndex:
+    """Reverse-label suffix trie over host fingerprints.
+
+    Args:
+        tables: {source: {vendor: [pattern, ...]}}, e.g. "cname", "redirect", "ssl".
+    """
+
+    def __init__(self, tables: dict[str, dict[str, list[str]]]):
+        self._tries: dict[str, dict] = {}
+        self._unindexed: dict[str, list[_HostEntry]] = {}
+        for source, vendors in tables.items():
+            trie: dict = {}
+            order = 0
+            for vendor, patterns in vendors.items():
+                for pattern in patterns:
+                    suffix, needs_regex = host_suffix(pattern)
+                    entry = _HostEntry(
+                        vendor=vendor,
+                        pattern=pattern,
+                        order=order,
+                        confirm=re.compile(pattern, re.IGNORECASE) if needs_regex else None,
+                    )
+                    order += 1
+                    if not suffix:
+                        self._unindexed.setdefault(source, []).append(entry)
+                        continue
+                    node = trie
+                    for label in reversed(suffix.split(".")):
+                        node = node.setdefault(label, {})
+                    node.setdefault("", []).append(entry)
+            self._tries[source] = trie
+
+    def match(self, value: str, source: str) -> list[tuple[str, str]]:
+        """(vendor, pattern) pairs matching a URL or hostname, in table order."""
+        entries: list[_HostEntry] = list(self._unindexed.get(source, []))
+        node = self._tries.get(source, {})
+        for label in reversed(hostname_of(value).split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            entries.extend(node.get("", []))
+        matched = [e for e in entries if e.confirm is None or e.confirm.search(value)]
+        return [(e.vendor, e.pattern) for e in sorted(matched, key=lambda e: e.order)]
@@ -0,0 +1,209 @@
+"""Persistent POS/LOS detection results with freshness-based rescans.
+
+Every batch used to rescan each lender from scratch, although a
+high-confidence Encompass detection from last month is almost certainly
+still true. ``ResultStore`` keeps the latest result per normalized domain
+in a local SQLite file. Each row holds the detections with their evidence,
+per-layer timestamps, the fingerprint-DB version that produced it, and
+the time of the scan.
+
+``RescanPolicy`` decides what is still fresh. It uses a TTL per result
+level (the best detection confidence, or "none"/"error" when nothing was
+found):
+
+    high 90d · medium 30d · low 14d · none 7d · error 1d
+
+A batch run with a store scans only the stale domains and serves the rest
+from the store.
+
+Usage:
+    store = ResultStore()
+    results = detect_batch(domains, store=store)            # skips fresh domains
+    fresh, stale = store.partition(domains, RescanPolicy(ttl_days={"none": 1}))
+
+    python -m outreach_intel.pos_los_detector -f lenders.txt --store
+"""
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .pos_los_detector import CONFIDENCE_RANK, FINGERPRINT_VERSION, DomainResult, normalize_domain
+
+STORE_PATH = Path(__file__).parent.parent / "exports" / "detector" / "results.sqlite3"
+
+DEFAULT_TTL_DAYS = {"high": 90, "medium": 30, "low": 14, "none": 7, "error": 1}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    domain TEXT PRIMARY KEY,
+    scanned_at TEXT NOT NULL,
+    level TEXT NOT NULL,
+    fingerprint_version TEXT NOT NULL,
+    layers TEXT NOT NULL,
+    result TEXT NOT NULL
+)
+"""
+
+
+def result_level(result: DomainResult) -> str:
+    """Best detection confidence, else "error" if a layer failed, else "none"."""
+    if result.detections:
+        return max((d.confidence for d in result.detections), key=lambda c: CONFIDENCE_RANK.get(c, 0))
+    return "error" if result.errors else "none"
+
+
+@dataclass
+class StoredResult:
+    """One row of the store."""
+
+    result: DomainResult
+    scanned_at: datetime
+    level: str
+
+    @property
+    def domain(self) -> str:
+        return self.result.domain
+
+    @property
+    def fingerprint_version(self) -> str:
+        return self.result.fingerprint_version
+
+
+@dataclass(frozen=True)
+class RescanPolicy:
+    """Which stored results are stale enough to re-probe.
+
+    Args:
+        ttl_days: Days a result stays fresh, per level. Missing levels use
+            DEFAULT_TTL_DAYS.
+        rescan_on_new_fingerprints: Also treat results produced by an older
+            fingerprint DB as stale.
+    """
+
+    ttl_days: dict[str, float] = field(default_factory=dict)
+    rescan_on_new_fingerprints: bool = False
+
+    def ttl(self, level: str) -> timedelta:
+        days = self.ttl_days.get(level, DEFAULT_TTL_DAYS.get(level, 0))
+        return timedelta(days=days)
+
+    def is_fresh(self, record: StoredResult, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now(timezone.utc)
+        if self.rescan_on_new_fingerprints and record.fingerprint_version != FINGERPRINT_VERSION:
+            return False
+        return now - record.scanned_at < self.ttl(record.level)
+
+
+DEFAULT_RESCAN_POLICY = RescanPolicy()
+
+# Nothing is fresh: rescan everything (results are still written back)
+RESCAN_ALL = RescanPolicy(ttl_days=dict.fromkeys(DEFAULT_TTL_DAYS, 0))
+
+
+class ResultStore:
+    """Latest detection result per normalized domain, in SQLite.
+
+    Safe to share between threads (the async engine's callbacks and the
+    thread engine's pool); writes are serialized with a lock.
+    """
+
+    def __init__(self, path: Path = STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @staticmethod
+    def _row_to_record(row: tuple) -> StoredResult:
+        scanned_at, level, result_json = row
+        return StoredResult(
+            result=DomainResult.from_dict(json.loads(result_json)),
+            scanned_at=datetime.fromisoformat(scanned_at),
+            level=level,
+        )
+
+    def get(self, domain: str) -> Optional[StoredResult]:
+        return self.get_many([domain]).get(normalize_domain(domain))
+
+    def get_many(self, domains: Iterable[str]) -> dict[str, StoredResult]:
+        """{normalized domain: record} for the domains that have one."""
+        keys = list(dict.fromkeys(normalize_domain(d) for d in domains))
+        records: dict[str, StoredResult] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    "SELECT domain, scanned_at, level, result FROM results "
+                    f"WHERE domain IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for domain, *rest in rows:
+                    records[domain] = self._row_to_record(tuple(rest))
+        return records
+
+    def put(self, result: DomainResult, scanned_at: Optional[datetime] = None) -> None:
+        self.put_many([result], scanned_at)
+
+    def put_many(self, results: Iterable[DomainResult], scanned_at: Optional[datetime] = None) -> None:
+        """Insert or replace the stored result for each domain."""
+        scanned_at = scanned_at or datetime.now(timezone.utc)
+        rows = [
+            (
+                normalize_domain(r.domain),
+                scanned_at.isoformat(),
+                result_level(r),
+                r.fingerprint_version or FINGERPRINT_VERSION,
+                json.dumps(r.layers),
+                json.dumps(r.to_dict()),
+            )
+            for r in results
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(domain, scanned_at, level, fingerprint_version, layers, result) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def partition(
+        self,
+        domains: Iterable[str],
+        policy: Optional[RescanPolicy] = None,
+        now: Optional[datetime] = None,
+    ) -> tuple[dict[str, StoredResult], list[str]]:
+        """Split domains into fresh stored records and domains to (re)scan.
+
+        Domains are normalized and deduplicated; the stale list keeps input
+        order.
+        """
+        policy = policy or DEFAULT_RESCAN_POLICY
+        now = now or datetime.now(timezone.utc)
+        keys = list(dict.fromkeys(normalize_domain(d) for d in domains))
+        stored = self.get_many(keys)
+        fresh = {d: rec for d, rec in stored.items() if policy.is_fresh(rec, now)}
+        return fresh, [d for d in keys if d not in fresh]
@@ -0,0 +1,215 @@
+"""Per-layer telemetry for the POS/LOS detector, and adaptive layer plans.
+
+Until now nothing showed which detection layer earns its latency. Every
+layer run now records a ``LayerRun``:
+
+  - wall time from layer start to finish (or cancellation)
+  - body bytes fetched (attributed to the layer that requested the page)
+  - hits by confidence and the vendors found
+  - how many final vendors only this layer found ("sole source")
+  - whether it produced the domain's first high-confidence hit
+
+``BatchTelemetry`` aggregates the runs of a batch into a JSON report.
+
+``plan_layers`` turns a report into an ordered layer list for
+``DetectionPolicy.layers``:
+
+  - A layer with enough runs that never was the sole source of a vendor
+    is skipped (SSL, say, if every cert vendor also shows up in DNS).
+  - The remaining layers are ordered by high-confidence hit rate per
+    second, which minimizes expected time to the first high-confidence
+    hit. In the async engine, earlier layers get the per-domain probe
+    slots first.
+  - Layers with too few runs in the report are kept and tried first. A
+    run using a plan therefore produces a report that re-includes any
+    skipped layer next time, so skips are re-checked every other batch.
+
+This module is pure (no detector imports); detections are anything with
+``vendor`` and ``confidence`` attributes.
+
+Usage:
+    telemetry = BatchTelemetry()
+    detect_batch(domains, progress_callback=lambda i, n, d, r: telemetry.add(r))
+    telemetry.write(Path("exports/detector/telemetry.json"))
+
+    python -m outreach_intel.pos_los_detector -f lenders.txt --telemetry report.json
+    python -m outreach_intel.pos_los_detector -f lenders.txt --adaptive report.json
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean
+from typing import Any, Iterable, Optional
+
+CONFIDENCES = ("high", "medium", "low")
+
+# Runs a layer needs in a report before the plan may skip it
+MIN_RUNS = 50
+
+
+@dataclass
+class LayerRun:
+    """One layer's run against one domain."""
+
+    layer: str
+    status: str = "ok"  # ok, error, cancelled
+    seconds: float = 0.0
+    bytes: int = 0
+    hits: dict[str, int] = field(default_factory=dict)
+    vendors: list[str] = field(default_factory=list)
+    sole_source: int = 0
+    first_high: bool = False
+
+
+def layer_run(layer: str, detections: Iterable[Any], seconds: float, bytes_read: int = 0, status: str = "ok") -> LayerRun:
+    """LayerRun from the detections a layer returned."""
+    run = LayerRun(layer=layer, status=status, seconds=round(seconds, 4), bytes=bytes_read)
+    for det in detections:
+        run.hits[det.confidence] = run.hits.get(det.confidence, 0) + 1
+        if det.vendor not in run.vendors:
+            run.vendors.append(det.vendor)
+    return run
+
+
+def finalize_runs(runs: list[LayerRun]) -> dict[str, dict[str, Any]]:
+    """Fill in sole-source counts and the first high hit; {layer: run dict}.
+
+    ``runs`` must be in finishing order so the first run with a high hit
+    is the one that produced it first.
+    """
+    found_by: dict[str, list[str]] = {}
+    for run in runs:
+        for vendor in run.vendors:
+            found_by.setdefault(vendor, []).append(run.layer)
+    for run in runs:
+        run.sole_source = sum(1 for v in run.vendors if found_by[v] == [run.layer])
+    first = next((run for run in runs if run.hits.get("high")), None)
+    if first is not None:
+        first.first_high = True
+    return {run.layer: asdict(run) for run in runs}
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class BatchTelemetry:
+    """Aggregates per-domain layer runs across a batch."""
+
+    def __init__(self) -> None:
+        self.domains = 0
+        self._runs: dict[str, list[dict[str, Any]]] = {}
+
+    def add(self, result: Any) -> None:
+        """Add a DomainResult (anything with a ``telemetry`` dict)."""
+        if not result.telemetry:
+            return
+        self.domains += 1
+        for layer, run in result.telemetry.items():
+            self._runs.setdefault(layer, []).append(run)
+
+    def report(self) -> dict[str, Any]:
+        layers: dict[str, Any] = {}
+        for layer, runs in self._runs.items():
+            finished = [r for r in runs if r["status"] == "ok"]
+            seconds = [r["seconds"] for r in finished]
+            layers[layer] = {
+                "runs": len(finished),
+                "errors": sum(1 for r in runs if r["status"] == "error"),
+                "cancelled": sum(1 for r in runs if r["status"] == "cancelled"),
+                "seconds_total": round(sum(r["seconds"] for r in runs), 3),
+                "seconds_mean": round(mean(seconds), 4) if seconds else 0.0,
+                "seconds_p50": _percentile(seconds, 50),
+                "seconds_p95": _percentile(seconds, 95),
+                "bytes_total": sum(r["bytes"] for r in runs),
+                "hits": {c: sum(r["hits"].get(c, 0) for r in runs) for c in CONFIDENCES},
+                "domains_with_hits": sum(1 for r in runs if r["vendors"]),
+                "domains_with_high": sum(1 for r in runs if r["hits"].get("high")),
+                "sole_source": sum(r["sole_source"] for r in runs),
+                "domains_sole_source": sum(1 for r in runs if r["sole_source"]),
+                "first_high": sum(1 for r in runs if r["first_high"]),
+            }
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "domains": self.domains,
+            "layers": layers,
+        }
+
+    def write(self, path: Path) -> dict[str, Any]:
+        """Write the report as JSON (atomic replace); returns it."""
+        report = self.report()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, path)
+        return report
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Plain-text table of a report, one row per layer."""
+    lines = [
+        f"{'Layer':<10} {'Runs':>6} {'Cancel':>6} {'Mean s':>8} {'p95 s':>8} {'MB':>8} "
+        f"{'High':>6} {'Med':>6} {'Low':>6} {'Sole':>6} {'First':>6}",
+        "-" * 88,
+    ]
+    for layer, st in report["layers"].items():
+        lines.append(
+            f"{layer:<10} {st['runs']:>6} {st['cancelled']:>6} {st['seconds_mean']:>8.3f} "
+            f"{st['seconds_p95']:>8.3f} {st['bytes_total'] / 1e6:>8.2f} "
+            f"{st['hits']['high']:>6} {st['hits']['medium']:>6} {st['hits']['low']:>6} "
+            f"{st['domains_sole_source']:>6} {st['first_high']:>6}"
+        )
+    return "\n".join(lines)
+
+
+def load_report(path: Path) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def plan_layers(
+    report: dict[str, Any],
+    free_layers: Iterable[str],
+    paid_layers: Iterable[str] = ("firecrawl",),
+    min_runs: int = MIN_RUNS,
+) -> tuple[str, ...]:
+    """Ordered layers worth running, from a telemetry report.
+
+    Args:
+        report: Output of ``BatchTelemetry.report``.
+        free_layers: Layers that may be reordered, in default order.
+        paid_layers: Layers that always run after the free ones (kept or
+            skipped, never reordered).
+        min_runs: Runs a layer needs before it can be skipped.
+    """
+    stats = report.get("layers", {})
+
+    def proven_useless(layer: str) -> bool:
+        st = stats.get(layer)
+        return bool(st) and st["runs"] >= min_runs and st["domains_sole_source"] == 0
+
+    def score(layer: str) -> float:
+        st = stats.get(layer)
+        if not st or st["runs"] < min_runs:
+            return float("inf")  # Not enough data: explore
+        return st["domains_with_high"] / st["runs"] / max(st["seconds_mean"], 1e-3)
+
+    free = list(free_layers)
+    kept = [layer for layer in free if not proven_useless(layer)] or free
+    ordered = sorted(kept, key=lambda layer: (-score(layer), free.index(layer)))
+    return (*ordered, *(layer for layer in paid_layers if not proven_useless(layer)))
+
+
+def adaptive_layers(report_path: Optional[Path], free_layers: Iterable[str], min_runs: int = MIN_RUNS) -> Optional[tuple[str, ...]]:
+    """``plan_layers`` for a report file, or None when there is no report yet."""
+    if report_path is None or not Path(report_path).exists():
+        return None
+    return plan_layers(load_report(report_path), free_layers, min_runs=min_runs)
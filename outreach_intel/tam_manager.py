@@ -11,10 +11,15 @@ Usage:
     python -m outreach_intel.cli tam-waves --wave-size 2500 --cycle-days 45
 """
 
+import json
 import math
+import threading
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
 
 from .config import (
     DEFAULT_CONTACT_PROPERTIES,
@@ -56,6 +61,15 @@ TAM_PROPERTIES = DEFAULT_CONTACT_PROPERTIES + [
     "outreach_wave_angle",
 ]
 
+# Outreach statuses that keep a contact out of the next wave
+WAVE_INELIGIBLE_STATUSES = ("active", "unsubscribed", "customer")
+
+# Label used for contacts with no sales_vertical set
+NO_VERTICAL = "(no vertical)"
+
+# Where extracted TAM files are written
+TAM_DIR = Path(__file__).parent.parent / "exports" / "tam"
+
 # Base filters used across all TAM/wave queries
 BASE_FILTERS = [
     {
@@ -72,14 +86,30 @@ BASE_FILTERS = [
 
 @dataclass
 class TAMReport:
-    """Summary of the total addressable market."""
+    """Summary of the total addressable market.
+
+    Contact records are not held in memory; they are streamed to the JSONL
+    file at ``contacts_path`` as pages arrive. Use ``iter_contacts`` to read
+    them back. Full (unfiltered) extractions also write a versioned snapshot
+    to ``snapshot_path`` (see tam_snapshot.py).
+    """
 
     total: int
     by_vertical: dict[str, int] = field(default_factory=dict)
     by_persona: dict[str, int] = field(default_factory=dict)
     by_outreach_status: dict[str, int] = field(default_factory=dict)
     wave_eligible: int = 0
-    contacts: list[dict[str, Any]] = field(default_factory=list)
+    contacts_path: Optional[str] = None
+    snapshot_path: Optional[str] = None
+
+    def iter_contacts(self) -> Iterator[dict[str, Any]]:
+        """Yield the extracted contact records one at a time."""
+        if not self.contacts_path:
+            return
+        with open(self.contacts_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
 
 
 def classify_persona(jobtitle: str) -> str:
@@ -94,20 +124,20 @@ def classify_persona(jobtitle: str) -> str:
     return "other"
 
 
-def _paginated_search(
+def _iter_search_pages(
     hs: HubSpotClient,
     filters: list[dict],
     properties: list[str],
     max_results: int = 10000,
-) -> list[dict[str, Any]]:
-    """Run a paginated HubSpot search up to max_results.
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield pages of a HubSpot search until max_results are seen.
 
     Uses the paging cursor from the response (not contact IDs).
     """
-    collected: list[dict[str, Any]] = []
+    seen = 0
     after = None
 
-    while len(collected) < max_results:
+    while seen < max_results:
         body: dict[str, Any] = {
             "limit": 100,
             "properties": properties,
@@ -122,7 +152,9 @@ def _paginated_search(
         if not results:
             break
 
-        collected.extend(results)
+        results = results[:max_results - seen]
+        seen += len(results)
+        yield results
 
         paging = response.get("paging", {})
         after = paging.get("next", {}).get("after")
@@ -130,6 +162,17 @@ def _paginated_search(
         if not after or len(results) < 100:
             break
 
+
+def _paginated_search(
+    hs: HubSpotClient,
+    filters: list[dict],
+    properties: list[str],
+    max_results: int = 10000,
+) -> list[dict[str, Any]]:
+    """Run a paginated HubSpot search up to max_results."""
+    collected: list[dict[str, Any]] = []
+    for page in _iter_search_pages(hs, filters, properties, max_results):
+        collected.extend(page)
     return collected
 
 
@@ -144,123 +187,182 @@ def _count_segment(hs: HubSpotClient, extra_filters: list[dict]) -> int:
     return response.get("total", 0)
 
 
+def _vertical_segments(verticals: Optional[list[str]]) -> list[tuple[str, list[dict]]]:
+    """Build (label, filters) pairs for each vertical segment to query.
+
+    Untagged contacts are only included when querying all verticals.
+    """
+    segments = [
+        (v, [{"propertyName": "sales_vertical", "operator": "EQ", "value": v}])
+        for v in (verticals or ALL_VERTICALS)
+    ]
+    if not verticals:
+        segments.append(
+            (NO_VERTICAL, [{"propertyName": "sales_vertical", "operator": "NOT_HAS_PROPERTY"}])
+        )
+    return segments
+
+
+class _TAMAggregator:
+    """Thread-safe counters and JSONL sink fed page by page."""
+
+    def __init__(self, personas: Optional[list[str]], sink: Optional[IO[str]]):
+        self.personas = personas
+        self.sink = sink
+        self.vertical_counts: Counter[str] = Counter()
+        self.persona_counts: Counter[str] = Counter()
+        self.status_counts: Counter[str] = Counter()
+        self.wave_eligible = 0
+        self._lock = threading.Lock()
+
+    def add_count(self, vertical: str, count: int) -> None:
+        """Record a count-only segment (all non-excluded are eligible)."""
+        with self._lock:
+            self.vertical_counts[vertical] += count
+            self.wave_eligible += count
+
+    def add_page(self, vertical: str, page: list[dict[str, Any]]) -> int:
+        """Classify one page of contacts and spill the kept ones to disk.
+
+        Returns:
+            Number of contacts kept after the persona filter
+        """
+        personas: Counter[str] = Counter()
+        statuses: Counter[str] = Counter()
+        eligible = 0
+        lines: list[str] = []
+
+        for contact in page:
+            props = contact.get("properties", {})
+            persona = classify_persona(props.get("jobtitle", ""))
+            if self.personas and persona not in self.personas:
+                continue
+            outreach_status = props.get("outreach_status") or "none"
+            personas[persona] += 1
+            statuses[outreach_status] += 1
+            if outreach_status not in WAVE_INELIGIBLE_STATUSES:
+                eligible += 1
+            if self.sink is not None:
+                lines.append(json.dumps(contact, separators=(",", ":")) + "\n")
+
+        kept = sum(personas.values())
+        with self._lock:
+            self.vertical_counts[vertical] += kept
+            self.persona_counts.update(personas)
+            self.status_counts.update(statuses)
+            self.wave_eligible += eligible
+            if lines:
+                self.sink.writelines(lines)
+        return kept
+
+
+def _extract_segment(
+    hs: HubSpotClient,
+    vertical: str,
+    segment_filters: list[dict],
+    aggregator: _TAMAggregator,
+    count_only: bool,
+) -> int:
+    """Stream one vertical segment into the aggregator."""
+    if count_only:
+        count = _count_segment(hs, segment_filters)
+        aggregator.add_count(vertical, count)
+        return count
+
+    kept = 0
+    for page in _iter_search_pages(
+        hs,
+        filters=BASE_FILTERS + segment_filters,
+        properties=TAM_PROPERTIES,
+    ):
+        kept += aggregator.add_page(vertical, page)
+    return kept
+
+
 def extract_tam(
     client: Optional[HubSpotClient] = None,
     verticals: Optional[list[str]] = None,
     personas: Optional[list[str]] = None,
     count_only: bool = False,
+    contacts_path: Optional[str] = None,
+    max_workers: int = 4,
+    write_snapshot: bool = True,
+    snapshot_dir: Optional[Path] = None,
 ) -> TAMReport:
     """Pull the full TAM from HubSpot with breakdowns.
 
-    Queries each vertical separately to bypass the 10K search limit.
-    Use count_only=True for fast counts without fetching contact records.
+    Queries each vertical separately to bypass the 10K search limit. Segments
+    are fetched concurrently (paced by the client's shared rate limiter) and
+    counters are aggregated page by page, so memory stays bounded regardless
+    of TAM size. Use count_only=True for fast counts without fetching contact
+    records.
 
     Args:
         client: HubSpot client (creates one if not provided)
         verticals: Filter to specific verticals (e.g. ["Bank", "IMB"])
         personas: Filter to specific personas (e.g. ["coo_ops", "cfo"])
         count_only: If True, only return counts (much faster for large TAMs)
+        contacts_path: JSONL file to stream contacts into (defaults to a
+            timestamped file under exports/tam/)
+        max_workers: Number of segments fetched in parallel
+        write_snapshot: Write a new TAM snapshot version after a full pull
+        snapshot_dir: Override the snapshot directory (defaults to
+            exports/tam/snapshots/)
 
     Returns:
-        TAMReport with counts, breakdowns, and optionally raw contacts
+        TAMReport with counts, breakdowns, and the contacts file path
     """
     hs = client or HubSpotClient()
+    segments = _vertical_segments(verticals)
+    started = datetime.now(timezone.utc)
 
-    # Determine which verticals to query
-    target_verticals = verticals or ALL_VERTICALS
-    include_no_vertical = not verticals  # Only include untagged contacts when querying all
+    sink: Optional[IO[str]] = None
+    if not count_only:
+        if contacts_path is None:
+            TAM_DIR.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            contacts_path = str(TAM_DIR / f"tam_contacts_{stamp}.jsonl")
+        sink = open(contacts_path, "w", encoding="utf-8")
 
-    vertical_counts: Counter[str] = Counter()
-    persona_counts: Counter[str] = Counter()
-    status_counts: Counter[str] = Counter()
-    wave_eligible_count = 0
-    all_contacts: list[dict[str, Any]] = []
+    aggregator = _TAMAggregator(personas, sink)
 
     print("Extracting TAM from HubSpot (by vertical segment)...", flush=True)
 
-    for vertical in target_verticals:
-        vertical_filter = [
-            {"propertyName": "sales_vertical", "operator": "EQ", "value": vertical},
-        ]
-
-        if count_only:
-            count = _count_segment(hs, vertical_filter)
-            vertical_counts[vertical] = count
-            wave_eligible_count += count  # Approximate — all non-excluded are eligible
-            print(f"  {vertical:<25} {count:>7,}", flush=True)
-        else:
-            segment = _paginated_search(
-                hs,
-                filters=BASE_FILTERS + vertical_filter,
-                properties=TAM_PROPERTIES,
-            )
-            print(f"  {vertical:<25} {len(segment):>7,}", flush=True)
-
-            for contact in segment:
-                props = contact.get("properties", {})
-                persona = classify_persona(props.get("jobtitle", ""))
-                outreach_status = props.get("outreach_status") or "none"
-
-                if personas and persona not in personas:
-                    continue
-
-                vertical_counts[vertical] += 1
-                persona_counts[persona] += 1
-                status_counts[outreach_status] += 1
-
-                if outreach_status not in ("active", "unsubscribed", "customer"):
-                    wave_eligible_count += 1
-
-                all_contacts.append(contact)
-
-    # Query contacts with no vertical set
-    if include_no_vertical:
-        no_vertical_filter = [
-            {"propertyName": "sales_vertical", "operator": "NOT_HAS_PROPERTY"},
-        ]
-
-        if count_only:
-            count = _count_segment(hs, no_vertical_filter)
-            vertical_counts["(no vertical)"] = count
-            wave_eligible_count += count
-            print(f"  {'(no vertical)':<25} {count:>7,}", flush=True)
-        else:
-            segment = _paginated_search(
-                hs,
-                filters=BASE_FILTERS + no_vertical_filter,
-                properties=TAM_PROPERTIES,
-            )
-            print(f"  {'(no vertical)':<25} {len(segment):>7,}", flush=True)
-
-            for contact in segment:
-                props = contact.get("properties", {})
-                persona = classify_persona(props.get("jobtitle", ""))
-                outreach_status = props.get("outreach_status") or "none"
-
-                if personas and persona not in personas:
-                    continue
-
-                vertical_counts["(no vertical)"] += 1
-                persona_counts[persona] += 1
-                status_counts[outreach_status] += 1
-
-                if outreach_status not in ("active", "unsubscribed", "customer"):
-                    wave_eligible_count += 1
-
-                all_contacts.append(contact)
-
-    total = sum(vertical_counts.values())
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_extract_segment, hs, label, filters, aggregator, count_only): label
+                for label, filters in segments
+            }
+            for future in as_completed(futures):
+                print(f"  {futures[future]:<25} {future.result():>7,}", flush=True)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    total = sum(aggregator.vertical_counts.values())
     print(f"  {'TOTAL':<25} {total:>7,}", flush=True)
 
-    return TAMReport(
+    report = TAMReport(
         total=total,
-        by_vertical=dict(vertical_counts.most_common()),
-        by_persona=dict(persona_counts.most_common()),
-        by_outreach_status=dict(status_counts.most_common()),
-        wave_eligible=wave_eligible_count,
-        contacts=all_contacts,
+        by_vertical=dict(aggregator.vertical_counts.most_common()),
+        by_persona=dict(aggregator.persona_counts.most_common()),
+        by_outreach_status=dict(aggregator.status_counts.most_common()),
+        wave_eligible=aggregator.wave_eligible,
+        contacts_path=None if count_only else contacts_path,
     )
 
+    # Only a full pull is a valid base for delta refreshes
+    if write_snapshot and not count_only and not verticals and not personas:
+        from .tam_snapshot import SNAPSHOT_DIR, save_new_version
+
+        report.snapshot_path = str(save_new_version(
+            report.iter_contacts(), as_of=started, directory=snapshot_dir or SNAPSHOT_DIR,
+        ))
+        print(f"  Snapshot written to {report.snapshot_path}", flush=True)
+
+    return report
+
 
 def calculate_waves(
     tam_size: int,
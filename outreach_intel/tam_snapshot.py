@@ -0,0 +1,483 @@
+"""Versioned, memory-mappable TAM snapshots with delta refresh.
+
+A snapshot is the full TAM as of a point in time, stored column by column
+so analyses (breakdowns, wave sizing, wave planning) can read it via mmap
+without touching HubSpot. ``refresh_snapshot`` pulls only contacts modified
+since the previous snapshot and writes the next version.
+
+File layout (all integers little-endian):
+    8 bytes   magic ``TAMSNAP1``
+    4 bytes   header length (uint32)
+    N bytes   JSON header (version, as_of, rows, column descriptors)
+    ...       column blocks, each 8-byte aligned
+
+Low-cardinality columns (vertical, persona, status, angle, lifecycle stage)
+are dictionary-encoded into uint8/uint16 code arrays. Everything else is an
+offsets array (uint32) plus a UTF-8 blob. Blocks are left uncompressed on
+purpose so they can be mapped straight into memory.
+
+Usage:
+    python -m outreach_intel.cli tam               # full pull, writes v1
+    python -m outreach_intel.cli tam-refresh       # deltas only, writes v2
+    python -m outreach_intel.cli tam --from-snapshot
+"""
+
+import json
+import mmap
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from .config import EXCLUDED_LIFECYCLE_STAGES
+from .hubspot_client import HubSpotClient
+from .tam_manager import (
+    ALL_VERTICALS,
+    NO_VERTICAL,
+    TAM_DIR,
+    TAM_PROPERTIES,
+    WAVE_INELIGIBLE_STATUSES,
+    TAMReport,
+    classify_persona,
+)
+
+
+MAGIC = b"TAMSNAP1"
+SNAPSHOT_DIR = TAM_DIR / "snapshots"
+
+# Columns stored in every snapshot ("persona" is derived from jobtitle)
+SNAPSHOT_COLUMNS = ["id"] + TAM_PROPERTIES + ["persona"]
+
+# Columns worth dictionary-encoding when their cardinality allows it
+DICT_COLUMNS = {
+    "sales_vertical",
+    "persona",
+    "outreach_status",
+    "outreach_wave_angle",
+    "lifecyclestage",
+    "hs_lead_status",
+    "industry",
+    "mortgage_los__new_",
+    "mortgage_pos__new_",
+    "last_outreach_wave_date",
+    "outreach_wave_count",
+}
+
+# Re-fetch a little before the previous as_of to absorb clock skew
+REFRESH_OVERLAP = timedelta(minutes=10)
+
+_VERSION_RE = re.compile(r"^tam-v(\d+)\.snap$")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def in_tam(props: dict[str, Any]) -> bool:
+    """Whether a contact's properties put it inside the TAM (BASE_FILTERS)."""
+    if not props.get("email"):
+        return False
+    if props.get("lifecyclestage") in EXCLUDED_LIFECYCLE_STAGES:
+        return False
+    vertical = props.get("sales_vertical")
+    return not vertical or vertical in ALL_VERTICALS
+
+
+# ── Writing ─────────────────────────────────────────────────────────
+
+
+def _encode_column(name: str, values: list[str]) -> tuple[dict[str, Any], list[bytes]]:
+    """Encode one column, returning its descriptor and raw blocks."""
+    if name in DICT_COLUMNS:
+        distinct = sorted(set(values))
+        if len(distinct) <= 0xFFFF:
+            code_of = {v: i for i, v in enumerate(distinct)}
+            typecode = "B" if len(distinct) <= 0xFF else "H"
+            codes = array(typecode, (code_of[v] for v in values))
+            if sys.byteorder != "little":
+                codes.byteswap()
+            return {"encoding": "dict", "typecode": typecode, "values": distinct}, [codes.tobytes()]
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for v in values:
+        blob += v.encode("utf-8")
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return {"encoding": "str"}, [offsets.tobytes(), bytes(blob)]
+
+
+def write_snapshot(
+    contacts: Iterable[dict[str, Any]],
+    path: Path,
+    version: int,
+    as_of: datetime,
+) -> Path:
+    """Write contacts (HubSpot records) as a columnar snapshot file.
+
+    Args:
+        contacts: Records with "id" and "properties"
+        path: Destination file
+        version: Snapshot version number
+        as_of: Time the underlying data was read from HubSpot
+
+    Returns:
+        The written path
+    """
+    columns: dict[str, list[str]] = {name: [] for name in SNAPSHOT_COLUMNS}
+    rows = 0
+    for contact in contacts:
+        props = contact.get("properties", {})
+        for name in TAM_PROPERTIES:
+            columns[name].append(props.get(name) or "")
+        columns["id"].append(str(contact.get("id", "")))
+        columns["persona"].append(classify_persona(props.get("jobtitle", "")))
+        rows += 1
+
+    descriptors: dict[str, dict[str, Any]] = {}
+    blocks: list[bytes] = []
+    offset = 0
+    for name in SNAPSHOT_COLUMNS:
+        descriptor, raw_blocks = _encode_column(name, columns.pop(name))
+        descriptor["blocks"] = []
+        for raw in raw_blocks:
+            descriptor["blocks"].append([offset, len(raw)])
+            padded = raw + b"\0" * (_align(len(raw)) - len(raw))
+            blocks.append(padded)
+            offset += len(padded)
+        descriptors[name] = descriptor
+
+    header = json.dumps({
+        "version": version,
+        "as_of": as_of.astimezone(timezone.utc).isoformat(),
+        "rows": rows,
+        "columns": descriptors,
+    }).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    prefix += b"\0" * (_align(len(prefix)) - len(prefix))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        for block in blocks:
+            f.write(block)
+    tmp_path.replace(path)
+    return path
+
+
+# ── Reading ─────────────────────────────────────────────────────────
+
+
+class _DictColumn(Sequence[str]):
+    """Dictionary-encoded column backed by a mapped code array."""
+
+    def __init__(self, codes: memoryview, values: list[str]):
+        self.codes = codes
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __iter__(self) -> Iterator[str]:
+        values = self.values
+        return (values[c] for c in self.codes)
+
+    def value_counts(self) -> Counter[str]:
+        return Counter({self.values[c]: n for c, n in Counter(self.codes).items()})
+
+
+class _StrColumn(Sequence[str]):
+    """Variable-length string column backed by mapped offsets + blob."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(len(self)))
+
+    def value_counts(self) -> Counter[str]:
+        return Counter(self)
+
+
+class TAMSnapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        if bytes(view[:8]) != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a TAM snapshot")
+        (header_len,) = struct.unpack_from("<I", view, 8)
+        header = json.loads(bytes(view[12:12 + header_len]))
+        base = _align(12 + header_len)
+
+        self.version: int = header["version"]
+        self.as_of = datetime.fromisoformat(header["as_of"])
+        self.rows: int = header["rows"]
+        self._columns: dict[str, Sequence[str]] = {}
+
+        for name, desc in header["columns"].items():
+            blocks = [view[base + off:base + off + length] for off, length in desc["blocks"]]
+            if sys.byteorder != "little":
+                # Mapped blocks can't be byteswapped in place; copy instead
+                blocks = [memoryview(self._swapped(b, desc)) for b in blocks]
+            if desc["encoding"] == "dict":
+                self._columns[name] = _DictColumn(blocks[0].cast(desc["typecode"]), desc["values"])
+            else:
+                self._columns[name] = _StrColumn(blocks[0].cast("I"), blocks[1])
+
+    @staticmethod
+    def _swapped(block: memoryview, desc: dict[str, Any]) -> bytes:
+        typecode = desc.get("typecode", "I")
+        arr = array(typecode, bytes(block))
+        arr.byteswap()
+        return arr.tobytes()
+
+    def __enter__(self) -> "TAMSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def close(self) -> None:
+        """Release the mapping (columns become invalid)."""
+        self._columns = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # A caller still holds a column view; GC will release it
+        self._file.close()
+
+    def column(self, name: str) -> Sequence[str]:
+        """Return a lazily-decoded column ("" means not set)."""
+        return self._columns[name]
+
+    def contact(self, i: int) -> dict[str, Any]:
+        """Rebuild row i as a HubSpot-style contact record."""
+        return {
+            "id": self._columns["id"][i],
+            "properties": {
+                name: self._columns[name][i] or None for name in TAM_PROPERTIES
+            },
+        }
+
+    def iter_contacts(self) -> Iterator[dict[str, Any]]:
+        """Yield every row as a HubSpot-style contact record."""
+        for i in range(self.rows):
+            yield self.contact(i)
+
+    def report(
+        self,
+        verticals: Optional[list[str]] = None,
+        personas: Optional[list[str]] = None,
+    ) -> TAMReport:
+        """Compute the same breakdowns as extract_tam, from the snapshot."""
+        vertical_col = self.column("sales_vertical")
+        persona_col = self.column("persona")
+        status_col = self.column("outreach_status")
+
+        if not verticals and not personas:
+            by_vertical = vertical_col.value_counts()
+            by_persona = persona_col.value_counts()
+            by_status = status_col.value_counts()
+        else:
+            by_vertical, by_persona, by_status = Counter(), Counter(), Counter()
+            for vertical, persona, status in zip(vertical_col, persona_col, status_col):
+                if verticals and vertical not in verticals:
+                    continue
+                if personas and persona not in personas:
+                    continue
+                by_vertical[vertical] += 1
+                by_persona[persona] += 1
+                by_status[status] += 1
+
+        if "" in by_vertical:
+            by_vertical[NO_VERTICAL] += by_vertical.pop("")
+        if "" in by_status:
+            by_status["none"] += by_status.pop("")
+
+        return TAMReport(
+            total=sum(by_vertical.values()),
+            by_vertical=dict(by_vertical.most_common()),
+            by_persona=dict(by_persona.most_common()),
+            by_outreach_status=dict(by_status.most_common()),
+            wave_eligible=sum(
+                n for s, n in by_status.items() if s not in WAVE_INELIGIBLE_STATUSES
+            ),
+        )
+
+
+# ── Versioning ──────────────────────────────────────────────────────
+
+
+def snapshot_path(version: int, directory: Path = SNAPSHOT_DIR) -> Path:
+    return directory / f"tam-v{version:05d}.snap"
+
+
+def list_snapshots(directory: Path = SNAPSHOT_DIR) -> list[tuple[int, Path]]:
+    """Return (version, path) for every snapshot, oldest first."""
+    if not directory.exists():
+        return []
+    found = []
+    for p in directory.iterdir():
+        m = _VERSION_RE.match(p.name)
+        if m:
+            found.append((int(m.group(1)), p))
+    return sorted(found)
+
+
+def open_latest_snapshot(directory: Path = SNAPSHOT_DIR) -> Optional[TAMSnapshot]:
+    """Open the newest snapshot, or None if none has been written yet."""
+    snapshots = list_snapshots(directory)
+    return TAMSnapshot(snapshots[-1][1]) if snapshots else None
+
+
+def save_new_version(
+    contacts: Iterable[dict[str, Any]],
+    as_of: datetime,
+    directory: Path = SNAPSHOT_DIR,
+    keep: int = 5,
+) -> Path:
+    """Write contacts as the next snapshot version and prune old ones."""
+    snapshots = list_snapshots(directory)
+    version = snapshots[-1][0] + 1 if snapshots else 1
+    path = write_snapshot(contacts, snapshot_path(version, directory), version, as_of)
+    for _, old in snapshots[:max(0, len(snapshots) + 1 - keep)]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+# ── Delta refresh ───────────────────────────────────────────────────
+
+
+def _iter_modified_since(
+    hs: HubSpotClient,
+    since: datetime,
+) -> Iterator[dict[str, Any]]:
+    """Yield every contact modified at or after `since`.
+
+    Sorts by lastmodifieddate and restarts the search from the last seen
+    timestamp whenever HubSpot's 10K result cap is reached.
+    """
+    since_ms = int(since.timestamp() * 1000)
+    properties = TAM_PROPERTIES + ["lastmodifieddate"]
+
+    while True:
+        after = None
+        fetched = 0
+        last_modified = None
+        while True:
+            body: dict[str, Any] = {
+                "limit": 100,
+                "properties": properties,
+                "filterGroups": [{"filters": [
+                    {"propertyName": "lastmodifieddate", "operator": "GTE", "value": str(since_ms)},
+                ]}],
+                "sorts": [{"propertyName": "lastmodifieddate", "direction": "ASCENDING"}],
+            }
+            if after:
+                body["after"] = after
+            response = hs.post("/crm/v3/objects/contacts/search", json_data=body)
+            results = response.get("results", [])
+            for contact in results:
+                yield contact
+                last_modified = contact.get("properties", {}).get("lastmodifieddate")
+            fetched += len(results)
+            after = response.get("paging", {}).get("next", {}).get("after")
+            if not after or not results:
+                return
+            if fetched >= 9900:
+                break
+
+        # Hit the search cap: restart from the last timestamp we saw
+        if not last_modified:
+            return
+        next_ms = int(datetime.fromisoformat(last_modified.replace("Z", "+00:00")).timestamp() * 1000)
+        if next_ms <= since_ms:
+            raise RuntimeError(
+                "More than 10K contacts share one lastmodifieddate; run a full `tam` extraction"
+            )
+        since_ms = next_ms
+
+
+def refresh_snapshot(
+    client: Optional[HubSpotClient] = None,
+    directory: Path = SNAPSHOT_DIR,
+) -> dict[str, Any]:
+    """Apply HubSpot changes since the latest snapshot and write the next version.
+
+    Contacts that left the TAM (new lifecycle stage, lost email, etc.) are
+    dropped; new and updated ones are upserted. Deleted contacts are not
+    reported by the search API and linger until the next full extraction.
+
+    Returns:
+        Dict with version, path, row count, and upserted/removed counts
+    """
+    hs = client or HubSpotClient()
+    base = open_latest_snapshot(directory)
+    if base is None:
+        raise FileNotFoundError("No TAM snapshot yet; run `tam` first for a full extraction")
+
+    started = datetime.now(timezone.utc)
+    since = base.as_of - REFRESH_OVERLAP
+    print(f"Refreshing TAM snapshot v{base.version} (changes since {since:%Y-%m-%d %H:%M} UTC)...", flush=True)
+
+    changed: dict[str, Optional[dict[str, Any]]] = {}
+    for contact in _iter_modified_since(hs, since):
+        props = contact.get("properties", {})
+        props.pop("lastmodifieddate", None)
+        changed[str(contact.get("id"))] = contact if in_tam(props) else None
+
+    base_ids = set(base.column("id"))
+    removed = sum(1 for cid, c in changed.items() if c is None and cid in base_ids)
+    upserted = sum(1 for c in changed.values() if c is not None)
+    print(f"  Changed: {upserted:,} upserted, {removed:,} left the TAM", flush=True)
+
+    def merged() -> Iterator[dict[str, Any]]:
+        ids = base.column("id")
+        for i in range(len(base)):
+            if ids[i] not in changed:
+                yield base.contact(i)
+        for contact in changed.values():
+            if contact is not None:
+                yield contact
+
+    try:
+        path = save_new_version(merged(), as_of=started, directory=directory)
+    finally:
+        base.close()
+
+    with TAMSnapshot(path) as snap:
+        rows, version = len(snap), snap.version
+    print(f"  Wrote v{version}: {rows:,} contacts -> {path}", flush=True)
+
+    return {
+        "version": version,
+        "path": str(path),
+        "rows": rows,
+        "upserted": upserted,
+        "removed": removed,
+    }
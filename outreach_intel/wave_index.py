@@ -0,0 +1,258 @@
+"""In-memory wave eligibility index over the TAM snapshot.
+
+Selecting a wave through HubSpot search means up to 2x(verticals+1)
+paginated queries plus client-side filtering that throws most of the
+download away. This index is built from the latest TAM snapshot (mmap, no
+API calls) and keeps one priority queue per vertical ordered by:
+
+    1. never contacted first
+    2. oldest last_outreach_wave_date
+    3. fewest waves
+    4. contact id (stable tiebreak)
+
+Because queues are ordered by last wave date, a scan stops at the first
+contact inside the cycle window. Angle history comes from HubSpot's
+``outreach_wave_angle`` plus the local wave ledger, which ``stamp_wave``
+appends to, so waves stamped after the snapshot are reflected immediately.
+
+Usage:
+    index = EligibilityIndex.from_latest()
+    contacts = index.select(wave_size=2500, angle="gse-compliance")
+    index.record_wave(ids, "gse-compliance")
+"""
+
+import json
+import math
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .tam_manager import NO_VERTICAL, TAM_DIR, WAVE_INELIGIBLE_STATUSES, classify_persona
+from .tam_snapshot import SNAPSHOT_DIR, TAMSnapshot, open_latest_snapshot
+
+
+# Append-only record of every wave stamped from this machine
+LEDGER_PATH = TAM_DIR / "wave_ledger.jsonl"
+
+
+@dataclass
+class _Entry:
+    """Eligibility state for one contact."""
+
+    contact: dict[str, Any]
+    vertical: str
+    persona: str
+    status: str
+    last_date: str
+    wave_count: int
+    angles: set[str] = field(default_factory=set)
+
+    @property
+    def key(self) -> tuple[str, int, str]:
+        # "" (never contacted) sorts before any ISO date
+        return (self.last_date, self.wave_count, self.contact["id"])
+
+
+def read_ledger(path: Path = LEDGER_PATH) -> list[dict[str, Any]]:
+    """Load stamped waves ({"date", "angle", "ids"}) oldest first."""
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_ledger(
+    contact_ids: list[str],
+    angle: str,
+    date: str,
+    path: Path = LEDGER_PATH,
+) -> None:
+    """Record a stamped wave so later index builds see it before a refresh."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"date": date, "angle": angle, "ids": contact_ids}) + "\n")
+
+
+class EligibilityIndex:
+    """Per-vertical priority queues of TAM contacts for wave selection."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, _Entry] = {}
+        self._queues: dict[str, list[tuple[str, int, str]]] = {}
+        # When the underlying snapshot was read from HubSpot (None if not
+        # built from a snapshot)
+        self.as_of: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ── Building ────────────────────────────────────────────────────
+
+    @classmethod
+    def from_contacts(
+        cls,
+        contacts: Iterable[dict[str, Any]],
+        ledger: Optional[list[dict[str, Any]]] = None,
+    ) -> "EligibilityIndex":
+        """Build from HubSpot-style contact records plus ledger entries."""
+        index = cls()
+        for contact in contacts:
+            props = contact.get("properties", {})
+            entry = _Entry(
+                contact=contact,
+                vertical=props.get("sales_vertical") or NO_VERTICAL,
+                persona=classify_persona(props.get("jobtitle", "")),
+                status=props.get("outreach_status") or "none",
+                last_date=props.get("last_outreach_wave_date") or "",
+                wave_count=int(props.get("outreach_wave_count") or 0),
+            )
+            if props.get("outreach_wave_angle"):
+                entry.angles.add(props["outreach_wave_angle"])
+            index._entries[contact["id"]] = entry
+
+        for vertical, entries in index._group_by_vertical().items():
+            index._queues[vertical] = sorted(e.key for e in entries)
+
+        for wave in ledger or []:
+            index._apply_wave(wave["ids"], wave["angle"], wave["date"], from_ledger=True)
+        return index
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: TAMSnapshot,
+        ledger_path: Path = LEDGER_PATH,
+    ) -> "EligibilityIndex":
+        """Build from a TAM snapshot, replaying waves stamped since it was taken."""
+        snapshot_date = snapshot.as_of.strftime("%Y-%m-%d")
+        ledger = [w for w in read_ledger(ledger_path) if w["date"] >= snapshot_date]
+        index = cls.from_contacts(snapshot.iter_contacts(), ledger=ledger)
+        index.as_of = snapshot.as_of
+        return index
+
+    @classmethod
+    def from_latest(
+        cls,
+        snapshot_dir: Path = SNAPSHOT_DIR,
+        ledger_path: Path = LEDGER_PATH,
+    ) -> Optional["EligibilityIndex"]:
+        """Build from the newest snapshot, or None if there is none."""
+        snapshot = open_latest_snapshot(snapshot_dir)
+        if snapshot is None:
+            return None
+        with snapshot:
+            return cls.from_snapshot(snapshot, ledger_path=ledger_path)
+
+    def _group_by_vertical(self) -> dict[str, list[_Entry]]:
+        groups: dict[str, list[_Entry]] = {}
+        for entry in self._entries.values():
+            groups.setdefault(entry.vertical, []).append(entry)
+        return groups
+
+    # ── Maintenance ─────────────────────────────────────────────────
+
+    def _apply_wave(self, contact_ids: list[str], angle: str, date: str, from_ledger: bool = False) -> None:
+        for cid in contact_ids:
+            entry = self._entries.get(cid)
+            if entry is None:
+                continue
+            if from_ledger and entry.last_date >= date and angle in entry.angles:
+                continue  # Snapshot already reflects this stamp
+            queue = self._queues[entry.vertical]
+            pos = bisect_left(queue, entry.key)
+            if pos < len(queue) and queue[pos] == entry.key:
+                del queue[pos]
+            entry.last_date = date
+            entry.wave_count += 1
+            entry.status = "active"
+            entry.angles.add(angle)
+            props = entry.contact.setdefault("properties", {})
+            props.update({
+                "last_outreach_wave_date": date,
+                "outreach_wave_count": str(entry.wave_count),
+                "outreach_wave_angle": angle,
+                "outreach_status": "active",
+            })
+            insort(queue, entry.key)
+
+    def record_wave(
+        self,
+        contact_ids: list[str],
+        angle: str,
+        date: Optional[str] = None,
+    ) -> None:
+        """Update queues after a wave is stamped (in-memory only)."""
+        self._apply_wave(contact_ids, angle, date or datetime.now().strftime("%Y-%m-%d"))
+
+    # ── Selection ───────────────────────────────────────────────────
+
+    def eligible_by_vertical(
+        self,
+        angle: Optional[str] = None,
+        verticals: Optional[list[str]] = None,
+        personas: Optional[list[str]] = None,
+        cycle_days: int = 45,
+        today: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> dict[str, tuple[int, list[dict[str, Any]]]]:
+        """Return {vertical: (eligible_count, first `limit` contacts in priority order)}."""
+        cutoff = ((today or datetime.now()) - timedelta(days=cycle_days)).strftime("%Y-%m-%d")
+        result: dict[str, tuple[int, list[dict[str, Any]]]] = {}
+
+        for vertical, queue in self._queues.items():
+            if verticals and vertical not in verticals:
+                continue
+            count = 0
+            picked: list[dict[str, Any]] = []
+            for last_date, _, cid in queue:
+                if last_date and last_date >= cutoff:
+                    break  # Everything after this was contacted more recently
+                entry = self._entries[cid]
+                if entry.status in WAVE_INELIGIBLE_STATUSES:
+                    continue
+                if personas and entry.persona not in personas:
+                    continue
+                if angle and angle in entry.angles:
+                    continue
+                count += 1
+                if limit is None or len(picked) < limit:
+                    picked.append(entry.contact)
+            if count:
+                result[vertical] = (count, picked)
+        return result
+
+    def select(
+        self,
+        wave_size: int = 2500,
+        angle: Optional[str] = None,
+        verticals: Optional[list[str]] = None,
+        personas: Optional[list[str]] = None,
+        cycle_days: int = 45,
+        today: Optional[datetime] = None,
+    ) -> list[dict[str, Any]]:
+        """Pick up to wave_size eligible contacts with a proportional vertical mix.
+
+        Each vertical gets a share of the wave proportional to its eligible
+        pool (largest-remainder rounding), so small verticals are not starved
+        by whichever segment happens to be queried first.
+        """
+        pools = self.eligible_by_vertical(
+            angle=angle, verticals=verticals, personas=personas,
+            cycle_days=cycle_days, today=today, limit=wave_size,
+        )
+        total = sum(count for count, _ in pools.values())
+        if total <= wave_size:
+            return [c for _, picked in pools.values() for c in picked]
+
+        quotas = {v: wave_size * count / total for v, (count, _) in pools.items()}
+        alloc = {v: math.floor(q) for v, q in quotas.items()}
+        leftover = wave_size - sum(alloc.values())
+        for v in sorted(quotas, key=lambda v: quotas[v] - alloc[v], reverse=True)[:leftover]:
+            alloc[v] += 1
+
+        selected: list[dict[str, Any]] = []
+        for vertical, (_, picked) in pools.items():
+            selected.extend(picked[:alloc[vertical]])
+        return selected
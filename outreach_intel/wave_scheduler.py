@@ -6,28 +6,54 @@ angle/hook so the same contacts never receive the same pitch twice.
 
 Usage:
     python -m outreach_intel.cli wave-build --size 2500 --angle "encompass-integration"
+    python -m outreach_intel.cli wave-build --resume exports/tam/wave_checkpoints/<wave>.json
     python -m outreach_intel.cli wave-status
 """
 
+import json
 import math
-import time
-from datetime import datetime, timedelta
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any, Optional
 
 from .config import EXCLUDED_LIFECYCLE_STAGES
 from .hubspot_client import HubSpotClient
 from .tam_manager import (
+    TAM_DIR,
     TAM_PROPERTIES,
     ALL_VERTICALS,
     BASE_FILTERS,
     _paginated_search,
     classify_persona,
 )
+from .wave_index import EligibilityIndex, append_ledger
 
 
 # Minimum days between waves for the same contact
 CYCLE_DAYS = 45
 
+# Oldest TAM snapshot the eligibility index may select from. Statuses that
+# changed in HubSpot since (unsubscribed, customer, sequenced elsewhere) are
+# invisible to the index, so older snapshots fall back to live search, and
+# index selections are re-checked against HubSpot before anything is written.
+MAX_SNAPSHOT_AGE_DAYS = 2
+
+# Contacts with these outreach statuses never join a wave
+EXCLUDED_OUTREACH_STATUSES = ["active", "unsubscribed", "customer"]
+
+# Properties read back to confirm a selected contact is still eligible
+LIVE_CHECK_PROPERTIES = ["outreach_status", "lifecyclestage", "outreach_wave_count"]
+
+# HubSpot batch endpoints accept at most 100 inputs
+STAMP_BATCH_SIZE = 100
+
+# In-progress wave writes, for resuming after a crash
+CHECKPOINT_DIR = TAM_DIR / "wave_checkpoints"
+
 # Angles available for rotation
 AVAILABLE_ANGLES = [
     "encompass-integration",
@@ -46,6 +72,9 @@ def get_wave_eligible_contacts(
     verticals: Optional[list[str]] = None,
     personas: Optional[list[str]] = None,
     cycle_days: int = CYCLE_DAYS,
+    index: Optional[EligibilityIndex] = None,
+    use_index: bool = True,
+    max_snapshot_age_days: Optional[float] = MAX_SNAPSHOT_AGE_DAYS,
 ) -> list[dict[str, Any]]:
     """Pull contacts eligible for the next wave.
 
@@ -53,19 +82,44 @@ def get_wave_eligible_contacts(
     - Not currently in a sequence (outreach_status != "active")
     - Not unsubscribed or customer
     - Last wave date >cycle_days ago OR never contacted
-    - If angle specified, exclude contacts who received that angle last time
+    - If angle specified, exclude contacts who received that angle before
+
+    When a recent TAM snapshot exists, selection runs against the local
+    EligibilityIndex (no HubSpot calls, proportional vertical mix). Those
+    statuses are as old as the snapshot; build_wave re-checks them against
+    HubSpot before writing. Otherwise it falls back to segmented HubSpot
+    searches, where the angle check only sees the most recent angle.
 
     Args:
         client: HubSpot client
         wave_size: Max contacts to include in this wave
-        angle: Email angle to use (excludes contacts who got this angle last)
+        angle: Email angle to use (excludes contacts who already got it)
         verticals: Filter to specific verticals
         personas: Filter to specific personas
         cycle_days: Days since last wave before re-eligible
+        index: Prebuilt eligibility index (built from the latest snapshot
+            if not provided)
+        use_index: Set False to always query HubSpot directly
+        max_snapshot_age_days: Query HubSpot directly instead when the
+            index's snapshot is older than this (None disables the check)
 
     Returns:
         List of eligible HubSpot contact records
     """
+    if use_index:
+        index = _load_index(index, max_snapshot_age_days)
+        if index is not None:
+            print(f"Selecting wave from eligibility index ({len(index):,} contacts)...", flush=True)
+            selected = index.select(
+                wave_size=wave_size,
+                angle=angle,
+                verticals=verticals,
+                personas=personas,
+                cycle_days=cycle_days,
+            )
+            print(f"  Selected: {len(selected)}", flush=True)
+            return selected
+
     hs = client or HubSpotClient()
     cutoff_date = (datetime.now() - timedelta(days=cycle_days)).strftime("%Y-%m-%d")
 
@@ -74,7 +128,7 @@ def get_wave_eligible_contacts(
         {
             "propertyName": "outreach_status",
             "operator": "NOT_IN",
-            "values": ["active", "unsubscribed", "customer"],
+            "values": EXCLUDED_OUTREACH_STATUSES,
         },
     ]
 
@@ -149,10 +203,179 @@ def get_wave_eligible_contacts(
     return all_eligible[:wave_size]
 
 
+def _load_index(
+    index: Optional[EligibilityIndex],
+    max_snapshot_age_days: Optional[float],
+) -> Optional[EligibilityIndex]:
+    """Return the given or latest eligibility index, or None if missing or stale."""
+    index = index or EligibilityIndex.from_latest()
+    if index is None or index.as_of is None or max_snapshot_age_days is None:
+        return index
+    age = datetime.now(timezone.utc) - index.as_of
+    if age > timedelta(days=max_snapshot_age_days):
+        print(
+            f"TAM snapshot is {age.days}d old (max {max_snapshot_age_days:g}d); "
+            f"selecting via HubSpot search. Run tam-refresh to use the index.",
+            flush=True,
+        )
+        return None
+    return index
+
+
+@dataclass
+class WaveCheckpoint:
+    """On-disk progress for a wave being written to HubSpot.
+
+    Saved after list creation and after every 100-contact batch, so a wave
+    that dies halfway through can be resumed with ``resume_wave``. Wave
+    counts are captured before any stamping, which makes re-running a batch
+    idempotent (count is always set to the pre-wave value + 1).
+
+    ``unchecked`` holds IDs whose status and wave count still have to be
+    read from HubSpot before the first write (see ``_check_contacts``).
+    """
+
+    path: Path
+    list_id: Optional[str]
+    list_name: str
+    angle: str
+    date: str
+    contact_ids: list[str]
+    wave_counts: dict[str, int]
+    listed: set[int] = field(default_factory=set)
+    stamped: set[int] = field(default_factory=set)
+    unchecked: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def batch_starts(self) -> range:
+        return range(0, len(self.contact_ids), STAMP_BATCH_SIZE)
+
+    def mark(self, kind: str, start: int) -> None:
+        """Record a finished batch ("listed" or "stamped") and persist."""
+        with self._lock:
+            getattr(self, kind).add(start)
+            self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "list_id": self.list_id,
+            "list_name": self.list_name,
+            "angle": self.angle,
+            "date": self.date,
+            "contact_ids": self.contact_ids,
+            "wave_counts": self.wave_counts,
+            "listed": sorted(self.listed),
+            "stamped": sorted(self.stamped),
+            "unchecked": self.unchecked,
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data))
+        tmp_path.replace(self.path)
+
+    @classmethod
+    def load(cls, path: Path) -> "WaveCheckpoint":
+        data = json.loads(Path(path).read_text())
+        return cls(
+            path=Path(path),
+            list_id=data["list_id"],
+            list_name=data["list_name"],
+            angle=data["angle"],
+            date=data["date"],
+            contact_ids=data["contact_ids"],
+            wave_counts={k: int(v) for k, v in data["wave_counts"].items()},
+            listed=set(data["listed"]),
+            stamped=set(data["stamped"]),
+            unchecked=data.get("unchecked", []),
+        )
+
+
+def _stamp_updates(
+    contact_ids: list[str],
+    angle: str,
+    date: str,
+    wave_counts: dict[str, int],
+) -> list[dict[str, Any]]:
+    """Build batch-update inputs that stamp one wave onto contacts."""
+    return [
+        {
+            "id": cid,
+            "properties": {
+                "last_outreach_wave_date": date,
+                "outreach_wave_count": str(wave_counts.get(cid, 0) + 1),
+                "outreach_wave_angle": angle,
+                "outreach_status": "active",
+            },
+        }
+        for cid in contact_ids
+    ]
+
+
+def _write_wave(
+    hs: HubSpotClient,
+    checkpoint: WaveCheckpoint,
+    max_workers: int = 4,
+) -> int:
+    """Run pending list-add and stamp batches concurrently.
+
+    Pacing comes from the HubSpot client's shared rate limiter. Every
+    batch that succeeds is checkpointed even if others fail; the first
+    failure is re-raised once all in-flight batches have settled.
+
+    Returns:
+        Number of contacts stamped so far
+    """
+    if checkpoint.unchecked:
+        try:
+            _check_contacts(hs, checkpoint, max_workers=max_workers)
+        except Exception:
+            _print_resume_hint(checkpoint)
+            raise
+
+    ids = checkpoint.contact_ids
+    jobs = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for start in checkpoint.batch_starts:
+            batch = ids[start:start + STAMP_BATCH_SIZE]
+            if checkpoint.list_id is not None and start not in checkpoint.listed:
+                future = executor.submit(hs.add_contacts_to_list, checkpoint.list_id, batch)
+                jobs[future] = ("listed", start)
+            if start not in checkpoint.stamped:
+                updates = _stamp_updates(batch, checkpoint.angle, checkpoint.date, checkpoint.wave_counts)
+                future = executor.submit(hs.batch_update_contacts, updates)
+                jobs[future] = ("stamped", start)
+
+        error: Optional[BaseException] = None
+        for future in as_completed(jobs):
+            kind, start = jobs[future]
+            try:
+                future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            checkpoint.mark(kind, start)
+            if kind == "stamped" and len(checkpoint.stamped) % 5 == 0:
+                done = min(len(checkpoint.stamped) * STAMP_BATCH_SIZE, len(ids))
+                print(f"  Stamped {done} contacts...", flush=True)
+
+    if error is not None:
+        _print_resume_hint(checkpoint)
+        raise error
+
+    return sum(
+        len(ids[start:start + STAMP_BATCH_SIZE]) for start in checkpoint.stamped
+    )
+
+
 def stamp_wave(
     contact_ids: list[str],
     angle: str,
     client: Optional[HubSpotClient] = None,
+    wave_counts: Optional[dict[str, int]] = None,
+    max_workers: int = 4,
 ) -> int:
     """Stamp contacts with wave metadata after pushing to Smartlead.
 
@@ -166,49 +389,103 @@ def stamp_wave(
         contact_ids: HubSpot contact IDs to stamp
         angle: The email angle used for this wave
         client: HubSpot client
+        wave_counts: Current outreach_wave_count per contact ID, usually
+            taken from the eligibility fetch. Only IDs missing from it are
+            read back from HubSpot before stamping, and those are skipped
+            if they are no longer eligible.
+        max_workers: Concurrent batch-read and batch-update requests
 
     Returns:
         Number of contacts stamped
     """
     hs = client or HubSpotClient()
     today = datetime.now().strftime("%Y-%m-%d")
-    stamped = 0
+    counts = dict(wave_counts or {})
 
-    for i in range(0, len(contact_ids), 100):
-        batch = contact_ids[i:i + 100]
+    checkpoint = WaveCheckpoint(
+        path=_new_checkpoint_path(f"stamp-{angle}"),
+        list_id=None,
+        list_name="",
+        angle=angle,
+        date=today,
+        contact_ids=list(contact_ids),
+        wave_counts=counts,
+        unchecked=[cid for cid in contact_ids if cid not in counts],
+    )
+    checkpoint.save()
+    return _finish_stamp(hs, checkpoint, max_workers=max_workers)
 
-        # First, read current wave counts so we can increment
-        current_contacts = hs.batch_get_contacts(
-            batch, properties=["outreach_wave_count"]
-        )
-        count_map = {}
-        for c in current_contacts:
-            cid = c.get("id", "")
-            current_count = c.get("properties", {}).get("outreach_wave_count")
-            count_map[cid] = int(current_count or 0) + 1
-
-        updates = [
-            {
-                "id": cid,
-                "properties": {
-                    "last_outreach_wave_date": today,
-                    "outreach_wave_count": str(count_map.get(cid, 1)),
-                    "outreach_wave_angle": angle,
-                    "outreach_status": "active",
-                },
-            }
-            for cid in batch
-        ]
-        hs.batch_update_contacts(updates)
-        stamped += len(batch)
 
-        if stamped % 500 == 0:
-            print(f"  Stamped {stamped} contacts...", flush=True)
-        time.sleep(0.1)
+def _finish_stamp(
+    hs: HubSpotClient,
+    checkpoint: WaveCheckpoint,
+    max_workers: int = 4,
+) -> int:
+    """Stamp a list-less wave, record it in the ledger and clear the checkpoint."""
+    stamped = _write_wave(hs, checkpoint, max_workers=max_workers)
+    checkpoint.path.unlink(missing_ok=True)
 
+    append_ledger(checkpoint.contact_ids, checkpoint.angle, checkpoint.date)
     return stamped
 
 
+def _check_contacts(
+    hs: HubSpotClient,
+    checkpoint: WaveCheckpoint,
+    max_workers: int = 4,
+) -> None:
+    """Re-read unchecked contacts and drop those no longer eligible.
+
+    Reads status, lifecycle stage and wave count in one pass, 100 IDs per
+    request and ``max_workers`` requests at a time. Contacts that were
+    unsubscribed, became customers, joined another wave or were deleted
+    since selection are removed before any list add or stamp, and the
+    rest get their current wave count. Runs before the first write, so
+    the checkpoint is saved with no batches done yet.
+    """
+    ids = checkpoint.unchecked
+    print(f"Checking current status of {len(ids)} contacts...", flush=True)
+    batches = [ids[i:i + STAMP_BATCH_SIZE] for i in range(0, len(ids), STAMP_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pages = list(executor.map(
+            lambda batch: hs.batch_get_contacts(batch, properties=LIVE_CHECK_PROPERTIES), batches,
+        ))
+
+    dropped = set(ids)
+    for contact in (c for page in pages for c in page):
+        props = contact.get("properties", {})
+        if props.get("outreach_status") in EXCLUDED_OUTREACH_STATUSES:
+            continue
+        if props.get("lifecyclestage") in EXCLUDED_LIFECYCLE_STAGES:
+            continue
+        cid = contact.get("id", "")
+        dropped.discard(cid)
+        checkpoint.wave_counts[cid] = int(props.get("outreach_wave_count") or 0)
+
+    if dropped:
+        print(f"  Skipping {len(dropped)} contacts no longer eligible", flush=True)
+        checkpoint.contact_ids = [cid for cid in checkpoint.contact_ids if cid not in dropped]
+        for cid in dropped:
+            checkpoint.wave_counts.pop(cid, None)
+    checkpoint.unchecked = []
+    checkpoint.save()
+
+
+def _print_resume_hint(checkpoint: WaveCheckpoint) -> None:
+    print(f"\nWave interrupted; resume with: wave-build --resume {checkpoint.path}", flush=True)
+
+
+def _new_checkpoint_path(stem: str) -> Path:
+    """A checkpoint path no other wave uses, so an interrupted one stays resumable."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = CHECKPOINT_DIR / f"{stem}-{stamp}.json"
+    n = 1
+    while path.exists():
+        n += 1
+        path = CHECKPOINT_DIR / f"{stem}-{stamp}-{n}.json"
+    return path
+
+
 def build_wave(
     wave_size: int = 2500,
     angle: str = "encompass-integration",
@@ -217,6 +494,9 @@ def build_wave(
     list_name: Optional[str] = None,
     dry_run: bool = False,
     client: Optional[HubSpotClient] = None,
+    index: Optional[EligibilityIndex] = None,
+    use_index: bool = True,
+    max_snapshot_age_days: Optional[float] = MAX_SNAPSHOT_AGE_DAYS,
 ) -> dict[str, Any]:
     """Build a wave: find eligible contacts, create list, stamp metadata.
 
@@ -230,6 +510,10 @@ def build_wave(
         list_name: Name for HubSpot list (auto-generated if not provided)
         dry_run: Preview without creating list or stamping
         client: HubSpot client
+        index: Eligibility index to select from and update after stamping
+        use_index: Set False to select via HubSpot search instead
+        max_snapshot_age_days: Select via HubSpot search when the index's
+            snapshot is older than this (None disables the check)
 
     Returns:
         Dict with wave details: list_id, contact_count, angle, contacts
@@ -239,6 +523,9 @@ def build_wave(
     if angle not in AVAILABLE_ANGLES:
         print(f"Warning: '{angle}' not in standard angles: {AVAILABLE_ANGLES}")
 
+    if use_index:
+        index = _load_index(index, max_snapshot_age_days)
+
     # Find eligible contacts
     contacts = get_wave_eligible_contacts(
         client=hs,
@@ -246,6 +533,9 @@ def build_wave(
         angle=angle,
         verticals=verticals,
         personas=personas,
+        index=index,
+        use_index=index is not None,
+        max_snapshot_age_days=None,
     )
 
     if not contacts:
@@ -280,43 +570,103 @@ def build_wave(
             "dry_run": True,
         }
 
+    # A live search just applied the exclusions and fetched wave counts
+    # (TAM_PROPERTIES). Index selections are as old as the snapshot, so
+    # _write_wave re-checks them against HubSpot before the first write.
+    wave_counts = {
+        c.get("id", ""): int(c.get("properties", {}).get("outreach_wave_count") or 0)
+        for c in contacts
+    }
+    checkpoint = WaveCheckpoint(
+        path=_new_checkpoint_path(_slugify(list_name)),
+        list_id=None,
+        list_name=list_name,
+        angle=angle,
+        date=today,
+        contact_ids=contact_ids,
+        wave_counts=wave_counts,
+        unchecked=list(contact_ids) if index is not None else [],
+    )
+
     # Create HubSpot list
     print(f"\nCreating HubSpot list '{list_name}'...", flush=True)
     new_list = hs.create_list(name=list_name)
     list_data = new_list.get("list", new_list)
-    list_id = list_data.get("listId") or list_data.get("id")
+    checkpoint.list_id = str(list_data.get("listId") or list_data.get("id"))
+    checkpoint.save()
 
-    # Add contacts to list
-    for i in range(0, len(contact_ids), 100):
-        batch = contact_ids[i:i + 100]
-        hs.add_contacts_to_list(list_id, batch)
-        time.sleep(0.1)
+    result = _finish_wave(hs, checkpoint, index=index)
+    kept = set(checkpoint.contact_ids)
+    result["contacts"] = [c for c in contacts if c.get("id", "") in kept]
+    return result
 
-    print(f"  Added {len(contact_ids)} contacts to list {list_id}", flush=True)
 
-    # Stamp wave metadata
-    print(f"\nStamping wave metadata...", flush=True)
-    stamped = stamp_wave(contact_ids, angle, client=hs)
+def resume_wave(
+    checkpoint_path: str,
+    client: Optional[HubSpotClient] = None,
+    index: Optional[EligibilityIndex] = None,
+) -> dict[str, Any]:
+    """Finish a wave whose list adds or stamping were interrupted.
+
+    Args:
+        checkpoint_path: Checkpoint file written by build_wave or stamp_wave
+        client: HubSpot client
+        index: Eligibility index to update once stamping completes
+
+    Returns:
+        Dict with wave details: list_id, list_name, contact_count, angle
+    """
+    hs = client or HubSpotClient()
+    checkpoint = WaveCheckpoint.load(Path(checkpoint_path))
+    remaining = len(set(checkpoint.batch_starts) - checkpoint.stamped)
+    if checkpoint.list_id is None:
+        # Written by stamp_wave: no list, stamping only
+        print(f"Resuming '{checkpoint.angle}' stamp ({remaining} batches left)...", flush=True)
+        stamped = _finish_stamp(hs, checkpoint)
+        if index is not None:
+            index.record_wave(checkpoint.contact_ids, checkpoint.angle, checkpoint.date)
+        return {"list_id": None, "list_name": "", "contact_count": stamped, "angle": checkpoint.angle}
+
+    print(f"Resuming wave '{checkpoint.list_name}' ({remaining} stamp batches left)...", flush=True)
+    return _finish_wave(hs, checkpoint, index=index)
+
+
+def _finish_wave(
+    hs: HubSpotClient,
+    checkpoint: WaveCheckpoint,
+    index: Optional[EligibilityIndex] = None,
+) -> dict[str, Any]:
+    """Add list memberships and stamp metadata, then clear the checkpoint."""
+    print(f"\nAdding contacts to list {checkpoint.list_id} and stamping wave metadata...", flush=True)
+    stamped = _write_wave(hs, checkpoint)
+
+    append_ledger(checkpoint.contact_ids, checkpoint.angle, checkpoint.date)
+    if index is not None:
+        index.record_wave(checkpoint.contact_ids, checkpoint.angle, checkpoint.date)
+    checkpoint.path.unlink(missing_ok=True)
 
     print(f"\n{'='*60}")
     print(f"WAVE BUILT SUCCESSFULLY")
-    print(f"  List ID:    {list_id}")
-    print(f"  List Name:  {list_name}")
+    print(f"  List ID:    {checkpoint.list_id}")
+    print(f"  List Name:  {checkpoint.list_name}")
     print(f"  Contacts:   {stamped}")
-    print(f"  Angle:      {angle}")
+    print(f"  Angle:      {checkpoint.angle}")
     print(f"{'='*60}")
     print(f"\nNext: push to Smartlead with:")
-    print(f"  python -m outreach_intel.smartlead_uploader push {list_id} <campaign_id>")
+    print(f"  python -m outreach_intel.smartlead_uploader push {checkpoint.list_id} <campaign_id>")
 
     return {
-        "list_id": list_id,
-        "list_name": list_name,
+        "list_id": checkpoint.list_id,
+        "list_name": checkpoint.list_name,
         "contact_count": stamped,
-        "angle": angle,
-        "contacts": contacts,
+        "angle": checkpoint.angle,
     }
 
 
+def _slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
 def get_wave_status(
     client: Optional[HubSpotClient] = None,
 ) -> dict[str, Any]:
@@ -0,0 +1,362 @@
+"""Capacity-aware, day-by-day wave schedule simulator.
+
+``calculate_waves`` sizes waves with closed-form arithmetic. This module
+replays the schedule over the real TAM snapshot instead: who is eligible
+when (recycle dates, 45-day cycles), which angle each wave uses and who has
+already had it, how many emails each sequence step adds, and how much the
+inboxes and domains can actually send each day.
+
+Contacts with identical state are interchangeable, so the pool is held as
+cohort counts keyed by (eligible day, vertical, angle history bitmask)
+rather than one record per contact. A 120-day run over a 100K TAM touches a
+few thousand cohorts, which keeps each configuration in the low
+milliseconds and makes sweeps over hundreds of what-ifs practical.
+
+Usage:
+    python -m outreach_intel.cli tam-simulate --wave-size 2500 --inboxes 150
+    python -m outreach_intel.cli tam-simulate --sweep-wave-size 1500,2500,4000
+"""
+
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, Optional
+
+from .tam_manager import NO_VERTICAL, WAVE_INELIGIBLE_STATUSES
+from .tam_snapshot import TAMSnapshot
+from .wave_scheduler import AVAILABLE_ANGLES, CYCLE_DAYS
+
+
+# Statuses that never come back into the pool ("active" recycles normally)
+PERMANENTLY_EXCLUDED = tuple(s for s in WAVE_INELIGIBLE_STATUSES if s != "active")
+
+# (eligible_day, vertical, angle_mask) -> contacts
+Cohorts = dict[tuple[int, str, int], int]
+
+
+@dataclass
+class SimConfig:
+    """One what-if configuration."""
+
+    wave_size: int = 2500
+    wave_interval_days: int = 7
+    cycle_days: int = CYCLE_DAYS
+    horizon_days: int = 120
+    angles: tuple[str, ...] = tuple(AVAILABLE_ANGLES)
+    # Day offsets of each email in the sequence, relative to wave launch
+    sequence_offsets: tuple[int, ...] = (0, 3)
+    inboxes: int = 125
+    emails_per_inbox_per_day: int = 5
+    domains: int = 3
+    # Inboxes one domain can host; inboxes beyond domains × this sit idle
+    # (0 = no limit)
+    inboxes_per_domain: int = 50
+    # Optional per-domain daily ceiling (0 = only inbox limits apply)
+    emails_per_domain_per_day: int = 0
+    # Monday=0; sends due on other days wait for the next sending day
+    send_weekdays: tuple[int, ...] = (0, 1, 2, 3)
+
+    @property
+    def sending_inboxes(self) -> int:
+        if self.inboxes_per_domain:
+            return min(self.inboxes, self.domains * self.inboxes_per_domain)
+        return self.inboxes
+
+    @property
+    def daily_capacity(self) -> int:
+        inbox_cap = self.sending_inboxes * self.emails_per_inbox_per_day
+        if self.emails_per_domain_per_day:
+            return min(inbox_cap, self.domains * self.emails_per_domain_per_day)
+        return inbox_cap
+
+    @property
+    def binding_limit(self) -> str:
+        inbox_cap = self.sending_inboxes * self.emails_per_inbox_per_day
+        if self.sending_inboxes < self.inboxes:
+            return "domain"
+        if self.emails_per_domain_per_day and self.domains * self.emails_per_domain_per_day < inbox_cap:
+            return "domain"
+        return "inbox"
+
+
+@dataclass
+class DayPlan:
+    """What happens on one simulated day."""
+
+    day: int
+    date: str
+    eligible: int
+    wave_angle: Optional[str] = None
+    wave_contacts: int = 0
+    emails_due: int = 0
+    emails_sent: int = 0
+    capacity: int = 0
+    backlog: int = 0
+
+
+@dataclass
+class WavePlan:
+    """One launched wave."""
+
+    day: int
+    date: str
+    angle: str
+    contacts: int
+    by_vertical: dict[str, int]
+    skipped_for_angle: int
+    shortfall_reason: Optional[str] = None
+
+
+@dataclass
+class SimResult:
+    """Day-by-day plan plus bottleneck analysis for one configuration."""
+
+    config: SimConfig
+    days: list[DayPlan] = field(default_factory=list)
+    waves: list[WavePlan] = field(default_factory=list)
+    bottlenecks: dict[str, Any] = field(default_factory=dict)
+
+
+# ── Building the pool ───────────────────────────────────────────────
+
+
+def _eligible_day(last_wave_date: Optional[str], start: date, cycle_days: int) -> int:
+    """Days from start until a contact is past its cycle (0 = eligible now)."""
+    if not last_wave_date:
+        return 0
+    last_day = datetime.strptime(last_wave_date[:10], "%Y-%m-%d").date()
+    return max(0, (last_day + timedelta(days=cycle_days) - start).days)
+
+
+def cohorts_from_contacts(
+    contacts: Iterable[dict[str, Any]],
+    start: date,
+    cycle_days: int = CYCLE_DAYS,
+    angles: Iterable[str] = AVAILABLE_ANGLES,
+) -> Cohorts:
+    """Collapse HubSpot-style contacts into (eligible_day, vertical, mask) counts."""
+    bits = {a: 1 << i for i, a in enumerate(angles)}
+    cohorts: Counter = Counter()
+    for contact in contacts:
+        props = contact.get("properties", {})
+        if (props.get("outreach_status") or "none") in PERMANENTLY_EXCLUDED:
+            continue
+        eligible_day = _eligible_day(props.get("last_outreach_wave_date"), start, cycle_days)
+        vertical = props.get("sales_vertical") or NO_VERTICAL
+        mask = bits.get(props.get("outreach_wave_angle") or "", 0)
+        cohorts[(eligible_day, vertical, mask)] += 1
+    return dict(cohorts)
+
+
+def cohorts_from_snapshot(
+    snapshot: TAMSnapshot,
+    start: Optional[date] = None,
+    cycle_days: int = CYCLE_DAYS,
+    angles: Iterable[str] = AVAILABLE_ANGLES,
+) -> Cohorts:
+    """Build simulator cohorts straight from snapshot columns."""
+    start = start or date.today()
+    bits = {a: 1 << i for i, a in enumerate(angles)}
+    cohorts: Counter = Counter()
+    columns = zip(
+        snapshot.column("outreach_status"),
+        snapshot.column("last_outreach_wave_date"),
+        snapshot.column("sales_vertical"),
+        snapshot.column("outreach_wave_angle"),
+    )
+    # Decode each distinct row state once; snapshots have few of them
+    for (status, last, vertical, angle), n in Counter(columns).items():
+        if status in PERMANENTLY_EXCLUDED:
+            continue
+        eligible_day = _eligible_day(last, start, cycle_days)
+        cohorts[(eligible_day, vertical or NO_VERTICAL, bits.get(angle, 0))] += n
+    return dict(cohorts)
+
+
+# ── Simulation ──────────────────────────────────────────────────────
+
+
+def _take_wave(
+    pool: dict[int, Counter],
+    day: int,
+    wave_size: int,
+    bit: int,
+) -> tuple[Counter, int, int]:
+    """Remove a wave from the eligible pool with a proportional vertical mix.
+
+    Returns:
+        (taken (vertical, mask) counts, eligible total, eligible-but-had-angle)
+    """
+    ready = sorted(d for d in pool if d <= day)
+    per_vertical: Counter = Counter()
+    eligible = 0
+    for d in ready:
+        for (vertical, mask), n in pool[d].items():
+            eligible += n
+            if not mask & bit:
+                per_vertical[vertical] += n
+    available = sum(per_vertical.values())
+    skipped = eligible - available
+
+    if available <= wave_size:
+        quotas = dict(per_vertical)
+    else:
+        exact = {v: wave_size * n / available for v, n in per_vertical.items()}
+        quotas = {v: math.floor(q) for v, q in exact.items()}
+        leftover = wave_size - sum(quotas.values())
+        for v in sorted(exact, key=lambda v: exact[v] - quotas[v], reverse=True)[:leftover]:
+            quotas[v] += 1
+
+    taken: Counter = Counter()
+    for d in ready:  # Oldest eligibility first
+        bucket = pool[d]
+        for key in list(bucket):
+            vertical, mask = key
+            if mask & bit or not quotas.get(vertical):
+                continue
+            n = min(bucket[key], quotas[vertical])
+            quotas[vertical] -= n
+            taken[key] += n
+            bucket[key] -= n
+            if not bucket[key]:
+                del bucket[key]
+        if not bucket:
+            del pool[d]
+    return taken, eligible, skipped
+
+
+def simulate(
+    cohorts: Cohorts,
+    config: SimConfig,
+    start: Optional[date] = None,
+) -> SimResult:
+    """Run one configuration over the cohort pool.
+
+    Each wave launch picks the next angle in rotation, takes up to
+    wave_size contacts that are past their cycle and have not had that
+    angle, and schedules one email per sequence step. Contacts return to
+    the pool cycle_days after launch. Emails beyond the day's inbox/domain
+    capacity carry over as backlog.
+    """
+    start = start or date.today()
+    result = SimResult(config=config)
+
+    pool: dict[int, Counter] = defaultdict(Counter)
+    for (eligible_day, vertical, mask), n in cohorts.items():
+        pool[eligible_day][(vertical, mask)] += n
+    total_contacts = sum(cohorts.values())
+
+    due: Counter = Counter()
+    backlog = 0
+    wave_no = 0
+    next_launch = 0
+    contacted = 0
+    capacity_bound_days = 0
+    sending_days = 0
+    capacity_used = 0
+    new_since_send = 0
+    peak_daily_due = 0
+
+    for day in range(config.horizon_days):
+        today = start + timedelta(days=day)
+        is_send_day = today.weekday() in config.send_weekdays
+        plan = DayPlan(day=day, date=today.isoformat(), eligible=0)
+
+        if day >= next_launch and is_send_day:
+            angle = config.angles[wave_no % len(config.angles)]
+            bit = 1 << (wave_no % len(config.angles))
+            taken, eligible, skipped = _take_wave(pool, day, config.wave_size, bit)
+            size = sum(taken.values())
+
+            for (vertical, mask), n in taken.items():
+                pool[day + config.cycle_days][(vertical, mask | bit)] += n
+            for offset in config.sequence_offsets:
+                due[day + offset] += size
+
+            by_vertical: Counter = Counter()
+            for (vertical, _), n in taken.items():
+                by_vertical[vertical] += n
+            shortfall = None
+            if size < config.wave_size:
+                shortfall = "angle" if eligible >= config.wave_size else "eligibility"
+
+            result.waves.append(WavePlan(
+                day=day,
+                date=plan.date,
+                angle=angle,
+                contacts=size,
+                by_vertical=dict(by_vertical.most_common()),
+                skipped_for_angle=skipped,
+                shortfall_reason=shortfall,
+            ))
+            plan.wave_angle = angle
+            plan.wave_contacts = size
+            contacted += size
+            wave_no += 1
+            next_launch = day + config.wave_interval_days
+
+        plan.eligible = sum(sum(b.values()) for d, b in pool.items() if d <= day)
+        plan.emails_due = due.pop(day, 0)
+        backlog += plan.emails_due
+        new_since_send += plan.emails_due
+
+        if is_send_day:
+            sending_days += 1
+            plan.capacity = config.daily_capacity
+            # Emails that became due since the last send day, ignoring backlog
+            peak_daily_due = max(peak_daily_due, new_since_send)
+            new_since_send = 0
+            plan.emails_sent = min(backlog, plan.capacity)
+            capacity_used += plan.emails_sent
+            backlog -= plan.emails_sent
+            if backlog:
+                capacity_bound_days += 1
+        plan.backlog = backlog
+        result.days.append(plan)
+
+    short_waves = [w for w in result.waves if w.shortfall_reason]
+    inboxes_needed = (
+        math.ceil(peak_daily_due / config.emails_per_inbox_per_day)
+        if config.emails_per_inbox_per_day else None
+    )
+    capacity_total = sending_days * config.daily_capacity
+    peak_backlog = max((d.backlog for d in result.days), default=0)
+    result.bottlenecks = {
+        "tam_contacts": total_contacts,
+        "contacts_sent": contacted,
+        "waves": len(result.waves),
+        "short_waves": len(short_waves),
+        "short_wave_reasons": dict(Counter(w.shortfall_reason for w in short_waves)),
+        "capacity_bound_days": capacity_bound_days,
+        "peak_backlog": peak_backlog,
+        "max_send_delay_days": math.ceil(peak_backlog / config.daily_capacity) if config.daily_capacity else None,
+        "ending_backlog": backlog,
+        "capacity_utilization": round(capacity_used / capacity_total, 3) if capacity_total else 0.0,
+        "binding_limit": config.binding_limit if capacity_bound_days else (
+            short_waves[0].shortfall_reason if short_waves else None
+        ),
+        "inboxes_for_zero_backlog": inboxes_needed,
+        "domains_for_zero_backlog": (
+            math.ceil(inboxes_needed / config.inboxes_per_domain)
+            if inboxes_needed is not None and config.inboxes_per_domain else None
+        ),
+    }
+    return result
+
+
+def sweep(
+    cohorts: Cohorts,
+    base: SimConfig,
+    start: Optional[date] = None,
+    **variations: Iterable[Any],
+) -> list[SimResult]:
+    """Simulate every combination of the given SimConfig field values.
+
+    Example:
+        sweep(cohorts, SimConfig(), wave_size=[1500, 2500], inboxes=[100, 150])
+    """
+    configs = [base]
+    for name, values in variations.items():
+        configs = [replace(c, **{name: v}) for c in configs for v in values]
+    return [simulate(cohorts, c, start=start) for c in configs]
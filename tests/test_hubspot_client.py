@@ -1,6 +1,8 @@
 """Tests for HubSpot client."""
 import os
 import pytest
+import requests
+from outreach_intel import hubspot_client
 from outreach_intel.hubspot_client import HubSpotClient
 
 
@@ -95,4 +97,46 @@ def test_create_and_delete_list():
 
     # Clean up - delete the list
     list_id = list_data.get("listId") or list_data.get("id")
-    client.delete_list(list_id)
\ No newline at end of file
+    client.delete_list(list_id)
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b'{"ok": true}'
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+    def json(self):
+        return {"ok": True}
+
+
+def _patch_transport(monkeypatch, responses):
+    sleeps = []
+    monkeypatch.setattr(hubspot_client.requests, "request", lambda **kwargs: responses.pop(0))
+    monkeypatch.setattr(hubspot_client.time, "sleep", sleeps.append)
+    monkeypatch.setattr(hubspot_client.API_RATE_LIMITER, "interval", 0.0)
+    return sleeps
+
+
+def test_rate_limited_request_honors_retry_after(monkeypatch):
+    """A 429 waits for HubSpot's Retry-After, falling back to backoff."""
+    sleeps = _patch_transport(monkeypatch, [
+        _Response(429, {"Retry-After": "3"}),
+        _Response(429, {"Retry-After": "soon"}),
+        _Response(200),
+    ])
+
+    assert HubSpotClient(api_token="t").get("/crm/v3/objects/contacts") == {"ok": True}
+    assert sleeps == [3.0, 2.0]
+
+
+def test_final_rate_limited_attempt_does_not_sleep(monkeypatch):
+    """After the last 429 the error is raised without another wait."""
+    sleeps = _patch_transport(monkeypatch, [_Response(429) for _ in range(3)])
+
+    with pytest.raises(requests.HTTPError):
+        HubSpotClient(api_token="t")._request("GET", "/crm/v3/objects/contacts", max_retries=3)
+    assert sleeps == [1.0, 2.0]
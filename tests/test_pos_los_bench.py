@@ -0,0 +1,67 @@
+"""Tests for the offline POS/LOS benchmark harness."""
+import shutil
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import pytest
+
+from outreach_intel.pos_los_bench import (
+    WILDCARD_SAFE,
+    BenchConfig,
+    StandInNetwork,
+    build_sites,
+    run_benchmark,
+    signal_catalog,
+)
+from outreach_intel.pos_los_detector import FREE_LAYERS
+
+EVERY_SIGNAL = {"cname": 1, "redirect": 1, "script": 1, "ssl": 1, "none": 1}
+
+
+def test_sites_are_deterministic_and_plant_recognized_signals():
+    config = BenchConfig(seed=7, wildcard_share=0.5, signal_weights=EVERY_SIGNAL)
+    sites = build_sites(config, 200)
+
+    assert sites == build_sites(config, 200)
+    assert {s.signal.kind if s.signal else "none" for s in sites.values()} == set(EVERY_SIGNAL)
+    assert all(not s.wildcard or (s.signal.kind if s.signal else "none") in WILDCARD_SAFE for s in sites.values())
+    catalog = signal_catalog()
+    assert "Encompass Consumer Connect" in {s.vendor for s in catalog["ssl"]}
+    assert all(s.vendor in s.expected for signals in catalog.values() for s in signals)
+
+
+def _ask(network, name, rdtype):
+    return network.answer(dns.message.make_query(name, rdtype))
+
+
+def test_dns_stub_answers_like_an_authoritative_server():
+    config = BenchConfig(signal_weights={"cname": 1})
+    sites = build_sites(config, 1)
+    lender = next(iter(sites.values()))
+    network = StandInNetwork(sites, config)
+
+    cname = _ask(network, lender.signal_portal, "A")
+    assert [rrset.rdtype for rrset in cname.answer] == [dns.rdatatype.CNAME, dns.rdatatype.A]
+    assert str(cname.answer[0][0].target).endswith(f"{lender.signal.host}.")
+
+    missing = _ask(network, f"nope.{lender.domain}", "CNAME")
+    assert missing.rcode() == dns.rcode.NXDOMAIN
+    assert missing.authority[0].rdtype == dns.rdatatype.SOA
+
+    nodata = _ask(network, lender.domain, "AAAA")
+    assert nodata.rcode() == dns.rcode.NOERROR and not nodata.answer and nodata.authority
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="needs the openssl CLI")
+def test_benchmark_finds_every_planted_vendor():
+    config = BenchConfig(dns_latency_ms=0, http_latency_ms=1, signal_weights=EVERY_SIGNAL, wildcard_share=0.2)
+
+    [run] = run_benchmark((25,), config)
+
+    assert run.domains == 25
+    assert run.recall == 1.0
+    assert run.false_positives == 0
+    assert run.errors == 0
+    assert run.domains_per_sec > 0 and run.cpu_seconds > 0
+    assert set(run.telemetry["layers"]) == set(FREE_LAYERS)
@@ -0,0 +1,106 @@
+"""Tests for the page corpus and offline rematch."""
+import asyncio
+
+from outreach_intel import pos_los_detector
+from outreach_intel.pos_los_corpus import Capture, Corpus, rematch, rematch_capture
+from outreach_intel.pos_los_detector import EXHAUSTIVE_POLICY
+from outreach_intel.pos_los_matcher import HostIndex
+
+from tests.test_pos_los_engine import FakeDetector
+
+
+def _capture():
+    return Capture(
+        domain="lender.com",
+        cnames={"apply.lender.com": ["lender.blend.com"]},
+        redirects={"https://portal.lender.com": ["https://portal.lender.com", "https://x.floify.com/s"]},
+        pages=[("https://lender.com", '<script src="https://cdn.meridianlink.com/x.js"></script>')],
+        certs={"loan.lender.com": ["x.elliemae.com"]},
+        firecrawl_pages=[("https://lender.com/apply", "<footer>Powered by Blend</footer>")],
+        links=[("https://lender.com/apply", ["https://lender.com/a", "https://app.roostify.com/x"])],
+        layers={"dns": "2026-05-01T00:00:00+00:00"},
+    )
+
+
+def test_archive_round_trips_and_dedupes_blobs(tmp_path):
+    """Identical pages are stored once; the latest archive per domain wins."""
+    corpus = Corpus(tmp_path)
+    first = corpus.archive(_capture())
+    objects = corpus.stats()["objects"]
+    second = corpus.archive(_capture())
+
+    assert first == second
+    assert corpus.stats()["objects"] == objects
+    assert corpus.load(corpus.index()["lender.com"]["manifest"]) == _capture()
+
+
+def test_rematch_capture_runs_every_matcher():
+    """Each archived observation goes through the matcher its layer uses."""
+    result = rematch_capture(_capture())
+
+    methods = {d.vendor: d.method for d in result.detections}
+    assert methods == {
+        "Blend": "dns",
+        "Floify": "redirect",
+        "MeridianLink": "html",
+        "Encompass Consumer Connect": "ssl",
+        "Roostify": "firecrawl_link",
+    }
+
+
+def test_new_fingerprint_applies_offline(tmp_path, monkeypatch):
+    """A vendor added after the scan is found from the archive alone."""
+    capture = Capture(domain="lender.com", cnames={"apply.lender.com": ["lender.newpos.io"]})
+    assert rematch_capture(capture).detections == []
+
+    monkeypatch.setattr(pos_los_detector, "HOST_INDEX", HostIndex({"cname": {"NewPOS": [r"newpos\.io"]}}))
+    monkeypatch.setitem(pos_los_detector._VENDOR_CATEGORY, "NewPOS", "pos")
+
+    assert rematch_capture(capture).pos_detected == ["NewPOS"]
+
+
+def test_engine_archives_what_it_saw_and_rematch_agrees(tmp_path):
+    """A live scan's archive rematches (in worker processes) to the same vendors."""
+    corpus = Corpus(tmp_path)
+    detector = FakeDetector(
+        cnames={"apply.lender.com": ["lender.blend.com"]},
+        pages={
+            "https://portal.lender.com": (["https://portal.lender.com", "https://lender.floify.com/s/x"], ""),
+            "https://lender.com": (None, '<script src="https://cdn.meridianlink.com/x.js"></script>'),
+            "https://loan.lender.com": (None, ""),
+        },
+        certs={"loan.lender.com": {"subject": ((("commonName", "x.elliemae.com"),),)}},
+        policy=EXHAUSTIVE_POLICY,
+        corpus=corpus,
+    )
+
+    async def run():
+        async with detector:
+            return await detector.detect("lender.com")
+
+    live = asyncio.run(run())
+    ((offline, archived_at),) = rematch(corpus, workers=2)
+
+    assert {d.vendor for d in offline.detections} == {d.vendor for d in live.detections}
+    assert offline.layers == live.layers
+    assert archived_at.tzinfo is not None
+
+
+def test_archiving_scans_read_whole_pages_and_every_layer(tmp_path):
+    """Early exit would truncate the archived page and skip layers, so it is off."""
+    corpus = Corpus(tmp_path)
+    html = (
+        '<script src="https://cdn.blend.com/x.js"></script>'
+        '<script src="https://cdn.meridianlink.com/x.js"></script>'
+    ) + "<p>filler</p>" * 500 + '<script src="https://cdn.later-vendor.io/x.js"></script>'
+    detector = FakeDetector(pages={"https://lender.com": (None, html)}, corpus=corpus)
+
+    async def run():
+        async with detector:
+            return await detector.detect("lender.com")
+
+    asyncio.run(run())
+    capture = corpus.load(corpus.index()["lender.com"]["manifest"])
+
+    assert dict(capture.pages)["https://lender.com"] == html
+    assert set(capture.layers) == set(pos_los_detector.FREE_LAYERS)
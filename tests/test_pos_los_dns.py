@@ -0,0 +1,108 @@
+"""Tests for the caching DNS resolver."""
+import asyncio
+import time
+
+import dns.name
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+
+from outreach_intel.pos_los_dns import CachingResolver, DnsAnswer
+
+
+class FakeAnswer:
+    """Just enough of dns.resolver.Answer for CachingResolver."""
+
+    def __init__(self, rdtype, records, ttl=300):
+        self.rdtype = dns.rdatatype.from_text(rdtype)
+        self.response = None
+        if records:
+            self.rrset = dns.rrset.from_text_list("x.", ttl, "IN", rdtype, records)
+        else:
+            self.rrset = None
+
+
+def _resolver(zone, tmp_path=None, delay=0.0):
+    """CachingResolver whose upstream answers from {(name, rdtype): records | None}."""
+    resolver = CachingResolver(cache_path=tmp_path / "dns.json" if tmp_path else None)
+    calls = []
+
+    async def resolve(name, rdtype, raise_on_no_answer=True):
+        calls.append((name, rdtype))
+        await asyncio.sleep(delay)
+        if name.startswith("wc-") and ("*", rdtype) in zone:
+            return FakeAnswer(rdtype, zone[("*", rdtype)])
+        if (name, rdtype) not in zone:
+            raise dns.resolver.NXDOMAIN(qnames=[dns.name.from_text(name)], responses={})
+        return FakeAnswer(rdtype, zone[(name, rdtype)])
+
+    resolver._resolver.resolve = resolve
+    return resolver, calls
+
+
+def test_positive_and_negative_answers_are_cached():
+    """A repeat query for an existing or missing name never reaches upstream."""
+    resolver, calls = _resolver({("apply.lender.com", "CNAME"): ["lender.blend.com."]})
+
+    async def run():
+        first = [await resolver.query("apply.lender.com"), await resolver.query("nope.lender.com")]
+        second = [await resolver.query("APPLY.lender.com."), await resolver.query("nope.lender.com")]
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first[0].records == ["lender.blend.com"]
+    assert first[1].status == "nxdomain" and not first[1].exists
+    assert second == first
+    assert len(calls) == 2
+    assert (resolver.hits, resolver.misses) == (2, 2)
+
+
+def test_concurrent_queries_share_one_lookup():
+    """Identical in-flight queries are coalesced."""
+    resolver, calls = _resolver({("a.lender.com", "A"): ["10.0.0.1"]}, delay=0.01)
+
+    answers = asyncio.run(resolver.query_many(["a.lender.com"] * 5, "A"))
+
+    assert [a.records for a in answers] == [["10.0.0.1"]] * 5
+    assert len(calls) == 1
+
+
+def test_cache_round_trips_to_disk_and_drops_expired(tmp_path):
+    """Saved answers reload in the next run; expired and error answers don't."""
+    resolver, _ = _resolver({("a.lender.com", "CNAME"): ["x.floify.com."]}, tmp_path)
+    asyncio.run(resolver.query_many(["a.lender.com", "b.lender.com"]))
+    resolver._cache["old.lender.com|CNAME"] = DnsAnswer("ok", ["y"], time.time() - 1)
+    resolver._cache["err.lender.com|CNAME"] = DnsAnswer("error", [], time.time() + 60)
+    resolver.save()
+
+    fresh, calls = _resolver({}, tmp_path)
+
+    assert fresh.load() == 2
+    answer = asyncio.run(fresh.query("a.lender.com"))
+    assert answer.records == ["x.floify.com"]
+    assert calls == []
+
+
+def test_wildcard_zone_is_detected_once_per_apex():
+    """Portals whose answer equals the wildcard's are flagged; real records are not."""
+    resolver, calls = _resolver({
+        ("*", "CNAME"): ["parked.example.net."],
+        ("apply.lender.com", "CNAME"): ["parked.example.net."],
+        ("loan.lender.com", "CNAME"): ["lender.floify.com."],
+    })
+
+    async def run():
+        wildcard = await resolver.wildcard("lender.com")
+        await resolver.wildcard("lender.com")
+        apply_ = await resolver.served_by_wildcard(
+            "apply.lender.com", await resolver.query("apply.lender.com"), wildcard)
+        loan = await resolver.served_by_wildcard(
+            "loan.lender.com", await resolver.query("loan.lender.com"), wildcard)
+        return wildcard, apply_, loan
+
+    wildcard, apply_, loan = asyncio.run(run())
+
+    assert wildcard == ("CNAME", ["parked.example.net"])
+    assert (apply_, loan) == (True, False)
+    assert len([c for c in calls if c[0].startswith("wc-")]) == 1
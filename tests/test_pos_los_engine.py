@@ -0,0 +1,239 @@
+"""Tests for the asyncio POS/LOS detection engine."""
+import asyncio
+import inspect
+
+import aiohttp
+
+from outreach_intel import pos_los_engine
+from outreach_intel.pos_los_detector import EXHAUSTIVE_POLICY, HtmlStream, detect_batch
+from outreach_intel.pos_los_dns import DnsAnswer
+from outreach_intel.pos_los_engine import AsyncDetector, Page
+
+
+class FakeDetector(AsyncDetector):
+    """Serves DNS, HTTP and TLS answers from dicts instead of the network."""
+
+    def __init__(self, cnames=None, pages=None, certs=None, delay=0.0, nxdomain=(), wildcard=None, **kwargs):
+        kwargs.setdefault("use_firecrawl", False)
+        kwargs.setdefault("dns_cache_path", None)
+        super().__init__(**kwargs)
+        self.cnames = cnames or {}
+        self.nxdomain = set(nxdomain)
+        self.wildcard_answer = wildcard
+        self.pages = pages or {}
+        self.certs = certs or {}
+        self.delay = delay
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = []
+        self.fetched_bytes = 0
+
+    async def _track(self, call):
+        self.calls.append(call)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+    async def lookup(self, fqdn):
+        await self._track(("dns", fqdn))
+        if fqdn in self.nxdomain:
+            return DnsAnswer("nxdomain")
+        if fqdn in self.cnames:
+            return DnsAnswer("ok", self.cnames[fqdn])
+        return DnsAnswer("nodata")
+
+    async def wildcard(self, apex):
+        return self.wildcard_answer
+
+    async def fetch(self, url, stop=None):
+        await self._track(("fetch", url))
+        host = url.split("://")[1].split("/")[0]
+        if url not in self.pages:
+            return Page(url=url, status=0, error="unreachable")
+        chain, text = self.pages[url]
+        # Stream the body in small chunks, like the real fetch
+        stream = HtmlStream(stop=stop)
+        body = text.encode()
+        for i in range(0, len(body), 64):
+            if stream.feed(body[i:i + 64]):
+                break
+        scan = stream.close()
+        self.fetched_bytes += stream.bytes_in
+        return Page(
+            url=url, status=200, chain=chain or [url], text=scan.text,
+            cert=self.certs.get(host), scan=scan, bytes_read=stream.bytes_in,
+        )
+
+    async def peer_cert(self, hostname):
+        await self._track(("tls", hostname))
+        return self.certs.get(hostname)
+
+
+def _detect(detector, domain):
+    async def run():
+        async with detector:
+            return await detector.detect(domain)
+    return asyncio.run(run())
+
+
+def test_detect_runs_every_free_layer():
+    """DNS, redirect, HTML and SSL evidence all land in one deduped result."""
+    detector = FakeDetector(
+        cnames={"apply.lender.com": ["lender.blend.com"]},
+        pages={
+            "https://portal.lender.com": (["https://portal.lender.com", "https://lender.floify.com/s/x"], ""),
+            "https://lender.com": (None, '<script src="https://cdn.meridianlink.com/x.js"></script>'),
+            "https://loan.lender.com": (None, ""),
+        },
+        certs={"loan.lender.com": {"subject": ((("commonName", "x.elliemae.com"),),)}},
+        policy=EXHAUSTIVE_POLICY,
+    )
+
+    result = _detect(detector, "https://www.Lender.com")
+
+    assert result.domain == "lender.com"
+    methods = {d.vendor: d.method for d in result.detections}
+    assert methods["Blend"] == "dns"
+    assert methods["Floify"] == "redirect"
+    assert methods["MeridianLink"] == "html"
+    assert methods["Encompass Consumer Connect"] == "ssl"
+    assert set(result.pos_detected) == {"Blend", "Floify", "Encompass Consumer Connect"}
+    assert result.los_detected == ["MeridianLink"]
+
+
+def test_html_matches_pages_in_url_order():
+    """The first page in scan order wins per vendor, regardless of fetch timing."""
+    detector = FakeDetector(pages={
+        "https://lender.com": (None, "We integrate with Roostify"),
+        "https://apply.lender.com": (None, "https://roostify.com/apply"),
+    })
+
+    result = _detect(detector, "lender.com")
+
+    (det,) = result.detections
+    assert det.confidence == "medium"
+    assert det.evidence == "Pattern 'Roostify' matched in https://lender.com"
+
+
+def test_global_budget_caps_probes_in_flight():
+    """No more than max_in_flight probes run at once across domains."""
+    detector = FakeDetector(delay=0.001, max_in_flight=3, per_domain=2)
+
+    results = asyncio.run(pos_los_engine.detect_batch_async(
+        ["a.com", "b.com", "c.com"], max_domains=3, detector=detector,
+    ))
+
+    assert len(results) == 3
+    assert detector.peak_in_flight == 3
+
+
+def test_detect_batch_uses_async_engine(monkeypatch):
+    """detect_batch defaults to the async engine and reports progress per domain."""
+    monkeypatch.setattr(pos_los_engine, "AsyncDetector", FakeDetector)
+    seen = []
+
+    results = detect_batch(["a.com", "b.com"], progress_callback=lambda i, n, d, r: seen.append((i, n)))
+
+    assert sorted(r.domain for r in results) == ["a.com", "b.com"]
+    assert seen == [(1, 2), (2, 2)]
+
+
+def test_policy_cancels_remaining_layers_once_satisfied():
+    """High-confidence POS and LOS from DNS stop the slower layers early."""
+    detector = FakeDetector(cnames={
+        "apply.lender.com": ["lender.blend.com"],
+        "loan.lender.com": ["lender.meridianlink.com"],
+    })
+    slow_calls = []
+
+    async def slow_fetch(url, stop=None):
+        slow_calls.append(url)
+        await asyncio.sleep(5)
+
+    detector.fetch = slow_fetch
+
+    result = _detect(detector, "lender.com")
+
+    assert {d.vendor for d in result.detections} == {"Blend", "MeridianLink"}
+    assert len(slow_calls) < 20  # Cancelled long before every page was requested
+
+
+def test_firecrawl_runs_only_when_free_layers_are_empty():
+    """The paid layer is skipped whenever a free layer found something."""
+    calls = []
+
+    class Recording(FakeDetector):
+        async def firecrawl_layer(self, scan):
+            calls.append(scan.domain)
+            return []
+
+    _detect(Recording(cnames={"apply.found.com": ["x.floify.com"]}), "found.com")
+    _detect(Recording(), "empty.com")
+
+    assert calls == ["empty.com"]
+
+
+def test_layers_share_one_fetch_per_url():
+    """Redirect, HTML and SSL read the same cached page instead of re-fetching."""
+    subs = ["apply", "portal", "loan"]
+    pages = {f"https://{s}.lender.com": (None, "") for s in subs}
+    certs = {f"{s}.lender.com": {"subject": ((("commonName", f"{s}.lender.com"),),)} for s in subs}
+    detector = FakeDetector(pages=pages, certs=certs, policy=EXHAUSTIVE_POLICY)
+
+    _detect(detector, "lender.com")
+
+    fetches = [url for kind, url in detector.calls if kind == "fetch"]
+    assert len(fetches) == len(set(fetches))
+    assert not [c for c in detector.calls if c[0] == "tls"]
+
+
+def test_nonexistent_and_wildcard_portals_are_not_probed():
+    """NXDOMAIN portals and portals answered only by the zone wildcard get no HTTP/TLS."""
+    detector = FakeDetector(
+        cnames={
+            "apply.lender.com": ["parked.example.net"],
+            "portal.lender.com": ["parked.example.net"],
+            "loan.lender.com": ["lender.floify.com"],
+        },
+        nxdomain={"mortgage.lender.com"},
+        wildcard=("CNAME", ["parked.example.net"]),
+        policy=EXHAUSTIVE_POLICY,
+    )
+
+    _detect(detector, "lender.com")
+
+    probed = {c[1].split("://")[-1].split("/")[0] for c in detector.calls if c[0] in ("fetch", "tls")}
+    assert "loan.lender.com" in probed
+    assert not probed & {"apply.lender.com", "portal.lender.com", "mortgage.lender.com"}
+
+
+def test_page_download_stops_once_policy_is_satisfied():
+    """A page that rules in POS and LOS early isn't read to the end."""
+    html = (
+        '<script src="https://cdn.blend.com/x.js"></script>'
+        '<script src="https://cdn.meridianlink.com/x.js"></script>'
+    ) + "<p>filler</p>" * 5000
+    detector = FakeDetector(pages={"https://lender.com": (None, html)})
+
+    result = _detect(detector, "lender.com")
+
+    assert {d.vendor for d in result.detections} >= {"Blend", "MeridianLink"}
+    assert 0 < detector.fetched_bytes < 1000
+
+
+def test_exhaustive_policy_reads_whole_page():
+    """Without early exit the page is read up to the caps."""
+    html = '<script src="https://cdn.blend.com/x.js"></script>' + "<p>x</p>" * 100
+    detector = FakeDetector(pages={"https://lender.com": (None, html)}, policy=EXHAUSTIVE_POLICY)
+
+    _detect(detector, "lender.com")
+
+    assert detector.fetched_bytes == len(html)
+
+
+def test_cert_recording_hook_matches_installed_aiohttp():
+    """The connector overrides a private aiohttp method; fail loudly if it moves."""
+    hook = aiohttp.TCPConnector._wrap_create_connection
+    assert pos_los_engine._CertRecordingConnector._wrap_create_connection is not hook
+    assert "req" in inspect.signature(hook).parameters
@@ -0,0 +1,167 @@
+"""Tests for the budgeted, concurrent Firecrawl layer (no network)."""
+import threading
+import time
+
+import pytest
+
+from outreach_intel.firecrawl_client import MapResult, ScrapeResult, SearchResult
+from outreach_intel.pos_los_corpus import Capture
+from outreach_intel.pos_los_firecrawl import (
+    BudgetExhausted,
+    FirecrawlCache,
+    FirecrawlLayer,
+    FirecrawlScheduler,
+)
+
+BLEND_PAGE = "<footer>Powered by Blend</footer>"
+
+
+class FakeClient:
+    """Firecrawl client double: per-URL pages and delays, records every call."""
+
+    available = True
+
+    def __init__(self, pages=None, delays=None, mapped=(), search=()):
+        self.pages = pages or {}
+        self.delays = delays or {}
+        self.mapped = list(mapped)
+        self.search_results = list(search)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def map(self, url, limit=100, search=None):
+        with self._lock:
+            self.calls.append(("map", url))
+        return MapResult(urls=self.mapped, total=len(self.mapped))
+
+    def scrape(self, url, formats=None, only_main_content=True, timeout=30, wait_for=None):
+        with self._lock:
+            self.calls.append(("scrape", url))
+        time.sleep(self.delays.get(url, 0.0))
+        page = self.pages.get(url)
+        if page is None:
+            return ScrapeResult(url=url, error="HTTP 404: not found")
+        return ScrapeResult(url=url, raw_html=page)
+
+    def search(self, query, limit=5):
+        with self._lock:
+            self.calls.append(("search", query))
+        return self.search_results
+
+    def scraped(self):
+        return [url for kind, url in self.calls if kind == "scrape"]
+
+
+def _layer(client, tmp_path, **kwargs):
+    cache = FirecrawlCache(tmp_path / "firecrawl_cache.json")
+    return FirecrawlLayer(client=client, cache=cache, **kwargs)
+
+
+def test_candidates_are_scraped_concurrently(tmp_path):
+    """Four 0.2s scrapes finish in about one scrape's time, not four."""
+    urls = ["https://lender.com", "https://apply.lender.com", "https://portal.lender.com", "https://my.lender.com"]
+    client = FakeClient(pages=dict.fromkeys(urls, "<p>hi</p>"), delays=dict.fromkeys(urls, 0.2))
+
+    started = time.perf_counter()
+    detections = _layer(client, tmp_path)._scrape_candidates("lender.com", urls, None)
+
+    assert detections == []
+    assert sorted(client.scraped()) == sorted(urls)
+    assert time.perf_counter() - started < 0.6
+
+
+def test_first_vendor_cancels_the_remaining_scrapes(tmp_path):
+    """Queued candidates never start once a page yields a vendor."""
+    urls = ["https://lender.com", "https://apply.lender.com", "https://portal.lender.com"]
+    client = FakeClient(
+        pages={"https://lender.com": BLEND_PAGE, "https://apply.lender.com": "<p></p>"},
+        delays={"https://apply.lender.com": 1.0},
+    )
+    capture = Capture(domain="lender.com")
+
+    started = time.perf_counter()
+    detections = _layer(client, tmp_path, max_pages=2)._scrape_candidates("lender.com", urls, capture)
+
+    assert [d.vendor for d in detections] == ["Blend"]
+    assert time.perf_counter() - started < 0.5  # Didn't wait for the slow scrape
+    assert "https://portal.lender.com" not in client.scraped()
+    assert capture.firecrawl_pages == [("https://lender.com", BLEND_PAGE)]
+
+
+def test_failed_scrape_is_replaced_by_next_candidate(tmp_path):
+    urls = ["https://lender.com", "https://apply.lender.com", "https://portal.lender.com"]
+    client = FakeClient(pages={"https://portal.lender.com": BLEND_PAGE})
+
+    detections = _layer(client, tmp_path, max_pages=1)._scrape_candidates("lender.com", urls, None)
+
+    assert client.scraped() == urls
+    assert [d.vendor for d in detections] == ["Blend"]
+
+
+def test_map_and_search_are_cached_per_domain(tmp_path):
+    """A rescan pays only for scrapes; the cache survives a restart."""
+    search = [SearchResult(title="Acme Lending uses Blend", url="https://news.example/acme")]
+    client = FakeClient(mapped=["https://lender.com/apply", "https://lender.com/about"], search=search)
+    layer = _layer(client, tmp_path, max_pages=1)
+
+    first = layer.detect("lender.com")
+    layer.close()
+    again = _layer(client, tmp_path, max_pages=1)
+    again.cache.load()
+    second = again.detect("lender.com")
+
+    assert [d.method for d in first] == [d.method for d in second] == ["firecrawl_search"]
+    assert [kind for kind, _ in client.calls].count("map") == 1
+    assert [kind for kind, _ in client.calls].count("search") == 1
+    # Mapped portal URLs are tried right after the homepage
+    assert client.scraped()[:2] == ["https://lender.com", "https://lender.com/apply"]
+
+
+def test_budget_is_shared_and_exhaustion_is_an_error(tmp_path):
+    """One batch-wide budget: once spent, domains that found nothing raise."""
+    client = FakeClient(pages={"https://first.com": BLEND_PAGE})
+    scheduler = FirecrawlScheduler(credit_budget=2)
+    layer = _layer(client, tmp_path, scheduler=scheduler, max_pages=1)
+
+    assert [d.vendor for d in layer.detect("first.com")] == ["Blend"]  # map + 1 scrape
+    with pytest.raises(BudgetExhausted):
+        layer.detect("second.com")
+
+    assert scheduler.credits_used == 2
+    assert scheduler.remaining == 0
+    assert scheduler.denied > 0
+    assert not any("second.com" in url for _, url in client.calls)
+
+
+def test_rate_limit_waits_for_the_window():
+    now = [0.0]
+    scheduler = FirecrawlScheduler(per_minute=2, clock=lambda: now[0])
+    cancel = threading.Event()
+    cancel.set()
+
+    assert scheduler.acquire(1) and scheduler.acquire(1)
+    # Window full: a cancelled waiter gives up instead of sleeping
+    assert not scheduler.acquire(1, cancel)
+    now[0] = 60.0
+    assert scheduler.acquire(1, cancel)
+    assert scheduler.requests == 3
+
+
+def test_rate_limited_scrape_does_not_hold_a_concurrency_slot(tmp_path):
+    """A scrape waiting for the rate window leaves the slot to other domains."""
+    scheduler = FirecrawlScheduler(per_minute=1, max_concurrent=1, clock=lambda: 0.0)
+    assert scheduler.acquire(1)  # Window now full
+    layer = _layer(FakeClient(pages={"https://a.com": BLEND_PAGE}), tmp_path, scheduler=scheduler)
+    cancel = threading.Event()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(layer._scrape("https://a.com", cancel)), daemon=True)
+    waiter.start()
+
+    time.sleep(0.05)
+    try:
+        assert scheduler.slots.acquire(timeout=1)
+        scheduler.slots.release()
+    finally:
+        cancel.set()
+        waiter.join(timeout=1)
+    assert results == [None]
@@ -0,0 +1,159 @@
+"""Tests for the compiled fingerprint matcher."""
+import re
+import zlib
+
+from outreach_intel.pos_los_detector import (
+    FINGERPRINT_MATCHER,
+    HOST_INDEX,
+    HTML_CHAR_CAP,
+    HTML_CHUNK_SIZE,
+    VENDOR_FINGERPRINTS,
+    HtmlStream,
+    _match_cname,
+    _match_html_page,
+    _match_links,
+    _match_raw_html,
+    is_html_content_type,
+    parse_content_type,
+)
+from outreach_intel.pos_los_matcher import FingerprintMatcher, HostIndex, required_literal
+
+PAGES = [
+    '<script src="https://encompass.icemortgagetechnology.com/x.js"></script>',
+    "Apply online with our emortgage portal. Powered by Blend.",
+    '<div style="mix-blend-mode: multiply">Maxwell House coffee</div>',
+    "MeridianLink and OpenClose, or LendingPad? <iframe src='https://x.floify.com/s/abc'>",
+    "nothing to see here " * 50,
+]
+
+
+def _naive_first_patterns(html):
+    """The old per-vendor, per-pattern re.search loop."""
+    found = {}
+    for fp in VENDOR_FINGERPRINTS:
+        for pattern in fp.html_patterns:
+            if re.search(pattern, html, re.IGNORECASE):
+                found[fp.name] = pattern
+                break
+    return found
+
+
+def test_required_literal_skips_optional_parts_and_weak_runs():
+    """Anchors come from mandatory literal runs, preferring vendor-specific ones."""
+    assert required_literal(r"(?:cdn|static)\.floify\.com") == ".floify.com"
+    assert required_literal(r'src="[^"]*blend[^"]*\.js"') == "blend"
+    assert required_literal(r"Blend Labs,?\s*Inc") == "blend labs"
+    assert required_literal(r"a|b") == ""
+
+
+def test_first_hits_match_naive_search():
+    """One pass plus confirmation finds the same first pattern per vendor."""
+    for html in PAGES:
+        hits = FINGERPRINT_MATCHER.scan(html).first_hits("html")
+        assert {v: h.pattern for v, h in hits.items()} == _naive_first_patterns(html)
+
+
+def test_overlapping_anchors_are_all_found():
+    """Anchors that start inside or at the same spot as a longer one still count."""
+    matcher = FingerprintMatcher({"t": {"A": ["icemortgage"], "B": ["emortgage"], "C": ["ice"]}})
+
+    hits = matcher.scan("ICEMORTGAGE").hits()
+
+    assert [(h.vendor, h.start, h.end) for h in hits] == [("C", 0, 3), ("A", 0, 11), ("B", 2, 11)]
+
+
+def test_false_positive_check_moves_to_next_occurrence():
+    """A rejected first occurrence doesn't hide a genuine later one."""
+    html = "Powered by Blend-mode shaders ... <footer>Powered by Blend</footer>"
+
+    (det,) = _match_raw_html(html, "https://lender.com")
+
+    assert det.vendor == "Blend"
+    assert "Copyright/legal" in det.evidence
+
+
+def test_match_html_page_skips_seen_vendors():
+    """Vendors already detected on an earlier page are not reported again."""
+    seen = {"Blend"}
+
+    detections = _match_html_page("Powered by Blend via floify.com", "https://x.com", seen)
+
+    assert [d.vendor for d in detections] == ["Floify"]
+    assert detections[0].confidence == "high"
+    assert seen == {"Blend", "Floify"}
+
+
+def test_host_index_matches_on_label_boundaries():
+    """Suffixes match whole labels, so look-alike hosts no longer count."""
+    assert HOST_INDEX.match("https://x.mello.com/apply", "redirect") == [("LoanDepot/mello", r"mello\.com")]
+    assert HOST_INDEX.match("https://camello.com", "redirect") == []
+    assert HOST_INDEX.match("*.elliemae.com", "ssl") == [("Encompass Consumer Connect", r"elliemae\.com")]
+
+
+def test_host_index_confirms_path_and_unindexed_patterns():
+    """Path-specific and bare-word patterns are confirmed with their regex."""
+    index = HostIndex({"link": {
+        "A": [r"elliemae\.com/static"],
+        "B": [r"(?:cdn|static)\.floify\.com"],
+        "C": [r"encompass"],
+    }})
+
+    assert index.match("https://elliemae.com/static/x.js", "link") == [("A", r"elliemae\.com/static")]
+    assert index.match("https://elliemae.com/other", "link") == []
+    assert index.match("https://floify.com", "link") == []
+    assert index.match("https://cdn.floify.com/a", "link") == [("B", r"(?:cdn|static)\.floify\.com")]
+    assert index.match("encompass.lender.com", "link") == [("C", "encompass")]
+
+
+def test_layers_share_the_host_index():
+    """CNAME and link matching report vendors in fingerprint order."""
+    cname = _match_cname("apply.lender.com", "lender.elliemae.com")
+    links = _match_links(
+        ["https://lender.com/apply", "https://lender.floify.com/s/1", "https://app.blend.com/x"],
+        "lender.com",
+    )
+
+    assert [d.vendor for d in cname] == ["Encompass Consumer Connect", "Encompass"]
+    assert [d.vendor for d in links] == ["Floify", "Blend"]
+
+
+def test_stream_scan_finds_anchors_across_chunk_boundaries():
+    """Feeding text in tiny chunks yields the same hits as one scan."""
+    for html in PAGES:
+        stream = FINGERPRINT_MATCHER.stream()
+        for i in range(0, len(html), 3):
+            stream.feed(html[i:i + 3])
+        assert stream.first_hits("html") == FINGERPRINT_MATCHER.scan(html).first_hits("html")
+
+
+def test_html_stream_inflates_gzip_and_raw_deflate_incrementally():
+    """Compressed bodies decode to the same text, fed a few bytes at a time."""
+    html = "<p>Powered by Blend</p>" * 200
+    gz = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    bodies = {
+        "gzip": gz.compress(html.encode()) + gz.flush(),
+        "deflate": raw.compress(html.encode()) + raw.flush(),
+    }
+
+    for encoding, body in bodies.items():
+        stream = HtmlStream(encoding)
+        for i in range(0, len(body), 7):
+            stream.feed(body[i:i + 7])
+        assert stream.close().text == html
+        assert stream.bytes_in == len(body)
+
+
+def test_html_stream_caps_and_content_types():
+    """Decoded text stops at HTML_CHAR_CAP; only HTML-ish types are read."""
+    stream = HtmlStream(charset="latin-1")
+    chunk = b"\xe9" * HTML_CHUNK_SIZE
+    while not stream.feed(chunk):
+        pass
+
+    assert len(stream.text) == HTML_CHAR_CAP
+    assert stream.text[0] == "é"
+    assert is_html_content_type("text/html; charset=UTF-8")
+    assert is_html_content_type("")
+    assert not is_html_content_type("application/pdf")
+    assert parse_content_type('text/html; Charset="ISO-8859-1"') == ("text/html", "iso-8859-1")
@@ -0,0 +1,157 @@
+"""Tests for the persistent detection result store and resumable batches."""
+import json
+from datetime import datetime, timedelta, timezone
+
+from outreach_intel import pos_los_detector
+from outreach_intel.pos_los_detector import (
+    FINGERPRINT_VERSION,
+    Detection,
+    DomainResult,
+    detect_batch,
+    merge_results,
+    parse_shard,
+    read_results_jsonl,
+    results_to_csv,
+    select_shard,
+)
+from outreach_intel.pos_los_store import RESCAN_ALL, RescanPolicy, ResultStore, result_level
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _result(domain, confidence=None, errors=()):
+    detections = [Detection("Blend", "pos", confidence, "dns", "apply.x CNAME → x.blend.com")] if confidence else []
+    return DomainResult(
+        domain=domain,
+        pos_detected=["Blend"] if confidence else [],
+        detections=detections,
+        errors=list(errors),
+        layers={"dns": "2026-05-01T00:00:00+00:00"},
+        fingerprint_version=FINGERPRINT_VERSION,
+    )
+
+
+def test_round_trip_keeps_evidence_layers_and_version(tmp_path):
+    """A stored result comes back field for field, keyed by normalized domain."""
+    with ResultStore(tmp_path / "r.sqlite3") as store:
+        store.put(_result("lender.com", "high"), scanned_at=NOW)
+
+        record = store.get("https://www.Lender.com/apply")
+
+    assert record.result == _result("lender.com", "high")
+    assert record.scanned_at == NOW
+    assert record.level == "high"
+    assert record.fingerprint_version == FINGERPRINT_VERSION
+
+
+def test_partition_uses_ttl_per_level(tmp_path):
+    """High-confidence results stay fresh far longer than empty or failed ones."""
+    store = ResultStore(tmp_path / "r.sqlite3")
+    store.put_many([_result("high.com", "high"), _result("none.com"), _result("err.com", errors=["dns: x"])],
+                   scanned_at=NOW - timedelta(days=10))
+
+    fresh, stale = store.partition(["high.com", "none.com", "err.com", "new.com", "HIGH.com"], now=NOW)
+
+    assert list(fresh) == ["high.com"]
+    assert stale == ["none.com", "err.com", "new.com"]
+    assert [result_level(r) for r in (_result("a", "medium"), _result("b"), _result("c", errors=["x"]))] == [
+        "medium", "none", "error"]
+    assert store.partition(["none.com"], RescanPolicy(ttl_days={"none": 30}), now=NOW)[1] == []
+    assert store.partition(["high.com"], RESCAN_ALL, now=NOW)[1] == ["high.com"]
+
+
+def test_outdated_fingerprints_can_force_a_rescan(tmp_path):
+    """Results from an older fingerprint DB are stale only when the policy says so."""
+    store = ResultStore(tmp_path / "r.sqlite3")
+    old = _result("lender.com", "high")
+    old.fingerprint_version = "000000000000"
+    store.put(old, scanned_at=NOW)
+
+    assert store.partition(["lender.com"], now=NOW)[1] == []
+    assert store.partition(["lender.com"], RescanPolicy(rescan_on_new_fingerprints=True), now=NOW)[1] == [
+        "lender.com"]
+
+
+def test_detect_batch_skips_fresh_domains_and_stores_new_results(tmp_path, monkeypatch):
+    """Only stale domains reach the engine, and their results are saved."""
+    scanned = []
+
+    def fake_sequential(domain, policy=None, firecrawl=None):
+        scanned.append(domain)
+        return _result(domain, "medium")
+
+    monkeypatch.setattr(pos_los_detector, "detect_tech_stack_sequential", fake_sequential)
+    store = ResultStore(tmp_path / "r.sqlite3")
+    store.put(_result("cached.com", "high"))
+
+    results = detect_batch(["cached.com", "new.com"], engine="thread", store=store)
+
+    assert scanned == ["new.com"]
+    assert sorted(r.domain for r in results) == ["cached.com", "new.com"]
+    assert store.get("new.com").level == "medium"
+
+
+def test_jsonl_checkpoint_resumes_after_a_crash(tmp_path, monkeypatch):
+    """Finished domains are skipped and a torn last line is discarded."""
+    scanned = []
+
+    def fake_sequential(domain, policy=None, firecrawl=None):
+        scanned.append(domain)
+        return _result(domain, "high")
+
+    monkeypatch.setattr(pos_los_detector, "detect_tech_stack_sequential", fake_sequential)
+    out = tmp_path / "run.jsonl"
+    out.write_text(json.dumps(_result("done.com", "high").to_dict()) + "\n" + '{"domain": "torn.c')
+
+    results = detect_batch(["done.com", "torn.com", "new.com"], engine="thread", jsonl_path=out)
+
+    assert sorted(scanned) == ["new.com", "torn.com"]
+    assert sorted(r.domain for r in results) == ["done.com", "new.com", "torn.com"]
+    assert sorted(r.domain for r in read_results_jsonl(out)) == ["done.com", "new.com", "torn.com"]
+
+
+def test_jsonl_checkpoint_records_domains_served_from_the_store(tmp_path, monkeypatch):
+    """A sharded run with a store still writes stored results to its shard file."""
+    scanned = []
+
+    def fake_sequential(domain, policy=None, firecrawl=None):
+        scanned.append(domain)
+        return _result(domain, "medium")
+
+    monkeypatch.setattr(pos_los_detector, "detect_tech_stack_sequential", fake_sequential)
+    store = ResultStore(tmp_path / "r.sqlite3")
+    store.put(_result("cached.com", "high"))
+    out = tmp_path / "shard.jsonl"
+    progress = []
+
+    results = detect_batch(
+        ["cached.com", "new.com"],
+        engine="thread",
+        store=store,
+        jsonl_path=out,
+        progress_callback=lambda done, total, domain, result: progress.append((done, total, domain)),
+    )
+
+    assert scanned == ["new.com"]
+    assert sorted(r.domain for r in results) == ["cached.com", "new.com"]
+    assert sorted(r.domain for r in read_results_jsonl(out)) == ["cached.com", "new.com"]
+    assert progress == [(1, 2, "cached.com"), (2, 2, "new.com")]
+
+
+def test_shards_partition_domains_and_merge_to_csv(tmp_path):
+    """Every domain lands in exactly one shard, whatever the list order."""
+    domains = [f"lender{i}.com" for i in range(200)]
+    shards = [select_shard(domains, i, 4) for i in range(1, 5)]
+
+    assert sorted(d for shard in shards for d in shard) == sorted(domains)
+    assert select_shard(list(reversed(domains)), 2, 4) == list(reversed(shards[1]))
+    assert parse_shard("2/4") == (2, 4)
+
+    paths = []
+    for i, shard in enumerate(shards[:2]):
+        paths.append(tmp_path / f"shard{i}.jsonl")
+        paths[-1].write_text("".join(json.dumps(_result(d, "high").to_dict()) + "\n" for d in shard))
+    merged = merge_results(paths + [paths[0]])
+
+    assert len(merged) == len(shards[0]) + len(shards[1])
+    assert results_to_csv(merged).count("\n") == len(merged) + 1
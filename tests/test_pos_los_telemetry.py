@@ -0,0 +1,102 @@
+"""Tests for per-layer telemetry and adaptive layer plans."""
+import asyncio
+from types import SimpleNamespace
+
+from outreach_intel.pos_los_detector import DEFAULT_POLICY, EXHAUSTIVE_POLICY, FREE_LAYERS, DetectionPolicy
+from outreach_intel.pos_los_telemetry import BatchTelemetry, plan_layers
+
+from tests.test_pos_los_engine import FakeDetector
+
+
+def _detect(detector, domain="lender.com"):
+    async def run():
+        async with detector:
+            return await detector.detect(domain)
+    return asyncio.run(run())
+
+
+def test_engine_records_every_layer_run():
+    """Duration, bytes, hits and sole-source counts are recorded per layer."""
+    result = _detect(FakeDetector(
+        cnames={"apply.lender.com": ["lender.blend.com"]},
+        pages={
+            "https://apply.lender.com": (["https://apply.lender.com", "https://x.blend.com/a"], ""),
+            "https://lender.com": (None, '<script src="https://cdn.meridianlink.com/x.js"></script>'),
+        },
+        policy=EXHAUSTIVE_POLICY,
+    ))
+
+    runs = result.telemetry
+    assert set(runs) == {*FREE_LAYERS, "firecrawl"}
+    assert runs["dns"]["vendors"] == ["Blend"] and runs["dns"]["sole_source"] == 0
+    assert runs["redirect"]["vendors"] == ["Blend"]
+    assert runs["html"]["sole_source"] == 1 and runs["html"]["hits"] == {"high": 1}
+    assert runs["html"]["bytes"] > 0
+    assert sum(run["first_high"] for run in runs.values()) == 1
+    assert all(run["status"] == "ok" and run["seconds"] >= 0 for run in runs.values())
+
+
+def test_cancelled_layers_are_reported():
+    """Layers cut short by early exit show up as cancelled."""
+    detector = FakeDetector(cnames={
+        "apply.lender.com": ["lender.blend.com"],
+        "loan.lender.com": ["lender.meridianlink.com"],
+    })
+
+    async def slow_fetch(url, stop=None):
+        await asyncio.sleep(5)
+
+    detector.fetch = slow_fetch
+    runs = _detect(detector).telemetry
+
+    assert runs["dns"]["status"] == "ok"
+    assert {runs[layer]["status"] for layer in ("redirect", "html", "ssl")} == {"cancelled"}
+
+
+def test_policy_layers_restrict_what_runs():
+    """A plan without HTTP layers never fetches a page."""
+    detector = FakeDetector(pages={"https://lender.com": (None, "Roostify")},
+                            policy=DetectionPolicy(layers=("dns",)))
+
+    result = _detect(detector)
+
+    assert list(result.telemetry) == ["dns"]
+    assert not [c for c in detector.calls if c[0] == "fetch"]
+
+
+def _report(**layers):
+    telemetry = BatchTelemetry()
+    for i in range(60):
+        runs = {}
+        for layer, (seconds, high_every, sole_every) in layers.items():
+            runs[layer] = {
+                "layer": layer, "status": "ok", "seconds": seconds, "bytes": 0,
+                "hits": {"high": 1} if high_every and i % high_every == 0 else {},
+                "vendors": ["X"] if high_every and i % high_every == 0 else [],
+                "sole_source": 1 if sole_every and i % sole_every == 0 else 0,
+                "first_high": False,
+            }
+        telemetry.add(SimpleNamespace(telemetry=runs))
+    return telemetry.report()
+
+
+def test_plan_skips_layers_that_never_add_a_unique_vendor():
+    """SSL never sole-sources anything, so it is dropped; the rest are ranked."""
+    report = _report(
+        dns=(0.05, 2, 3),        # frequent, fast
+        redirect=(1.0, 2, 5),    # frequent, slow
+        html=(0.5, 10, 10),      # rare, medium
+        ssl=(0.2, 3, 0),         # never unique
+        firecrawl=(20.0, 4, 4),
+    )
+
+    assert report["layers"]["ssl"]["domains_sole_source"] == 0
+    assert plan_layers(report, FREE_LAYERS) == ("dns", "redirect", "html", "firecrawl")
+
+
+def test_plan_explores_layers_without_enough_runs():
+    """A layer missing from the report (skipped last time) is tried first."""
+    report = _report(dns=(0.05, 2, 3), html=(0.5, 10, 10))
+
+    assert plan_layers(report, FREE_LAYERS) == ("redirect", "ssl", "dns", "html", "firecrawl")
+    assert DEFAULT_POLICY.free_layers() == FREE_LAYERS
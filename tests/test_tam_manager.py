@@ -0,0 +1,108 @@
+"""Tests for TAM extraction and wave sizing."""
+from outreach_intel.tam_manager import (
+    NO_VERTICAL,
+    classify_persona,
+    extract_tam,
+)
+
+
+class FakeHubSpot:
+    """Serves canned search pages keyed by the sales_vertical filter."""
+
+    def __init__(self, segments: dict[str, list[dict]]):
+        self.segments = segments
+        self.calls = 0
+
+    def post(self, endpoint, json_data=None):
+        self.calls += 1
+        filters = json_data["filterGroups"][0]["filters"]
+        vertical = NO_VERTICAL
+        for f in filters:
+            if f["propertyName"] == "sales_vertical" and f["operator"] == "EQ":
+                vertical = f["value"]
+        contacts = self.segments.get(vertical, [])
+        if json_data["limit"] == 1:
+            return {"total": len(contacts), "results": contacts[:1]}
+        start = int(json_data.get("after") or 0)
+        page = contacts[start:start + 100]
+        response = {"results": page}
+        if start + 100 < len(contacts):
+            response["paging"] = {"next": {"after": str(start + 100)}}
+        return response
+
+
+def _contact(cid, title="CFO", status=None):
+    props = {"jobtitle": title}
+    if status:
+        props["outreach_status"] = status
+    return {"id": str(cid), "properties": props}
+
+
+def test_classify_persona():
+    """Job titles map to persona buckets."""
+    assert classify_persona("Chief Financial Officer") == "cfo"
+    assert classify_persona("") == "unknown"
+    assert classify_persona("Loan Officer") == "other"
+
+
+def test_extract_tam_streams_contacts_to_jsonl(tmp_path):
+    """Counters aggregate across pages and contacts land in the spill file."""
+    hs = FakeHubSpot({
+        "Bank": [_contact(i) for i in range(250)],
+        "IMB": [_contact(1000, "COO", "active"), _contact(1001, "CTO")],
+    })
+    path = tmp_path / "tam.jsonl"
+
+    report = extract_tam(client=hs, verticals=["Bank", "IMB"], contacts_path=str(path))
+
+    assert report.total == 252
+    assert report.by_vertical == {"Bank": 250, "IMB": 2}
+    assert report.by_persona["cfo"] == 250
+    assert report.by_outreach_status == {"none": 251, "active": 1}
+    assert report.wave_eligible == 251
+    assert report.contacts_path == str(path)
+    assert sorted(int(c["id"]) for c in report.iter_contacts()) == list(range(250)) + [1000, 1001]
+
+
+def test_extract_tam_persona_filter(tmp_path):
+    """Persona filter drops contacts before they are counted or spilled."""
+    hs = FakeHubSpot({"Bank": [_contact(1, "CFO"), _contact(2, "CEO")]})
+
+    report = extract_tam(
+        client=hs, verticals=["Bank"], personas=["ceo"],
+        contacts_path=str(tmp_path / "tam.jsonl"),
+    )
+
+    assert report.total == 1
+    assert [c["id"] for c in report.iter_contacts()] == ["2"]
+
+
+def test_extract_tam_count_only_includes_untagged():
+    """count_only queries every vertical plus untagged contacts."""
+    hs = FakeHubSpot({"Bank": [_contact(1)], NO_VERTICAL: [_contact(2), _contact(3)]})
+
+    report = extract_tam(client=hs, count_only=True)
+
+    assert report.by_vertical[NO_VERTICAL] == 2
+    assert report.by_vertical["Bank"] == 1
+    assert report.total == 3
+    assert report.contacts_path is None
+    assert list(report.iter_contacts()) == []
+
+
+def test_full_extraction_writes_snapshot(tmp_path):
+    """An unfiltered pull writes a snapshot that reproduces its breakdowns."""
+    from outreach_intel.tam_snapshot import TAMSnapshot
+
+    hs = FakeHubSpot({"Bank": [_contact(1)], NO_VERTICAL: [_contact(2, "CEO", "active")]})
+
+    report = extract_tam(
+        client=hs,
+        contacts_path=str(tmp_path / "tam.jsonl"),
+        snapshot_dir=tmp_path / "snapshots",
+    )
+
+    with TAMSnapshot(report.snapshot_path) as snap:
+        from_snapshot = snap.report()
+    assert from_snapshot.by_persona == report.by_persona
+    assert from_snapshot.wave_eligible == report.wave_eligible
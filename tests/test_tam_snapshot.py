@@ -0,0 +1,111 @@
+"""Tests for versioned TAM snapshots and delta refresh."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from outreach_intel.tam_snapshot import (
+    TAMSnapshot,
+    list_snapshots,
+    open_latest_snapshot,
+    refresh_snapshot,
+    save_new_version,
+)
+
+
+def _contact(cid, **props):
+    base = {"email": f"c{cid}@example.com", "jobtitle": "CFO", "sales_vertical": "Bank"}
+    base.update(props)
+    return {"id": str(cid), "properties": base}
+
+
+class FakeHubSpot:
+    """Returns one page of modified contacts for any search."""
+
+    def __init__(self, modified):
+        self.modified = modified
+        self.bodies = []
+
+    def post(self, endpoint, json_data=None):
+        self.bodies.append(json_data)
+        return {"results": self.modified}
+
+
+def test_snapshot_roundtrip(tmp_path):
+    """Contacts survive a write/mmap-read cycle, including unset properties."""
+    as_of = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    contacts = [_contact(1), _contact(2, jobtitle="CEO", sales_vertical=None, outreach_status="active")]
+
+    path = save_new_version(contacts, as_of=as_of, directory=tmp_path)
+
+    with TAMSnapshot(path) as snap:
+        assert snap.version == 1
+        assert snap.as_of == as_of
+        assert len(snap) == 2
+        assert list(snap.column("persona")) == ["cfo", "ceo"]
+        second = snap.contact(1)
+        assert second["id"] == "2"
+        assert second["properties"]["sales_vertical"] is None
+        assert second["properties"]["outreach_status"] == "active"
+
+
+def test_snapshot_report_matches_extract_breakdowns(tmp_path):
+    """report() computes vertical/persona/status breakdowns from columns."""
+    contacts = [
+        _contact(1),
+        _contact(2, jobtitle="COO", outreach_status="active"),
+        _contact(3, sales_vertical=None),
+    ]
+    path = save_new_version(contacts, as_of=datetime.now(timezone.utc), directory=tmp_path)
+
+    with TAMSnapshot(path) as snap:
+        report = snap.report()
+        assert report.total == 3
+        assert report.by_vertical == {"Bank": 2, "(no vertical)": 1}
+        assert report.by_outreach_status == {"none": 2, "active": 1}
+        assert report.wave_eligible == 2
+
+        filtered = snap.report(personas=["coo_ops"])
+        assert filtered.total == 1
+        assert filtered.wave_eligible == 0
+
+
+def test_save_new_version_increments_and_prunes(tmp_path):
+    """Each save is the next version; only the newest `keep` are retained."""
+    now = datetime.now(timezone.utc)
+    for _ in range(4):
+        save_new_version([_contact(1)], as_of=now, directory=tmp_path, keep=2)
+
+    assert [v for v, _ in list_snapshots(tmp_path)] == [3, 4]
+
+
+def test_refresh_applies_upserts_and_removals(tmp_path):
+    """Modified contacts replace old rows; ones that left the TAM are dropped."""
+    as_of = datetime.now(timezone.utc) - timedelta(days=1)
+    save_new_version([_contact(1), _contact(2), _contact(3)], as_of=as_of, directory=tmp_path)
+    hs = FakeHubSpot([
+        _contact(2, jobtitle="CTO"),
+        _contact(3, lifecyclestage="customer"),
+        _contact(4),
+    ])
+
+    result = refresh_snapshot(client=hs, directory=tmp_path)
+
+    assert result == {
+        "version": 2,
+        "path": result["path"],
+        "rows": 3,
+        "upserted": 2,
+        "removed": 1,
+    }
+    filters = hs.bodies[0]["filterGroups"][0]["filters"]
+    assert filters[0]["propertyName"] == "lastmodifieddate"
+    with open_latest_snapshot(tmp_path) as snap:
+        rows = {c["id"]: c["properties"] for c in snap.iter_contacts()}
+    assert sorted(rows) == ["1", "2", "4"]
+    assert rows["2"]["jobtitle"] == "CTO"
+
+
+def test_refresh_requires_existing_snapshot(tmp_path):
+    """Refreshing without a base snapshot asks for a full extraction."""
+    with pytest.raises(FileNotFoundError, match="full extraction"):
+        refresh_snapshot(client=FakeHubSpot([]), directory=tmp_path)
@@ -0,0 +1,95 @@
+"""Tests for the wave eligibility index."""
+from datetime import datetime, timezone
+
+from outreach_intel.tam_snapshot import save_new_version
+from outreach_intel.wave_index import EligibilityIndex, append_ledger
+
+TODAY = datetime(2026, 6, 1)
+
+
+def _contact(cid, vertical="Bank", last=None, count=0, angle=None, status=None, title="CFO"):
+    return {
+        "id": str(cid),
+        "properties": {
+            "email": f"c{cid}@example.com",
+            "jobtitle": title,
+            "sales_vertical": vertical,
+            "last_outreach_wave_date": last,
+            "outreach_wave_count": str(count) if count else None,
+            "outreach_wave_angle": angle,
+            "outreach_status": status,
+        },
+    }
+
+
+def _ids(contacts):
+    return [c["id"] for c in contacts]
+
+
+def test_select_orders_never_contacted_then_oldest():
+    """Never-contacted contacts come first, then the oldest recyclable ones."""
+    index = EligibilityIndex.from_contacts([
+        _contact(1, last="2026-03-01", count=1),
+        _contact(2),
+        _contact(3, last="2026-01-01", count=2),
+        _contact(4, last="2026-05-20", count=1),  # Inside the 45-day window
+    ])
+
+    assert _ids(index.select(wave_size=10, today=TODAY)) == ["2", "3", "1"]
+
+
+def test_select_enforces_status_persona_and_angle_history():
+    """Ineligible statuses, other personas and repeated angles are excluded."""
+    index = EligibilityIndex.from_contacts([
+        _contact(1, status="active"),
+        _contact(2, title="CEO"),
+        _contact(3, last="2026-01-01", count=1, angle="gse-compliance"),
+        _contact(4),
+    ])
+
+    selected = index.select(wave_size=10, angle="gse-compliance", personas=["cfo"], today=TODAY)
+
+    assert _ids(selected) == ["4"]
+
+
+def test_select_splits_wave_proportionally_across_verticals():
+    """Each vertical's share of the wave matches its share of the eligible pool."""
+    contacts = [_contact(i, vertical="Bank") for i in range(75)]
+    contacts += [_contact(100 + i, vertical="IMB") for i in range(25)]
+    index = EligibilityIndex.from_contacts(contacts)
+
+    selected = index.select(wave_size=20, today=TODAY)
+
+    verticals = [c["properties"]["sales_vertical"] for c in selected]
+    assert len(selected) == 20
+    assert verticals.count("Bank") == 15
+    assert verticals.count("IMB") == 5
+
+
+def test_record_wave_updates_queues_incrementally():
+    """Stamped contacts drop out of the pool and carry the new wave state."""
+    index = EligibilityIndex.from_contacts([_contact(1), _contact(2)])
+
+    index.record_wave(["1"], "pre-closing-voe", date="2026-05-31")
+
+    assert _ids(index.select(wave_size=10, today=TODAY)) == ["2"]
+    props = index._entries["1"].contact["properties"]
+    assert props["outreach_wave_count"] == "1"
+    assert props["outreach_status"] == "active"
+    assert index._entries["1"].angles == {"pre-closing-voe"}
+
+
+def test_from_latest_replays_ledger_after_snapshot(tmp_path):
+    """Waves stamped after the snapshot was taken are applied from the ledger."""
+    snap_dir, ledger = tmp_path / "snapshots", tmp_path / "ledger.jsonl"
+    save_new_version(
+        [_contact(1), _contact(2)],
+        as_of=datetime(2026, 5, 1, tzinfo=timezone.utc),
+        directory=snap_dir,
+    )
+    append_ledger(["2"], "gse-compliance", "2026-05-15", path=ledger)
+
+    index = EligibilityIndex.from_latest(snapshot_dir=snap_dir, ledger_path=ledger)
+
+    assert len(index) == 2
+    assert _ids(index.select(wave_size=10, today=TODAY)) == ["1"]
@@ -0,0 +1,196 @@
+"""Tests for wave building and stamping."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from outreach_intel import wave_scheduler
+from outreach_intel.wave_index import EligibilityIndex
+from outreach_intel.wave_scheduler import build_wave, get_wave_eligible_contacts, resume_wave, stamp_wave
+
+
+class FakeHubSpot:
+    """Records list adds and batch updates; can fail a chosen update call."""
+
+    def __init__(self, fail_update_at=None, fail_reads=False, live=None):
+        self.fail_update_at = fail_update_at
+        self.fail_reads = fail_reads
+        self.live = live or {}
+        self.update_calls = 0
+        self.listed: list[str] = []
+        self.updates: dict[str, dict] = {}
+        self.reads: list[list[str]] = []
+
+    def create_list(self, name):
+        return {"list": {"listId": 42}}
+
+    def add_contacts_to_list(self, list_id, ids):
+        self.listed.extend(ids)
+        return {}
+
+    def batch_update_contacts(self, updates):
+        self.update_calls += 1
+        if self.update_calls == self.fail_update_at:
+            raise RuntimeError("HubSpot 502")
+        for u in updates:
+            self.updates[u["id"]] = u["properties"]
+        return []
+
+    def batch_get_contacts(self, ids, properties=None):
+        if self.fail_reads:
+            raise RuntimeError("HubSpot 502")
+        self.reads.append(ids)
+        return [
+            {"id": cid, "properties": {"outreach_wave_count": "3", **self.live.get(cid, {})}}
+            for cid in ids if self.live.get(cid) != "deleted"
+        ]
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Keep checkpoints and the wave ledger out of the real exports dir."""
+    monkeypatch.setattr(wave_scheduler, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+    ledger: list[tuple] = []
+    monkeypatch.setattr(wave_scheduler, "append_ledger", lambda *args: ledger.append(args))
+    return ledger
+
+
+def _index(n, wave_count=None):
+    return EligibilityIndex.from_contacts([
+        {"id": str(i), "properties": {
+            "email": f"c{i}@example.com",
+            "sales_vertical": "Bank",
+            "outreach_wave_count": wave_count,
+        }}
+        for i in range(n)
+    ])
+
+
+def test_build_wave_rereads_counts_for_index_selection(isolated_state):
+    """Snapshot wave counts may be stale, so they are read from HubSpot before stamping."""
+    hs = FakeHubSpot()
+
+    result = build_wave(wave_size=250, angle="gse-compliance", client=hs, index=_index(250, "2"))
+
+    assert result["contact_count"] == 250
+    assert sorted(len(ids) for ids in hs.reads) == [50, 100, 100]
+    assert sorted(hs.listed, key=int) == [str(i) for i in range(250)]
+    assert {p["outreach_wave_count"] for p in hs.updates.values()} == {"4"}
+    assert len(isolated_state) == 1
+    assert list(wave_scheduler.CHECKPOINT_DIR.glob("*.json")) == []
+
+
+def test_index_selection_skips_contacts_no_longer_eligible_in_hubspot():
+    """A contact who unsubscribed after the snapshot is never re-activated."""
+    index = _index(4)
+    hs = FakeHubSpot(live={
+        "0": {"outreach_status": "unsubscribed"},
+        "1": {"lifecyclestage": "customer"},
+        "2": "deleted",
+    })
+
+    result = build_wave(wave_size=4, angle="gse-compliance", client=hs, index=index)
+
+    assert result["contact_count"] == 1
+    assert [c["id"] for c in result["contacts"]] == ["3"]
+    assert hs.listed == ["3"]
+    assert list(hs.updates) == ["3"]
+    assert hs.updates["3"]["outreach_status"] == "active"
+    # Still selectable from the index, but not recorded as waved
+    assert "0" in {c["id"] for c in index.select(wave_size=4, angle="speed-to-close")}
+
+
+def test_interrupted_status_check_resumes_before_any_write():
+    """The live check runs after the checkpoint exists, so resume redoes it."""
+    hs = FakeHubSpot(fail_reads=True)
+    with pytest.raises(RuntimeError):
+        build_wave(wave_size=150, angle="gse-compliance", client=hs, index=_index(150), list_name="Wave X")
+
+    [checkpoint] = wave_scheduler.CHECKPOINT_DIR.glob("wave-x-*.json")
+    assert hs.listed == [] and hs.updates == {}
+
+    retry = FakeHubSpot(live={"7": {"outreach_status": "unsubscribed"}})
+    result = resume_wave(str(checkpoint), client=retry)
+
+    assert result["contact_count"] == 149
+    assert sorted(len(ids) for ids in retry.reads) == [50, 100]
+    assert "7" not in retry.updates and "7" not in retry.listed
+
+
+def test_interrupted_wave_resumes_from_checkpoint():
+    """A failed batch leaves a checkpoint; resuming only redoes what's pending."""
+    hs = FakeHubSpot(fail_update_at=2)
+    with pytest.raises(RuntimeError):
+        build_wave(wave_size=300, angle="gse-compliance", client=hs, index=_index(300), list_name="Wave X")
+
+    [checkpoint] = wave_scheduler.CHECKPOINT_DIR.glob("wave-x-*.json")
+    assert len(hs.updates) == 200
+
+    retry = FakeHubSpot()
+    result = resume_wave(str(checkpoint), client=retry)
+
+    assert result["list_id"] == "42"
+    assert result["contact_count"] == 300
+    assert len(retry.updates) == 100
+    assert retry.listed == []
+    assert not checkpoint.exists()
+
+
+def test_stamp_wave_reads_only_missing_counts():
+    """Standalone stamping reads counts just for IDs it wasn't given."""
+    hs = FakeHubSpot()
+
+    stamped = stamp_wave(["1", "2"], "speed-to-close", client=hs, wave_counts={"1": 0})
+
+    assert stamped == 2
+    assert hs.reads == [["2"]]
+    assert hs.updates["1"]["outreach_wave_count"] == "1"
+    assert hs.updates["2"]["outreach_wave_count"] == "4"
+
+
+def test_checkpoints_do_not_overwrite_an_interrupted_wave():
+    """A second same-name wave gets its own checkpoint file."""
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            build_wave(wave_size=300, angle="gse-compliance", client=FakeHubSpot(fail_update_at=1),
+                       index=_index(300), list_name="Wave X")
+
+    assert len(list(wave_scheduler.CHECKPOINT_DIR.glob("wave-x-*.json"))) == 2
+
+
+def test_interrupted_stamp_resumes_without_a_list(isolated_state):
+    """stamp_wave checkpoints resume through resume_wave too."""
+    with pytest.raises(RuntimeError):
+        stamp_wave([str(i) for i in range(200)], "speed-to-close", client=FakeHubSpot(fail_update_at=2),
+                   wave_counts={str(i): 0 for i in range(200)})
+    [checkpoint] = wave_scheduler.CHECKPOINT_DIR.glob("stamp-speed-to-close-*.json")
+
+    retry = FakeHubSpot()
+    result = resume_wave(str(checkpoint), client=retry)
+
+    assert result["contact_count"] == 200
+    assert len(retry.updates) == 100
+    assert retry.listed == []
+    assert len(isolated_state) == 1
+    assert not checkpoint.exists()
+
+
+def test_stale_snapshot_falls_back_to_live_search(monkeypatch):
+    """An index built from an old snapshot is not trusted for selection."""
+    searches = []
+
+    def fake_search(hs, filters, properties, max_results):
+        searches.append(filters)
+        return [{"id": "live", "properties": {}}][:max_results]
+
+    monkeypatch.setattr(wave_scheduler, "_paginated_search", fake_search)
+    index = _index(3)
+    index.as_of = datetime.now(timezone.utc) - timedelta(days=1)
+
+    assert len(get_wave_eligible_contacts(client=FakeHubSpot(), wave_size=3, index=index)) == 3
+    assert searches == []
+
+    index.as_of = datetime.now(timezone.utc) - timedelta(days=10)
+    selected = get_wave_eligible_contacts(client=FakeHubSpot(), wave_size=1, index=index)
+
+    assert [c["id"] for c in selected] == ["live"]
+    assert searches
@@ -0,0 +1,132 @@
+"""Tests for the wave schedule simulator."""
+import contextlib
+import io
+from datetime import date
+
+from outreach_intel import cli
+from outreach_intel.wave_simulator import SimConfig, cohorts_from_contacts, simulate, sweep
+
+MONDAY = date(2026, 6, 1)
+
+
+def _contacts(n, vertical="Bank", last=None, angle=None, status=None):
+    return [
+        {"id": str(i), "properties": {
+            "sales_vertical": vertical,
+            "last_outreach_wave_date": last,
+            "outreach_wave_angle": angle,
+            "outreach_status": status,
+        }}
+        for i in range(n)
+    ]
+
+
+def test_cohorts_collapse_identical_contacts():
+    """Contacts with the same state share one cohort; excluded ones are dropped."""
+    contacts = _contacts(10) + _contacts(5, last="2026-05-20") + _contacts(3, status="unsubscribed")
+
+    cohorts = cohorts_from_contacts(contacts, start=MONDAY, cycle_days=45)
+
+    assert cohorts == {(0, "Bank", 0): 10, (33, "Bank", 0): 5}
+
+
+def test_waves_recycle_after_cycle_days():
+    """Contacts return to the pool cycle_days after their wave launches."""
+    cohorts = cohorts_from_contacts(_contacts(100), start=MONDAY)
+    config = SimConfig(wave_size=100, wave_interval_days=7, cycle_days=14, horizon_days=21, inboxes=1000)
+
+    result = simulate(cohorts, config, start=MONDAY)
+
+    assert [w.contacts for w in result.waves] == [100, 0, 100]
+    assert result.waves[1].shortfall_reason == "eligibility"
+    assert result.waves[2].angle != result.waves[0].angle
+
+
+def test_angle_history_blocks_repeat_pitch():
+    """Contacts who already had the wave's angle are skipped and reported."""
+    contacts = _contacts(50, angle="encompass-integration") + _contacts(50, vertical="IMB")
+    cohorts = cohorts_from_contacts(contacts, start=MONDAY)
+
+    result = simulate(cohorts, SimConfig(wave_size=100, horizon_days=1, inboxes=1000), start=MONDAY)
+
+    wave = result.waves[0]
+    assert wave.angle == "encompass-integration"
+    assert wave.contacts == 50
+    assert wave.skipped_for_angle == 50
+    assert wave.shortfall_reason == "angle"
+
+
+def test_capacity_backlog_and_bottleneck():
+    """Emails beyond daily inbox capacity carry over and flag the inbox limit."""
+    cohorts = cohorts_from_contacts(_contacts(1000), start=MONDAY)
+    config = SimConfig(wave_size=1000, horizon_days=7, inboxes=40, emails_per_inbox_per_day=5)
+
+    result = simulate(cohorts, config, start=MONDAY)
+
+    monday = result.days[0]
+    assert (monday.emails_due, monday.emails_sent, monday.backlog) == (1000, 200, 800)
+    assert result.bottlenecks["binding_limit"] == "inbox"
+    assert result.bottlenecks["inboxes_for_zero_backlog"] == 200
+
+
+def test_zero_per_inbox_limit_reports_no_inbox_estimate():
+    """A config without a per-inbox limit can't size inboxes, and doesn't crash."""
+    cohorts = cohorts_from_contacts(_contacts(10), start=MONDAY)
+    config = SimConfig(wave_size=10, horizon_days=7, emails_per_inbox_per_day=0, emails_per_domain_per_day=50)
+
+    result = simulate(cohorts, config, start=MONDAY)
+
+    assert result.bottlenecks["inboxes_for_zero_backlog"] is None
+
+
+def test_inboxes_beyond_what_the_domains_host_add_no_capacity():
+    """Each domain hosts inboxes_per_domain inboxes; extra inboxes sit idle."""
+    cohorts = cohorts_from_contacts(_contacts(1000), start=MONDAY)
+    config = SimConfig(wave_size=1000, horizon_days=7, inboxes=200, domains=2, inboxes_per_domain=50)
+
+    result = simulate(cohorts, config, start=MONDAY)
+
+    assert result.days[0].emails_sent == 100 * 5
+    assert result.bottlenecks["binding_limit"] == "domain"
+    assert result.bottlenecks["inboxes_for_zero_backlog"] == 200
+    assert result.bottlenecks["domains_for_zero_backlog"] == 4
+
+
+def test_cli_sweep_prints_zero_capacity_rows(monkeypatch):
+    """A sweep that includes zero inboxes prints '-' instead of crashing."""
+    cohorts = cohorts_from_contacts(_contacts(100), start=MONDAY)
+    monkeypatch.setattr(cli, "open_latest_snapshot", _Snapshot)
+    monkeypatch.setattr(cli, "cohorts_from_snapshot", lambda snapshot, **kwargs: cohorts)
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        cli.main(["tam-simulate", "--horizon", "7", "--sweep-inboxes", "0,10"])
+
+    rows = out.getvalue().splitlines()[-2:]
+    assert rows[0].split()[1] == "0" and rows[0].split()[5] == "-"
+    assert rows[1].split()[5].endswith("d")
+
+
+class _Snapshot:
+    version = 1
+
+    def __len__(self):
+        return 100
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_sweep_covers_every_combination():
+    """sweep runs the cross product of the varied fields."""
+    cohorts = cohorts_from_contacts(_contacts(500), start=MONDAY)
+
+    results = sweep(cohorts, SimConfig(horizon_days=14), start=MONDAY, wave_size=[100, 200], inboxes=[10, 20, 30])
+
+    assert len(results) == 6
+    assert {(r.config.wave_size, r.config.inboxes) for r in results} == {
+        (w, i) for w in (100, 200) for i in (10, 20, 30)
+    }
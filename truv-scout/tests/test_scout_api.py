@@ -1,12 +1,15 @@
 """Tests for the Truv Scout FastAPI endpoints."""
 
+import asyncio
+import threading
+import time
 from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 
 import truv_scout.app as app_module
-from truv_scout.app import app
+from truv_scout.app import ScoringPool, app
 from truv_scout.models import PipelineResult, ScoutDecision
 
 client = TestClient(app)
@@ -78,7 +81,7 @@ def test_score_no_params():
     assert "contact_id" in body["detail"].lower() or "email" in body["detail"].lower()
 
 
-@patch("truv_scout.pipeline.run_pipeline")
+@patch("truv_scout.pipeline.run_pipeline_async")
 def test_score_with_contact_id(mock_run):
     """POST /score with contact_id returns a valid ScoreResponse."""
     mock_run.return_value = _make_pipeline_result("c-456")
@@ -130,3 +133,68 @@ def test_webhook_no_token():
     payload = {"contact_id": "wh-999", "event_type": "form_submission", "properties": {}}
     resp = client.post("/webhook", json=payload)
     assert resp.status_code == 401
+
+
+def test_concurrent_scores_do_not_block_the_event_loop(monkeypatch):
+    """Scores overlap on the event loop and /health answers meanwhile."""
+    monkeypatch.setattr(app_module, "_scoring_pool", ScoringPool(workers=2, queue_limit=0))
+    # Both pipelines and the test must meet here, so scores that ran one
+    # after another would break the barrier instead of passing
+    both_running = threading.Barrier(3, timeout=5)
+    release = threading.Event()
+
+    async def blocked_pipeline(**kwargs):
+        # Wait off the loop, as the real pipeline's blocking calls do
+        await asyncio.to_thread(both_running.wait)
+        await asyncio.to_thread(release.wait, 5)
+        return _make_pipeline_result(kwargs["contact_id"])
+
+    statuses = []
+    with patch("truv_scout.pipeline.run_pipeline_async", side_effect=blocked_pipeline), TestClient(app) as shared:
+        def score(contact_id):
+            resp = shared.post("/score", json={"contact_id": contact_id}, headers=_auth_headers())
+            statuses.append(resp.status_code)
+
+        threads = [threading.Thread(target=score, args=(f"c-{i}",)) for i in range(2)]
+        for t in threads:
+            t.start()
+        try:
+            both_running.wait()
+            assert shared.get("/health").status_code == 200
+            # Still blocked: /health didn't have to wait for them
+            assert app_module._scoring_pool.stats()["running"] == 2
+        finally:
+            release.set()
+            for t in threads:
+                t.join()
+
+    assert statuses == [200, 200]
+    assert app_module._scoring_pool.stats()["completed"] == 2
+
+
+def test_score_returns_503_when_pool_is_full(monkeypatch):
+    """Requests beyond workers + queue limit are refused, not queued without bound."""
+    monkeypatch.setattr(app_module, "_scoring_pool", ScoringPool(workers=1, queue_limit=0))
+    release = threading.Event()
+
+    async def blocked_pipeline(**kwargs):
+        await asyncio.to_thread(release.wait, 5)
+        return _make_pipeline_result(kwargs["contact_id"])
+
+    with patch("truv_scout.pipeline.run_pipeline_async", side_effect=blocked_pipeline), TestClient(app) as shared:
+        first = threading.Thread(
+            target=shared.post, args=("/score",), kwargs={"json": {"contact_id": "c-1"}, "headers": _auth_headers()}
+        )
+        first.start()
+        deadline = time.monotonic() + 2
+        while app_module._scoring_pool.stats()["running"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        resp = shared.post("/score", json={"contact_id": "c-2"}, headers=_auth_headers())
+        release.set()
+        first.join()
+
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "10"
+    stats = app_module._scoring_pool.stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 1 and stats["queued"] == 0
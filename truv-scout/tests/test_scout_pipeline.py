@@ -0,0 +1,184 @@
+"""Tests for the async pipeline's concurrency and per-layer timings."""
+
+import asyncio
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from outreach_intel.enrichment.base import EnrichedCompany, EnrichedPerson
+from truv_scout.models import ScoutDecision
+from truv_scout.pipeline import run_pipeline, run_pipeline_async
+from truv_scout.tools.apollo import FilteredApolloEnrichment
+
+DELAY = 0.2
+
+
+def _slow(value, calls=None, name=None):
+    def call(*args, **kwargs):
+        if calls is not None:
+            calls.append(name)
+        time.sleep(DELAY)
+        return value
+
+    return call
+
+
+def _contact():
+    return {
+        "id": "123",
+        "properties": {
+            "firstname": "Jane",
+            "lastname": "Doe",
+            "email": "jane@lender.com",
+            "company": "Lender Co",
+            "jobtitle": "VP Lending",
+            "use_case": "mortgage",
+        },
+    }
+
+
+def _person():
+    return EnrichedPerson(title="VP Lending", company_domain="lender.com", raw={"organization": {"id": "org-1"}})
+
+
+def _company():
+    return EnrichedCompany(name="Lender Co", employee_count=500, tech_stack=["Encompass"])
+
+
+def _decision():
+    return ScoutDecision(
+        adjusted_score=70.0,
+        tier="hot",
+        routing="enterprise",
+        reasoning="Strong fit.",
+        recommended_action="Call.",
+        confidence="high",
+    )
+
+
+@pytest.fixture
+def slow_dependencies():
+    """Every external call sleeps DELAY seconds; sequentially that's 7 × DELAY."""
+    hubspot = MagicMock()
+    hubspot.return_value.get_contact.side_effect = _slow(_contact())
+    apollo = MagicMock()
+    apollo.return_value.enrich_person.side_effect = _slow(_person())
+    apollo.return_value.enrich_organization.side_effect = _slow(_company())
+    apollo.return_value.get_job_postings.side_effect = _slow([])
+    agent = MagicMock(side_effect=_slow(_decision()))
+    with (
+        patch("truv_scout.pipeline.HubSpotClient", hubspot),
+        patch("truv_scout.tools.apollo.ApolloClient", apollo),
+        patch("truv_scout.agent.run_scout_agent", agent),
+        patch("truv_scout.tools.awareness.list_sources", side_effect=_slow("sources")),
+        patch("truv_scout.tools.search.search_knowledge_base", side_effect=_slow('Search results for "x"')),
+    ):
+        yield {"hubspot": hubspot, "apollo": apollo, "agent": agent}
+
+
+def _window(layer):
+    return datetime.fromisoformat(layer.started_at), datetime.fromisoformat(layer.finished_at)
+
+
+def test_pipeline_overlaps_independent_io(slow_dependencies):
+    result = run_pipeline(
+        contact_id="123", email="jane@lender.com", first_name="Jane", last_name="Doe",
+        company="Lender Co", domain="lender.com",
+    )
+    layers = result.trace.layers
+
+    # HubSpot ‖ Apollo (person ‖ org, then postings) ‖ KB, then the agent
+    assert result.trace.total_duration_ms < 5 * DELAY * 1000
+    assert result.final_score == 70.0
+    assert result.enrichment.los_pos_matches
+    assert "updated_routing" in layers["apollo_enrichment"].output_summary
+
+    hubspot_start, hubspot_end = _window(layers["hubspot_fetch"])
+    apollo_start, apollo_end = _window(layers["apollo_enrichment"])
+    knowledge_start, knowledge_end = _window(layers["knowledge_prefetch"])
+    agent_start, _ = _window(layers["scout_agent"])
+    assert apollo_start < hubspot_end
+    assert knowledge_start >= hubspot_end and knowledge_start < apollo_end
+    assert agent_start >= max(apollo_end, knowledge_end)
+
+    # Each layer reports its own work, not time spent waiting on others
+    assert layers["hubspot_fetch"].duration_ms == pytest.approx(DELAY * 1000, abs=100)
+    assert layers["apollo_enrichment"].duration_ms == pytest.approx(2 * DELAY * 1000, abs=100)
+    assert layers["knowledge_prefetch"].duration_ms == pytest.approx(DELAY * 1000, abs=100)
+    assert layers["scout_agent"].duration_ms == pytest.approx(DELAY * 1000, abs=100)
+
+    # The agent gets the prefetched knowledge
+    assert "sources" in slow_dependencies["agent"].call_args.args[4]
+
+
+def test_apollo_waits_for_contact_without_email(slow_dependencies):
+    result = run_pipeline(contact_id="123")
+    layers = result.trace.layers
+
+    _, hubspot_end = _window(layers["hubspot_fetch"])
+    apollo_start, _ = _window(layers["apollo_enrichment"])
+    assert apollo_start >= hubspot_end
+    assert layers["apollo_enrichment"].input_summary["email"] == "jane@lender.com"
+
+
+def test_apollo_waits_for_contact_when_request_lacks_name_or_company(slow_dependencies):
+    """HubSpot fills the Apollo inputs the request left out."""
+    result = run_pipeline(contact_id="123", email="jane@lender.com", domain="lender.com", skip_agent=True)
+    layers = result.trace.layers
+
+    _, hubspot_end = _window(layers["hubspot_fetch"])
+    apollo_start, _ = _window(layers["apollo_enrichment"])
+    assert apollo_start >= hubspot_end
+    assert layers["apollo_enrichment"].input_summary == {
+        "email": "jane@lender.com",
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "company": "Lender Co",
+        "domain": "lender.com",
+    }
+
+
+def test_hubspot_failure_falls_back_to_request_fields(slow_dependencies):
+    slow_dependencies["hubspot"].return_value.get_contact.side_effect = RuntimeError("HubSpot down")
+
+    result = run_pipeline(contact_id="123", email="jane@lender.com", company="Lender Co", skip_agent=True)
+
+    assert result.trace.layers["hubspot_fetch"].status == "failed"
+    assert result.company_name == "Lender Co"
+    assert result.trace.layers["apollo_enrichment"].status == "complete"
+    assert "knowledge_prefetch" not in result.trace.layers
+
+
+def test_enrich_async_matches_enrich_full_and_overlaps_org():
+    calls: list[str] = []
+    with patch("truv_scout.tools.apollo.ApolloClient") as client_cls:
+        client = client_cls.return_value
+        client.enrich_person.side_effect = _slow(_person(), calls, "person")
+        client.enrich_organization.side_effect = _slow(_company(), calls, "org")
+        client.get_job_postings.side_effect = _slow([], calls, "postings")
+        apollo = FilteredApolloEnrichment(api_key="test-key")
+
+        start = time.monotonic()
+        enrichment = asyncio.run(apollo.enrich_async(email="jane@lender.com", domain="lender.com"))
+        elapsed = time.monotonic() - start
+
+    assert sorted(calls) == ["org", "person", "postings"]
+    client.enrich_organization.assert_called_once_with("lender.com")
+    client.get_job_postings.assert_called_once_with("org-1")
+    assert elapsed < 2.5 * DELAY
+    assert enrichment.company_name == "Lender Co"
+    assert enrichment.los_pos_matches
+
+
+def test_cancelling_the_pipeline_cancels_pending_work(slow_dependencies):
+    async def scenario():
+        task = asyncio.create_task(run_pipeline_async(contact_id="123", email="jane@lender.com"))
+        await asyncio.sleep(DELAY / 2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    slow_dependencies["agent"].assert_not_called()
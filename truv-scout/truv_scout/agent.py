@@ -127,6 +127,7 @@ def run_scout_agent(
     enrichment: Optional[ScoutEnrichment],
     routing: str,
     tier: str,
+    knowledge: Optional[str] = None,
 ) -> ScoutDecision:
     """Run the Scout agent using a two-pass approach for reliable tool use.
 
@@ -142,6 +143,9 @@ def run_scout_agent(
         enrichment: Filtered Apollo enrichment (may be None).
         routing: Deterministic routing label.
         tier: Deterministic tier label.
+        knowledge: Knowledge base results fetched ahead of time by the
+            pipeline. When given, the research pass starts from them instead
+            of calling list_sources() and searching for the basics itself.
 
     Returns:
         ScoutDecision with adjusted score and reasoning.
@@ -159,13 +163,24 @@ def run_scout_agent(
         markdown=False,
     )
 
+    if knowledge:
+        knowledge_steps = (
+            "1. Review the prefetched knowledge base results below.\n"
+            "2. Call search_knowledge_base() only for queries about this lead's industry, "
+            "company, or use case that the prefetched results do not cover.\n"
+        )
+    else:
+        knowledge_steps = (
+            "1. Call list_sources() to see what knowledge is available.\n"
+            "2. Call search_knowledge_base() with at least one query relevant to this lead's "
+            "industry, company, or use case.\n"
+        )
+
     research_prompt = (
         f"You are a research assistant. Your ONLY job is to gather context about this lead. "
         f"Do NOT score the lead. Do NOT return JSON.\n\n"
         f"Complete these steps and report what you found:\n"
-        f"1. Call list_sources() to see what knowledge is available.\n"
-        f"2. Call search_knowledge_base() with at least one query relevant to this lead's "
-        f"industry, company, or use case.\n"
+        f"{knowledge_steps}"
         f"3. If the lead has 50+ employees or is in lending/mortgage/financial services, "
         f"call check_job_changes() with their company name.\n"
         f"4. If there are tech stack matches (LOS/POS/VOI/VOE), call search_knowledge_base() "
@@ -173,6 +188,8 @@ def run_scout_agent(
         f"After calling the tools, summarize all findings in plain text. "
         f"List every file path or source you referenced.\n\n{context}"
     )
+    if knowledge:
+        research_prompt += f"\n\n--- KNOWLEDGE BASE (prefetched) ---\n{knowledge}"
 
     try:
         research_response = research_agent.run(research_prompt)
@@ -1,12 +1,14 @@
 """FastAPI application for Truv Scout."""
 
+import asyncio
 import dataclasses
 import hmac
 import logging
 import os
 import threading
-from collections import OrderedDict
-from typing import Optional
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Optional
 
 from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Query
 
@@ -41,6 +43,91 @@ def _save_trace(contact_id: str, trace_dict: dict) -> None:
             _trace_store.popitem(last=False)
 
 
+class ScoringPool:
+    """Admission control for /score pipelines.
+
+    /score awaits run_pipeline_async on the event loop, and the pipeline
+    puts its blocking HubSpot, Apollo and Gemini calls on threads itself.
+    At most ``workers`` scores run at once. Up to ``queue_limit`` more may
+    wait for a slot; beyond that, ``admit`` refuses and the caller answers 503.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._slots = asyncio.Semaphore(workers)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        # (queue wait, run time) of recent scores, for percentiles
+        self._timings: deque[tuple[float, float]] = deque(maxlen=500)
+
+    def admit(self) -> bool:
+        """Reserve a place for one score, or return False when the pool is full."""
+        with self._lock:
+            if self.in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    async def run(self, fn: Callable[..., Awaitable], /, *args, **kwargs):
+        """Await fn once a slot is free. Call only after ``admit`` returned True."""
+        queued_at = time.monotonic()
+        try:
+            async with self._slots:
+                started = time.monotonic()
+                with self._lock:
+                    self.running += 1
+                ok = False
+                try:
+                    result = await fn(*args, **kwargs)
+                    ok = True
+                    return result
+                finally:
+                    with self._lock:
+                        self.running -= 1
+                        if ok:
+                            self.completed += 1
+                        else:
+                            self.failed += 1
+                        self._timings.append((started - queued_at, time.monotonic() - started))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(w for w, _ in self._timings)
+            runs = sorted(r for _, r in self._timings)
+            stats = {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "running": self.running,
+                "queued": self.in_flight - self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+        def pct(values: list[float], q: float) -> Optional[float]:
+            return round(values[min(int(q * len(values)), len(values) - 1)], 3) if values else None
+
+        stats.update({
+            "queue_wait_p50_seconds": pct(waits, 0.5),
+            "queue_wait_p95_seconds": pct(waits, 0.95),
+            "run_p50_seconds": pct(runs, 0.5),
+            "run_p95_seconds": pct(runs, 0.95),
+        })
+        return stats
+
+
+_scoring_pool = ScoringPool(workers=settings.score_workers, queue_limit=settings.score_queue_limit)
+
+
 def _check_token(token: Optional[str]) -> None:
     """Raise 401 if webhook secret is not set or token doesn't match."""
     if not settings.webhook_secret:
@@ -69,6 +156,7 @@ def system_status(x_scout_token: Optional[str] = Header(None)):
             "c": {"name": "Dashboard Signups", "endpoint": "/webhook/dashboard-signup"},
             "d": {"name": "ROI Calculator", "endpoint": "/webhook/roi-calculator"},
         },
+        "scoring": _scoring_pool.stats(),
     }
 
 
@@ -77,15 +165,23 @@ async def score_lead(
     request: ScoreRequest,
     x_scout_token: Optional[str] = Header(None),
 ):
-    """Score an inbound lead through the full pipeline."""
+    """Score an inbound lead through the full pipeline.
+
+    The pipeline runs on the event loop under the scoring pool's admission
+    control. Returns 503 when the pool's queue is full.
+    """
     _check_token(x_scout_token)
-    from truv_scout.pipeline import run_pipeline
+    from truv_scout.pipeline import run_pipeline_async
 
     if not request.contact_id and not request.email:
         raise HTTPException(400, "Either contact_id or email is required")
 
+    if not _scoring_pool.admit():
+        raise HTTPException(503, "Scoring queue is full, retry shortly", headers={"Retry-After": "10"})
+
     try:
-        result = run_pipeline(
+        result = await _scoring_pool.run(
+            run_pipeline_async,
             contact_id=request.contact_id,
             email=request.email,
             first_name=request.first_name,
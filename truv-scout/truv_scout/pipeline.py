@@ -1,12 +1,26 @@
-"""Pipeline orchestrator — runs all scoring layers with graceful degradation."""
+"""Pipeline orchestrator — runs all scoring layers with graceful degradation.
 
+The pipeline is async so independent I/O overlaps. When the request already
+has everything Apollo needs, the enrichment starts together with the HubSpot
+fetch, and the knowledge base lookups run alongside Apollo. A lead therefore
+takes about as long as its slowest dependency chain, not the sum of every
+call. The HubSpot, Apollo and Agno clients are synchronous, so each blocking
+call runs on a worker thread via asyncio.to_thread.
+
+Each LayerTrace times its own work. Under overlap, layers' started_at and
+finished_at ranges intersect, and their durations sum to more than the
+pipeline's total_duration_ms.
+"""
+
+import asyncio
 import logging
 import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterator, Optional
 
 from outreach_intel.hubspot_client import HubSpotClient
-from outreach_intel.scorer import FORM_PROPERTIES
+from outreach_intel.scorer import FORM_PROPERTIES, ScoredContact
 from truv_scout.models import LayerTrace, PipelineResult, PipelineTrace, ScoutEnrichment
 from truv_scout.scorer import classify_route, classify_tier, score_and_route
 
@@ -26,6 +40,10 @@ SCORE_PROPERTIES = [
     *FORM_PROPERTIES,
 ]
 
+# Form fields searched in the knowledge base ahead of the agent's research pass
+KNOWLEDGE_QUERY_PROPERTIES = ["use_case", "what_s_your_use_case___forms_"]
+MAX_KNOWLEDGE_QUERIES = 3
+
 
 def run_pipeline(
     contact_id: Optional[str] = None,
@@ -37,6 +55,35 @@ def run_pipeline(
     skip_enrichment: bool = False,
     skip_agent: bool = False,
     source: str = "form_submission",
+) -> PipelineResult:
+    """Run the full Scout scoring pipeline from synchronous code.
+
+    Runs run_pipeline_async() on its own event loop. From code that already
+    has a running loop, await run_pipeline_async() instead.
+    """
+    return asyncio.run(run_pipeline_async(
+        contact_id=contact_id,
+        email=email,
+        first_name=first_name,
+        last_name=last_name,
+        company=company,
+        domain=domain,
+        skip_enrichment=skip_enrichment,
+        skip_agent=skip_agent,
+        source=source,
+    ))
+
+
+async def run_pipeline_async(
+    contact_id: Optional[str] = None,
+    email: Optional[str] = None,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    company: Optional[str] = None,
+    domain: Optional[str] = None,
+    skip_enrichment: bool = False,
+    skip_agent: bool = False,
+    source: str = "form_submission",
 ) -> PipelineResult:
     """Run the full Scout scoring pipeline.
 
@@ -47,167 +94,173 @@ def run_pipeline(
     4. Learning engine (STUB — needs PgVector)
 
     Each layer degrades gracefully if it fails.
+
+    Concurrency:
+    - HubSpot fetch ‖ Apollo enrichment, when the request has an email,
+      name and company (or there is no contact to fetch). Otherwise Apollo
+      waits for the contact and fills the gaps from HubSpot.
+    - Apollo enrichment ‖ knowledge base prefetch. The agent needs both.
     """
     # Trace setup
     pipeline_start = time.monotonic()
-    now_str = datetime.now(timezone.utc).isoformat()
     trace = PipelineTrace(
         contact_id=contact_id or email or "unknown",
-        started_at=now_str,
+        started_at=_now(),
         source=source,
     )
 
-    # Resolve contact data
-    contact = _resolve_contact(contact_id, email, first_name, last_name, company)
-    cid = contact.get("id", contact_id or email or "unknown")
-    trace.contact_id = cid
+    l2 = LayerTrace(name="apollo_enrichment")
+    apollo_task: Optional[asyncio.Task] = None
+    knowledge_task: Optional[asyncio.Task] = None
+    try:
+        request_complete = bool(first_name and last_name and company)
+        if not skip_enrichment and email and (request_complete or not contact_id):
+            apollo_task = asyncio.create_task(_enrich(l2, {
+                "email": email,
+                "first_name": first_name or "",
+                "last_name": last_name or "",
+                "company": company or "",
+                "domain": domain or "",
+            }))
 
-    props = contact.get("properties", {})
-    result = PipelineResult(
-        contact_id=cid,
-        contact_name=f"{props.get('firstname', '')} {props.get('lastname', '')}".strip(),
-        company_name=props.get("company", ""),
-    )
+        # Resolve contact data
+        if contact_id:
+            hubspot = LayerTrace(name="hubspot_fetch", input_summary={"contact_id": contact_id})
+            trace.layers["hubspot_fetch"] = hubspot
+            contact = await _fetch_contact(hubspot, contact_id)
+        else:
+            contact = None
+        if contact is None:
+            contact = _manual_contact(contact_id, email, first_name, last_name, company)
+        cid = contact.get("id", contact_id or email or "unknown")
+        trace.contact_id = cid
 
-    # --- Layer 1: Deterministic Scorer ---
-    l1 = LayerTrace(name="deterministic_scorer")
-    l1.started_at = datetime.now(timezone.utc).isoformat()
-    l1_start = time.monotonic()
-    l1.input_summary = {"contact_id": cid, "email": props.get("email", ""), "company": props.get("company", "")}
-
-    scored, routing, tier = score_and_route(contact)
-    result.base_score = scored.total_score
-    result.form_fit_score = scored.form_fit_score
-    result.engagement_score = scored.engagement_score
-    result.timing_score = scored.timing_score
-    result.deal_context_score = scored.deal_context_score
-    result.external_trigger_score = scored.external_trigger_score
-    result.base_routing = routing
-    product_intent_bonus = 0.0
-    if source == "dashboard_signup":
-        product_intent_bonus = 25.0
-        logger.info(f"[pipeline] Dashboard signup bonus: +{product_intent_bonus} pts")
-    elif source == "roi_calculator":
-        product_intent_bonus = 20.0
-        logger.info(f"[pipeline] ROI calculator bonus: +{product_intent_bonus} pts")
-
-    base_with_bonus = min(scored.total_score + product_intent_bonus, 100.0)
-    result.final_score = base_with_bonus
-    result.final_tier = classify_tier(base_with_bonus)
-    result.final_routing = routing
-    result.reasoning = "Deterministic score only."
-    result.confidence = "medium"
-
-    l1.status = "complete"
-    l1.finished_at = datetime.now(timezone.utc).isoformat()
-    l1.duration_ms = int((time.monotonic() - l1_start) * 1000)
-    l1.output_summary = {
-        "base_score": scored.total_score,
-        "product_intent_bonus": product_intent_bonus,
-        "final_base_score": base_with_bonus,
-        "routing": routing,
-        "tier": tier,
-        "form_fit": scored.form_fit_score,
-        "engagement": scored.engagement_score,
-        "timing": scored.timing_score,
-        "deal_context": scored.deal_context_score,
-        "external_trigger": scored.external_trigger_score,
-    }
-    trace.layers["deterministic_scorer"] = l1
+        props = contact.get("properties", {})
+        result = PipelineResult(
+            contact_id=cid,
+            contact_name=f"{props.get('firstname', '')} {props.get('lastname', '')}".strip(),
+            company_name=props.get("company", ""),
+        )
 
-    # --- Layer 2: Filtered Apollo Enrichment ---
-    l2 = LayerTrace(name="apollo_enrichment")
-    enrichment = None
-    if not skip_enrichment:
-        l2.started_at = datetime.now(timezone.utc).isoformat()
-        l2_start = time.monotonic()
-        l2.input_summary = {
-            "email": scored.email or email or "",
-            "first_name": first_name or scored.firstname or "",
-            "last_name": last_name or scored.lastname or "",
-            "company": company or scored.company or "",
-            "domain": domain or "",
-        }
-        try:
-            from truv_scout.tools.apollo import FilteredApolloEnrichment
+        # --- Layer 1: Deterministic Scorer ---
+        l1 = LayerTrace(name="deterministic_scorer")
+        with _timed(l1):
+            l1.input_summary = {"contact_id": cid, "email": props.get("email", ""), "company": props.get("company", "")}
 
-            apollo = FilteredApolloEnrichment()
-            enrichment = apollo.enrich(
-                email=scored.email or email or "",
-                first_name=first_name or scored.firstname or "",
-                last_name=last_name or scored.lastname or "",
-                company=company or scored.company or "",
-                domain=domain or "",
-            )
-            result.enrichment = enrichment
+            scored, routing, tier = score_and_route(contact)
+            result.base_score = scored.total_score
+            result.form_fit_score = scored.form_fit_score
+            result.engagement_score = scored.engagement_score
+            result.timing_score = scored.timing_score
+            result.deal_context_score = scored.deal_context_score
+            result.external_trigger_score = scored.external_trigger_score
+            result.base_routing = routing
+            product_intent_bonus = 0.0
+            if source == "dashboard_signup":
+                product_intent_bonus = 25.0
+                logger.info(f"[pipeline] Dashboard signup bonus: +{product_intent_bonus} pts")
+            elif source == "roi_calculator":
+                product_intent_bonus = 20.0
+                logger.info(f"[pipeline] ROI calculator bonus: +{product_intent_bonus} pts")
 
-            routing = classify_route(scored, enrichment)
+            base_with_bonus = min(scored.total_score + product_intent_bonus, 100.0)
+            result.final_score = base_with_bonus
+            result.final_tier = classify_tier(base_with_bonus)
             result.final_routing = routing
+            result.reasoning = "Deterministic score only."
+            result.confidence = "medium"
 
-            l2.status = "complete"
-            l2.output_summary = {
-                "tech_intent": enrichment.tech_intent,
-                "los_pos_matches": enrichment.los_pos_matches,
-                "voi_voe_matches": enrichment.voi_voe_matches,
-                "employee_count": enrichment.employee_count,
-                "revenue": enrichment.revenue,
-                "industry": enrichment.industry,
-                "person_title": enrichment.person_title,
-                "person_seniority": enrichment.person_seniority,
-                "company_name": enrichment.company_name,
-                "updated_routing": routing,
+            l1.status = "complete"
+            l1.output_summary = {
+                "base_score": scored.total_score,
+                "product_intent_bonus": product_intent_bonus,
+                "final_base_score": base_with_bonus,
+                "routing": routing,
+                "tier": tier,
+                "form_fit": scored.form_fit_score,
+                "engagement": scored.engagement_score,
+                "timing": scored.timing_score,
+                "deal_context": scored.deal_context_score,
+                "external_trigger": scored.external_trigger_score,
             }
-        except Exception as e:
-            logger.warning(f"Apollo enrichment failed: {e}")
-            result.enrichment_error = str(e)
-            l2.status = "failed"
-            l2.error = str(e)
-        l2.finished_at = datetime.now(timezone.utc).isoformat()
-        l2.duration_ms = int((time.monotonic() - l2_start) * 1000)
-    trace.layers["apollo_enrichment"] = l2
-
-    # --- Layer 3: Scout Agent ---
-    l3 = LayerTrace(name="scout_agent")
-    if not skip_agent:
-        l3.started_at = datetime.now(timezone.utc).isoformat()
-        l3_start = time.monotonic()
-        l3.input_summary = {
-            "base_score": scored.total_score,
-            "routing": routing,
-            "tier": tier,
-            "has_enrichment": enrichment is not None,
-        }
-        try:
-            from truv_scout.agent import run_scout_agent
-
-            decision = run_scout_agent(scored, enrichment, routing, tier)
-            result.decision = decision
-            result.final_score = decision.adjusted_score
-            result.final_tier = decision.tier
-            result.final_routing = decision.routing
-            result.reasoning = decision.reasoning
-            result.recommended_action = decision.recommended_action
-            result.confidence = decision.confidence
-
-            l3.status = "complete"
-            l3.output_summary = {
-                "adjusted_score": decision.adjusted_score,
-                "tier": decision.tier,
-                "routing": decision.routing,
-                "confidence": decision.confidence,
-                "reasoning": decision.reasoning,
-                "recommended_action": decision.recommended_action,
-                "knowledge_sources_used": decision.knowledge_sources_used,
-                "tech_matches": decision.tech_matches,
-            }
-        except Exception as e:
-            logger.warning(f"Scout agent failed: {e}")
-            result.agent_error = str(e)
-            l3.status = "failed"
-            l3.error = str(e)
-        l3.finished_at = datetime.now(timezone.utc).isoformat()
-        l3.duration_ms = int((time.monotonic() - l3_start) * 1000)
-    trace.layers["scout_agent"] = l3
+        trace.layers["deterministic_scorer"] = l1
+
+        # Start whatever still depends on the contact, then wait on both
+        if not skip_enrichment and apollo_task is None:
+            apollo_task = asyncio.create_task(_enrich(l2, {
+                "email": scored.email or email or "",
+                "first_name": first_name or scored.firstname or "",
+                "last_name": last_name or scored.lastname or "",
+                "company": company or scored.company or "",
+                "domain": domain or "",
+            }))
+        knowledge = LayerTrace(name="knowledge_prefetch")
+        if not skip_agent:
+            knowledge_task = asyncio.create_task(_prefetch_knowledge(knowledge, scored))
+
+        # --- Layer 2: Filtered Apollo Enrichment ---
+        enrichment = None
+        if apollo_task is not None:
+            enrichment = await apollo_task
+            if enrichment is not None:
+                result.enrichment = enrichment
+                routing = classify_route(scored, enrichment)
+                result.final_routing = routing
+                l2.output_summary["updated_routing"] = routing
+            else:
+                result.enrichment_error = l2.error
+        trace.layers["apollo_enrichment"] = l2
+
+        # --- Layer 3: Scout Agent ---
+        l3 = LayerTrace(name="scout_agent")
+        if knowledge_task is not None:
+            knowledge_text = await knowledge_task
+            trace.layers["knowledge_prefetch"] = knowledge
+            with _timed(l3):
+                l3.input_summary = {
+                    "base_score": scored.total_score,
+                    "routing": routing,
+                    "tier": tier,
+                    "has_enrichment": enrichment is not None,
+                    "has_knowledge": bool(knowledge_text),
+                }
+                try:
+                    from truv_scout.agent import run_scout_agent
+
+                    decision = await asyncio.to_thread(
+                        run_scout_agent, scored, enrichment, routing, tier, knowledge_text
+                    )
+                    result.decision = decision
+                    result.final_score = decision.adjusted_score
+                    result.final_tier = decision.tier
+                    result.final_routing = decision.routing
+                    result.reasoning = decision.reasoning
+                    result.recommended_action = decision.recommended_action
+                    result.confidence = decision.confidence
+
+                    l3.status = "complete"
+                    l3.output_summary = {
+                        "adjusted_score": decision.adjusted_score,
+                        "tier": decision.tier,
+                        "routing": decision.routing,
+                        "confidence": decision.confidence,
+                        "reasoning": decision.reasoning,
+                        "recommended_action": decision.recommended_action,
+                        "knowledge_sources_used": decision.knowledge_sources_used,
+                        "tech_matches": decision.tech_matches,
+                    }
+                except Exception as e:
+                    logger.warning(f"Scout agent failed: {e}")
+                    result.agent_error = str(e)
+                    l3.status = "failed"
+                    l3.error = str(e)
+        trace.layers["scout_agent"] = l3
+    finally:
+        # Only reached with work pending if the caller was cancelled or
+        # scoring raised — don't leave Apollo or KB calls running
+        for task in (apollo_task, knowledge_task):
+            if task is not None and not task.done():
+                task.cancel()
 
     # --- Layer 4: Learning Engine (STUB) ---
     l4 = LayerTrace(name="learning_engine", status="skipped")
@@ -215,30 +268,127 @@ def run_pipeline(
     trace.layers["learning_engine"] = l4
 
     # Finalize trace
-    trace.finished_at = datetime.now(timezone.utc).isoformat()
+    trace.finished_at = _now()
     trace.total_duration_ms = int((time.monotonic() - pipeline_start) * 1000)
     result.trace = trace
 
     return result
 
 
-def _resolve_contact(
+# ── Layer helpers ─────────────────────────────────────────────────────
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@contextmanager
+def _timed(layer: LayerTrace) -> Iterator[LayerTrace]:
+    """Stamp a layer's started_at, finished_at and duration_ms around its work.
+
+    Layers run concurrently, so each is timed from when its own work starts
+    rather than from when the previous layer finished.
+    """
+    layer.started_at = _now()
+    start = time.monotonic()
+    try:
+        yield layer
+    finally:
+        layer.finished_at = _now()
+        layer.duration_ms = int((time.monotonic() - start) * 1000)
+
+
+async def _fetch_contact(layer: LayerTrace, contact_id: str) -> Optional[dict]:
+    """Fetch a contact from HubSpot, or None if the fetch fails."""
+    with _timed(layer):
+        try:
+            client = HubSpotClient()
+            contact = await asyncio.to_thread(client.get_contact, contact_id, properties=SCORE_PROPERTIES)
+        except Exception as e:
+            logger.warning(f"HubSpot fetch failed for {contact_id}: {e}")
+            layer.status = "failed"
+            layer.error = str(e)
+            return None
+        layer.status = "complete"
+        layer.output_summary = {"properties": len(contact.get("properties", {}))}
+        return contact
+
+
+async def _enrich(layer: LayerTrace, inputs: dict) -> Optional[ScoutEnrichment]:
+    """Run filtered Apollo enrichment into ``layer``; None if it fails."""
+    with _timed(layer):
+        layer.input_summary = dict(inputs)
+        try:
+            from truv_scout.tools.apollo import FilteredApolloEnrichment
+
+            apollo = FilteredApolloEnrichment()
+            enrichment = await apollo.enrich_async(**inputs)
+        except Exception as e:
+            logger.warning(f"Apollo enrichment failed: {e}")
+            layer.status = "failed"
+            layer.error = str(e)
+            return None
+
+        layer.status = "complete"
+        layer.output_summary = {
+            "tech_intent": enrichment.tech_intent,
+            "los_pos_matches": enrichment.los_pos_matches,
+            "voi_voe_matches": enrichment.voi_voe_matches,
+            "employee_count": enrichment.employee_count,
+            "revenue": enrichment.revenue,
+            "industry": enrichment.industry,
+            "person_title": enrichment.person_title,
+            "person_seniority": enrichment.person_seniority,
+            "company_name": enrichment.company_name,
+        }
+        return enrichment
+
+
+async def _prefetch_knowledge(layer: LayerTrace, scored: ScoredContact) -> str:
+    """Run the agent's routine knowledge base lookups ahead of time.
+
+    The research pass always starts with list_sources() and a search for the
+    lead's company or use case. Neither depends on Apollo, so they run while
+    enrichment is in flight. Returns "" if the lookups fail, and the agent
+    then does them itself.
+    """
+    from truv_scout.tools.awareness import list_sources
+    from truv_scout.tools.search import search_knowledge_base
+
+    queries: list[str] = []
+    for value in [scored.company, *(scored.raw_properties.get(p) for p in KNOWLEDGE_QUERY_PROPERTIES)]:
+        value = (value or "").strip()
+        if value and value.lower() not in {q.lower() for q in queries}:
+            queries.append(value)
+    queries = queries[:MAX_KNOWLEDGE_QUERIES]
+
+    with _timed(layer):
+        layer.input_summary = {"queries": queries}
+        try:
+            sources, *searches = await asyncio.gather(
+                asyncio.to_thread(list_sources),
+                *(asyncio.to_thread(search_knowledge_base, q) for q in queries),
+            )
+        except Exception as e:
+            logger.warning(f"Knowledge prefetch failed: {e}")
+            layer.status = "failed"
+            layer.error = str(e)
+            return ""
+
+        hits = [s for s in searches if not s.startswith("No matches found")]
+        layer.status = "complete"
+        layer.output_summary = {"queries": len(queries), "with_matches": len(hits)}
+        return "\n\n".join([sources, *hits])
+
+
+def _manual_contact(
     contact_id: Optional[str],
     email: Optional[str],
     first_name: Optional[str],
     last_name: Optional[str],
     company: Optional[str],
 ) -> dict:
-    """Fetch or construct a HubSpot-style contact dict."""
-    if contact_id:
-        try:
-            client = HubSpotClient()
-            contact = client.get_contact(contact_id, properties=SCORE_PROPERTIES)
-            return contact
-        except Exception as e:
-            logger.warning(f"HubSpot fetch failed for {contact_id}: {e}")
-
-    # Construct minimal contact dict
+    """Construct a minimal HubSpot-style contact dict from request fields."""
     return {
         "id": contact_id or email or "manual",
         "properties": {
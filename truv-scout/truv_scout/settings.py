@@ -40,6 +40,11 @@ class Settings(BaseSettings):
     # Enterprise routing: HubSpot owner ID for SDR queue assignment
     enterprise_sdr_owner_id: str = ""
 
+    # /score runs pipelines on a dedicated pool; beyond workers + queue limit
+    # in flight, new requests get 503 instead of piling up
+    score_workers: int = 4
+    score_queue_limit: int = 16
+
     model_config = {"env_file": ".env", "extra": "ignore", "populate_by_name": True}
 
 
@@ -1,12 +1,13 @@
 """Filtered Apollo enrichment for mortgage-relevant tech stacks."""
 
+import asyncio
 import json
 import logging
 from pathlib import Path
 from typing import Optional
 
 from outreach_intel.enrichment.apollo_client import ApolloClient
-from outreach_intel.enrichment.base import HiringSignal
+from outreach_intel.enrichment.base import EnrichmentResult, HiringSignal
 
 from truv_scout.models import ScoutEnrichment
 
@@ -50,7 +51,63 @@ class FilteredApolloEnrichment:
             email=email or None,
             domain=domain or None,
         )
+        return self._to_enrichment(result)
 
+    async def enrich_async(
+        self,
+        email: str,
+        first_name: str = "",
+        last_name: str = "",
+        company: str = "",
+        domain: str = "",
+    ) -> ScoutEnrichment:
+        """Same result as enrich(), overlapping Apollo's calls where inputs allow.
+
+        enrich_full runs person → org → job postings in series. Only the
+        person match is a true prerequisite: org enrichment needs a domain
+        (known up front when passed in) and job postings need the person's
+        org id. So the org lookup starts with the person match when a domain
+        is given, and otherwise runs alongside the job postings.
+        """
+        client = self.client
+        org_task = asyncio.ensure_future(asyncio.to_thread(client.enrich_organization, domain)) if domain else None
+        try:
+            person = await asyncio.to_thread(
+                client.enrich_person,
+                first_name,
+                last_name,
+                company=company or None,
+                email=email or None,
+                domain=domain or None,
+            )
+            credits = 1
+
+            org_domain = domain or person.company_domain
+            hiring = []
+            if org_domain:
+                if org_task is None:
+                    org_task = asyncio.ensure_future(asyncio.to_thread(client.enrich_organization, org_domain))
+                credits += 1
+
+                org_id = person.raw.get("organization", {}).get("id")
+                if org_id:
+                    hiring = await asyncio.to_thread(client.get_job_postings, org_id)
+                    credits += 1
+            enriched_company = await org_task if org_task else None
+        finally:
+            if org_task and not org_task.done():
+                org_task.cancel()
+
+        return self._to_enrichment(EnrichmentResult(
+            person=person,
+            company=enriched_company,
+            hiring_signals=hiring,
+            provider="apollo",
+            credits_used=credits,
+        ))
+
+    def _to_enrichment(self, result: EnrichmentResult) -> ScoutEnrichment:
+        """Filter a raw Apollo result down to mortgage-relevant signals."""
         tech_stack = result.company.tech_stack if result.company else []
         los_matches = self._filter_tech_stack(tech_stack, self._los_pos_providers)
         voe_matches = self._filter_tech_stack(tech_stack, self._voi_voe_providers)